@@ -1,6 +1,8 @@
 import json
 import os
 
+from scene_template import CompiledTemplate
+
 def batch_generate_json_files():
     """
     根据捕获的绿点坐标批量生成JSON文件
@@ -12,7 +14,10 @@ def batch_generate_json_files():
     # 读取模板文件
     template_path = "output/json/test_00.json"
     with open(template_path, 'r', encoding='utf-8') as f:
-        template = json.load(f)
+        template_data = json.load(f)
+
+    # 编译模板：光源(objs[0])的x/y为参数，每帧只编码这两个数值
+    template = CompiledTemplate(template_data, {'x': ('objs', 0, 'x'), 'y': ('objs', 0, 'y')}, indent=4)
 
     # 读取捕获的坐标数据
     coordinates_path = "output/json/green_dot_coordinates.json"
@@ -22,8 +27,8 @@ def batch_generate_json_files():
     coordinates = coord_data['coordinates']
 
     # 获取test_00中光源的坐标
-    light_source = template['objs'][0]
-    template_y = light_source['y']  # 625
+    template_x = template.defaults['x']
+    template_y = template.defaults['y']  # 625
 
     # 获取第一个捕获的纵坐标
     first_captured_y = coordinates[0]['y']  # 556
@@ -31,7 +36,7 @@ def batch_generate_json_files():
     # 计算纵坐标偏移量
     y_offset = template_y - first_captured_y  # 625 - 556 = 69
 
-    print(f"模板光源坐标: ({light_source['x']}, {template_y})")
+    print(f"模板光源坐标: ({template_x}, {template_y})")
     print(f"第一个捕获坐标: ({coordinates[0]['x']}, {first_captured_y})")
     print(f"纵坐标偏移量: {y_offset}")
     print(f"\n开始生成文件...\n")
@@ -42,23 +47,16 @@ def batch_generate_json_files():
 
     # 为每个坐标生成对应的JSON文件
     for i, coord in enumerate(coordinates, start=1):
-        # 创建新的JSON对象（深拷贝模板）
-        new_json = json.loads(json.dumps(template))
-
         # 更新光源坐标
         new_x = coord['x']
         new_y = coord['y'] + y_offset
 
-        new_json['objs'][0]['x'] = new_x
-        new_json['objs'][0]['y'] = new_y
-
         # 生成文件名
         output_filename = f"test_{i:02d}.json"
         output_path = os.path.join(output_dir, output_filename)
 
         # 保存文件
-        with open(output_path, 'w', encoding='utf-8') as f:
-            json.dump(new_json, f, indent=4, ensure_ascii=False)
+        template.write(output_path, x=new_x, y=new_y)
 
         print(f"生成 {output_filename}: 帧 {coord['frame']}, 坐标 ({new_x}, {new_y}), 原始 ({coord['x']}, {coord['y']})")
 
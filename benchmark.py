@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+场景模型基准测试 - 对比大量对象时的内存占用和构造时间
+
+对比三种存储方式（每种构造 N 个平面镜 + 一个 N 顶点的玻璃多边形）:
+  legacy:  使用__dict__的对象（即加入__slots__之前的 Point / FlatMirror）
+  slots:   当前使用__slots__的 Point / FlatMirror / GlassRefractor
+  store:   object_store.ObjectStore 按列批量添加（NumPy数组）
+
+用法:
+    python benchmark.py                      # 默认 N = 100000, 1000000
+    python benchmark.py --sizes 10000 100000
+"""
+
+import argparse
+import gc
+import time
+import tracemalloc
+from dataclasses import dataclass
+
+from ray_optics_controller import Point, FlatMirror, GlassRefractor
+
+
+@dataclass
+class LegacyPoint:
+    """加入__slots__之前的Point"""
+    x: float
+    y: float
+
+
+class LegacyMirror:
+    """加入__slots__之前的FlatMirror（属性保存在__dict__中）"""
+    def __init__(self, p1, p2):
+        self.type = "Mirror"
+        self.position = p1
+        self.p2 = p2
+
+
+def build_legacy(n):
+    mirrors = [LegacyMirror(LegacyPoint(i, 0), LegacyPoint(i, 10)) for i in range(n)]
+    glass = [LegacyPoint(i, i % 7) for i in range(n)]
+    return mirrors, glass
+
+
+def build_slots(n):
+    mirrors = [FlatMirror(Point(i, 0), Point(i, 10)) for i in range(n)]
+    glass = GlassRefractor([Point(i, i % 7) for i in range(n)])
+    return mirrors, glass
+
+
+def build_store(n):
+    import numpy as np
+    from object_store import ObjectStore
+
+    store = ObjectStore()
+    xs = np.arange(n, dtype='float64')
+    store.add_array("Mirror", x1=xs, y1=0, x2=xs, y2=10)
+    store.add_glass([np.column_stack((xs, xs % 7))])
+    return store
+
+
+def measure(builder, n):
+    """返回 (构造用时秒数, 峰值内存MB)"""
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = builder(n)
+    elapsed = time.perf_counter() - start
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return elapsed, current / (1024 * 1024)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='场景模型内存/构造时间基准测试')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[100000, 1000000],
+                        help='对象数量（默认: 100000 1000000）')
+    args = parser.parse_args()
+
+    builders = [('legacy', build_legacy), ('slots', build_slots)]
+    try:
+        import numpy  # noqa: F401
+        builders.append(('store', build_store))
+    except ImportError:
+        print("⚠ 未安装numpy，跳过 ObjectStore")
+
+    print("=" * 60)
+    print("场景模型基准测试（N个平面镜 + N顶点玻璃）")
+    print("=" * 60)
+    for n in args.sizes:
+        print(f"\nN = {n:,}")
+        baseline = None
+        for name, builder in builders:
+            elapsed, memory = measure(builder, n)
+            if baseline is None:
+                baseline = memory
+            print(f"  {name:<8} 构造 {elapsed:7.3f} 秒   内存 {memory:9.1f} MB   "
+                  f"（{memory / baseline:6.1%}）")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""
+常驻无头Chrome浏览器池 - 在多帧截图之间复用已启动的浏览器
+
+每次截图都新建 webdriver.Chrome 需要1~3秒启动时间。
+BrowserPool 保持N个已启动的浏览器，按需租借给截图任务：
+  - 每个浏览器处理 max_frames 帧后自动回收重建
+  - JS堆内存超过 max_memory_mb 时自动回收重建
+  - 使用过程中出错（浏览器崩溃等）时丢弃并重建
+
+用法:
+    from browser_pool import BrowserPool
+    from screenshot_helper import screenshot_with_selenium
+
+    with BrowserPool(size=1) as pool:
+        for html_file, png_file in jobs:
+            screenshot_with_selenium(html_file, png_file, pool=pool)
+"""
+
+import queue
+import threading
+from contextlib import contextmanager
+from typing import Callable, Optional
+
+
+# 默认配置
+DEFAULT_WINDOW_SIZE = (1920, 1080)
+DEFAULT_MAX_FRAMES = 100  # 每个浏览器最多截图帧数（0表示不限制）
+DEFAULT_MAX_MEMORY_MB = 1024  # JS堆内存上限（MB，0表示不检查）
+
+
+def create_chrome_driver(window_size=DEFAULT_WINDOW_SIZE):
+    """创建一个无头Chrome浏览器（需要selenium）"""
+    from selenium import webdriver
+    from selenium.webdriver.chrome.options import Options
+
+    options = Options()
+    options.add_argument('--headless=new')
+    options.add_argument('--no-sandbox')
+    options.add_argument('--disable-dev-shm-usage')
+    options.add_argument(f'--window-size={window_size[0]},{window_size[1]}')
+
+    return webdriver.Chrome(options=options)
+
+
+def _quit_driver(driver):
+    try:
+        driver.quit()
+    except Exception:
+        pass
+
+
+def get_driver_memory_mb(driver) -> Optional[float]:
+    """
+    通过Chrome DevTools协议读取页面JS堆内存（MB）
+
+    非Chrome浏览器或读取失败时返回None
+    """
+    try:
+        driver.execute_cdp_cmd('Performance.enable', {})
+        metrics = driver.execute_cdp_cmd('Performance.getMetrics', {})
+    except Exception:
+        return None
+
+    for metric in metrics.get('metrics', []):
+        if metric.get('name') == 'JSHeapUsedSize':
+            return metric['value'] / (1024 * 1024)
+    return None
+
+
+class _PooledBrowser:
+    """池中的一个浏览器槽位（浏览器按需启动）"""
+
+    def __init__(self, factory: Callable):
+        self.factory = factory
+        self.driver = None
+        self.frames = 0
+
+    def get(self):
+        if self.driver is None:
+            self.driver = self.factory()
+            self.frames = 0
+        return self.driver
+
+    def discard(self):
+        if self.driver is not None:
+            _quit_driver(self.driver)
+            self.driver = None
+            self.frames = 0
+
+
+class BrowserPool:
+    """
+    无头Chrome浏览器池
+
+    参数:
+        size: 浏览器数量
+        max_frames: 每个浏览器截图多少帧后回收重建（0表示不限制）
+        max_memory_mb: JS堆内存超过该值时回收重建（0表示不检查）
+        driver_factory: 创建浏览器的函数（默认 create_chrome_driver）
+        warm: 是否在创建池时立即启动所有浏览器（默认首次使用时启动）
+    """
+
+    def __init__(self, size: int = 1, max_frames: int = DEFAULT_MAX_FRAMES,
+                 max_memory_mb: float = DEFAULT_MAX_MEMORY_MB,
+                 driver_factory: Optional[Callable] = None, warm: bool = False):
+        if size < 1:
+            raise ValueError(f"浏览器池大小必须大于0: {size}")
+
+        self.size = size
+        self.max_frames = max_frames
+        self.max_memory_mb = max_memory_mb
+        self._slots = [_PooledBrowser(driver_factory or create_chrome_driver) for _ in range(size)]
+        self._idle = queue.Queue()
+        for slot in self._slots:
+            self._idle.put(slot)
+        self._lock = threading.Lock()
+        self._closed = False
+
+        # 统计
+        self.launched = 0
+        self.recycled = 0
+        self.crashed = 0
+
+        if warm:
+            for slot in self._slots:
+                self._start(slot)
+
+    def _start(self, slot: _PooledBrowser):
+        if slot.driver is None:
+            slot.get()
+            with self._lock:
+                self.launched += 1
+        return slot.driver
+
+    def _needs_recycle(self, slot: _PooledBrowser) -> bool:
+        if self.max_frames and slot.frames >= self.max_frames:
+            return True
+        if self.max_memory_mb:
+            memory = get_driver_memory_mb(slot.driver)
+            if memory is not None and memory > self.max_memory_mb:
+                return True
+        return False
+
+    @contextmanager
+    def lease(self):
+        """
+        租借一个浏览器，用完自动归还
+
+        with块内抛出异常时，认为浏览器已损坏，丢弃后下次使用时重建
+        """
+        if self._closed:
+            raise RuntimeError("浏览器池已关闭")
+
+        slot = self._idle.get()
+        try:
+            driver = self._start(slot)
+            try:
+                yield driver
+            except BaseException:
+                slot.discard()
+                with self._lock:
+                    self.crashed += 1
+                raise
+
+            slot.frames += 1
+            if self._needs_recycle(slot):
+                slot.discard()
+                with self._lock:
+                    self.recycled += 1
+        finally:
+            self._idle.put(slot)
+
+    def close(self):
+        """关闭所有浏览器"""
+        if self._closed:
+            return
+        self._closed = True
+        for slot in self._slots:
+            slot.discard()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
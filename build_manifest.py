@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""
+构建清单 - 基于内容哈希的增量重建
+
+为每个输出（HTML+PNG）记录场景JSON的规范化哈希和渲染设置的哈希。
+再次运行时只重建输入发生变化或输出文件缺失的场景，
+而不是简单地"PNG存在就跳过"（那样修改过的场景会一直保留旧图片）。
+
+清单文件默认保存在 output/.build_manifest.json:
+    {
+      "version": 1,
+      "entries": {
+        "output/images/test_01.png": {"scene": "<sha256>", "settings": "<sha256>"},
+        ...
+      }
+    }
+
+用法:
+    from build_manifest import BuildManifest, scene_hash, render_settings
+
+    with BuildManifest() as manifest:
+        settings = render_settings(crop_top=75)
+        if manifest.needs_rebuild(png_path, scene_hash(data), settings, [html_path, png_path]):
+            ...  # 重新生成
+            manifest.record(png_path, scene_hash(data), settings)
+"""
+
+import hashlib
+import json
+import os
+import threading
+from typing import Callable, Iterable, Optional
+
+
+DEFAULT_MANIFEST_PATH = os.path.join('output', '.build_manifest.json')
+MANIFEST_VERSION = 1
+AUTOSAVE_EVERY = 100  # 每记录多少条自动保存一次（中途中断时不丢失已完成的进度）
+
+
+def _hash_json(value) -> str:
+    canonical = json.dumps(value, sort_keys=True, ensure_ascii=False, separators=(',', ':'))
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+
+def scene_hash(data: dict) -> str:
+    """场景JSON的规范化哈希（与键顺序、缩进无关）"""
+    return _hash_json(data)
+
+
+def render_settings(crop_top: int, viewport=None, simulator_url: Optional[str] = None,
+                    simulator_build: Optional[str] = None, **extra) -> dict:
+    """
+    影响渲染结果的设置
+
+    参数:
+        crop_top: 顶部裁剪像素
+        viewport: 浏览器窗口大小（默认 browser_pool.DEFAULT_WINDOW_SIZE）
+        simulator_url: 仿真器地址（默认 screenshot_helper.get_simulator_url()）
+        simulator_build: 仿真器构建的版本标识（默认 screenshot_helper.get_simulator_version()：
+                         本地仿真器为构建文件的指纹，更新构建后旧截图失效；远程仿真器以地址代表版本）
+        extra: 其他需要参与比较的设置
+    """
+    if viewport is None:
+        from browser_pool import DEFAULT_WINDOW_SIZE
+        viewport = DEFAULT_WINDOW_SIZE
+    if simulator_url is None:
+        from screenshot_helper import get_simulator_url
+        simulator_url = get_simulator_url()
+    if simulator_build is None:
+        from screenshot_helper import get_simulator_version
+        simulator_build = get_simulator_version()
+
+    settings = {
+        'crop_top': crop_top,
+        'viewport': list(viewport),
+        'simulator': simulator_url,
+    }
+    if simulator_build is not None:
+        settings['simulator_build'] = simulator_build
+    settings.update(extra)
+    return settings
+
+
+def settings_hash(settings: dict) -> str:
+    """渲染设置的哈希"""
+    return _hash_json(settings)
+
+
+def _key(path: str) -> str:
+    return os.path.normpath(path).replace(os.sep, '/')
+
+
+class BuildManifest:
+    """
+    增量构建清单
+
+    参数:
+        path: 清单文件路径
+        force: 为True时所有输出都视为需要重建
+        before_save: 每次保存清单（包括自动保存）之前调用，用于先写出清单所依赖的其他输出
+                     （如 SceneManifest.flush），中途中断时清单不会记录尚未写入的结果
+    """
+
+    def __init__(self, path: str = DEFAULT_MANIFEST_PATH, force: bool = False,
+                 before_save: Optional[Callable[[], None]] = None):
+        self.path = path
+        self.force = force
+        self.before_save = before_save
+        self.entries = {}
+        self._lock = threading.Lock()
+        self._save_lock = threading.Lock()
+        self._pending = 0
+        self.load()
+
+    def load(self):
+        """读取清单（文件不存在或损坏时视为空清单）"""
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            data = {}
+        if data.get('version') == MANIFEST_VERSION:
+            self.entries = data.get('entries', {})
+        else:
+            self.entries = {}
+
+    def save(self):
+        """原子写入清单（并发调用时依次执行）"""
+        with self._save_lock:
+            with self._lock:
+                # 先取快照再调用 before_save：快照中的输出都在 before_save 之前完成
+                entries = dict(self.entries)
+                self._pending = 0
+            if self.before_save is not None:
+                self.before_save()
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            tmp_path = self.path + '.tmp'
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({'version': MANIFEST_VERSION, 'entries': entries}, f,
+                          ensure_ascii=False, separators=(',', ':'))
+            os.replace(tmp_path, self.path)
+
+    def needs_rebuild(self, output: str, scene_digest: str, settings: dict,
+                      outputs: Iterable[str] = ()) -> bool:
+        """
+        判断输出是否需要重建
+
+        参数:
+            output: 输出标识（通常为PNG路径）
+            scene_digest: scene_hash() 的结果
+            settings: render_settings() 的结果
+            outputs: 必须存在的输出文件（任一缺失即需要重建）
+        """
+        if self.force:
+            return True
+        entry = self.entries.get(_key(output))
+        if entry is None:
+            return True
+        if entry.get('scene') != scene_digest or entry.get('settings') != settings_hash(settings):
+            return True
+        return not all(os.path.exists(path) for path in outputs)
+
+    def record(self, output: str, scene_digest: str, settings: dict):
+        """记录一个已成功重建的输出（线程安全）"""
+        with self._lock:
+            self.entries[_key(output)] = {
+                'scene': scene_digest,
+                'settings': settings_hash(settings),
+            }
+            self._pending += 1
+            autosave = self._pending >= AUTOSAVE_EVERY
+        if autosave:
+            self.save()
+
+    def forget(self, output: str):
+        """删除一个输出的记录（下次必定重建）"""
+        with self._lock:
+            self.entries.pop(_key(output), None)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.save()
@@ -0,0 +1,44 @@
+#!/usr/bin/env node
+/**
+ * 常驻压缩进程 - 使用json-url('lzma')压缩JSON数据
+ * 与compress_json.js使用同一编码器，但只启动一次Node并复用已加载的json-url/lzma
+ *
+ * 协议（按行分隔，每行一个JSON）：
+ *   请求: {"id": 1, "scene": "<场景JSON字符串>"}
+ *   响应: {"id": 1, "ok": true, "result": "<压缩后的hash>"}
+ *         {"id": 1, "ok": false, "error": "<错误信息>"}
+ */
+
+const readline = require('readline');
+const codec = require('json-url')('lzma');
+
+const rl = readline.createInterface({ input: process.stdin, terminal: false });
+
+function reply(message) {
+    process.stdout.write(JSON.stringify(message) + '\n');
+}
+
+// 按顺序处理请求，保证响应顺序与请求顺序一致
+let queue = Promise.resolve();
+
+rl.on('line', (line) => {
+    if (!line.trim()) {
+        return;
+    }
+
+    queue = queue.then(async () => {
+        let id = null;
+        try {
+            const request = JSON.parse(line);
+            id = request.id;
+            const compressed = await codec.compress(JSON.parse(request.scene));
+            reply({ id: id, ok: true, result: compressed });
+        } catch (error) {
+            reply({ id: id, ok: false, error: error.message });
+        }
+    });
+});
+
+rl.on('close', () => {
+    queue.then(() => process.exit(0));
+});
@@ -0,0 +1,276 @@
+#!/usr/bin/env python3
+"""
+常驻Node压缩进程池 - 复用json-url('lzma')编码器
+
+每个工作进程运行 compress_worker.js，通过stdin/stdout按行收发请求，
+避免每个场景都冷启动一次Node并重新加载json-url/lzma。
+"""
+
+import atexit
+import functools
+import json
+import os
+import queue
+import shutil
+import subprocess
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional
+
+
+WORKER_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'compress_worker.js')
+
+# 默认进程池大小（None表示按CPU核数自动选择，最多4个）
+DEFAULT_POOL_SIZE = None
+
+# 等待单个压缩结果的最长时间（秒），超时视为进程卡死并重启
+READ_TIMEOUT = 60.0
+
+
+@functools.lru_cache(maxsize=None)
+def node_available(script: str = WORKER_SCRIPT) -> bool:
+    """能否启动压缩进程（PATH中有node，且工作脚本旁已安装json-url）"""
+    directory = os.path.dirname(script)
+    return (shutil.which('node') is not None
+            and os.path.isdir(os.path.join(directory, 'node_modules', 'json-url')))
+
+
+class CompressionError(RuntimeError):
+    """压缩进程返回的错误"""
+
+
+def _read_lines(stream, lines: queue.Queue):
+    """后台读取进程输出（读到EOF时放入空行）"""
+    for line in iter(stream.readline, b''):
+        lines.put(line)
+    lines.put(b'')
+
+
+class _NodeWorker:
+    """单个常驻Node压缩进程"""
+
+    def __init__(self, script: str, timeout: Optional[float] = READ_TIMEOUT):
+        self.script = script
+        self.timeout = timeout
+        self.process = None
+        self._lines = None
+        self._next_id = 0
+        self.restarts = 0
+        self._start()
+
+    def _start(self):
+        self.process = subprocess.Popen(
+            ['node', self.script],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            cwd=os.path.dirname(self.script),
+        )
+        # 由后台线程读取stdout，主线程可以带超时等待响应
+        self._lines = queue.Queue()
+        threading.Thread(target=_read_lines, args=(self.process.stdout, self._lines),
+                         daemon=True).start()
+
+    def restart(self):
+        """重启已崩溃的进程"""
+        self.close()
+        self.restarts += 1
+        self._start()
+
+    def alive(self) -> bool:
+        return self.process is not None and self.process.poll() is None
+
+    def compress(self, scene_json: str) -> str:
+        if not self.alive():
+            self.restart()
+
+        self._next_id += 1
+        request = json.dumps({"id": self._next_id, "scene": scene_json}, ensure_ascii=False)
+        self.process.stdin.write(request.encode('utf-8') + b'\n')
+        self.process.stdin.flush()
+
+        try:
+            line = self._lines.get(timeout=self.timeout)
+        except queue.Empty:
+            # 进程卡死：直接结束，下次调用时重启
+            self.kill()
+            raise TimeoutError(f"压缩进程超过 {self.timeout} 秒未响应")
+        if not line:
+            raise BrokenPipeError("压缩进程意外退出")
+
+        response = json.loads(line)
+        if response.get("id") != self._next_id:
+            raise BrokenPipeError("压缩进程响应错位")
+        if not response.get("ok"):
+            raise CompressionError(response.get("error", "未知错误"))
+        return response["result"]
+
+    def kill(self):
+        if self.process is None:
+            return
+        self.process.kill()
+        self.close()
+
+    def close(self):
+        if self.process is None:
+            return
+        try:
+            self.process.stdin.close()
+        except OSError:
+            pass
+        try:
+            self.process.wait(timeout=2)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+            self.process.wait()
+        self.process = None
+
+
+class CompressionPool:
+    """
+    Node压缩进程池
+
+    参数:
+        size: 工作进程数量（默认按CPU核数，最多4个）
+        script: 工作脚本路径（默认 compress_worker.js）
+        max_retries: 进程崩溃或超时后自动重启并重试的次数
+        timeout: 等待单个压缩结果的最长时间（秒，None表示不限）
+
+    用法:
+        with CompressionPool(size=4) as pool:
+            hashes = pool.compress_many([json1, json2, ...])
+    """
+
+    def __init__(self, size: Optional[int] = None, script: str = WORKER_SCRIPT,
+                 max_retries: int = 1, timeout: Optional[float] = READ_TIMEOUT):
+        if size is None:
+            size = min(4, os.cpu_count() or 1)
+        if size < 1:
+            raise ValueError(f"进程池大小必须大于0: {size}")
+
+        self.script = script
+        self.max_retries = max_retries
+        self.timeout = timeout
+        self._workers = []
+        self._idle = queue.Queue()
+        self._grow_lock = threading.Lock()
+        self._closed = False
+        self.grow(size)
+
+    @property
+    def size(self) -> int:
+        """工作进程数量"""
+        return len(self._workers)
+
+    def grow(self, size: int):
+        """
+        把进程池扩大到size个工作进程（已不小于size时不变）
+
+        只增加新进程，正在使用中的进程不受影响，可以在其他线程压缩时调用。
+        """
+        with self._grow_lock:
+            if self._closed:
+                raise RuntimeError("压缩进程池已关闭")
+            while len(self._workers) < size:
+                worker = _NodeWorker(self.script, timeout=self.timeout)
+                self._workers.append(worker)
+                self._idle.put(worker)
+
+    def compress(self, scene_json: str) -> str:
+        """压缩单个场景JSON字符串"""
+        if self._closed:
+            raise RuntimeError("压缩进程池已关闭")
+
+        worker = self._idle.get()
+        try:
+            attempt = 0
+            while True:
+                try:
+                    return worker.compress(scene_json)
+                except (BrokenPipeError, OSError, ValueError):
+                    # 进程崩溃、超时（TimeoutError）或输出损坏：重启后重试
+                    if attempt >= self.max_retries:
+                        raise
+                    attempt += 1
+                    worker.restart()
+        finally:
+            self._idle.put(worker)
+
+    def compress_many(self, scene_jsons: List[str], return_exceptions: bool = False) -> list:
+        """
+        并行压缩多个场景，结果顺序与输入一致
+
+        参数:
+            scene_jsons: 场景JSON字符串列表
+            return_exceptions: 为True时单个场景失败不会中断整批，
+                               对应位置返回异常对象
+        """
+        def run(scene_json):
+            try:
+                return self.compress(scene_json)
+            except Exception as e:
+                if return_exceptions:
+                    return e
+                raise
+
+        if self.size == 1 or len(scene_jsons) <= 1:
+            return [run(s) for s in scene_jsons]
+
+        with ThreadPoolExecutor(max_workers=self.size) as executor:
+            return list(executor.map(run, scene_jsons))
+
+    @property
+    def restarts(self) -> int:
+        """累计重启次数"""
+        return sum(w.restarts for w in self._workers)
+
+    def close(self):
+        """关闭所有工作进程"""
+        with self._grow_lock:
+            if self._closed:
+                return
+            self._closed = True
+        for worker in self._workers:
+            worker.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+# ========== 共享进程池 ==========
+_shared_pool = None
+_shared_lock = threading.Lock()
+
+
+def get_shared_pool(size: Optional[int] = None) -> CompressionPool:
+    """
+    获取进程内共享的压缩进程池（首次调用时创建，退出时自动关闭）
+
+    若请求的size大于当前池大小，会在原有的池中增加工作进程；
+    不会关闭其他线程可能仍在使用的池。
+    """
+    global _shared_pool
+    if size is None:
+        size = DEFAULT_POOL_SIZE
+
+    with _shared_lock:
+        if _shared_pool is None:
+            _shared_pool = CompressionPool(size=size)
+        elif size is not None:
+            _shared_pool.grow(size)
+        return _shared_pool
+
+
+def close_shared_pool():
+    """关闭共享进程池"""
+    global _shared_pool
+    with _shared_lock:
+        if _shared_pool is not None:
+            _shared_pool.close()
+            _shared_pool = None
+
+
+atexit.register(close_shared_pool)
@@ -1,12 +1,17 @@
 #!/usr/bin/env python3
 """
 轨迹生成辅助工具 - 快速创建轨迹JSON文件
+
+命令行使用 trajectories.py 的向量化路径（NumPy数组），只在写文件时转换为JSON格式；
+下面的 generate_*_trajectory 返回 [{"x", "y"}] 列表，保留给少量点的Python调用
 """
 
-import json
 import math
 import argparse
 
+import trajectories
+from trajectory_io import write_trajectory
+
 
 def generate_linear_trajectory(start_x, start_y, end_x, end_y, n_points):
     """生成直线轨迹"""
@@ -86,19 +91,45 @@ def main():
   python create_trajectory.py -t grid -o zigzag.json \\
       --x-range 100 500 --y-range 100 500 \\
       --x-steps 10 --y-steps 5 --zigzag
+
+  # 三次贝塞尔曲线（4个控制点，100个点）
+  python create_trajectory.py -t bezier -o bezier.json \\
+      --points 100 300 300 100 500 500 700 300 -n 100
+
+  # 经过各点的样条（闭合）
+  python create_trajectory.py -t spline -o spline.json \\
+      --points 200 200 600 200 600 500 200 500 -n 200 --closed
+
+  # 李萨如曲线（频率3:2）
+  python create_trajectory.py -t lissajous -o lissajous.json \\
+      --center 500 400 --amplitude 300 200 --frequency 3 2 -n 500
+
+  # 螺线（从半径20到200，转3圈）
+  python create_trajectory.py -t spiral -o spiral.json \\
+      --center 500 400 --radius-range 20 200 --turns 3 -n 300
+
+  # 百万点网格扫描，写为NumPy数组（generate_trajectory.py 以内存映射读取）
+  python create_trajectory.py -t grid -o scan.npy -f npy \\
+      --x-range 100 1100 --y-range 100 500 --x-steps 2000 --y-steps 500
+
+  # 沿折线每隔10个单位取一个点
+  python create_trajectory.py -t polyline -o path.json \\
+      --points 100 100 500 100 500 400 --spacing 10
         '''
     )
 
     parser.add_argument('-t', '--type', required=True,
-                        choices=['line', 'circle', 'grid'],
+                        choices=['line', 'circle', 'grid', 'bezier', 'spline',
+                                 'lissajous', 'spiral', 'polyline'],
                         help='轨迹类型')
     parser.add_argument('-o', '--output', required=True,
                         help='输出JSON文件路径')
     parser.add_argument('-n', '--n-points', type=int, default=20,
                         help='点数（默认: 20）')
-    parser.add_argument('-f', '--format', choices=['array', 'separated'],
+    parser.add_argument('-f', '--format', choices=['array', 'separated', 'ndjson', 'npy', 'npz'],
                         default='array',
-                        help='输出格式：array=[{x,y}], separated={x:[],y:[]}（默认: array）')
+                        help='输出格式：array=[{x,y}], separated={x:[],y:[]}, '
+                             'ndjson=每行一个点, npy/npz=NumPy数组（大量点时使用，默认: array）')
 
     # 直线参数
     line_group = parser.add_argument_group('直线轨迹参数')
@@ -131,60 +162,93 @@ def main():
     grid_group.add_argument('--zigzag', action='store_true',
                             help='启用Z字形扫描')
 
+    # 曲线参数
+    curve_group = parser.add_argument_group('曲线/折线参数')
+    curve_group.add_argument('--points', nargs='+', type=float, metavar='X Y',
+                             help='控制点/顶点坐标 (x1 y1 x2 y2 ...)，用于 bezier、spline、polyline')
+    curve_group.add_argument('--closed', action='store_true',
+                             help='闭合曲线（spline、polyline）')
+    curve_group.add_argument('--alpha', type=float, default=0.5,
+                             help='样条参数化：0均匀、0.5向心、1弦长（默认: 0.5）')
+    curve_group.add_argument('--spacing', type=float,
+                             help='折线按弧长等距取点的间距（指定时忽略 -n）')
+    curve_group.add_argument('--amplitude', nargs=2, type=float, metavar=('AX', 'AY'),
+                             help='李萨如曲线振幅 (ax ay)')
+    curve_group.add_argument('--frequency', nargs=2, type=float, metavar=('FX', 'FY'),
+                             help='李萨如曲线频率 (fx fy)')
+    curve_group.add_argument('--phase', type=float, default=90,
+                             help='李萨如曲线x方向相位（度数，默认: 90）')
+    curve_group.add_argument('--radius-range', nargs=2, type=float, metavar=('START', 'END'),
+                             help='螺线起止半径')
+    curve_group.add_argument('--turns', type=float, default=3,
+                             help='螺线圈数（默认: 3）')
+
     args = parser.parse_args()
 
-    # 生成轨迹
-    trajectory = None
+    # 生成轨迹（(N, 2) 数组）
+    points = None
+    control = None
+    if args.points is not None:
+        if len(args.points) % 2:
+            parser.error("--points 需要成对的 x y 坐标")
+        control = list(zip(args.points[0::2], args.points[1::2]))
 
     if args.type == 'line':
         if not args.start or not args.end:
             parser.error("直线轨迹需要 --start 和 --end 参数")
-        trajectory = generate_linear_trajectory(
-            args.start[0], args.start[1],
-            args.end[0], args.end[1],
-            args.n_points
-        )
+        points = trajectories.line(args.start, args.end, args.n_points)
 
     elif args.type == 'circle':
         if not args.center or not args.radius:
             parser.error("圆周轨迹需要 --center 和 --radius 参数")
         start_rad = math.radians(args.start_angle)
         end_rad = math.radians(args.end_angle) if args.end_angle is not None else None
-        trajectory = generate_circular_trajectory(
-            args.center[0], args.center[1],
-            args.radius,
-            args.n_points,
-            start_rad, end_rad
-        )
+        points = trajectories.circle(args.center, args.radius, args.n_points, start_rad, end_rad)
 
     elif args.type == 'grid':
         if not args.x_range or not args.y_range:
             parser.error("网格扫描需要 --x-range 和 --y-range 参数")
-        trajectory = generate_grid_trajectory(
+        points = trajectories.grid(
             args.x_range[0], args.x_range[1], args.x_steps,
             args.y_range[0], args.y_range[1], args.y_steps,
             args.zigzag
         )
 
-    # 转换格式
-    if args.format == 'separated':
-        output = {
-            "x": [p["x"] for p in trajectory],
-            "y": [p["y"] for p in trajectory]
-        }
+    elif args.type in ('bezier', 'spline', 'polyline'):
+        if not control or len(control) < 2:
+            parser.error(f"{args.type} 需要至少2个 --points 控制点")
+        if args.type == 'bezier':
+            points = trajectories.bezier(control, args.n_points)
+        elif args.type == 'spline':
+            points = trajectories.catmull_rom(control, args.n_points, alpha=args.alpha, closed=args.closed)
+        else:
+            points = trajectories.polyline(control, None if args.spacing else args.n_points,
+                                           spacing=args.spacing, closed=args.closed)
+
+    elif args.type == 'lissajous':
+        if not args.center or not args.amplitude or not args.frequency:
+            parser.error("李萨如曲线需要 --center、--amplitude 和 --frequency 参数")
+        points = trajectories.lissajous(args.center, args.amplitude, args.frequency, args.n_points,
+                                        phase=math.radians(args.phase))
+
+    elif args.type == 'spiral':
+        if not args.center or not args.radius_range:
+            parser.error("螺线需要 --center 和 --radius-range 参数")
+        points = trajectories.spiral(args.center, args.radius_range[0], args.radius_range[1],
+                                     args.turns, args.n_points, math.radians(args.start_angle))
+
+    # 保存（写文件时才转换为JSON格式）
+    if args.format in ('array', 'separated'):
+        trajectories.save_trajectory(args.output, points, fmt=args.format)
     else:
-        output = trajectory
-
-    # 保存
-    with open(args.output, 'w', encoding='utf-8') as f:
-        json.dump(output, f, indent=2, ensure_ascii=False)
+        write_trajectory(args.output, points, fmt=args.format)
 
     print(f"✓ 已生成轨迹文件: {args.output}")
     print(f"  轨迹类型: {args.type}")
-    print(f"  点数: {len(trajectory)}")
+    print(f"  点数: {len(points)}")
     print(f"  格式: {args.format}")
-    print(f"  起点: ({trajectory[0]['x']:.1f}, {trajectory[0]['y']:.1f})")
-    print(f"  终点: ({trajectory[-1]['x']:.1f}, {trajectory[-1]['y']:.1f})")
+    print(f"  起点: ({points[0, 0]:.1f}, {points[0, 1]:.1f})")
+    print(f"  终点: ({points[-1, 0]:.1f}, {points[-1, 1]:.1f})")
 
 
 if __name__ == "__main__":
@@ -92,7 +92,7 @@ process_video_to_scenes(
 返回值:
 {
     "json_files": [...],   # 生成的JSON文件列表
-    "html_files": [...],   # 生成的HTML文件列表
+    "html_files": [...],   # 场景查看页地址列表（共享 viewer.html?scene=...）
     "image_files": [...]   # 生成的图片文件列表
 }
 
@@ -0,0 +1,382 @@
+#!/usr/bin/env python3
+"""
+帧序列归档 - 一个文件保存整段轨迹：基础场景只存一次，每帧只存与它的差异
+
+轨迹运行把每帧写成 output/json 下的一个 {prefix}_{i:03d}.json，帧数达到1万~10万时，
+目录列举、排序、备份都很慢，而这些文件除了光源坐标几乎完全相同。
+归档文件的结构（整数均为小端 uint64）:
+
+    [magic 8字节][索引偏移][元数据偏移]
+    [基础场景JSON]
+    [第0帧差异JSON][第1帧差异JSON]...
+    [索引: 每帧 (偏移, 长度)]
+    [元数据JSON: 格式版本、帧名列表、基础场景位置]
+
+按帧号随机读取只需从索引中读16字节再读该帧的差异（文件以mmap打开，不读入整个文件）。
+
+差异是对基础场景的操作列表（由 scene_delta 生成，apply_delta 还原）:
+    ["=", 路径, 值]   设置字典键或列表元素（下标等于列表长度时追加）
+    ["-", 路径]       删除字典键
+    ["#", 路径, 长度]  截短列表
+路径是从场景根部开始的键/下标列表，如 ["objs", 5, "x"]。
+
+用法:
+    from frame_archive import FrameArchive, FrameArchiveWriter
+
+    with FrameArchiveWriter("output/trajectory.rayframes") as writer:
+        for i, scene in enumerate(scenes, 1):
+            writer.add(f"trajectory_{i:03d}", scene)   # 第一帧作为基础场景
+
+    archive = FrameArchive("output/trajectory.rayframes")
+    scene = archive.frame(1234)                          # 随机读取
+    scene = archive["trajectory_0042"]
+
+命令行:
+    python frame_archive.py pack output/json -o output/frames.rayframes   # 把目录中的JSON打包
+    python frame_archive.py list output/frames.rayframes
+    python frame_archive.py extract output/frames.rayframes -d output/json
+"""
+
+import argparse
+import json
+import mmap
+import os
+import struct
+import sys
+from array import array
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+
+MAGIC = b'RAYFRM01'
+FORMAT_VERSION = 1
+ARCHIVE_EXTENSION = '.rayframes'
+
+_HEADER = struct.Struct('<8sQQ')
+_ENTRY = struct.Struct('<QQ')
+
+
+def _dumps(value) -> bytes:
+    return json.dumps(value, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+# ---------- 差异 ----------
+
+def scene_delta(base, frame, path: Tuple = ()) -> List[list]:
+    """
+    frame 相对 base 的差异操作列表
+
+    同一对象（is）直接跳过，所以由 CompiledTemplate.render_dict 等路径复制得到的帧
+    只需比较被替换的分支
+    """
+    ops: List[list] = []
+    _diff(base, frame, list(path), ops)
+    return ops
+
+
+def _diff(base, frame, path: list, ops: List[list]):
+    if base is frame:
+        return
+    if type(base) is dict and type(frame) is dict:
+        for key, value in frame.items():
+            if key in base:
+                _diff(base[key], value, path + [key], ops)
+            else:
+                ops.append(["=", path + [key], value])
+        for key in base:
+            if key not in frame:
+                ops.append(["-", path + [key]])
+    elif type(base) is list and type(frame) is list:
+        common = min(len(base), len(frame))
+        for i in range(common):
+            _diff(base[i], frame[i], path + [i], ops)
+        if len(frame) > common:
+            ops.extend(["=", path + [i], frame[i]] for i in range(common, len(frame)))
+        elif len(base) > common:
+            ops.append(["#", path, common])
+    elif type(base) is not type(frame) or base != frame:
+        ops.append(["=", path, frame])
+
+
+def _writable(value, copied: set):
+    """本次还原中第一次修改某个容器时复制它（基础场景本身不被修改）"""
+    if id(value) in copied:
+        return value
+    value = list(value) if isinstance(value, list) else dict(value)
+    copied.add(id(value))
+    return value
+
+
+def apply_delta(base, ops: Iterable[list]):
+    """
+    把差异应用到 base，返回新的场景
+
+    只复制操作路径经过的字典/列表，其余部分与 base 共享（不要原地修改返回值）
+    """
+    copied: set = set()
+    root = [base]
+    for op in ops:
+        kind, path = op[0], op[1]
+        if kind == "#":
+            path = path + [None]  # 截短作用于路径指向的列表本身
+        parent, key = root, 0
+        for step in path[:-1] if path else ():
+            node = _writable(parent[key], copied)
+            parent[key] = node
+            parent, key = node, step
+        if path:
+            node = _writable(parent[key], copied)
+            parent[key] = node
+            parent, key = node, path[-1]
+        if kind == "=":
+            if isinstance(parent, list) and key == len(parent):
+                parent.append(op[2])
+            else:
+                parent[key] = op[2]
+        elif kind == "-":
+            del parent[key]
+        elif kind == "#":
+            del parent[op[2]:]
+        else:
+            raise ValueError(f"未知的差异操作: {kind}")
+    return root[0]
+
+
+# ---------- 写入 ----------
+
+class FrameArchiveWriter:
+    """
+    逐帧写入归档（帧按添加顺序编号，名称不能重复）
+
+    参数:
+        path: 归档文件路径
+        base: 基础场景（默认使用第一帧）
+    """
+
+    def __init__(self, path: str, base: Optional[Dict[str, Any]] = None):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._file = open(path, 'wb')
+        self._file.write(_HEADER.pack(MAGIC, 0, 0))
+        self._base = None
+        self._base_location = None
+        self._index = array('Q')
+        self._names: List[str] = []
+        self._seen = set()
+        if base is not None:
+            self.set_base(base)
+
+    def set_base(self, base: Dict[str, Any]):
+        """设置基础场景（只能设置一次，且要在添加第一帧之前）"""
+        if self._base is not None:
+            raise ValueError("基础场景已经设置")
+        encoded = _dumps(base)
+        self._base = base
+        self._base_location = [self._file.tell(), len(encoded)]
+        self._file.write(encoded)
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    def add_delta(self, name: str, ops: List[list]):
+        """直接写入差异（调用方已知哪些字段变化时使用）"""
+        if self._base is None:
+            raise ValueError("没有基础场景：先 add() 一帧或在构造时传入 base")
+        if name in self._seen:
+            raise ValueError(f"帧名重复: {name}")
+        encoded = _dumps(ops)
+        self._index.extend((self._file.tell(), len(encoded)))
+        self._file.write(encoded)
+        self._names.append(name)
+        self._seen.add(name)
+
+    def add(self, name: str, scene: Dict[str, Any]):
+        """添加一帧（只保存与基础场景的差异）"""
+        if self._base is None:
+            self.set_base(scene)
+        self.add_delta(name, scene_delta(self._base, scene))
+
+    def close(self):
+        if self._file.closed:
+            return
+        if self._base is None:
+            self.set_base({})
+        index_offset = self._file.tell()
+        index = self._index
+        if sys.byteorder != 'little':
+            index = array('Q', index)
+            index.byteswap()
+        self._file.write(index.tobytes())
+        meta_offset = self._file.tell()
+        self._file.write(_dumps({"version": FORMAT_VERSION, "count": len(self._names),
+                                 "base": self._base_location, "names": self._names}))
+        self._file.seek(0)
+        self._file.write(_HEADER.pack(MAGIC, index_offset, meta_offset))
+        self._file.close()
+
+    def abort(self):
+        """放弃写入并删除未完成的文件（头部没有索引偏移，本来也无法打开）"""
+        if not self._file.closed:
+            self._file.close()
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass
+
+    def __enter__(self) -> 'FrameArchiveWriter':
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()  # 出错时不写索引，避免留下看似完整的截断归档
+
+
+def write_archive(path: str, frames: Iterable[Tuple[str, Dict[str, Any]]],
+                  base: Optional[Dict[str, Any]] = None) -> int:
+    """把 (帧名, 场景字典) 序列写成归档，返回帧数"""
+    with FrameArchiveWriter(path, base=base) as writer:
+        for name, scene in frames:
+            writer.add(name, scene)
+        return len(writer)
+
+
+# ---------- 读取 ----------
+
+def is_archive(path: str) -> bool:
+    """文件是否为帧归档（检查开头的magic）"""
+    try:
+        with open(path, 'rb') as f:
+            return f.read(len(MAGIC)) == MAGIC
+    except OSError:
+        return False
+
+
+class FrameArchive:
+    """
+    只读的帧归档（按帧号或帧名随机读取）
+
+    frame(i) 返回的场景与基础场景共享未变化的部分，不要原地修改
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, 'rb')
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self._file.close()
+            raise ValueError(f"不是帧归档文件: {path}")
+        magic, self._index_offset, meta_offset = _HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC or not self._index_offset:
+            self.close()
+            raise ValueError(f"不是帧归档文件（或写入未完成）: {path}")
+        meta = json.loads(self._map[meta_offset:])
+        if meta.get("version") != FORMAT_VERSION:
+            self.close()
+            raise ValueError(f"不支持的归档版本: {meta.get('version')}")
+        self.names: List[str] = meta["names"]
+        self._base_location = meta["base"]
+        self._base = None
+        self._positions = None
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    @property
+    def base(self) -> Dict[str, Any]:
+        if self._base is None:
+            offset, length = self._base_location
+            self._base = json.loads(self._map[offset:offset + length])
+        return self._base
+
+    def index_of(self, name: str) -> int:
+        if self._positions is None:
+            self._positions = {n: i for i, n in enumerate(self.names)}
+        return self._positions[name]
+
+    def delta(self, index: int) -> List[list]:
+        """第index帧的差异操作列表"""
+        if index < 0:
+            index += len(self.names)
+        if not 0 <= index < len(self.names):
+            raise IndexError(f"帧号超出范围: {index}")
+        offset, length = _ENTRY.unpack_from(self._map, self._index_offset + index * _ENTRY.size)
+        return json.loads(self._map[offset:offset + length])
+
+    def frame(self, index: int) -> Dict[str, Any]:
+        """第index帧的场景字典"""
+        return apply_delta(self.base, self.delta(index))
+
+    def __getitem__(self, key) -> Dict[str, Any]:
+        return self.frame(self.index_of(key) if isinstance(key, str) else key)
+
+    def __iter__(self) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        for i, name in enumerate(self.names):
+            yield name, self.frame(i)
+
+    def close(self):
+        if not self._map.closed:
+            self._map.close()
+        self._file.close()
+
+    def __enter__(self) -> 'FrameArchive':
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def __repr__(self) -> str:
+        return f"FrameArchive({self.path!r}, {len(self.names)} frames)"
+
+
+# ---------- 命令行 ----------
+
+def main():
+    parser = argparse.ArgumentParser(description='帧序列归档：打包/列出/解包场景JSON')
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    pack = sub.add_parser('pack', help='把目录中的场景JSON（按文件名排序）打包为一个归档')
+    pack.add_argument('json_dir', help='场景JSON目录')
+    pack.add_argument('-o', '--output', required=True, help=f'归档路径（如 frames{ARCHIVE_EXTENSION}）')
+    pack.add_argument('-p', '--prefix', default='', help='只打包以该前缀开头的文件')
+
+    listing = sub.add_parser('list', help='列出归档中的帧')
+    listing.add_argument('archive')
+
+    extract = sub.add_parser('extract', help='把归档解包为逐帧JSON文件')
+    extract.add_argument('archive')
+    extract.add_argument('-d', '--dir', default='output/json', help='输出目录（默认: output/json）')
+    extract.add_argument('--indent', type=int, default=2, help='JSON缩进（默认: 2）')
+
+    args = parser.parse_args()
+
+    if args.command == 'pack':
+        names = sorted(entry.name for entry in os.scandir(args.json_dir)
+                       if entry.name.endswith('.json') and entry.name.startswith(args.prefix))
+
+        def frames():
+            for filename in names:
+                with open(os.path.join(args.json_dir, filename), 'r', encoding='utf-8') as f:
+                    yield filename[:-len('.json')], json.load(f)
+        count = write_archive(args.output, frames())
+        total = sum(os.path.getsize(os.path.join(args.json_dir, n)) for n in names)
+        print(f"✓ 已打包 {count} 帧: {args.output}（{total / 1024:.0f} KB -> {os.path.getsize(args.output) / 1024:.0f} KB）")
+    elif args.command == 'list':
+        with FrameArchive(args.archive) as archive:
+            for i, name in enumerate(archive.names):
+                print(f"{i:6d}  {name}")
+            print(f"共 {len(archive)} 帧")
+    else:
+        os.makedirs(args.dir, exist_ok=True)
+        with FrameArchive(args.archive) as archive:
+            for name, scene in archive:
+                with open(os.path.join(args.dir, f"{name}.json"), 'w', encoding='utf-8') as f:
+                    json.dump(scene, f, indent=args.indent, ensure_ascii=False)
+            print(f"✓ 已解包 {len(archive)} 帧到 {args.dir}/")
+
+
+if __name__ == "__main__":
+    main()
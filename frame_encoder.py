@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+"""
+动画输出 - 将渲染好的帧直接写入MP4/WebM/GIF
+
+截图得到的PNG字节按顺序送入编码器，不必先在 output/images 下
+写出上千张中间图片再用其他工具拼接。
+
+编码后端（backend='auto' 时按顺序选择）:
+  1. ffmpeg:  通过管道把PNG送入ffmpeg进程（支持 .mp4 / .webm / .gif 等）
+  2. cv2:     cv2.VideoWriter（.mp4 / .avi / .webm）
+  3. pillow:  仅用于 .gif（需要在内存中保留所有帧）
+
+用法:
+    from frame_encoder import FrameEncoder
+
+    with FrameEncoder("output/trajectory.mp4", fps=24) as encoder:
+        for png in frames:
+            encoder.write(png)
+"""
+
+import io
+import os
+import shutil
+import subprocess
+from typing import Optional
+
+
+DEFAULT_FPS = 24
+
+# 各格式的默认ffmpeg编码参数
+FFMPEG_CODECS = {
+    '.mp4': ['-c:v', 'libx264', '-pix_fmt', 'yuv420p', '-crf', '20'],
+    '.mov': ['-c:v', 'libx264', '-pix_fmt', 'yuv420p', '-crf', '20'],
+    '.mkv': ['-c:v', 'libx264', '-pix_fmt', 'yuv420p', '-crf', '20'],
+    '.webm': ['-c:v', 'libvpx-vp9', '-pix_fmt', 'yuv420p', '-b:v', '0', '-crf', '32'],
+}
+
+# 各格式的默认cv2 FourCC
+CV2_FOURCC = {
+    '.mp4': 'mp4v',
+    '.mov': 'mp4v',
+    '.avi': 'XVID',
+    '.mkv': 'XVID',
+    '.webm': 'VP80',
+}
+
+
+def available_backends():
+    """返回当前环境可用的编码后端"""
+    backends = []
+    if shutil.which('ffmpeg'):
+        backends.append('ffmpeg')
+    try:
+        import cv2  # noqa: F401
+        backends.append('cv2')
+    except ImportError:
+        pass
+    try:
+        import PIL  # noqa: F401
+        backends.append('pillow')
+    except ImportError:
+        pass
+    return backends
+
+
+def _choose_backend(ext: str) -> str:
+    backends = available_backends()
+    if 'ffmpeg' in backends:
+        return 'ffmpeg'
+    if ext == '.gif':
+        if 'pillow' in backends:
+            return 'pillow'
+    elif 'cv2' in backends and ext in CV2_FOURCC:
+        return 'cv2'
+    raise RuntimeError(f"没有可用于 {ext} 的编码器，请安装ffmpeg或opencv-python")
+
+
+class FrameEncoder:
+    """
+    按顺序接收PNG帧并编码为动画文件
+
+    参数:
+        output_path: 输出文件路径（扩展名决定格式: .mp4 / .webm / .gif ...）
+        fps: 帧率
+        codec: 编码器名称（ffmpeg后端为 -c:v 参数，如 'libx264'；
+               cv2后端为FourCC，如 'mp4v'）；默认按扩展名选择
+        backend: 'auto'、'ffmpeg'、'cv2' 或 'pillow'
+    """
+
+    def __init__(self, output_path: str, fps: float = DEFAULT_FPS, codec: Optional[str] = None,
+                 backend: str = 'auto'):
+        self.output_path = output_path
+        self.fps = fps
+        self.codec = codec
+        self.ext = os.path.splitext(output_path)[1].lower()
+        self.backend = _choose_backend(self.ext) if backend == 'auto' else backend
+        if self.backend not in ('ffmpeg', 'cv2', 'pillow'):
+            raise ValueError(f"未知的编码后端: {backend}")
+        if self.backend == 'pillow' and self.ext != '.gif':
+            raise ValueError("pillow后端只支持输出 .gif")
+
+        self.frames = 0
+        self.size = None
+        self._process = None
+        self._writer = None
+        self._images = []
+        self._closed = False
+
+        output_dir = os.path.dirname(output_path)
+        if output_dir:
+            os.makedirs(output_dir, exist_ok=True)
+
+    # ---------- 后端 ----------
+
+    def _start_ffmpeg(self):
+        command = ['ffmpeg', '-y', '-loglevel', 'error',
+                   '-f', 'image2pipe', '-c:v', 'png', '-framerate', str(self.fps), '-i', '-']
+        if self.ext == '.gif':
+            command += ['-vf', 'split[a][b];[a]palettegen[p];[b][p]paletteuse']
+        else:
+            # yuv420p要求宽高为偶数（裁剪顶部后高度可能是奇数）
+            command += ['-vf', 'pad=ceil(iw/2)*2:ceil(ih/2)*2']
+            if self.codec:
+                command += ['-c:v', self.codec, '-pix_fmt', 'yuv420p']
+            else:
+                command += FFMPEG_CODECS.get(self.ext, [])
+        command.append(self.output_path)
+        self._process = subprocess.Popen(command, stdin=subprocess.PIPE, stderr=subprocess.PIPE)
+
+    def _write_cv2(self, png: bytes):
+        import cv2
+        import numpy as np
+
+        frame = cv2.imdecode(np.frombuffer(png, dtype=np.uint8), cv2.IMREAD_COLOR)
+        if frame is None:
+            raise ValueError("无法解码PNG帧")
+        height, width = frame.shape[:2]
+        if self._writer is None:
+            fourcc = cv2.VideoWriter_fourcc(*(self.codec or CV2_FOURCC.get(self.ext, 'mp4v')))
+            self._writer = cv2.VideoWriter(self.output_path, fourcc, self.fps, (width, height))
+            if not self._writer.isOpened():
+                raise RuntimeError(f"无法创建视频文件: {self.output_path}")
+            self.size = (width, height)
+        elif (width, height) != self.size:
+            frame = cv2.resize(frame, self.size)
+        self._writer.write(frame)
+
+    def _write_pillow(self, png: bytes):
+        from PIL import Image
+
+        image = Image.open(io.BytesIO(png)).convert('RGB')
+        if self.size is None:
+            self.size = image.size
+        elif image.size != self.size:
+            image = image.resize(self.size)
+        self._images.append(image.quantize(colors=256))
+
+    # ---------- 接口 ----------
+
+    def write(self, png: bytes):
+        """写入一帧（PNG字节）"""
+        if self._closed:
+            raise RuntimeError("编码器已关闭")
+
+        if self.backend == 'ffmpeg':
+            if self._process is None:
+                self._start_ffmpeg()
+            try:
+                self._process.stdin.write(png)
+            except BrokenPipeError:
+                error = self._process.stderr.read().decode('utf-8', 'replace').strip()
+                raise RuntimeError(f"ffmpeg编码失败: {error}")
+        elif self.backend == 'cv2':
+            self._write_cv2(png)
+        else:
+            self._write_pillow(png)
+        self.frames += 1
+
+    def write_file(self, image_path: str):
+        """写入一帧（已有的图片文件）"""
+        with open(image_path, 'rb') as f:
+            self.write(f.read())
+
+    def close(self):
+        """结束编码并写出文件"""
+        if self._closed:
+            return
+        self._closed = True
+
+        if self._process is not None:
+            self._process.stdin.close()
+            error = self._process.stderr.read().decode('utf-8', 'replace').strip()
+            if self._process.wait() != 0:
+                raise RuntimeError(f"ffmpeg编码失败: {error}")
+        if self._writer is not None:
+            self._writer.release()
+        if self._images:
+            duration = int(round(1000 / self.fps))
+            self._images[0].save(self.output_path, save_all=True, append_images=self._images[1:],
+                                 duration=duration, loop=0)
+            self._images = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
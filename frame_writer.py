@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+并行帧写入 - 帧由生成器按需产生，线程池写盘，排队的帧数有上限
+
+轨迹动画的帧数可达数万，先生成全部帧再逐个同步写入时，内存随帧数增长，
+写盘期间解释器也在空等。FrameWriter 接收 (路径, 字节) 并交给有界线程池写入:
+
+  - 排队（已生成、未写完）的帧数达到 max_pending 时 submit 阻塞（背压），
+    生成器不会跑到磁盘前面太远，内存占用与帧数无关
+  - 文件写入在线程中进行（释放GIL），编码下一帧与写盘重叠
+  - 任何一帧写入失败时，下一次 submit 或 close 抛出该异常
+
+用法:
+    from frame_writer import write_frames
+
+    paths = write_frames(template.iter_frames(paths, x=xs, y=ys), workers=4)
+
+    with FrameWriter(workers=4, progress=ProgressBar(total)) as writer:
+        for path, data in frames:
+            writer.submit(path, data)
+"""
+
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable, List, Optional, Tuple
+
+
+WRITE_WORKERS = 4  # 默认写盘线程数
+PENDING_PER_WORKER = 4  # 默认每个线程最多排队的帧数
+
+
+class ProgressBar:
+    """
+    单行进度条（代替逐帧打印）
+
+    输出到终端时原地刷新（最多每 interval 秒一次）；输出被重定向时只在结束时打印一行
+    """
+
+    def __init__(self, total: Optional[int] = None, label: str = "写入", width: int = 30,
+                 interval: float = 0.1, stream=None):
+        self.total = total
+        self.label = label
+        self.width = width
+        self.interval = interval
+        self.stream = stream or sys.stdout
+        self.count = 0
+        self._start = time.time()
+        self._last_draw = 0.0
+        self._lock = threading.Lock()
+        self._tty = hasattr(self.stream, 'isatty') and self.stream.isatty()
+
+    def update(self, n: int = 1):
+        with self._lock:
+            self.count += n
+            now = time.time()
+            if self._tty and now - self._last_draw >= self.interval:
+                self._last_draw = now
+                self._draw(end='')
+
+    def _draw(self, end: str):
+        elapsed = time.time() - self._start
+        rate = self.count / elapsed if elapsed > 0 else 0.0
+        if self.total:
+            filled = int(self.width * min(self.count, self.total) / self.total)
+            bar = '#' * filled + '-' * (self.width - filled)
+            text = f"{self.label} [{bar}] {self.count}/{self.total}"
+        else:
+            text = f"{self.label} {self.count}"
+        self.stream.write(f"\r{text}  {rate:.0f} 帧/秒{end}")
+        self.stream.flush()
+
+    def close(self):
+        with self._lock:
+            self._draw(end='\n')
+
+
+class FrameWriter:
+    """
+    有界线程池写入帧文件
+
+    参数:
+        workers: 写盘线程数
+        max_pending: 最多排队的帧数（默认 workers * PENDING_PER_WORKER）
+        progress: 可选的 ProgressBar（每写完一帧更新一次）
+    """
+
+    def __init__(self, workers: int = WRITE_WORKERS, max_pending: Optional[int] = None,
+                 progress: Optional[ProgressBar] = None):
+        self.workers = max(1, workers)
+        self.max_pending = max_pending or self.workers * PENDING_PER_WORKER
+        self.progress = progress
+        self.written = 0
+        self.bytes = 0
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='frame-writer')
+        self._slots = threading.BoundedSemaphore(self.max_pending)
+        self._lock = threading.Lock()
+        self._error: Optional[BaseException] = None
+        self._directories = set()
+
+    def _write(self, path: str, data: bytes):
+        try:
+            with open(path, 'wb') as f:
+                f.write(data)
+            with self._lock:
+                self.written += 1
+                self.bytes += len(data)
+            if self.progress is not None:
+                self.progress.update()
+        except BaseException as e:
+            with self._lock:
+                if self._error is None:
+                    self._error = e
+        finally:
+            self._slots.release()
+
+    def _raise_error(self):
+        if self._error is not None:
+            raise self._error
+
+    def submit(self, path: str, data: bytes):
+        """提交一帧（排队已满时阻塞到有帧写完）"""
+        self._raise_error()
+        directory = os.path.dirname(path)
+        if directory and directory not in self._directories:
+            os.makedirs(directory, exist_ok=True)
+            self._directories.add(directory)
+        self._slots.acquire()
+        self._executor.submit(self._write, path, data)
+
+    def close(self):
+        """等待所有帧写完，有写入失败时抛出第一个异常"""
+        self._executor.shutdown(wait=True)
+        if self.progress is not None:
+            self.progress.close()
+        self._raise_error()
+
+    def __enter__(self) -> 'FrameWriter':
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self._executor.shutdown(wait=True)  # 已有异常时不再覆盖它
+
+    def __repr__(self) -> str:
+        return f"FrameWriter(workers={self.workers}, max_pending={self.max_pending}, written={self.written})"
+
+
+def write_frames(frames: Iterable[Tuple[str, bytes]], workers: int = WRITE_WORKERS,
+                 max_pending: Optional[int] = None, total: Optional[int] = None,
+                 quiet: bool = False, label: str = "写入") -> List[str]:
+    """
+    逐个取出生成器产生的 (路径, 字节) 并行写入，返回写出的路径列表
+
+    参数:
+        total: 总帧数（用于进度条，未知时只显示计数）
+        quiet: 不显示进度条
+    """
+    progress = None if quiet else ProgressBar(total, label=label)
+    paths = []
+    with FrameWriter(workers, max_pending, progress) as writer:
+        for path, data in frames:
+            writer.submit(path, data)
+            paths.append(path)
+    return paths
@@ -7,7 +7,13 @@ import json
 import os
 import sys
 import argparse
-from typing import List, Dict, Any
+from typing import Iterator, List, Dict, Any, Optional, Tuple
+
+from frame_archive import FrameArchiveWriter
+from frame_writer import WRITE_WORKERS, ProgressBar, write_frames
+from scene_culling import cull_scene
+from scene_template import CompiledTemplate, compile_light_template
+from trajectory_io import TrajectoryFile, point_chunks
 
 
 def load_scene_json(scene_path: str) -> Dict[str, Any]:
@@ -18,7 +24,7 @@ def load_scene_json(scene_path: str) -> Dict[str, Any]:
 
 def load_trajectory_json(trajectory_path: str) -> List[Dict[str, float]]:
     """
-    加载轨迹JSON文件
+    加载轨迹JSON文件（整个文件读入内存，大文件请使用 trajectory_io.TrajectoryFile 读取NDJSON/npy/npz）
 
     支持格式:
     1. 点数组: [{"x": 100, "y": 300}, {"x": 130, "y": 300}, ...]
@@ -69,45 +75,156 @@ def create_light_source(position: Dict[str, float], light_config: Dict[str, Any]
         raise ValueError(f"不支持的光源类型: {light_type}")
 
 
-def generate_trajectory_scenes(
+def _iter_trajectory_chunks(
     base_scene: Dict[str, Any],
-    trajectory: List[Dict[str, float]],
+    trajectory,
+    light_config: Dict[str, Any]
+) -> Iterator[Tuple[CompiledTemplate, int, Dict[str, List[float]]]]:
+    """
+    按块生成 (模板, 本块第一帧的序号, {参数名: 坐标列表})
+
+    模板以第一个位置的光源编译，之后每帧只替换光源坐标
+    """
+    chunks = trajectory.chunks() if hasattr(trajectory, 'chunks') else point_chunks(trajectory)
+    template = None
+    count = 0
+    for xs, ys in chunks:
+        if template is None:
+            scene = {
+                "version": base_scene.get("version", 5),
+                "objs": base_scene.get("objs", []) + [create_light_source({"x": xs[0], "y": ys[0]}, light_config)],
+                "width": base_scene.get("width", 1200),
+                "height": base_scene.get("height", 600),
+                "rayModeDensity": base_scene.get("rayModeDensity", 0.1),
+                "origin": base_scene.get("origin", {"x": 0, "y": 0}),
+                "scale": base_scene.get("scale", 1),
+                "simulateColors": base_scene.get("simulateColors", True)
+            }
+            template = compile_light_template(scene, index=len(scene["objs"]) - 1, indent=2)
+
+        if "x" in template.slots:
+            arrays = {"x": xs, "y": ys}
+        else:
+            # Beam: p2 与 p1 保持固定的宽度偏移
+            width = light_config.get("width", 50)
+            arrays = {"p1_x": xs, "p1_y": ys, "p2_x": xs, "p2_y": [y + width for y in ys]}
+        yield template, count + 1, arrays
+        count += len(xs)
+
+
+def trajectory_light_area(trajectory, light_config: Dict[str, Any]) -> Optional[Tuple[float, float, float, float]]:
+    """光源沿轨迹经过的范围 (xmin, ymin, xmax, ymax)（Beam 包含宽度偏移），轨迹为空时返回None"""
+    chunks = trajectory.chunks() if hasattr(trajectory, 'chunks') else point_chunks(trajectory)
+    offset = light_config.get("width", 50) if light_config.get("type", "PointSource") == "Beam" else 0
+    area = None
+    for xs, ys in chunks:
+        if not len(xs):
+            continue
+        x0, x1 = min(xs), max(xs)
+        y0, y1 = min(ys) + min(offset, 0), max(ys) + max(offset, 0)
+        if area is None:
+            area = (x0, y0, x1, y1)
+        else:
+            area = (min(area[0], x0), min(area[1], y0), max(area[2], x1), max(area[3], y1))
+    return area
+
+
+def iter_trajectory_frames(
+    base_scene: Dict[str, Any],
+    trajectory,
     light_config: Dict[str, Any],
     output_dir: str,
     output_prefix: str
+) -> Iterator[Tuple[str, bytes]]:
+    """
+    按需逐帧生成 (输出路径, 场景JSON字节)
+
+    trajectory: [{"x", "y"}] 列表、(N, 2) 数组或 trajectory_io.TrajectoryFile，
+                按块读取坐标，已生成的帧不保留，内存占用与帧数无关
+    """
+    for template, first, arrays in _iter_trajectory_chunks(base_scene, trajectory, light_config):
+        size = len(next(iter(arrays.values())))
+        paths = (os.path.join(output_dir, f"{output_prefix}_{i:03d}.json")
+                 for i in range(first, first + size))
+        yield from template.iter_frames(paths, **arrays)
+
+
+def write_trajectory_archive(
+    base_scene: Dict[str, Any],
+    trajectory,
+    light_config: Dict[str, Any],
+    archive_path: str,
+    output_prefix: str,
+    quiet: bool = False
 ) -> List[str]:
-    """生成轨迹场景序列"""
+    """
+    把轨迹场景序列写成一个帧归档（见 frame_archive.py），返回帧名列表
 
-    os.makedirs(output_dir, exist_ok=True)
-    json_files = []
+    基础场景只存一次，每帧只存光源坐标；帧名与逐帧JSON的文件名相同（不含 .json）
+    """
+    names = []
+    progress = None if quiet else ProgressBar(len(trajectory), label="归档")
+    with FrameArchiveWriter(archive_path) as writer:
+        for template, first, arrays in _iter_trajectory_chunks(base_scene, trajectory, light_config):
+            if not len(writer):
+                writer.set_base(template.data)
+            paths = [list(template.slots[name]) for name in arrays]
+            for i, row in enumerate(zip(*arrays.values()), first):
+                name = f"{output_prefix}_{i:03d}"
+                writer.add_delta(name, [["=", path, value] for path, value in zip(paths, row)])
+                names.append(name)
+                if progress is not None:
+                    progress.update()
+    if progress is not None:
+        progress.close()
+    return names
 
-    print(f"\n生成光源轨迹: {len(trajectory)} 个位置")
-    print("=" * 60)
 
-    for i, position in enumerate(trajectory, 1):
-        # 复制基础场景
-        scene = {
-            "version": base_scene.get("version", 5),
-            "objs": base_scene.get("objs", []).copy(),
-            "width": base_scene.get("width", 1200),
-            "height": base_scene.get("height", 600),
-            "rayModeDensity": base_scene.get("rayModeDensity", 0.1),
-            "origin": base_scene.get("origin", {"x": 0, "y": 0}),
-            "scale": base_scene.get("scale", 1),
-            "simulateColors": base_scene.get("simulateColors", True)
-        }
+def generate_trajectory_scenes(
+    base_scene: Dict[str, Any],
+    trajectory,
+    light_config: Dict[str, Any],
+    output_dir: str,
+    output_prefix: str,
+    cull: bool = False,
+    workers: int = WRITE_WORKERS,
+    quiet: bool = False,
+    archive: Optional[str] = None
+) -> List[str]:
+    """
+    生成轨迹场景序列
+
+    帧由 iter_trajectory_frames 按需生成，交给有界线程池写盘（见 frame_writer.py）
+
+    trajectory: [{"x", "y"}] 列表、(N, 2) 数组或 trajectory_io.TrajectoryFile
+    cull: 先精简基础场景（删除画面外、退化、重复的对象，见 scene_culling.py），
+          每帧只编码一次精简后的场景；光源经过的范围一并传给精简，
+          挡住画面外光源的遮挡物会保留
+    workers: 写盘线程数
+    quiet: 不显示进度条
+    archive: 写成一个帧归档文件而不是逐帧JSON（见 frame_archive.py），此时返回帧名列表
+    """
+
+    if archive is None:
+        os.makedirs(output_dir, exist_ok=True)
 
-        # 添加光源
-        light = create_light_source(position, light_config)
-        scene["objs"].append(light)
+    if cull:
+        base_scene, report = cull_scene(base_scene,
+                                        light_area=trajectory_light_area(trajectory, light_config))
+        print(report)
 
-        # 保存JSON
-        filename = os.path.join(output_dir, f"{output_prefix}_{i:03d}.json")
-        with open(filename, 'w', encoding='utf-8') as f:
-            json.dump(scene, f, indent=2, ensure_ascii=False)
+    total = len(trajectory)
+    print(f"\n生成光源轨迹: {total} 个位置")
+    print("=" * 60)
+
+    if archive is not None:
+        json_files = write_trajectory_archive(base_scene, trajectory, light_config, archive, output_prefix, quiet=quiet)
+        print("=" * 60)
+        print(f"✓ 已归档 {len(json_files)} 帧: {archive}\n")
+        return json_files
 
-        json_files.append(filename)
-        print(f"✓ 场景已保存: {filename}")
+    json_files = write_frames(iter_trajectory_frames(base_scene, trajectory, light_config, output_dir, output_prefix),
+                              workers=workers, total=total, quiet=quiet)
 
     print("=" * 60)
     print(f"✓ 已生成 {len(json_files)} 个场景文件\n")
@@ -137,6 +254,20 @@ def main():
   # 自动转换为图片
   python generate_trajectory.py scene.json trajectory.json --convert
 
+  # 重采样：直线段每10个单位一帧，转弯处每5度一帧
+  python generate_trajectory.py scene.json trajectory.json --resample curvature --spacing 10 --max-angle 5
+
+  # 重采样：按弧长等距取100帧 / 按1个单位的容差简化
+  python generate_trajectory.py scene.json trajectory.json --resample arc --frames 100
+  python generate_trajectory.py scene.json trajectory.json --resample rdp --tolerance 1
+
+  # 精简场景（删除画面外、长度为0、重复的对象）
+  python generate_trajectory.py scene.json trajectory.json --cull
+
+  # 写成一个帧归档文件（代替上万个JSON文件），再直接从归档渲染
+  python generate_trajectory.py scene.json trajectory.json -a output/trajectory.rayframes
+  python json_to_image.py --archive output/trajectory.rayframes
+
 轨迹文件格式 (trajectory.json):
 
   格式1 - 点数组:
@@ -151,11 +282,16 @@ def main():
     "x": [100, 130, 160, 190],
     "y": [300, 300, 300, 300]
   }
+
+  大文件（百万点，流式/内存映射读取，见 trajectory_io.py）:
+  .ndjson  每行一个点 {"x": 100, "y": 300}
+  .npy     (N, 2) 数组
+  .npz     points 数组，或 x、y 两个数组
         '''
     )
 
     parser.add_argument('scene', help='基础场景JSON文件路径（不含光源）')
-    parser.add_argument('trajectory', help='轨迹数据JSON文件路径')
+    parser.add_argument('trajectory', help='轨迹文件路径（.json、.ndjson、.npy、.npz）')
     parser.add_argument('-o', '--output', default='trajectory',
                         help='输出文件名前缀（默认: trajectory）')
     parser.add_argument('-d', '--dir', default='output/json',
@@ -169,8 +305,30 @@ def main():
                         help='亮度(0-1)（默认: 0.8）')
     parser.add_argument('--width', type=float, default=50,
                         help='平行光束宽度（仅用于Beam类型，默认: 50）')
+    parser.add_argument('--cull', action='store_true',
+                        help='精简基础场景：删除画面外、长度为0、重复的对象（缩短URL hash）')
+
+    # 轨迹重采样（见 trajectories.resample，需要numpy）
+    resample_group = parser.add_argument_group('轨迹重采样（减少帧数）')
+    resample_group.add_argument('--resample', choices=['arc', 'curvature', 'rdp'],
+                                help='arc=按弧长等距, curvature=直线稀疏/转弯密集, rdp=按容差简化')
+    resample_group.add_argument('--spacing', type=float,
+                                help='相邻帧的最大弧长间距（arc、curvature）')
+    resample_group.add_argument('--frames', type=int,
+                                help='重采样后的帧数（arc: 可代替 --spacing；'
+                                     'curvature: 仍需 --spacing，只把总帧数缩放到该值）')
+    resample_group.add_argument('--max-angle', type=float, default=10,
+                                help='相邻帧的最大转角（度数，curvature，默认: 10）')
+    resample_group.add_argument('--tolerance', type=float, default=1.0,
+                                help='简化后轨迹允许的最大偏离距离（rdp，默认: 1.0）')
     parser.add_argument('--convert', action='store_true',
                         help='自动转换为HTML和图片')
+    parser.add_argument('-q', '--quiet', action='store_true',
+                        help='不显示写入进度条')
+    parser.add_argument('--write-workers', type=int, default=WRITE_WORKERS,
+                        help=f'并行写入JSON文件的线程数（默认: {WRITE_WORKERS}）')
+    parser.add_argument('-a', '--archive', metavar='FILE',
+                        help='写成一个帧归档文件（如 output/trajectory.rayframes）而不是逐帧JSON')
 
     args = parser.parse_args()
 
@@ -194,10 +352,29 @@ def main():
     print(f"  对象数量: {len(base_scene.get('objs', []))}")
 
     print(f"\n加载轨迹: {args.trajectory}")
-    trajectory = load_trajectory_json(args.trajectory)
+    trajectory = TrajectoryFile(args.trajectory)  # NDJSON逐行读取，npy/npz内存映射
+    if not len(trajectory):
+        print("❌ 错误: 轨迹文件中没有点")
+        sys.exit(1)
     print(f"  轨迹点数: {len(trajectory)}")
-    print(f"  起点: ({trajectory[0]['x']}, {trajectory[0]['y']})")
-    print(f"  终点: ({trajectory[-1]['x']}, {trajectory[-1]['y']})")
+    if args.resample:
+        import math
+        from trajectories import resample
+        from trajectory_io import load_trajectory_array
+        if args.resample == 'arc' and not args.spacing and not args.frames:
+            parser.error("--resample arc 需要 --spacing 或 --frames")
+        if args.resample == 'curvature' and not args.spacing:
+            parser.error("--resample curvature 需要 --spacing（--frames 只缩放总帧数，不能代替 --spacing）")
+        original = len(trajectory)
+        trajectory = resample(load_trajectory_array(args.trajectory), args.resample,
+                              n_points=args.frames, spacing=args.spacing,
+                              max_angle=math.radians(args.max_angle), tolerance=args.tolerance)
+        print(f"  重采样({args.resample}): {original} -> {len(trajectory)} 个点")
+        start, end = ({'x': float(x), 'y': float(y)} for x, y in trajectory[[0, -1]])
+    else:
+        start, end = trajectory.first(), trajectory.last()
+    print(f"  起点: ({start['x']}, {start['y']})")
+    print(f"  终点: ({end['x']}, {end['y']})")
 
     # 光源配置
     light_config = {
@@ -221,7 +398,11 @@ def main():
         trajectory,
         light_config,
         args.dir,
-        args.output
+        args.output,
+        cull=args.cull,
+        workers=args.write_workers,
+        quiet=args.quiet,
+        archive=args.archive
     )
 
     # 自动转换
@@ -229,10 +410,12 @@ def main():
         print("正在转换为HTML和图片...")
         try:
             from json_to_image import json_to_image
-            json_to_image()
+            json_to_image(archive=args.archive)
         except Exception as e:
             print(f"⚠ 转换失败: {e}")
             print("提示: 手动运行 'python json_to_image.py'")
+    elif args.archive:
+        print(f"提示: 运行 'python json_to_image.py --archive {args.archive}' 生成HTML和图片")
     else:
         print("提示: 运行 'python json_to_image.py' 生成HTML和图片")
 
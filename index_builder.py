@@ -0,0 +1,555 @@
+#!/usr/bin/env python3
+"""
+场景索引页 - 分页、懒加载缩略图、增量更新
+
+以前的索引页把所有场景的卡片拼进一个HTML，并直接引用1920px的原图，
+几千个场景时生成慢、打开时浏览器卡死。现在:
+
+  output/index.html               固定的页面外壳（分页浏览，#page=N 可直接跳转）
+  output/index_data/meta.js       场景总数、页数和每页的版本号
+  output/index_data/page_0001.js  每页的场景列表（JSONP，file:// 下也能加载）
+  output/thumbs/<场景名>.jpg      缩略图（loading="lazy"，只在图片更新后重新生成）
+  output/players/<前缀>.html      轨迹播放页（见 trajectory_player.py）
+
+场景按文件名顺序逐页写出（内存中只保留当前页），内容没有变化的页文件和缩略图不会重写，
+所以只改动少数场景时重建索引几乎没有开销。
+
+用法:
+    from index_builder import build_index
+
+    build_index("output")
+
+    # 或命令行
+    python index_builder.py --output output
+"""
+
+import argparse
+import hashlib
+import json
+import os
+from typing import List, Optional
+
+
+# 默认配置
+PAGE_SIZE = 120  # 每页场景数
+THUMB_WIDTH = 320  # 缩略图宽度（像素）
+THUMB_QUALITY = 80  # 缩略图JPEG质量
+INDEX_DATA_DIR = 'index_data'
+THUMB_DIR = 'thumbs'
+
+
+def scene_title(base_name: str) -> str:
+    """由文件名生成卡片标题"""
+    return base_name.replace("_", " ").replace("-", " ").title()
+
+
+def list_scene_names(json_dir: str) -> List[str]:
+    """按文件名顺序列出场景（不读取JSON内容）"""
+    names = []
+    with os.scandir(json_dir) as entries:
+        for entry in entries:
+            if entry.name.endswith('.json') and entry.is_file():
+                names.append(entry.name[:-len('.json')])
+    names.sort()
+    return names
+
+
+def make_thumbnail(png_path: str, thumb_path: str, width: int = THUMB_WIDTH) -> bool:
+    """
+    生成缩略图（已存在且不比原图旧时跳过）
+
+    返回是否实际生成了新的缩略图
+    """
+    try:
+        if os.path.getmtime(thumb_path) >= os.path.getmtime(png_path):
+            return False
+    except OSError:
+        pass
+
+    from PIL import Image
+
+    with Image.open(png_path) as image:
+        image = image.convert('RGB')
+        height = max(1, round(image.height * width / image.width))
+        image.thumbnail((width, height))
+        tmp_path = thumb_path + '.tmp'
+        image.save(tmp_path, 'JPEG', quality=THUMB_QUALITY, optimize=True)
+    os.replace(tmp_path, thumb_path)
+    return True
+
+
+def _write_if_changed(path: str, content: str) -> bool:
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            if f.read() == content:
+                return False
+    except OSError:
+        pass
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(content)
+    os.replace(tmp_path, path)
+    return True
+
+
+def _page_filename(page: int) -> str:
+    return f'page_{page:04d}.js'
+
+
+def _dumps(value) -> str:
+    return json.dumps(value, ensure_ascii=False, separators=(',', ':'))
+
+
+def _relative(path: str, output_dir: str) -> str:
+    return os.path.relpath(path, output_dir).replace(os.sep, '/')
+
+
+def render_index_html(paths: dict, meta_version: str) -> str:
+    """生成索引页外壳（不含场景数据，meta_version 用于让浏览器重新加载 meta.js）"""
+    return """<!DOCTYPE html>
+<html lang="zh-CN">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>Ray-Optics 场景库</title>
+    <style>
+        * {
+            margin: 0;
+            padding: 0;
+            box-sizing: border-box;
+        }
+
+        body {
+            font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Arial, sans-serif;
+            background: linear-gradient(135deg, #1e3c72 0%, #2a5298 100%);
+            color: white;
+            padding: 20px;
+            min-height: 100vh;
+        }
+
+        .container {
+            max-width: 1400px;
+            margin: 0 auto;
+        }
+
+        header {
+            text-align: center;
+            padding: 40px 0;
+        }
+
+        h1 {
+            font-size: 3em;
+            margin-bottom: 10px;
+            text-shadow: 2px 2px 4px rgba(0,0,0,0.3);
+        }
+
+        .subtitle {
+            font-size: 1.2em;
+            opacity: 0.9;
+        }
+
+        .grid {
+            display: grid;
+            grid-template-columns: repeat(auto-fill, minmax(350px, 1fr));
+            gap: 25px;
+            padding: 20px 0;
+        }
+
+        .card {
+            background: rgba(255, 255, 255, 0.1);
+            border-radius: 15px;
+            padding: 20px;
+            transition: all 0.3s ease;
+            border: 1px solid rgba(255, 255, 255, 0.2);
+        }
+
+        .card:hover {
+            transform: translateY(-5px);
+            background: rgba(255, 255, 255, 0.15);
+            box-shadow: 0 10px 30px rgba(0, 0, 0, 0.3);
+        }
+
+        .card h3 {
+            font-size: 1.3em;
+            margin-bottom: 15px;
+            color: #fff;
+        }
+
+        .card-links {
+            display: flex;
+            gap: 10px;
+            flex-wrap: wrap;
+        }
+
+        .btn {
+            display: inline-block;
+            padding: 10px 20px;
+            background: rgba(255, 255, 255, 0.2);
+            color: white;
+            text-decoration: none;
+            border-radius: 8px;
+            transition: all 0.2s;
+            font-size: 0.9em;
+            border: 1px solid rgba(255, 255, 255, 0.3);
+            cursor: pointer;
+        }
+
+        .btn:hover {
+            background: rgba(255, 255, 255, 0.3);
+            transform: scale(1.05);
+        }
+
+        .btn:disabled {
+            opacity: 0.4;
+            transform: none;
+            cursor: default;
+        }
+
+        .btn-primary {
+            background: #4CAF50;
+            border-color: #4CAF50;
+        }
+
+        .btn-primary:hover {
+            background: #45a049;
+        }
+
+        .stats {
+            text-align: center;
+            padding: 30px;
+            background: rgba(255, 255, 255, 0.1);
+            border-radius: 15px;
+            margin: 20px 0;
+        }
+
+        .stats-number {
+            font-size: 3em;
+            font-weight: bold;
+            color: #4CAF50;
+        }
+
+        .players {
+            padding: 20px;
+            background: rgba(255, 255, 255, 0.1);
+            border-radius: 15px;
+            margin: 20px 0;
+        }
+
+        .players h2 {
+            font-size: 1.3em;
+            margin-bottom: 15px;
+        }
+
+        .pager {
+            display: flex;
+            gap: 10px;
+            align-items: center;
+            justify-content: center;
+            padding: 10px 0;
+        }
+
+        .pager input {
+            width: 80px;
+            padding: 8px;
+            border-radius: 8px;
+            border: none;
+            text-align: center;
+        }
+
+        footer {
+            text-align: center;
+            padding: 40px 0 20px;
+            opacity: 0.8;
+        }
+
+        .preview {
+            width: 100%;
+            height: 200px;
+            background: rgba(0, 0, 0, 0.3);
+            border-radius: 10px;
+            margin-bottom: 15px;
+            display: flex;
+            align-items: center;
+            justify-content: center;
+            overflow: hidden;
+        }
+
+        .preview img {
+            max-width: 100%;
+            max-height: 100%;
+            object-fit: contain;
+        }
+
+        .no-image {
+            color: rgba(255, 255, 255, 0.5);
+            font-size: 0.9em;
+        }
+    </style>
+</head>
+<body>
+    <div class="container">
+        <header>
+            <h1>🔬 Ray-Optics 场景库</h1>
+            <p class="subtitle">光学仿真场景合集</p>
+        </header>
+
+        <div class="stats">
+            <div class="stats-number" id="total">-</div>
+            <div>个可用场景</div>
+        </div>
+
+        <div class="players" id="players" hidden>
+            <h2>🎞️ 轨迹动画</h2>
+            <div class="card-links" id="player-links"></div>
+        </div>
+
+        <div class="pager">
+            <button class="btn" id="prev">← 上一页</button>
+            <span>第 <input type="number" id="page" min="1" value="1"> / <span id="pages">-</span> 页</span>
+            <button class="btn" id="next">下一页 →</button>
+        </div>
+
+        <div class="grid" id="grid"></div>
+
+        <footer>
+            <p>使用 <a href="https://github.com/ricktu288/ray-optics" style="color: #4CAF50;">Ray-Optics</a> 创建</p>
+            <p style="margin-top: 10px; font-size: 0.9em;">
+                Generated by ray_optics_controller.py
+            </p>
+        </footer>
+    </div>
+
+    <script>
+        const PATHS = """ + json.dumps(paths) + """;
+        let meta = null;
+        let current = 0;
+
+        function link(href, text, className, download) {
+            const a = document.createElement('a');
+            a.href = href;
+            a.textContent = text;
+            a.className = className;
+            if (download) {
+                a.download = '';
+            } else {
+                a.target = '_blank';
+            }
+            return a;
+        }
+
+        function card(entry) {
+            const [name, title, hasImage] = entry;
+            const key = encodeURIComponent(name);
+            const div = document.createElement('div');
+            div.className = 'card';
+
+            const preview = document.createElement('div');
+            preview.className = 'preview';
+            if (hasImage) {
+                const img = document.createElement('img');
+                img.loading = 'lazy';
+                img.alt = title;
+                img.src = PATHS.thumbs + '/' + key + PATHS.thumbExt;
+                preview.appendChild(img);
+            } else {
+                const empty = document.createElement('div');
+                empty.className = 'no-image';
+                empty.textContent = '暂无预览图';
+                preview.appendChild(empty);
+            }
+
+            const h3 = document.createElement('h3');
+            h3.textContent = title;
+
+            const links = document.createElement('div');
+            links.className = 'card-links';
+            links.appendChild(link(PATHS.viewer + '?scene=' + key, '🔬 查看仿真', 'btn btn-primary', false));
+            links.appendChild(link(PATHS.json + '/' + key + '.json', '💾 下载JSON', 'btn', true));
+            if (hasImage) {
+                links.appendChild(link(PATHS.images + '/' + key + '.png', '🖼️ 下载截图', 'btn', true));
+            }
+
+            div.append(preview, h3, links);
+            return div;
+        }
+
+        window.rayOpticsIndexPage = function(page, entries) {
+            if (page !== current) {
+                return;  // 已切换到其他页
+            }
+            const grid = document.getElementById('grid');
+            const fragment = document.createDocumentFragment();
+            for (const entry of entries) {
+                fragment.appendChild(card(entry));
+            }
+            grid.replaceChildren(fragment);
+        };
+
+        function showPage(page) {
+            if (!meta || meta.pages === 0) {
+                return;
+            }
+            page = Math.min(Math.max(1, page | 0), meta.pages);
+            current = page;
+            document.getElementById('page').value = page;
+            document.getElementById('prev').disabled = page <= 1;
+            document.getElementById('next').disabled = page >= meta.pages;
+            if (location.hash !== '#page=' + page) {
+                history.replaceState(null, '', '#page=' + page);
+            }
+
+            const script = document.createElement('script');
+            script.src = PATHS.data + '/page_' + String(page).padStart(4, '0') + '.js?v=' + meta.versions[page - 1];
+            script.onload = script.onerror = function() { script.remove(); };
+            document.head.appendChild(script);
+            window.scrollTo(0, 0);
+        }
+
+        window.rayOpticsIndexMeta = function(value) {
+            meta = value;
+            document.getElementById('total').textContent = meta.total;
+            document.getElementById('pages').textContent = meta.pages;
+            if (meta.players && meta.players.length) {
+                const links = document.getElementById('player-links');
+                for (const [prefix, frames] of meta.players) {
+                    const href = PATHS.players + '/' + encodeURIComponent(prefix) + '.html';
+                    links.appendChild(link(href, '▶ ' + prefix + '（' + frames + ' 帧）', 'btn', false));
+                }
+                document.getElementById('players').hidden = false;
+            }
+            const match = location.hash.match(/page=(\\d+)/);
+            showPage(match ? parseInt(match[1], 10) : 1);
+        };
+
+        document.getElementById('prev').onclick = function() { showPage(current - 1); };
+        document.getElementById('next').onclick = function() { showPage(current + 1); };
+        document.getElementById('page').onchange = function() { showPage(parseInt(this.value, 10)); };
+        window.addEventListener('hashchange', function() {
+            const match = location.hash.match(/page=(\\d+)/);
+            if (match && parseInt(match[1], 10) !== current) {
+                showPage(parseInt(match[1], 10));
+            }
+        });
+    </script>
+    <script src=""" + json.dumps(f"{paths['data']}/meta.js?v={meta_version}") + """></script>
+</body>
+</html>
+"""
+
+
+def build_index(output_dir: str = 'output', json_dir: Optional[str] = None,
+                html_dir: Optional[str] = None, image_dir: Optional[str] = None,
+                page_size: int = PAGE_SIZE, thumbnails: bool = True, trajectories: bool = True,
+                verbose: bool = True, names: Optional[List[str]] = None) -> dict:
+    """
+    流式生成分页索引（只重写内容变化的页文件和缩略图）
+
+    参数:
+        output_dir: 索引页所在目录（index.html 写在这里）
+        json_dir / html_dir / image_dir: 场景、查看器、截图目录（默认 output_dir 下的 json/html/images）
+        page_size: 每页场景数
+        thumbnails: 是否生成缩略图
+        trajectories: 是否为连续帧（如 demo_h_001..N）生成轨迹播放页（见 trajectory_player.py）
+        verbose: 是否打印进度
+        names: 场景名列表（默认列出 json_dir 中的JSON文件；如来自帧归档，见 frame_archive.py）
+
+    返回统计: {'total', 'pages', 'pages_written', 'thumbs_written', 'players'}
+    """
+    from scene_viewer import VIEWER_FILENAME
+
+    json_dir = json_dir or os.path.join(output_dir, 'json')
+    html_dir = html_dir or os.path.join(output_dir, 'html')
+    image_dir = image_dir or os.path.join(output_dir, 'images')
+    data_dir = os.path.join(output_dir, INDEX_DATA_DIR)
+    thumb_dir = os.path.join(output_dir, THUMB_DIR)
+    os.makedirs(data_dir, exist_ok=True)
+    if thumbnails:
+        os.makedirs(thumb_dir, exist_ok=True)
+
+    stats = {'total': 0, 'pages': 0, 'pages_written': 0, 'thumbs_written': 0}
+    versions: List[str] = []
+    page: List[list] = []
+
+    def flush_page():
+        stats['pages'] += 1
+        content = f"rayOpticsIndexPage({stats['pages']},{_dumps(page)});\n"
+        versions.append(hashlib.sha1(content.encode('utf-8')).hexdigest()[:10])
+        if _write_if_changed(os.path.join(data_dir, _page_filename(stats['pages'])), content):
+            stats['pages_written'] += 1
+        page.clear()
+
+    if names is None:
+        names = list_scene_names(json_dir) if os.path.isdir(json_dir) else []
+    for base_name in names:
+        stats['total'] += 1
+        png_path = os.path.join(image_dir, f"{base_name}.png")
+        has_image = os.path.exists(png_path)
+        if has_image and thumbnails:
+            try:
+                if make_thumbnail(png_path, os.path.join(thumb_dir, f"{base_name}.jpg")):
+                    stats['thumbs_written'] += 1
+            except Exception as e:
+                print(f"  ⚠ 缩略图生成失败: {base_name}.png: {e}")
+        page.append([base_name, scene_title(base_name), 1 if has_image else 0])
+        if len(page) >= page_size:
+            flush_page()
+        if verbose and stats['total'] % 10000 == 0:
+            print(f"  已索引 {stats['total']} 个场景...")
+    if page:
+        flush_page()
+
+    # 删除多余的旧页文件
+    page_number = stats['pages'] + 1
+    while os.path.exists(os.path.join(data_dir, _page_filename(page_number))):
+        os.remove(os.path.join(data_dir, _page_filename(page_number)))
+        page_number += 1
+
+    # 轨迹播放页（按前缀分组的连续帧）
+    players = []
+    if trajectories:
+        from trajectory_player import build_players, PLAYER_DIR
+        players = build_players(output_dir, names, image_dir=image_dir, verbose=verbose)
+        paths_players = _relative(os.path.join(output_dir, PLAYER_DIR), output_dir)
+    else:
+        paths_players = ''
+    stats['players'] = len(players)
+
+    meta = {'total': stats['total'], 'pages': stats['pages'], 'page_size': page_size, 'versions': versions,
+            'players': players}
+    meta_content = f"rayOpticsIndexMeta({_dumps(meta)});\n"
+    _write_if_changed(os.path.join(data_dir, 'meta.js'), meta_content)
+
+    paths = {
+        'data': _relative(data_dir, output_dir),
+        'thumbs': _relative(thumb_dir if thumbnails else image_dir, output_dir),
+        'thumbExt': '.jpg' if thumbnails else '.png',
+        'json': _relative(json_dir, output_dir),
+        'images': _relative(image_dir, output_dir),
+        'viewer': _relative(os.path.join(html_dir, VIEWER_FILENAME), output_dir),
+        'players': paths_players,
+    }
+    meta_version = hashlib.sha1(meta_content.encode('utf-8')).hexdigest()[:10]
+    index_html = render_index_html(paths, meta_version)
+    _write_if_changed(os.path.join(output_dir, 'index.html'), index_html)
+
+    if verbose:
+        print(f"✓ 索引已更新: {stats['total']} 个场景, {stats['pages']} 页"
+              f"（重写 {stats['pages_written']} 页, 新缩略图 {stats['thumbs_written']} 张）")
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description='生成分页的场景索引页（output/index.html）')
+    parser.add_argument('--output', default='output', help='输出目录（默认: output）')
+    parser.add_argument('--page-size', type=int, default=PAGE_SIZE, help=f'每页场景数（默认: {PAGE_SIZE}）')
+    parser.add_argument('--no-thumbs', action='store_true', help='不生成缩略图，卡片直接引用原图')
+    parser.add_argument('--no-players', action='store_true', help='不生成轨迹播放页')
+    args = parser.parse_args()
+
+    build_index(args.output, page_size=args.page_size, thumbnails=not args.no_thumbs,
+                trajectories=not args.no_players)
+    print(f"  打开浏览器: {os.path.join(args.output, 'index.html')}")
+
+
+if __name__ == "__main__":
+    main()
@@ -7,11 +7,21 @@ JSON转图片工具 - 一键将所有JSON场景转换为HTML和图片
   - 可修改 SCREENSHOT_CROP_TOP 调整裁剪高度
 """
 
-from screenshot_helper import screenshot_with_selenium, compress_scene_for_url
+from screenshot_helper import capture_html_png, capture_scene_png, compress_scenes_for_url
+from browser_pool import BrowserPool
+from frame_encoder import FrameEncoder, DEFAULT_FPS
+from build_manifest import BuildManifest, scene_hash, render_settings
+from scene_viewer import SceneManifest, create_html_from_json, scene_href
+from index_builder import build_index, list_scene_names
+from scene_culling import cull_scene
+from frame_archive import FrameArchive
 import os
 import json
 import glob
 import sys
+import time
+import argparse
+from concurrent.futures import ThreadPoolExecutor
 
 # ========== 依赖检查 ==========
 # 检查Pillow是否已安装（裁剪功能必需）
@@ -39,353 +49,123 @@ except ImportError:
 
 # ========== 截图配置 ==========
 SCREENSHOT_CROP_TOP = 75  # 裁剪顶部像素（默认75px）
+COMPRESS_POOL_SIZE = None  # 并行压缩的Node进程数（node和auto压缩后端，None=按CPU核数，最多4个）
+BROWSER_MAX_FRAMES = 100  # 每个浏览器截图多少帧后重建（0=不限制）
+BROWSER_MAX_MEMORY_MB = 1024  # 浏览器JS堆内存上限（MB，0=不检查）
+RENDER_JOBS = 1  # 并行截图的浏览器数量（可用 --jobs 覆盖）
+READY_TIMEOUT = 30  # 等待场景渲染稳定的最长时间（秒）
+RENDER_BATCH = 256  # 每批读取、压缩、截图的场景数（内存中的场景数与总帧数无关）
+STEP_RENDER = True  # 单页步进截图：每个浏览器只加载一次仿真器，之后切换hash（可用 --no-step 关闭）
 # ==============================
 
 
-def create_html_from_json(json_data: dict, output_html: str):
-    """从JSON数据创建本地HTML文件 - 使用json-url压缩"""
-
-    # 将字典转换为JSON字符串
-    json_str = json.dumps(json_data, ensure_ascii=False, separators=(",", ":"))
-
-    # 使用json-url压缩场景数据
-    compressed_scene = compress_scene_for_url(json_str)
-
-    scene_name = json_data.get("name", "Ray Optics Scene")
-    width = json_data.get("width", 1200)
-    height = json_data.get("height", 600)
-    obj_count = len(json_data.get("objs", []))
-
-    html_content = f"""<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>Ray Optics - {scene_name}</title>
-    <style>
-        body {{
-            margin: 0;
-            padding: 0;
-            font-family: Arial, sans-serif;
-            background: #000;
-            color: white;
-            overflow: hidden;
-        }}
-        #info {{
-            position: fixed;
-            top: 10px;
-            left: 10px;
-            padding: 10px 15px;
-            background: rgba(0, 0, 0, 0.8);
-            border-radius: 5px;
-            z-index: 1000;
-            font-size: 12px;
-        }}
-        #loading {{
-            position: fixed;
-            top: 50%;
-            left: 50%;
-            transform: translate(-50%, -50%);
-            text-align: center;
-        }}
-        .spinner {{
-            border: 4px solid rgba(255, 255, 255, 0.1);
-            border-top: 4px solid white;
-            border-radius: 50%;
-            width: 40px;
-            height: 40px;
-            animation: spin 1s linear infinite;
-            margin: 0 auto 10px;
-        }}
-        @keyframes spin {{
-            0% {{ transform: rotate(0deg); }}
-            100% {{ transform: rotate(360deg); }}
-        }}
-        iframe {{
-            position: fixed;
-            top: 0;
-            left: 0;
-            width: 100%;
-            height: 100%;
-            border: none;
-        }}
-    </style>
-</head>
-<body>
-    <div id="info">
-        <strong>{scene_name}</strong><br>
-        {width}x{height} | {obj_count} objects
-    </div>
-
-    <div id="loading">
-        <div class="spinner"></div>
-        <div>Loading simulator...</div>
-    </div>
-
-    <iframe id="simulator"></iframe>
-
-    <script>
-        const compressedScene = '{compressed_scene}';
-        const simulatorURL = 'https://phydemo.app/ray-optics/simulator/#' + compressedScene;
-
-        const iframe = document.getElementById('simulator');
-        const loading = document.getElementById('loading');
-
-        console.log('Compressed scene length:', compressedScene.length);
-        console.log('Loading URL:', simulatorURL);
-
-        iframe.src = simulatorURL;
-
-        iframe.onload = function() {{
-            setTimeout(function() {{
-                loading.style.display = 'none';
-                console.log('✓ Scene loaded');
-            }}, 3000);
-        }};
-    </script>
-</body>
-</html>
-"""
-
-    with open(output_html, "w", encoding="utf-8") as f:
-        f.write(html_content)
-
-    return output_html
+def scene_to_compact_json(json_data: dict) -> str:
+    """将场景字典转换为紧凑JSON字符串（用于压缩）"""
+    return json.dumps(json_data, ensure_ascii=False, separators=(",", ":"))
 
 
-def create_index_html(json_dir: str, html_dir: str, image_dir: str):
-    """创建索引页面"""
+def create_index_html(json_dir: str, html_dir: str, image_dir: str, names: list = None):
+    """创建/增量更新分页索引页（output/index.html，见 index_builder.py）"""
     print("\n创建索引页面...")
+    build_index("output", json_dir=json_dir, html_dir=html_dir, image_dir=image_dir, names=names)
+
+
+def _render_scene(index, total, json_path, data, compressed_scene, viewer, image_dir, browsers,
+                  ready_times=None, stepping=False, keep_png=True, want_frame=False):
+    """
+    把单个场景写入查看器清单（viewer 为共享的 SceneManifest）并截图
+
+    返回 (状态, PNG字节):
+        状态为 'rendered'（已截图）或 'failed'；
+        want_frame为True时返回本帧的PNG字节（供动画编码），否则为None
+    keep_png为False时截图只保留在内存中，不写入 image_dir
+    单帧失败只影响本帧，不会抛出异常
+    """
+    base_name = os.path.splitext(os.path.basename(json_path))[0]
+    print(f"[{index}/{total}] 处理: {base_name}.json")
+
+    try:
+        if isinstance(data, Exception):
+            raise data
+        if isinstance(compressed_scene, Exception):
+            raise compressed_scene
+
+        # 写入共享查看器的场景清单
+        create_html_from_json(data, os.path.join(viewer.html_dir, f"{base_name}.html"),
+                              compressed_scene=compressed_scene, manifest=viewer)
+        print(f"  ✓ 查看页已生成: {scene_href(base_name)}")
+
+        # 截图
+        png_file = os.path.join(image_dir, f"{base_name}.png")
+
+        print(f"  正在截图...")
+        output_image = png_file if keep_png else None
+        png = None
+        if stepping:
+            png = capture_scene_png(
+                compressed_scene, output_image, crop_top=SCREENSHOT_CROP_TOP,
+                pool=browsers, ready_timeout=READY_TIMEOUT, timings=ready_times
+            )
+            if png is None:
+                print(f"  ⚠ 步进截图失败，改为加载查看页截图")
+        if png is None:
+            # 直接把场景hash带在查看器地址中，不依赖清单是否已写入磁盘
+            png = capture_html_png(
+                viewer.page_path(base_name, compressed_scene), output_image, crop_top=SCREENSHOT_CROP_TOP,
+                pool=browsers, ready_timeout=READY_TIMEOUT, timings=ready_times
+            )
+        if png is not None:
+            if keep_png:
+                print(f"  ✓ 截图已保存: {base_name}.png")
+            return 'rendered', png if want_frame else None
+        print(f"  ❌ 截图失败: {base_name}.png")
+        return 'failed', None
+
+    except Exception as e:
+        print(f"  ❌ 处理失败: {base_name}.json: {e}")
+        return 'failed', None
+
+
+def json_to_image(compress_pool_size: int = None, jobs: int = None, stepping: bool = None,
+                  video: str = None, fps: float = DEFAULT_FPS, codec: str = None,
+                  keep_png: bool = True, dry_run: bool = False, force: bool = False,
+                  cull: bool = False, archive: str = None):
+    """
+    将所有JSON文件（或一个帧归档中的所有帧）转换为查看页和图片
+
+    查看页共用 output/html/viewer.html，场景记录在分片清单中（见 scene_viewer.py）
+    增量构建：只重建场景内容或渲染设置发生变化、或输出文件缺失的场景
+    （记录在 output/.build_manifest.json，见 build_manifest.py）
+
+    参数:
+        compress_pool_size: 并行压缩的Node进程数（node和auto压缩后端，默认使用 COMPRESS_POOL_SIZE）
+        jobs: 并行截图数量，每个并行任务使用独立的浏览器（默认使用 RENDER_JOBS）
+        stepping: 是否使用单页步进截图（默认使用 STEP_RENDER）
+        video: 动画输出路径（.mp4 / .webm / .gif），按文件名顺序把所有帧编码为一个文件；
+               截图失败的帧用上一帧代替（开头的失败帧用第一个成功的帧），动画时长不变
+        fps: 动画帧率
+        codec: 动画编码器（默认按扩展名选择，见 frame_encoder.py）
+        keep_png: 输出动画时是否同时保存每帧PNG（默认True）
+        dry_run: 只列出需要重建的场景，不实际生成
+        force: 忽略构建清单，全部重建
+        cull: 压缩前精简场景（删除画面外、退化、重复的对象，见 scene_culling.py），
+              缩短URL hash并减少仿真器的求交计算；不修改JSON文件
+        archive: 帧归档路径（见 frame_archive.py），直接渲染归档中的帧而不是 output/json 中的文件；
+                 输出以帧名命名，与逐帧JSON时相同
+    """
+    if compress_pool_size is None:
+        compress_pool_size = COMPRESS_POOL_SIZE
+    if jobs is None:
+        jobs = RENDER_JOBS
+    jobs = max(1, jobs)
+    if stepping is None:
+        stepping = STEP_RENDER
 
-    json_files = sorted(glob.glob(os.path.join(json_dir, "*.json")))
-
-    if not json_files:
-        print("没有找到JSON文件")
-        return
-
-    index_content = (
-        """<!DOCTYPE html>
-<html lang="zh-CN">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>Ray-Optics 场景库</title>
-    <style>
-        * {
-            margin: 0;
-            padding: 0;
-            box-sizing: border-box;
-        }
-
-        body {
-            font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Arial, sans-serif;
-            background: linear-gradient(135deg, #1e3c72 0%, #2a5298 100%);
-            color: white;
-            padding: 20px;
-            min-height: 100vh;
-        }
-
-        .container {
-            max-width: 1400px;
-            margin: 0 auto;
-        }
-
-        header {
-            text-align: center;
-            padding: 40px 0;
-        }
-
-        h1 {
-            font-size: 3em;
-            margin-bottom: 10px;
-            text-shadow: 2px 2px 4px rgba(0,0,0,0.3);
-        }
-
-        .subtitle {
-            font-size: 1.2em;
-            opacity: 0.9;
-        }
-
-        .grid {
-            display: grid;
-            grid-template-columns: repeat(auto-fill, minmax(350px, 1fr));
-            gap: 25px;
-            padding: 20px 0;
-        }
-
-        .card {
-            background: rgba(255, 255, 255, 0.1);
-            backdrop-filter: blur(10px);
-            border-radius: 15px;
-            padding: 20px;
-            transition: all 0.3s ease;
-            border: 1px solid rgba(255, 255, 255, 0.2);
-        }
-
-        .card:hover {
-            transform: translateY(-5px);
-            background: rgba(255, 255, 255, 0.15);
-            box-shadow: 0 10px 30px rgba(0, 0, 0, 0.3);
-        }
-
-        .card h3 {
-            font-size: 1.3em;
-            margin-bottom: 15px;
-            color: #fff;
-        }
-
-        .card-links {
-            display: flex;
-            gap: 10px;
-            flex-wrap: wrap;
-        }
-
-        .btn {
-            display: inline-block;
-            padding: 10px 20px;
-            background: rgba(255, 255, 255, 0.2);
-            color: white;
-            text-decoration: none;
-            border-radius: 8px;
-            transition: all 0.2s;
-            font-size: 0.9em;
-            border: 1px solid rgba(255, 255, 255, 0.3);
-        }
-
-        .btn:hover {
-            background: rgba(255, 255, 255, 0.3);
-            transform: scale(1.05);
-        }
-
-        .btn-primary {
-            background: #4CAF50;
-            border-color: #4CAF50;
-        }
-
-        .btn-primary:hover {
-            background: #45a049;
-        }
-
-        .stats {
-            text-align: center;
-            padding: 30px;
-            background: rgba(255, 255, 255, 0.1);
-            border-radius: 15px;
-            margin: 20px 0;
-        }
-
-        .stats-number {
-            font-size: 3em;
-            font-weight: bold;
-            color: #4CAF50;
-        }
-
-        footer {
-            text-align: center;
-            padding: 40px 0 20px;
-            opacity: 0.8;
-        }
-
-        .preview {
-            width: 100%;
-            height: 200px;
-            background: rgba(0, 0, 0, 0.3);
-            border-radius: 10px;
-            margin-bottom: 15px;
-            display: flex;
-            align-items: center;
-            justify-content: center;
-            overflow: hidden;
-        }
-
-        .preview img {
-            max-width: 100%;
-            max-height: 100%;
-            object-fit: contain;
-        }
-
-        .no-image {
-            color: rgba(255, 255, 255, 0.5);
-            font-size: 0.9em;
-        }
-    </style>
-</head>
-<body>
-    <div class="container">
-        <header>
-            <h1>🔬 Ray-Optics 场景库</h1>
-            <p class="subtitle">光学仿真场景合集</p>
-        </header>
-
-        <div class="stats">
-            <div class="stats-number">"""
-        + str(len(json_files))
-        + """</div>
-            <div>个可用场景</div>
-        </div>
-
-        <div class="grid">
-"""
-    )
-
-    for json_path in json_files:
-        base_name = os.path.splitext(os.path.basename(json_path))[0]
-        name = base_name.replace("_", " ").replace("-", " ").title()
-
-        html_file = f"html/{base_name}.html"
-        json_file = f"json/{base_name}.json"
-        png_file = f"images/{base_name}.png"
-
-        png_path = os.path.join(image_dir, f"{base_name}.png")
-        png_exists = os.path.exists(png_path)
-
-        preview_html = (
-            f'<img src="{png_file}" alt="{name}">'
-            if png_exists
-            else '<div class="no-image">暂无预览图</div>'
-        )
-
-        index_content += f"""
-            <div class="card">
-                <div class="preview">
-                    {preview_html}
-                </div>
-                <h3>{name}</h3>
-                <div class="card-links">
-                    <a href="{html_file}" class="btn btn-primary" target="_blank">🔬 查看仿真</a>
-                    <a href="{json_file}" class="btn" download>💾 下载JSON</a>
-                    {'<a href="' + png_file + '" class="btn" download>🖼️ 下载截图</a>' if png_exists else ""}
-                </div>
-            </div>
-"""
-
-    index_content += """
-        </div>
-
-        <footer>
-            <p>使用 <a href="https://github.com/ricktu288/ray-optics" style="color: #4CAF50;">Ray-Optics</a> 创建</p>
-            <p style="margin-top: 10px; font-size: 0.9em;">
-                Generated by ray_optics_controller.py
-            </p>
-        </footer>
-    </div>
-</body>
-</html>
-"""
-
-    index_path = "output/index.html"
-    with open(index_path, "w", encoding="utf-8") as f:
-        f.write(index_content)
-
-    print(f"✓ 索引页面已创建: {index_path}")
-
-
-def json_to_image():
-    """将所有JSON文件转换为HTML和图片"""
     print("=" * 60)
     print("JSON转图片工具")
     print("=" * 60)
     print(f"裁剪配置: SCREENSHOT_CROP_TOP = {SCREENSHOT_CROP_TOP}px")
+    print(f"并行截图: {jobs} 个浏览器{'（单页步进）' if stepping else ''}")
     print("=" * 60)
 
     # 创建输出目录
@@ -397,68 +177,235 @@ def json_to_image():
     os.makedirs(html_dir, exist_ok=True)
     os.makedirs(image_dir, exist_ok=True)
 
-    # 查找所有JSON文件
-    json_files = sorted(glob.glob(os.path.join(json_dir, "*.json")))
-
-    if not json_files:
-        print(f"\n❌ 在 {json_dir} 中没有找到JSON文件")
-        print("\n请先运行以下命令生成场景:")
-        print("  python ray_optics_controller.py")
-        print("  python example_usage.py")
-        print("  python quickstart.py")
+    archive_names = None
+    frames = None
+    if archive:
+        # 帧归档：按帧号逐帧还原，json_files 只用于命名输出（文件本身不存在）
+        if not os.path.exists(archive):
+            print(f"\n❌ 帧归档不存在: {archive}")
+            return
+        frames = FrameArchive(archive)
+        archive_names = frames.names
+        json_files = [os.path.join(json_dir, f"{name}.json") for name in archive_names]
+        print(f"\n帧归档 {archive}: {len(json_files)} 帧\n")
+    else:
+        # 查找所有JSON文件
+        json_files = sorted(glob.glob(os.path.join(json_dir, "*.json")))
+
+        if not json_files:
+            print(f"\n❌ 在 {json_dir} 中没有找到JSON文件")
+            print("\n请先运行以下命令生成场景:")
+            print("  python ray_optics_controller.py")
+            print("  python example_usage.py")
+            print("  python quickstart.py")
+            return
+
+        print(f"\n找到 {len(json_files)} 个JSON文件\n")
+
+    def load_scene(i):
+        """读取（并精简）第i个场景，返回 (场景字典或异常, CullReport或None)"""
+        try:
+            if frames is not None:
+                data = frames.frame(i)
+            else:
+                with open(json_files[i], "r", encoding="utf-8") as f:
+                    data = json.load(f)
+            return cull_scene(data) if cull else (data, None)
+        except Exception as e:
+            return e, None
+
+    # 逐个读取场景计算哈希（只保留哈希，不保留场景）
+    digests = []
+    removed = 0
+    for i in range(len(json_files)):
+        data, report = load_scene(i)
+        digests.append(None if isinstance(data, Exception) else scene_hash(data))
+        if report is not None:
+            removed += report.removed
+    if cull:
+        print(f"精简场景: 共删除/合并 {removed} 个对象\n")
+
+    # 对比构建清单，找出需要重建的场景
+    keep_png = keep_png or not video
+    settings = render_settings(SCREENSHOT_CROP_TOP)
+    viewer = SceneManifest(html_dir, simulator_url=settings['simulator'])
+    # 构建清单每次（自动）保存前先写出查看器分片，中断后不会把分片未写入的场景记为最新
+    manifest = BuildManifest(force=force, before_save=viewer.flush)
+    to_build = []
+    for i, json_path in enumerate(json_files):
+        base_name = os.path.splitext(os.path.basename(json_path))[0]
+        png_file = os.path.join(image_dir, f"{base_name}.png")
+        outputs = [viewer.shard_path(base_name), png_file]
+        if (digests[i] is None or not keep_png
+                or manifest.needs_rebuild(png_file, digests[i], settings, outputs)):
+            to_build.append(i)
+    print(f"需要重建 {len(to_build)} 个场景，{len(json_files) - len(to_build)} 个已是最新\n")
+
+    if dry_run:
+        for i in to_build:
+            print(f"  - {os.path.basename(json_files[i])}")
+        print("\n（dry-run模式，未生成任何文件）")
+        if frames is not None:
+            frames.close()
         return
 
-    print(f"\n找到 {len(json_files)} 个JSON文件\n")
-
-    for i, json_path in enumerate(json_files, 1):
-        base_name = os.path.splitext(os.path.basename(json_path))[0]
+    viewer.write_viewer()  # 截图回退时直接加载查看器页面
 
-        print(f"[{i}/{len(json_files)}] 处理: {base_name}.json")
+    # 按批重新读取、压缩（默认按场景大小选择编码器，见 screenshot_helper.COMPRESS_BACKEND）并截图，
+    # 同时在内存中的场景不超过 RENDER_BATCH 个
+    print(f"逐批压缩并截图 {len(to_build)} 个场景（每批 {RENDER_BATCH} 个）...\n")
 
+    def load_batch(batch):
+        scenes = {i: load_scene(i)[0] for i in batch if i in build_set}
+        to_compress = [i for i, data in scenes.items() if not isinstance(data, Exception)]
+        if not to_compress:
+            return scenes, {}
         try:
-            # 读取JSON
-            with open(json_path, "r", encoding="utf-8") as f:
-                data = json.load(f)
-
-            # 生成HTML
-            html_file = os.path.join(html_dir, f"{base_name}.html")
-            create_html_from_json(data, html_file)
-            print(f"  ✓ HTML已生成: {base_name}.html")
-
-            # 截图
-            png_file = os.path.join(image_dir, f"{base_name}.png")
-
-            if os.path.exists(png_file):
-                print(f"  ⚠ PNG已存在，跳过截图")
-            else:
-                print(f"  正在截图...")
-                success = screenshot_with_selenium(
-                    html_file, png_file, wait_time=1, crop_top=SCREENSHOT_CROP_TOP
-                )
-                if success:
-                    print(f"  ✓ 截图已保存: {base_name}.png")
-                else:
-                    print(f"  ❌ 截图失败")
-
+            results = compress_scenes_for_url(
+                [scene_to_compact_json(scenes[i]) for i in to_compress],
+                pool_size=compress_pool_size,
+                return_exceptions=True,
+            )
         except Exception as e:
-            print(f"  ❌ 处理失败: {e}")
-
-        print()
+            results = [e] * len(to_compress)
+        return scenes, dict(zip(to_compress, results))
+
+    # 整批截图共用浏览器池（避免每帧冷启动Chrome），每个并行任务独占一个浏览器
+    total = len(json_files)
+    ready_times = []
+    statuses = []
+    filled = 0  # 动画中用相邻帧代替的失败帧数
+    build_set = set(to_build)
+    encoder = FrameEncoder(video, fps=fps, codec=codec) if video else None
+    start_time = time.time()
+    with BrowserPool(size=jobs, max_frames=BROWSER_MAX_FRAMES,
+                     max_memory_mb=BROWSER_MAX_MEMORY_MB) as browsers:
+        def render(i, scenes, compressed):
+            base_name = os.path.splitext(os.path.basename(json_files[i]))[0]
+            png_file = os.path.join(image_dir, f"{base_name}.png")
+            if i not in build_set:
+                # 已是最新：动画仍需要这一帧，从已有PNG读取
+                if encoder is not None:
+                    with open(png_file, 'rb') as f:
+                        return 'skipped', f.read()
+                return 'skipped', None
+
+            result = _render_scene(i + 1, total, json_files[i], scenes[i], compressed.get(i),
+                                   viewer, image_dir, browsers, ready_times, stepping,
+                                   keep_png=keep_png, want_frame=encoder is not None)
+            if result[0] == 'rendered' and keep_png:
+                manifest.record(png_file, digests[i], settings)
+            if jobs == 1:
+                print()
+            return result
+
+        executor = ThreadPoolExecutor(max_workers=jobs) if jobs > 1 else None
+        last_png = None
+        leading = 0  # 还没有成功的帧可重复时，开头的失败帧数
+        try:
+            for start in range(0, total, RENDER_BATCH):
+                batch = range(start, min(start + RENDER_BATCH, total))
+                scenes, compressed = load_batch(batch)
+                task = lambda i: render(i, scenes, compressed)
+                # map保证结果顺序与输入一致，按顺序逐帧送入动画编码器
+                results = executor.map(task, batch) if executor is not None else map(task, batch)
+                for status, png in results:
+                    statuses.append(status)
+                    if encoder is None:
+                        continue
+                    if png is None:
+                        # 截图失败：重复上一帧，动画不会比帧序列短
+                        filled += 1
+                        if last_png is not None:
+                            encoder.write(last_png)
+                        else:
+                            leading += 1
+                        continue
+                    for _ in range(leading + 1):
+                        encoder.write(png)
+                    leading = 0
+                    last_png = png
+        finally:
+            if executor is not None:
+                executor.shutdown()
+            if encoder is not None:
+                encoder.close()
+            if frames is not None:
+                frames.close()
+            manifest.save()  # 先flush查看器分片
+    elapsed = time.time() - start_time
+
+    rendered = statuses.count('rendered')
+    failed = [os.path.basename(json_files[i]) for i, status in enumerate(statuses) if status == 'failed']
+    frame_rate = rendered / elapsed if elapsed > 0 else 0.0
+    summary = f"截图统计: 成功 {rendered} 帧, 跳过 {statuses.count('skipped')} 帧, 失败 {len(failed)} 帧"
+    if encoder is not None and filled:
+        summary += f"（动画中用相邻帧代替 {filled} 帧）"
+    print("\n" + summary)
+    print(f"  用时 {elapsed:.1f} 秒, 平均 {frame_rate:.2f} 帧/秒（{jobs} 个浏览器）")
+    if ready_times:
+        print(f"  渲染就绪用时: 平均 {sum(ready_times) / len(ready_times):.2f} 秒, "
+              f"最长 {max(ready_times):.2f} 秒")
+    for name in failed:
+        print(f"  ❌ {name}")
+    if encoder is not None:
+        print(f"✓ 动画已保存: {video}（{encoder.frames} 帧, {fps:g} fps）")
+    print()
 
-    # 创建索引
-    create_index_html(json_dir, html_dir, image_dir)
+    # 创建索引（归档的帧与 output/json 中的场景一起列出）
+    index_names = None
+    if archive_names is not None:
+        index_names = sorted(set(list_scene_names(json_dir)).union(archive_names))
+    create_index_html(json_dir, html_dir, image_dir, names=index_names)
 
     print("\n" + "=" * 60)
     print("✓ 完成!")
     print("=" * 60)
     print(f"\n输出目录:")
     print(f"  - JSON文件:  {json_dir}/")
-    print(f"  - HTML文件:  {html_dir}/")
+    print(f"  - 查看页:    {viewer.viewer_path}?scene=<场景名>")
     print(f"  - PNG图片:   {image_dir}/")
     print(f"\n查看结果:")
     print("  打开浏览器: output/index.html")
     print("=" * 60)
 
 
+def main():
+    parser = argparse.ArgumentParser(description='将 output/json/ 中的所有场景转换为HTML和图片')
+    parser.add_argument('-j', '--jobs', type=int, default=RENDER_JOBS,
+                        help=f'并行截图数量，每个任务使用独立的无头浏览器（默认: {RENDER_JOBS}）')
+    parser.add_argument('--no-step', action='store_true',
+                        help='关闭单页步进截图，每帧重新加载HTML和仿真器')
+    parser.add_argument('--local-simulator', action='store_true',
+                        help='使用本地托管的仿真器（离线渲染，见 local_server.py）')
+    parser.add_argument('--video', help='同时把所有帧编码为动画（.mp4 / .webm / .gif）')
+    parser.add_argument('--fps', type=float, default=DEFAULT_FPS, help=f'动画帧率（默认: {DEFAULT_FPS}）')
+    parser.add_argument('--codec', help='动画编码器（如 libx264、libvpx-vp9，默认按扩展名选择）')
+    parser.add_argument('--no-keep-png', action='store_true',
+                        help='输出动画时不保存每帧PNG')
+    parser.add_argument('--dry-run', action='store_true',
+                        help='只列出需要重建的场景（内容或渲染设置变化、或输出缺失），不生成文件')
+    parser.add_argument('--force', action='store_true', help='忽略构建清单，全部重建')
+    parser.add_argument('--cull', action='store_true',
+                        help='压缩前删除画面外、长度为0、重复的对象（缩短URL hash，加快渲染）')
+    parser.add_argument('--archive', metavar='FILE',
+                        help='渲染帧归档中的所有帧（见 frame_archive.py）而不是 output/json 中的文件')
+    parser.add_argument('--compress-pool-size', type=int, default=COMPRESS_POOL_SIZE,
+                        help='并行压缩的Node进程数（node和auto压缩后端）')
+    args = parser.parse_args()
+
+    if args.jobs < 1:
+        parser.error('--jobs 必须大于0')
+    if args.local_simulator:
+        import screenshot_helper
+        screenshot_helper.USE_LOCAL_SIMULATOR = True
+
+    json_to_image(compress_pool_size=args.compress_pool_size, jobs=args.jobs,
+                  stepping=False if args.no_step else None,
+                  video=args.video, fps=args.fps, codec=args.codec,
+                  keep_png=not args.no_keep_png, dry_run=args.dry_run, force=args.force,
+                  cull=args.cull, archive=args.archive)
+
+
 if __name__ == "__main__":
-    json_to_image()
+    main()
@@ -0,0 +1,1542 @@
+#!/usr/bin/env python3
+"""
+json-url('lzma') 编解码器的纯Python实现
+
+生成的hash字符串与Node.js的 json-url('lzma') 逐字节一致，
+无需Node.js和node_modules即可生成ray-optics仿真器的URL hash。
+大场景比Node.js慢一倍以上，安装了Node.js时默认交给进程池（见 screenshot_helper.COMPRESS_BACKEND）。
+
+编码流程（与json-url相同）:
+  1. msgpack5 打包（JS的数字/对象键顺序语义）
+  2. LZMA-JS 压缩（mode 9，.lzma格式，写入长度和结束标记）
+  3. URL安全的base64（'+'→'-'，'/'→'_'，去掉'='）
+
+用法:
+    from json_url_codec import compress, decompress
+
+    hash_str = compress({"version": 5, "objs": []})
+    data = decompress(hash_str)
+"""
+
+import base64
+import json
+import lzma as _lzma
+import math
+import struct
+from typing import Any
+
+
+# ========== msgpack（与msgpack5默认选项一致） ==========
+
+_MAX_SAFE_INTEGER = 9007199254740991
+
+
+def _is_array_index(key: str) -> bool:
+    """JS对象中"数组下标"形式的键会排在其他键之前"""
+    if not key or not key.isdigit() or not key.isascii():
+        return False
+    if len(key) > 1 and key[0] == '0':
+        return False
+    return int(key) < 4294967295
+
+
+def _js_key_order(keys):
+    """按JS对象属性遍历顺序排列键：整数下标升序在前，其余保持插入顺序"""
+    index_keys = [k for k in keys if _is_array_index(k)]
+    if not index_keys:
+        return list(keys)
+    index_keys.sort(key=int)
+    return index_keys + [k for k in keys if not _is_array_index(k)]
+
+
+def _utf8(s: str) -> bytes:
+    try:
+        return s.encode('utf-8')
+    except UnicodeEncodeError:
+        # 孤立的代理字符：与Node.js一样替换为U+FFFD
+        return s.encode('utf-16', 'surrogatepass').decode('utf-16', 'replace').encode('utf-8')
+
+
+def _header(length: int, tag1: int, tag2: int) -> bytes:
+    if length < 16:
+        return bytes([tag1 | length])
+    if length < 0x10000:
+        return bytes([tag2]) + struct.pack('>H', length)
+    return bytes([tag2 + 1]) + struct.pack('>I', length)
+
+
+def _pack_float(value: float, force_float64: bool = False) -> bytes:
+    if not force_float64:
+        try:
+            packed = struct.pack('>f', value)
+        except OverflowError:
+            packed = None
+        if packed is not None and struct.unpack('>f', packed)[0] == value:
+            return b'\xca' + packed
+    return b'\xcb' + struct.pack('>d', value)
+
+
+def _pack_number(value) -> bytes:
+    # JS中所有数字都是double：整数值的浮点数按整数编码
+    if isinstance(value, float):
+        if math.isnan(value) or math.isinf(value) or value != int(value):
+            return _pack_float(value)
+        value = int(value)
+    if abs(value) > _MAX_SAFE_INTEGER:
+        return _pack_float(float(value), force_float64=True)
+
+    if value >= 0:
+        if value < 128:
+            return bytes([value])
+        if value < 256:
+            return bytes([0xcc, value])
+        if value < 65536:
+            return b'\xcd' + struct.pack('>H', value)
+        if value <= 0xffffffff:
+            return b'\xce' + struct.pack('>I', value)
+        return b'\xcf' + struct.pack('>Q', value)
+
+    if value >= -32:
+        return bytes([0x100 + value])
+    if value >= -128:
+        return b'\xd0' + struct.pack('>b', value)
+    if value >= -32768:
+        return b'\xd1' + struct.pack('>h', value)
+    # msgpack5的边界是-214748365（而非-2^31），此处保持一致
+    if value > -214748365:
+        return b'\xd2' + struct.pack('>i', value)
+    return b'\xd3' + struct.pack('>q', value)
+
+
+def _pack_string(value: str) -> bytes:
+    data = _utf8(value)
+    n = len(data)
+    if n < 32:
+        return bytes([0xa0 | n]) + data
+    if n <= 0xff:
+        return bytes([0xd9, n]) + data
+    if n <= 0xffff:
+        return b'\xda' + struct.pack('>H', n) + data
+    return b'\xdb' + struct.pack('>I', n) + data
+
+
+def _pack_into(obj, out: list):
+    if obj is None:
+        out.append(b'\xc0')
+    elif obj is True:
+        out.append(b'\xc3')
+    elif obj is False:
+        out.append(b'\xc2')
+    elif isinstance(obj, str):
+        out.append(_pack_string(obj))
+    elif isinstance(obj, (int, float)):
+        out.append(_pack_number(obj))
+    elif isinstance(obj, (list, tuple)):
+        out.append(_header(len(obj), 0x90, 0xdc))
+        for item in obj:
+            _pack_into(item, out)
+    elif isinstance(obj, dict):
+        keys = _js_key_order([str(k) for k in obj])
+        values = {str(k): v for k, v in obj.items()}
+        out.append(_header(len(keys), 0x80, 0xde))
+        for key in keys:
+            out.append(_pack_string(key))
+            _pack_into(values[key], out)
+    elif isinstance(obj, (bytes, bytearray)):
+        n = len(obj)
+        if n <= 0xff:
+            out.append(bytes([0xc4, n]))
+        elif n <= 0xffff:
+            out.append(b'\xc5' + struct.pack('>H', n))
+        else:
+            out.append(b'\xc6' + struct.pack('>I', n))
+        out.append(bytes(obj))
+    else:
+        raise TypeError(f"无法用msgpack编码的类型: {type(obj).__name__}")
+
+
+def pack(obj: Any) -> bytes:
+    """按msgpack5的规则打包JSON对象"""
+    out = []
+    _pack_into(obj, out)
+    return b''.join(out)
+
+
+def unpack(data: bytes) -> Any:
+    """解包msgpack数据"""
+    value, offset = _unpack_from(data, 0)
+    if offset != len(data):
+        raise ValueError(f"msgpack数据末尾有多余字节: {len(data) - offset}")
+    return value
+
+
+def _unpack_from(data: bytes, i: int):
+    b = data[i]
+    i += 1
+    if b <= 0x7f:
+        return b, i
+    if b >= 0xe0:
+        return b - 0x100, i
+    if 0x80 <= b <= 0x8f:
+        return _unpack_map(data, i, b & 0x0f)
+    if 0x90 <= b <= 0x9f:
+        return _unpack_array(data, i, b & 0x0f)
+    if 0xa0 <= b <= 0xbf:
+        n = b & 0x1f
+        return data[i:i + n].decode('utf-8'), i + n
+    if b == 0xc0:
+        return None, i
+    if b == 0xc2:
+        return False, i
+    if b == 0xc3:
+        return True, i
+    if b in (0xc4, 0xc5, 0xc6):
+        size = {0xc4: 1, 0xc5: 2, 0xc6: 4}[b]
+        n = int.from_bytes(data[i:i + size], 'big')
+        i += size
+        return bytes(data[i:i + n]), i + n
+    if b == 0xca:
+        return struct.unpack_from('>f', data, i)[0], i + 4
+    if b == 0xcb:
+        return struct.unpack_from('>d', data, i)[0], i + 8
+    if b in (0xcc, 0xcd, 0xce, 0xcf):
+        size = {0xcc: 1, 0xcd: 2, 0xce: 4, 0xcf: 8}[b]
+        return int.from_bytes(data[i:i + size], 'big'), i + size
+    if b in (0xd0, 0xd1, 0xd2, 0xd3):
+        size = {0xd0: 1, 0xd1: 2, 0xd2: 4, 0xd3: 8}[b]
+        return int.from_bytes(data[i:i + size], 'big', signed=True), i + size
+    if b in (0xd9, 0xda, 0xdb):
+        size = {0xd9: 1, 0xda: 2, 0xdb: 4}[b]
+        n = int.from_bytes(data[i:i + size], 'big')
+        i += size
+        return data[i:i + n].decode('utf-8'), i + n
+    if b in (0xdc, 0xdd):
+        size = 2 if b == 0xdc else 4
+        return _unpack_array(data, i + size, int.from_bytes(data[i:i + size], 'big'))
+    if b in (0xde, 0xdf):
+        size = 2 if b == 0xde else 4
+        return _unpack_map(data, i + size, int.from_bytes(data[i:i + size], 'big'))
+    raise ValueError(f"不支持的msgpack类型: 0x{b:02x}")
+
+
+def _unpack_array(data, i, n):
+    result = []
+    for _ in range(n):
+        value, i = _unpack_from(data, i)
+        result.append(value)
+    return result, i
+
+
+def _unpack_map(data, i, n):
+    result = {}
+    for _ in range(n):
+        key, i = _unpack_from(data, i)
+        value, i = _unpack_from(data, i)
+        result[key] = value
+    return result, i
+
+
+# ========== LZMA（LZMA-JS编码器的逐行移植） ==========
+
+# LZMA-JS的压缩级别: s=字典大小的对数, f=fast bytes, m=匹配器(0: BT2, 1: BT4)
+_MODES = [
+    (16, 64, 0),
+    (20, 64, 0),
+    (19, 64, 1),
+    (20, 64, 1),
+    (21, 128, 1),
+    (22, 128, 1),
+    (23, 128, 1),
+    (24, 255, 1),
+    (25, 255, 1),
+]
+
+_INFINITY_PRICE = 268435455
+_NUM_OPTS = 4096
+
+
+def _build_crc_table():
+    table = []
+    for i in range(256):
+        r = i
+        for _ in range(8):
+            r = (r >> 1) ^ 0xEDB88320 if r & 1 else r >> 1
+        table.append(r)
+    return table
+
+
+def _build_prob_prices():
+    prices = [0] * 512
+    for i in range(8, -1, -1):
+        start = 1 << (9 - i - 1)
+        end = 1 << (9 - i)
+        for j in range(start, end):
+            prices[j] = (i << 6) + (((end - j) << 6) >> (9 - i - 1))
+    return prices
+
+
+def _build_fast_pos():
+    fast_pos = [0, 1]
+    for slot in range(2, 22):
+        fast_pos.extend([slot] * (1 << ((slot >> 1) - 1)))
+    return fast_pos
+
+
+_CRC_TABLE = _build_crc_table()
+_PROB_PRICES = _build_prob_prices()
+_FAST_POS = _build_fast_pos()
+
+
+def _get_pos_slot(pos):
+    if pos < 2048:
+        return _FAST_POS[pos]
+    if pos < 2097152:
+        return _FAST_POS[pos >> 10] + 20
+    return _FAST_POS[pos >> 20] + 40
+
+
+def _get_pos_slot2(pos):
+    if pos < 131072:
+        return _FAST_POS[pos >> 6] + 12
+    if pos < 134217728:
+        return _FAST_POS[pos >> 16] + 32
+    return _FAST_POS[pos >> 26] + 52
+
+
+def _state_update_char(index):
+    if index < 4:
+        return 0
+    if index < 10:
+        return index - 3
+    return index - 6
+
+
+def _len_to_pos_state(length):
+    length -= 2
+    return length if length < 4 else 3
+
+
+def _bit_price(prob, bit):
+    return _PROB_PRICES[(((prob - bit) ^ (-bit)) & 2047) >> 2]
+
+
+class _RangeEncoder:
+    __slots__ = ('out', 'low', 'range', 'cache_size', 'cache')
+
+    def __init__(self, out: bytearray):
+        self.out = out
+        self.low = 0
+        self.range = 0xFFFFFFFF
+        self.cache_size = 1
+        self.cache = 0
+
+    def shift_low(self):
+        low = self.low
+        low_hi = low >> 32
+        if low_hi != 0 or low < 0xFF000000:
+            temp = self.cache
+            out = self.out
+            while True:
+                out.append((temp + low_hi) & 0xFF)
+                temp = 0xFF
+                self.cache_size -= 1
+                if self.cache_size == 0:
+                    break
+            self.cache = (low >> 24) & 0xFF
+        self.cache_size += 1
+        self.low = (low & 0xFFFFFF) << 8
+
+    def encode(self, probs, index, bit):
+        prob = probs[index]
+        bound = (self.range >> 11) * prob
+        if not bit:
+            self.range = bound
+            probs[index] = prob + ((2048 - prob) >> 5)
+        else:
+            self.low += bound
+            self.range -= bound
+            probs[index] = prob - (prob >> 5)
+        if self.range < 0x1000000:
+            self.range = (self.range << 8) & 0xFFFFFFFF
+            self.shift_low()
+
+    def encode_direct_bits(self, value, num_bits):
+        for i in range(num_bits - 1, -1, -1):
+            self.range >>= 1
+            if (value >> i) & 1:
+                self.low += self.range
+            if self.range < 0x1000000:
+                self.range = (self.range << 8) & 0xFFFFFFFF
+                self.shift_low()
+
+
+class _BitTree:
+    __slots__ = ('num_bits', 'models')
+
+    def __init__(self, num_bits):
+        self.num_bits = num_bits
+        self.models = [1024] * (1 << num_bits)
+
+    def encode(self, rc, symbol):
+        m = 1
+        models = self.models
+        for bit_index in range(self.num_bits - 1, -1, -1):
+            bit = (symbol >> bit_index) & 1
+            rc.encode(models, m, bit)
+            m = (m << 1) | bit
+
+    def price(self, symbol):
+        m = 1
+        price = 0
+        models = self.models
+        for bit_index in range(self.num_bits - 1, -1, -1):
+            bit = (symbol >> bit_index) & 1
+            price += _bit_price(models[m], bit)
+            m = (m << 1) + bit
+        return price
+
+    def reverse_encode(self, rc, symbol):
+        _reverse_encode(self.models, 0, rc, self.num_bits, symbol)
+
+    def reverse_price(self, symbol):
+        return _reverse_price(self.models, 0, self.num_bits, symbol)
+
+
+def _reverse_encode(models, start, rc, num_bits, symbol):
+    m = 1
+    for _ in range(num_bits):
+        bit = symbol & 1
+        rc.encode(models, start + m, bit)
+        m = (m << 1) | bit
+        symbol >>= 1
+
+
+def _reverse_price(models, start, num_bits, symbol):
+    m = 1
+    price = 0
+    for _ in range(num_bits):
+        bit = symbol & 1
+        symbol >>= 1
+        price += _bit_price(models[start + m], bit)
+        m = (m << 1) | bit
+    return price
+
+
+class _LenPriceTableEncoder:
+    __slots__ = ('choice', 'low', 'mid', 'high', 'prices', 'counters', 'table_size')
+
+    def __init__(self, table_size, num_pos_states):
+        self.choice = [1024, 1024]
+        self.low = [_BitTree(3) for _ in range(16)]
+        self.mid = [_BitTree(3) for _ in range(16)]
+        self.high = _BitTree(8)
+        self.prices = [None] * (16 * 272)
+        self.counters = [0] * 16
+        self.table_size = table_size
+        for pos_state in range(num_pos_states):
+            self.set_prices(pos_state)
+            self.counters[pos_state] = table_size
+
+    def set_prices(self, pos_state):
+        choice = self.choice
+        a0 = _PROB_PRICES[choice[0] >> 2]
+        a1 = _PROB_PRICES[(2048 - choice[0]) >> 2]
+        b0 = a1 + _PROB_PRICES[choice[1] >> 2]
+        b1 = a1 + _PROB_PRICES[(2048 - choice[1]) >> 2]
+        prices = self.prices
+        st = pos_state * 272
+        num_symbols = self.table_size
+        low = self.low[pos_state]
+        mid = self.mid[pos_state]
+        high = self.high
+        for i in range(num_symbols):
+            if i < 8:
+                prices[st + i] = a0 + low.price(i)
+            elif i < 16:
+                prices[st + i] = b0 + mid.price(i - 8)
+            else:
+                prices[st + i] = b1 + high.price(i - 16)
+
+    def encode(self, rc, symbol, pos_state):
+        if symbol < 8:
+            rc.encode(self.choice, 0, 0)
+            self.low[pos_state].encode(rc, symbol)
+        else:
+            symbol -= 8
+            rc.encode(self.choice, 0, 1)
+            if symbol < 8:
+                rc.encode(self.choice, 1, 0)
+                self.mid[pos_state].encode(rc, symbol)
+            else:
+                rc.encode(self.choice, 1, 1)
+                self.high.encode(rc, symbol - 8)
+        self.counters[pos_state] -= 1
+        if self.counters[pos_state] == 0:
+            self.set_prices(pos_state)
+            self.counters[pos_state] = self.table_size
+
+
+def _literal_encode(probs, rc, symbol):
+    context = 1
+    for i in range(7, -1, -1):
+        bit = (symbol >> i) & 1
+        rc.encode(probs, context, bit)
+        context = (context << 1) | bit
+
+
+def _literal_encode_matched(probs, rc, match_byte, symbol):
+    same = True
+    context = 1
+    for i in range(7, -1, -1):
+        bit = (symbol >> i) & 1
+        state = context
+        if same:
+            match_bit = (match_byte >> i) & 1
+            state += (1 + match_bit) << 8
+            same = match_bit == bit
+        rc.encode(probs, state, bit)
+        context = (context << 1) | bit
+
+
+def _literal_price(probs, match_mode, match_byte, symbol):
+    price = 0
+    context = 1
+    i = 7
+    if match_mode:
+        while i >= 0:
+            match_bit = (match_byte >> i) & 1
+            bit = (symbol >> i) & 1
+            price += _bit_price(probs[((1 + match_bit) << 8) + context], bit)
+            context = (context << 1) | bit
+            i -= 1
+            if match_bit != bit:
+                break
+    while i >= 0:
+        bit = (symbol >> i) & 1
+        price += _bit_price(probs[context], bit)
+        context = (context << 1) | bit
+        i -= 1
+    return price
+
+
+class _Optimal:
+    # None对应LZMA-JS中未赋值（undefined）的字段
+    __slots__ = ('state', 'prev1_is_char', 'prev2', 'pos_prev2', 'back_prev2',
+                 'price', 'pos_prev', 'back_prev', 'backs0', 'backs1', 'backs2', 'backs3')
+
+    def __init__(self):
+        for name in self.__slots__:
+            setattr(self, name, None)
+
+    def make_as_char(self):
+        self.back_prev = -1
+        self.prev1_is_char = 0
+
+    def make_as_short_rep(self):
+        self.back_prev = 0
+        self.prev1_is_char = 0
+
+
+class _MatchFinder:
+    """
+    二叉树匹配器（BT2/BT4），整个输入常驻内存
+
+    son/hash用字典保存，未写入的槽位读出为None，
+    对应LZMA-JS中数组未赋值时的undefined，以保证输出逐字节一致。
+    """
+
+    def __init__(self, data: bytes, dictionary_size: int, num_fast_bytes: int, bt4: bool):
+        self.buf = data
+        # LZMA-JS初始化后 _bufferOffset=-1, _pos=1
+        self.off = -1
+        self.pos = 1
+        self.stream_pos = len(data) + 1
+        self.cyclic_pos = 0
+        self.cyclic_size = dictionary_size + 1
+        self.match_max_len = num_fast_bytes
+        self.cut_value = 16 + (num_fast_bytes >> 1)
+        self.son = {}
+        self.hash = {}
+        self.hash_array = bt4
+        if bt4:
+            self.direct_bytes = 0
+            self.min_match_check = 4
+            self.fix_hash_size = 66560
+            hs = dictionary_size - 1
+            hs |= hs >> 1
+            hs |= hs >> 2
+            hs |= hs >> 4
+            hs |= hs >> 8
+            hs >>= 1
+            hs |= 65535
+            if hs > 16777216:
+                hs >>= 1
+            self.hash_mask = hs
+        else:
+            self.direct_bytes = 2
+            self.min_match_check = 3
+            self.fix_hash_size = 0
+            self.hash_mask = 0
+
+    def available(self):
+        return self.stream_pos - self.pos
+
+    def index_byte(self, index):
+        return self.buf[self.off + self.pos + index]
+
+    def match_len(self, index, distance, limit):
+        pos = self.pos
+        if pos + index + limit > self.stream_pos:
+            limit = self.stream_pos - (pos + index)
+        distance += 1
+        buf = self.buf
+        pby = self.off + pos + index
+        i = 0
+        while i < limit and buf[pby + i] == buf[pby + i - distance]:
+            i += 1
+        return i
+
+    def _move_pos(self):
+        self.cyclic_pos += 1
+        if self.cyclic_pos >= self.cyclic_size:
+            self.cyclic_pos = 0
+        self.pos += 1
+
+    def _hash_values(self, cur):
+        buf = self.buf
+        if self.hash_array:
+            temp = _CRC_TABLE[buf[cur]] ^ buf[cur + 1]
+            hash2 = temp & 1023
+            temp ^= buf[cur + 2] << 8
+            hash3 = temp & 65535
+            return hash2, hash3, (temp ^ (_CRC_TABLE[buf[cur + 3]] << 5)) & self.hash_mask
+        return 0, 0, buf[cur] ^ (buf[cur + 1] << 8)
+
+    def get_matches(self, distances):
+        pos = self.pos
+        if pos + self.match_max_len <= self.stream_pos:
+            len_limit = self.match_max_len
+        else:
+            len_limit = self.stream_pos - pos
+            if len_limit < self.min_match_check:
+                self._move_pos()
+                return 0
+
+        offset = 0
+        cyclic_size = self.cyclic_size
+        match_min_pos = pos - cyclic_size if pos > cyclic_size else 0
+        buf = self.buf
+        off = self.off
+        cur = off + pos
+        max_len = 1
+        hash_table = self.hash
+        hash2, hash3, hash_value = self._hash_values(cur)
+
+        cur_match = hash_table.get(self.fix_hash_size + hash_value, 0)
+        if self.hash_array:
+            cur_match2 = hash_table.get(hash2, 0)
+            cur_match3 = hash_table.get(1024 + hash3, 0)
+            hash_table[hash2] = pos
+            hash_table[1024 + hash3] = pos
+            if cur_match2 > match_min_pos:
+                if buf[off + cur_match2] == buf[cur]:
+                    max_len = 2
+                    distances[offset] = 2
+                    distances[offset + 1] = pos - cur_match2 - 1
+                    offset += 2
+            if cur_match3 > match_min_pos:
+                if buf[off + cur_match3] == buf[cur]:
+                    if cur_match3 == cur_match2:
+                        offset -= 2
+                    max_len = 3
+                    distances[offset] = 3
+                    distances[offset + 1] = pos - cur_match3 - 1
+                    offset += 2
+                    cur_match2 = cur_match3
+            if offset != 0 and cur_match2 == cur_match:
+                offset -= 2
+                max_len = 1
+
+        hash_table[self.fix_hash_size + hash_value] = pos
+        cyclic_pos = self.cyclic_pos
+        ptr0 = (cyclic_pos << 1) + 1
+        ptr1 = cyclic_pos << 1
+        len0 = len1 = direct = self.direct_bytes
+        if direct != 0 and cur_match > match_min_pos:
+            if buf[off + cur_match + direct] != buf[cur + direct]:
+                max_len = direct
+                distances[offset] = direct
+                distances[offset + 1] = pos - cur_match - 1
+                offset += 2
+
+        son = self.son
+        count = self.cut_value
+        while True:
+            if cur_match is None:
+                # LZMA-JS: undefined参与比较得到false，距离为NaN，位移后落在0号节点
+                if count == 0:
+                    son[ptr0] = son[ptr1] = 0
+                    break
+                count -= 1
+                length = len0 if len0 < len1 else len1
+                if buf[cur + length] > 0:
+                    son[ptr1] = None
+                    ptr1 = 1
+                    cur_match = son.get(1)
+                    len1 = length
+                else:
+                    son[ptr0] = None
+                    ptr0 = 0
+                    cur_match = son.get(0)
+                    len0 = length
+                continue
+
+            if cur_match <= match_min_pos or count == 0:
+                son[ptr0] = son[ptr1] = 0
+                break
+            count -= 1
+
+            delta = pos - cur_match
+            cyclic = ((cyclic_pos - delta) if delta <= cyclic_pos
+                      else (cyclic_pos - delta + cyclic_size)) << 1
+            pby1 = off + cur_match
+            length = len0 if len0 < len1 else len1
+            if buf[pby1 + length] == buf[cur + length]:
+                length += 1
+                while length != len_limit:
+                    if buf[pby1 + length] != buf[cur + length]:
+                        break
+                    length += 1
+                if max_len < length:
+                    max_len = length
+                    distances[offset] = length
+                    distances[offset + 1] = delta - 1
+                    offset += 2
+                    if length == len_limit:
+                        son[ptr1] = son.get(cyclic)
+                        son[ptr0] = son.get(cyclic + 1)
+                        break
+            if buf[pby1 + length] < buf[cur + length]:
+                son[ptr1] = cur_match
+                ptr1 = cyclic + 1
+                cur_match = son.get(ptr1)
+                len1 = length
+            else:
+                son[ptr0] = cur_match
+                ptr0 = cyclic
+                cur_match = son.get(ptr0)
+                len0 = length
+
+        self._move_pos()
+        return offset
+
+    def skip(self, num):
+        buf = self.buf
+        off = self.off
+        son = self.son
+        hash_table = self.hash
+        cyclic_size = self.cyclic_size
+        while True:
+            pos = self.pos
+            if pos + self.match_max_len <= self.stream_pos:
+                len_limit = self.match_max_len
+            else:
+                len_limit = self.stream_pos - pos
+                if len_limit < self.min_match_check:
+                    self._move_pos()
+                    num -= 1
+                    if num == 0:
+                        break
+                    continue
+
+            match_min_pos = pos - cyclic_size if pos > cyclic_size else 0
+            cur = off + pos
+            hash2, hash3, hash_value = self._hash_values(cur)
+            if self.hash_array:
+                hash_table[hash2] = pos
+                hash_table[1024 + hash3] = pos
+            # 注意：LZMA-JS在Skip中没有 "|| 0"，空槽位读出为undefined
+            cur_match = hash_table.get(self.fix_hash_size + hash_value)
+            hash_table[self.fix_hash_size + hash_value] = pos
+
+            cyclic_pos = self.cyclic_pos
+            ptr0 = (cyclic_pos << 1) + 1
+            ptr1 = cyclic_pos << 1
+            len0 = len1 = self.direct_bytes
+            count = self.cut_value
+            while True:
+                if cur_match is None:
+                    if count == 0:
+                        son[ptr0] = son[ptr1] = 0
+                        break
+                    count -= 1
+                    length = len0 if len0 < len1 else len1
+                    if buf[cur + length] > 0:
+                        son[ptr1] = None
+                        ptr1 = 1
+                        cur_match = son.get(1)
+                        len1 = length
+                    else:
+                        son[ptr0] = None
+                        ptr0 = 0
+                        cur_match = son.get(0)
+                        len0 = length
+                    continue
+
+                if cur_match <= match_min_pos or count == 0:
+                    son[ptr0] = son[ptr1] = 0
+                    break
+                count -= 1
+
+                delta = pos - cur_match
+                cyclic = ((cyclic_pos - delta) if delta <= cyclic_pos
+                          else (cyclic_pos - delta + cyclic_size)) << 1
+                pby1 = off + cur_match
+                length = len0 if len0 < len1 else len1
+                if buf[pby1 + length] == buf[cur + length]:
+                    length += 1
+                    while length != len_limit:
+                        if buf[pby1 + length] != buf[cur + length]:
+                            break
+                        length += 1
+                    if length == len_limit:
+                        son[ptr1] = son.get(cyclic)
+                        son[ptr0] = son.get(cyclic + 1)
+                        break
+                if buf[pby1 + length] < buf[cur + length]:
+                    son[ptr1] = cur_match
+                    ptr1 = cyclic + 1
+                    cur_match = son.get(ptr1)
+                    len1 = length
+                else:
+                    son[ptr0] = cur_match
+                    ptr0 = cyclic
+                    cur_match = son.get(ptr0)
+                    len0 = length
+
+            self._move_pos()
+            num -= 1
+            if num == 0:
+                break
+
+
+class _LzmaEncoder:
+    """LZMA-JS（Java LZMA SDK的GWT编译版）编码器的Python移植"""
+
+    def __init__(self, data: bytes, mode: int):
+        dict_log, num_fast_bytes, match_finder = _MODES[mode - 1]
+        self.dictionary_size = 1 << dict_log
+        self.num_fast_bytes = num_fast_bytes
+        self.dist_table_size = dict_log * 2
+        self.pos_state_mask = 3  # pb=2
+        self.mf = _MatchFinder(data, self.dictionary_size, num_fast_bytes, match_finder == 1)
+
+        self.out = bytearray()
+        self.rc = _RangeEncoder(self.out)
+
+        self.state = 0
+        self.previous_byte = 0
+        self.rep_distances = [0, 0, 0, 0]
+
+        self.is_match = [1024] * 192
+        self.is_rep = [1024] * 12
+        self.is_rep_g0 = [1024] * 12
+        self.is_rep_g1 = [1024] * 12
+        self.is_rep_g2 = [1024] * 12
+        self.is_rep0_long = [1024] * 192
+        self.pos_slot_encoder = [_BitTree(6) for _ in range(4)]
+        self.pos_encoders = [1024] * 114
+        self.pos_align_encoder = _BitTree(4)
+        # lc=3, lp=0：8个字面量编码器
+        self.literal_coders = [[1024] * 768 for _ in range(8)]
+
+        table_size = num_fast_bytes + 1 - 2
+        self.len_encoder = _LenPriceTableEncoder(table_size, 4)
+        self.rep_match_len_encoder = _LenPriceTableEncoder(table_size, 4)
+
+        self.optimum = [_Optimal() for _ in range(_NUM_OPTS)]
+        self.match_distances = [0] * 548
+        self.num_distance_pairs = 0
+        self.longest_match_length = 0
+        self.longest_match_was_found = False
+        self.optimum_end_index = 0
+        self.optimum_current_index = 0
+        self.additional_offset = 0
+        self.back_res = 0
+        self.reps = [0, 0, 0, 0]
+        self.rep_lens = [0, 0, 0, 0]
+
+        self.pos_slot_prices = [0] * 256
+        self.distances_prices = [0] * 512
+        self.align_prices = [0] * 16
+        self.temp_prices = [0] * 128
+        self.match_price_count = 0
+        self.align_price_count = 0
+        self.fill_distances_prices()
+        self.fill_align_prices()
+
+    # ---------- 价格表 ----------
+
+    def fill_align_prices(self):
+        for i in range(16):
+            self.align_prices[i] = self.pos_align_encoder.reverse_price(i)
+        self.align_price_count = 0
+
+    def fill_distances_prices(self):
+        temp_prices = self.temp_prices
+        for i in range(4, 128):
+            pos_slot = _get_pos_slot(i)
+            footer_bits = (pos_slot >> 1) - 1
+            base_val = (2 | (pos_slot & 1)) << footer_bits
+            temp_prices[i] = _reverse_price(self.pos_encoders, base_val - pos_slot - 1,
+                                            footer_bits, i - base_val)
+        pos_slot_prices = self.pos_slot_prices
+        distances_prices = self.distances_prices
+        for len_to_pos_state in range(4):
+            encoder = self.pos_slot_encoder[len_to_pos_state]
+            st = len_to_pos_state << 6
+            for pos_slot in range(self.dist_table_size):
+                pos_slot_prices[st + pos_slot] = encoder.price(pos_slot)
+            for pos_slot in range(14, self.dist_table_size):
+                pos_slot_prices[st + pos_slot] += ((pos_slot >> 1) - 1 - 4) << 6
+            st2 = len_to_pos_state * 128
+            for i in range(4):
+                distances_prices[st2 + i] = pos_slot_prices[st + i]
+            for i in range(4, 128):
+                distances_prices[st2 + i] = pos_slot_prices[st + _get_pos_slot(i)] + temp_prices[i]
+        self.match_price_count = 0
+
+    def _literal_coder(self, prev_byte):
+        return self.literal_coders[(prev_byte & 255) >> 5]
+
+    def pos_len_price(self, pos, length, pos_state):
+        len_to_pos_state = _len_to_pos_state(length)
+        if pos < 128:
+            price = self.distances_prices[len_to_pos_state * 128 + pos]
+        else:
+            price = (self.pos_slot_prices[(len_to_pos_state << 6) + _get_pos_slot2(pos)]
+                     + self.align_prices[pos & 15])
+        return price + self.len_encoder.prices[pos_state * 272 + length - 2]
+
+    def pure_rep_price(self, rep_index, state, pos_state):
+        if not rep_index:
+            price = _PROB_PRICES[self.is_rep_g0[state] >> 2]
+            price += _PROB_PRICES[(2048 - self.is_rep0_long[(state << 4) + pos_state]) >> 2]
+        else:
+            price = _PROB_PRICES[(2048 - self.is_rep_g0[state]) >> 2]
+            if rep_index == 1:
+                price += _PROB_PRICES[self.is_rep_g1[state] >> 2]
+            else:
+                price += _PROB_PRICES[(2048 - self.is_rep_g1[state]) >> 2]
+                price += _bit_price(self.is_rep_g2[state], rep_index - 2)
+        return price
+
+    def rep_len1_price(self, state, pos_state):
+        return (_PROB_PRICES[self.is_rep_g0[state] >> 2]
+                + _PROB_PRICES[self.is_rep0_long[(state << 4) + pos_state] >> 2])
+
+    # ---------- 匹配 ----------
+
+    def read_match_distances(self):
+        len_res = 0
+        self.num_distance_pairs = self.mf.get_matches(self.match_distances)
+        if self.num_distance_pairs > 0:
+            len_res = self.match_distances[self.num_distance_pairs - 2]
+            if len_res == self.num_fast_bytes:
+                len_res += self.mf.match_len(len_res - 1,
+                                             self.match_distances[self.num_distance_pairs - 1],
+                                             273 - len_res)
+        self.additional_offset += 1
+        return len_res
+
+    def move_pos(self, num):
+        if num > 0:
+            self.mf.skip(num)
+            self.additional_offset += num
+
+    def backward(self, cur):
+        optimum = self.optimum
+        self.optimum_end_index = cur
+        pos_mem = optimum[cur].pos_prev
+        back_mem = optimum[cur].back_prev
+        while True:
+            if optimum[cur].prev1_is_char:
+                optimum[pos_mem].make_as_char()
+                optimum[pos_mem].pos_prev = pos_mem - 1
+                if optimum[cur].prev2:
+                    optimum[pos_mem - 1].prev1_is_char = 0
+                    optimum[pos_mem - 1].pos_prev = optimum[cur].pos_prev2
+                    optimum[pos_mem - 1].back_prev = optimum[cur].back_prev2
+            pos_prev = pos_mem
+            back_cur = back_mem
+            back_mem = optimum[pos_prev].back_prev
+            pos_mem = optimum[pos_prev].pos_prev
+            optimum[pos_prev].back_prev = back_cur
+            optimum[pos_prev].pos_prev = cur
+            cur = pos_prev
+            if cur <= 0:
+                break
+        self.back_res = optimum[0].back_prev
+        self.optimum_current_index = optimum[0].pos_prev
+        return self.optimum_current_index
+
+    def get_optimum(self, position):
+        optimum = self.optimum
+        if self.optimum_end_index != self.optimum_current_index:
+            current = optimum[self.optimum_current_index]
+            len_res = current.pos_prev - self.optimum_current_index
+            self.back_res = current.back_prev
+            self.optimum_current_index = current.pos_prev
+            return len_res
+
+        self.optimum_current_index = self.optimum_end_index = 0
+        mf = self.mf
+        reps = self.reps
+        rep_lens = self.rep_lens
+        match_distances = self.match_distances
+        num_fast_bytes = self.num_fast_bytes
+        rep_len_prices = self.rep_match_len_encoder.prices
+        is_match = self.is_match
+        is_rep = self.is_rep
+        is_rep_g0 = self.is_rep_g0
+        is_rep0_long = self.is_rep0_long
+        prob_prices = _PROB_PRICES
+
+        if self.longest_match_was_found:
+            len_main = self.longest_match_length
+            self.longest_match_was_found = False
+        else:
+            len_main = self.read_match_distances()
+        num_distance_pairs = self.num_distance_pairs
+        num_available_bytes = mf.available() + 1
+        if num_available_bytes < 2:
+            self.back_res = -1
+            return 1
+        if num_available_bytes > 273:
+            num_available_bytes = 273
+
+        rep_max_index = 0
+        for i in range(4):
+            reps[i] = self.rep_distances[i]
+            rep_lens[i] = mf.match_len(-1, reps[i], 273)
+            if rep_lens[i] > rep_lens[rep_max_index]:
+                rep_max_index = i
+        if rep_lens[rep_max_index] >= num_fast_bytes:
+            self.back_res = rep_max_index
+            len_res = rep_lens[rep_max_index]
+            self.move_pos(len_res - 1)
+            return len_res
+        if len_main >= num_fast_bytes:
+            self.back_res = match_distances[num_distance_pairs - 1] + 4
+            self.move_pos(len_main - 1)
+            return len_main
+
+        current_byte = mf.index_byte(-1)
+        match_byte = mf.index_byte(-self.rep_distances[0] - 1 - 1)
+        if len_main < 2 and current_byte != match_byte and rep_lens[rep_max_index] < 2:
+            self.back_res = -1
+            return 1
+
+        state = self.state
+        optimum[0].state = state
+        pos_state = position & self.pos_state_mask
+        optimum[1].price = (prob_prices[is_match[(state << 4) + pos_state] >> 2]
+                            + _literal_price(self._literal_coder(self.previous_byte),
+                                             state >= 7, match_byte, current_byte))
+        optimum[1].make_as_char()
+        match_price = prob_prices[(2048 - is_match[(state << 4) + pos_state]) >> 2]
+        rep_match_price = match_price + prob_prices[(2048 - is_rep[state]) >> 2]
+        if match_byte == current_byte:
+            short_rep_price = rep_match_price + self.rep_len1_price(state, pos_state)
+            if short_rep_price < optimum[1].price:
+                optimum[1].price = short_rep_price
+                optimum[1].make_as_short_rep()
+
+        len_end = len_main if len_main >= rep_lens[rep_max_index] else rep_lens[rep_max_index]
+        if len_end < 2:
+            self.back_res = optimum[1].back_prev
+            return 1
+
+        optimum[1].pos_prev = 0
+        optimum[0].backs0 = reps[0]
+        optimum[0].backs1 = reps[1]
+        optimum[0].backs2 = reps[2]
+        optimum[0].backs3 = reps[3]
+        length = len_end
+        while True:
+            optimum[length].price = _INFINITY_PRICE
+            length -= 1
+            if length < 2:
+                break
+
+        for i in range(4):
+            rep_len = rep_lens[i]
+            if rep_len < 2:
+                continue
+            price_4 = rep_match_price + self.pure_rep_price(i, state, pos_state)
+            while True:
+                cur_and_len_price = price_4 + rep_len_prices[pos_state * 272 + rep_len - 2]
+                opt = optimum[rep_len]
+                if cur_and_len_price < opt.price:
+                    opt.price = cur_and_len_price
+                    opt.pos_prev = 0
+                    opt.back_prev = i
+                    opt.prev1_is_char = 0
+                rep_len -= 1
+                if rep_len < 2:
+                    break
+
+        normal_match_price = match_price + prob_prices[is_rep[state] >> 2]
+        length = rep_lens[0] + 1 if rep_lens[0] >= 2 else 2
+        if length <= len_main:
+            offs = 0
+            while length > match_distances[offs]:
+                offs += 2
+            while True:
+                distance = match_distances[offs + 1]
+                cur_and_len_price = normal_match_price + self.pos_len_price(distance, length, pos_state)
+                opt = optimum[length]
+                if cur_and_len_price < opt.price:
+                    opt.price = cur_and_len_price
+                    opt.pos_prev = 0
+                    opt.back_prev = distance + 4
+                    opt.prev1_is_char = 0
+                if length == match_distances[offs]:
+                    offs += 2
+                    if offs == num_distance_pairs:
+                        break
+                length += 1
+
+        cur = 0
+        while True:
+            cur += 1
+            if cur == len_end:
+                return self.backward(cur)
+            new_len = self.read_match_distances()
+            num_distance_pairs = self.num_distance_pairs
+            if new_len >= num_fast_bytes:
+                self.longest_match_length = new_len
+                self.longest_match_was_found = True
+                return self.backward(cur)
+            position += 1
+
+            cur_opt = optimum[cur]
+            pos_prev = cur_opt.pos_prev
+            if cur_opt.prev1_is_char:
+                pos_prev -= 1
+                if cur_opt.prev2:
+                    state = optimum[cur_opt.pos_prev2].state
+                    if cur_opt.back_prev2 < 4:
+                        state = 8 if state < 7 else 11
+                    else:
+                        state = 7 if state < 7 else 10
+                else:
+                    state = optimum[pos_prev].state
+                state = _state_update_char(state)
+            else:
+                state = optimum[pos_prev].state
+
+            if pos_prev == cur - 1:
+                if not cur_opt.back_prev:
+                    state = 9 if state < 7 else 11
+                else:
+                    state = _state_update_char(state)
+            else:
+                if cur_opt.prev1_is_char and cur_opt.prev2:
+                    pos_prev = cur_opt.pos_prev2
+                    pos = cur_opt.back_prev2
+                    state = 8 if state < 7 else 11
+                else:
+                    pos = cur_opt.back_prev
+                    if pos < 4:
+                        state = 8 if state < 7 else 11
+                    else:
+                        state = 7 if state < 7 else 10
+                opt = optimum[pos_prev]
+                if pos < 4:
+                    if not pos:
+                        reps[0], reps[1], reps[2], reps[3] = opt.backs0, opt.backs1, opt.backs2, opt.backs3
+                    elif pos == 1:
+                        reps[0], reps[1], reps[2], reps[3] = opt.backs1, opt.backs0, opt.backs2, opt.backs3
+                    elif pos == 2:
+                        reps[0], reps[1], reps[2], reps[3] = opt.backs2, opt.backs0, opt.backs1, opt.backs3
+                    else:
+                        reps[0], reps[1], reps[2], reps[3] = opt.backs3, opt.backs0, opt.backs1, opt.backs2
+                else:
+                    reps[0], reps[1], reps[2], reps[3] = pos - 4, opt.backs0, opt.backs1, opt.backs2
+
+            cur_opt.state = state
+            cur_opt.backs0 = reps[0]
+            cur_opt.backs1 = reps[1]
+            cur_opt.backs2 = reps[2]
+            cur_opt.backs3 = reps[3]
+            cur_price = cur_opt.price
+            current_byte = mf.index_byte(-1)
+            match_byte = mf.index_byte(-reps[0] - 1 - 1)
+            pos_state = position & self.pos_state_mask
+            cur_and1_price = (cur_price + prob_prices[is_match[(state << 4) + pos_state] >> 2]
+                              + _literal_price(self._literal_coder(mf.index_byte(-2)),
+                                               state >= 7, match_byte, current_byte))
+            next_opt = optimum[cur + 1]
+            next_is_char = False
+            if cur_and1_price < next_opt.price:
+                next_opt.price = cur_and1_price
+                next_opt.pos_prev = cur
+                next_opt.back_prev = -1
+                next_opt.prev1_is_char = 0
+                next_is_char = True
+
+            match_price = cur_price + prob_prices[(2048 - is_match[(state << 4) + pos_state]) >> 2]
+            rep_match_price = match_price + prob_prices[(2048 - is_rep[state]) >> 2]
+            # next_opt.pos_prev可能从未赋值（undefined < cur 在JS中为false）
+            if match_byte == current_byte and not (next_opt.pos_prev is not None
+                                                   and next_opt.pos_prev < cur
+                                                   and not next_opt.back_prev):
+                short_rep_price = rep_match_price + (prob_prices[is_rep_g0[state] >> 2]
+                                                     + prob_prices[is_rep0_long[(state << 4) + pos_state] >> 2])
+                if short_rep_price <= next_opt.price:
+                    next_opt.price = short_rep_price
+                    next_opt.pos_prev = cur
+                    next_opt.back_prev = 0
+                    next_opt.prev1_is_char = 0
+                    next_is_char = True
+
+            num_available_bytes_full = mf.available() + 1
+            if 4095 - cur < num_available_bytes_full:
+                num_available_bytes_full = 4095 - cur
+            num_available_bytes = num_available_bytes_full
+            if num_available_bytes < 2:
+                continue
+            if num_available_bytes > num_fast_bytes:
+                num_available_bytes = num_fast_bytes
+
+            if not next_is_char and match_byte != current_byte:
+                t = min(num_available_bytes_full - 1, num_fast_bytes)
+                len_test2 = mf.match_len(0, reps[0], t)
+                if len_test2 >= 2:
+                    state2 = _state_update_char(state)
+                    pos_state_next = (position + 1) & self.pos_state_mask
+                    next_rep_match_price = (cur_and1_price
+                                            + prob_prices[(2048 - is_match[(state2 << 4) + pos_state_next]) >> 2]
+                                            + prob_prices[(2048 - is_rep[state2]) >> 2])
+                    offset = cur + 1 + len_test2
+                    while len_end < offset:
+                        len_end += 1
+                        optimum[len_end].price = _INFINITY_PRICE
+                    cur_and_len_price = next_rep_match_price + (
+                        rep_len_prices[pos_state_next * 272 + len_test2 - 2]
+                        + self.pure_rep_price(0, state2, pos_state_next))
+                    opt = optimum[offset]
+                    if cur_and_len_price < opt.price:
+                        opt.price = cur_and_len_price
+                        opt.pos_prev = cur + 1
+                        opt.back_prev = 0
+                        opt.prev1_is_char = 1
+                        opt.prev2 = 0
+
+            start_len = 2
+            for rep_index in range(4):
+                len_test = mf.match_len(-1, reps[rep_index], num_available_bytes)
+                if len_test < 2:
+                    continue
+                len_test_temp = len_test
+                while True:
+                    while len_end < cur + len_test:
+                        len_end += 1
+                        optimum[len_end].price = _INFINITY_PRICE
+                    cur_and_len_price = rep_match_price + (
+                        rep_len_prices[pos_state * 272 + len_test - 2]
+                        + self.pure_rep_price(rep_index, state, pos_state))
+                    opt = optimum[cur + len_test]
+                    if cur_and_len_price < opt.price:
+                        opt.price = cur_and_len_price
+                        opt.pos_prev = cur
+                        opt.back_prev = rep_index
+                        opt.prev1_is_char = 0
+                    len_test -= 1
+                    if len_test < 2:
+                        break
+                len_test = len_test_temp
+                if not rep_index:
+                    start_len = len_test + 1
+                if len_test < num_available_bytes_full:
+                    t = min(num_available_bytes_full - 1 - len_test, num_fast_bytes)
+                    len_test2 = mf.match_len(len_test, reps[rep_index], t)
+                    if len_test2 >= 2:
+                        state2 = 8 if state < 7 else 11
+                        pos_state_next = (position + len_test) & self.pos_state_mask
+                        cur_and_len_char_price = (
+                            rep_match_price
+                            + (rep_len_prices[pos_state * 272 + len_test - 2]
+                               + self.pure_rep_price(rep_index, state, pos_state))
+                            + prob_prices[is_match[(state2 << 4) + pos_state_next] >> 2]
+                            + _literal_price(self._literal_coder(mf.index_byte(len_test - 1 - 1)), True,
+                                             mf.index_byte(len_test - 1 - (reps[rep_index] + 1)),
+                                             mf.index_byte(len_test - 1)))
+                        state2 = _state_update_char(state2)
+                        pos_state_next = (position + len_test + 1) & self.pos_state_mask
+                        next_match_price = (cur_and_len_char_price
+                                            + prob_prices[(2048 - is_match[(state2 << 4) + pos_state_next]) >> 2])
+                        next_rep_match_price = next_match_price + prob_prices[(2048 - is_rep[state2]) >> 2]
+                        offset = len_test + 1 + len_test2
+                        while len_end < cur + offset:
+                            len_end += 1
+                            optimum[len_end].price = _INFINITY_PRICE
+                        cur_and_len_price = next_rep_match_price + (
+                            rep_len_prices[pos_state_next * 272 + len_test2 - 2]
+                            + self.pure_rep_price(0, state2, pos_state_next))
+                        opt = optimum[cur + offset]
+                        if cur_and_len_price < opt.price:
+                            opt.price = cur_and_len_price
+                            opt.pos_prev = cur + len_test + 1
+                            opt.back_prev = 0
+                            opt.prev1_is_char = 1
+                            opt.prev2 = 1
+                            opt.pos_prev2 = cur
+                            opt.back_prev2 = rep_index
+
+            if new_len > num_available_bytes:
+                new_len = num_available_bytes
+                num_distance_pairs = 0
+                while new_len > match_distances[num_distance_pairs]:
+                    num_distance_pairs += 2
+                match_distances[num_distance_pairs] = new_len
+                num_distance_pairs += 2
+
+            if new_len >= start_len:
+                normal_match_price = match_price + prob_prices[is_rep[state] >> 2]
+                while len_end < cur + new_len:
+                    len_end += 1
+                    optimum[len_end].price = _INFINITY_PRICE
+                offs = 0
+                while start_len > match_distances[offs]:
+                    offs += 2
+                len_test = start_len
+                while True:
+                    cur_back = match_distances[offs + 1]
+                    cur_and_len_price = normal_match_price + self.pos_len_price(cur_back, len_test, pos_state)
+                    opt = optimum[cur + len_test]
+                    if cur_and_len_price < opt.price:
+                        opt.price = cur_and_len_price
+                        opt.pos_prev = cur
+                        opt.back_prev = cur_back + 4
+                        opt.prev1_is_char = 0
+                    if len_test == match_distances[offs]:
+                        if len_test < num_available_bytes_full:
+                            t = min(num_available_bytes_full - 1 - len_test, num_fast_bytes)
+                            len_test2 = mf.match_len(len_test, cur_back, t)
+                            if len_test2 >= 2:
+                                state2 = 7 if state < 7 else 10
+                                pos_state_next = (position + len_test) & self.pos_state_mask
+                                cur_and_len_char_price = (
+                                    cur_and_len_price
+                                    + prob_prices[is_match[(state2 << 4) + pos_state_next] >> 2]
+                                    + _literal_price(self._literal_coder(mf.index_byte(len_test - 1 - 1)), True,
+                                                     mf.index_byte(len_test - (cur_back + 1) - 1),
+                                                     mf.index_byte(len_test - 1)))
+                                state2 = _state_update_char(state2)
+                                pos_state_next = (position + len_test + 1) & self.pos_state_mask
+                                next_match_price = (cur_and_len_char_price
+                                                    + prob_prices[(2048 - is_match[(state2 << 4) + pos_state_next]) >> 2])
+                                next_rep_match_price = next_match_price + prob_prices[(2048 - is_rep[state2]) >> 2]
+                                offset = len_test + 1 + len_test2
+                                while len_end < cur + offset:
+                                    len_end += 1
+                                    optimum[len_end].price = _INFINITY_PRICE
+                                cur_and_len_price = next_rep_match_price + (
+                                    rep_len_prices[pos_state_next * 272 + len_test2 - 2]
+                                    + self.pure_rep_price(0, state2, pos_state_next))
+                                opt = optimum[cur + offset]
+                                if cur_and_len_price < opt.price:
+                                    opt.price = cur_and_len_price
+                                    opt.pos_prev = cur + len_test + 1
+                                    opt.back_prev = 0
+                                    opt.prev1_is_char = 1
+                                    opt.prev2 = 1
+                                    opt.pos_prev2 = cur
+                                    opt.back_prev2 = cur_back + 4
+                        offs += 2
+                        if offs == num_distance_pairs:
+                            break
+                    len_test += 1
+
+    # ---------- 编码 ----------
+
+    def write_end_marker(self, pos_state):
+        rc = self.rc
+        rc.encode(self.is_match, (self.state << 4) + pos_state, 1)
+        rc.encode(self.is_rep, self.state, 0)
+        self.state = 7 if self.state < 7 else 10
+        self.len_encoder.encode(rc, 0, pos_state)
+        self.pos_slot_encoder[_len_to_pos_state(2)].encode(rc, 63)
+        rc.encode_direct_bits(67108863, 26)
+        self.pos_align_encoder.reverse_encode(rc, 15)
+
+    def flush(self, now_pos):
+        self.write_end_marker(now_pos & self.pos_state_mask)
+        for _ in range(5):
+            self.rc.shift_low()
+
+    def encode(self) -> bytes:
+        mf = self.mf
+        rc = self.rc
+        now_pos = 0
+
+        if not mf.available():
+            self.flush(now_pos)
+            return bytes(self.out)
+        self.read_match_distances()
+        pos_state = now_pos & self.pos_state_mask
+        rc.encode(self.is_match, (self.state << 4) + pos_state, 0)
+        self.state = _state_update_char(self.state)
+        cur_byte = mf.index_byte(-self.additional_offset)
+        _literal_encode(self._literal_coder(self.previous_byte), rc, cur_byte)
+        self.previous_byte = cur_byte
+        self.additional_offset -= 1
+        now_pos += 1
+
+        if not mf.available():
+            self.flush(now_pos)
+            return bytes(self.out)
+
+        while True:
+            length = self.get_optimum(now_pos)
+            pos = self.back_res
+            pos_state = now_pos & self.pos_state_mask
+            complex_state = (self.state << 4) + pos_state
+            if length == 1 and pos == -1:
+                rc.encode(self.is_match, complex_state, 0)
+                cur_byte = mf.index_byte(-self.additional_offset)
+                sub_coder = self._literal_coder(self.previous_byte)
+                if self.state < 7:
+                    _literal_encode(sub_coder, rc, cur_byte)
+                else:
+                    match_byte = mf.index_byte(-self.rep_distances[0] - 1 - self.additional_offset)
+                    _literal_encode_matched(sub_coder, rc, match_byte, cur_byte)
+                self.previous_byte = cur_byte
+                self.state = _state_update_char(self.state)
+            else:
+                rc.encode(self.is_match, complex_state, 1)
+                if pos < 4:
+                    rc.encode(self.is_rep, self.state, 1)
+                    if not pos:
+                        rc.encode(self.is_rep_g0, self.state, 0)
+                        rc.encode(self.is_rep0_long, complex_state, 0 if length == 1 else 1)
+                    else:
+                        rc.encode(self.is_rep_g0, self.state, 1)
+                        if pos == 1:
+                            rc.encode(self.is_rep_g1, self.state, 0)
+                        else:
+                            rc.encode(self.is_rep_g1, self.state, 1)
+                            rc.encode(self.is_rep_g2, self.state, pos - 2)
+                    if length == 1:
+                        self.state = 9 if self.state < 7 else 11
+                    else:
+                        self.rep_match_len_encoder.encode(rc, length - 2, pos_state)
+                        self.state = 8 if self.state < 7 else 11
+                    distance = self.rep_distances[pos]
+                    if pos != 0:
+                        for i in range(pos, 0, -1):
+                            self.rep_distances[i] = self.rep_distances[i - 1]
+                        self.rep_distances[0] = distance
+                else:
+                    rc.encode(self.is_rep, self.state, 0)
+                    self.state = 7 if self.state < 7 else 10
+                    self.len_encoder.encode(rc, length - 2, pos_state)
+                    pos -= 4
+                    pos_slot = _get_pos_slot(pos)
+                    self.pos_slot_encoder[_len_to_pos_state(length)].encode(rc, pos_slot)
+                    if pos_slot >= 4:
+                        footer_bits = (pos_slot >> 1) - 1
+                        base_val = (2 | (pos_slot & 1)) << footer_bits
+                        pos_reduced = pos - base_val
+                        if pos_slot < 14:
+                            _reverse_encode(self.pos_encoders, base_val - pos_slot - 1, rc,
+                                            footer_bits, pos_reduced)
+                        else:
+                            rc.encode_direct_bits(pos_reduced >> 4, footer_bits - 4)
+                            self.pos_align_encoder.reverse_encode(rc, pos_reduced & 15)
+                            self.align_price_count += 1
+                    self.rep_distances[3] = self.rep_distances[2]
+                    self.rep_distances[2] = self.rep_distances[1]
+                    self.rep_distances[1] = self.rep_distances[0]
+                    self.rep_distances[0] = pos
+                    self.match_price_count += 1
+                self.previous_byte = mf.index_byte(length - 1 - self.additional_offset)
+
+            self.additional_offset -= length
+            now_pos += length
+            if not self.additional_offset:
+                if self.match_price_count >= 128:
+                    self.fill_distances_prices()
+                if self.align_price_count >= 16:
+                    self.fill_align_prices()
+                if not mf.available():
+                    self.flush(now_pos)
+                    return bytes(self.out)
+
+
+def lzma_compress(data: bytes, mode: int = 9) -> bytes:
+    """
+    与LZMA-JS的 LZMA.compress(data, mode) 输出逐字节一致的压缩
+
+    输出为.lzma（LZMA_Alone）格式：5字节属性 + 8字节原始长度 + 压缩数据（含结束标记）。
+    整个输入常驻内存，长度不能超过该模式的字典大小。
+    """
+    if not 1 <= mode <= 9:
+        mode = 7  # 与LZMA-JS一致：非法模式回退到 mode 7
+    data = bytes(data)
+    dict_log = _MODES[mode - 1][0]
+    if len(data) > (1 << dict_log):
+        raise ValueError(f"输入过大（{len(data)} 字节），超过mode {mode}的字典大小")
+
+    header = bytearray([(2 * 5 + 0) * 9 + 3])  # pb=2, lp=0, lc=3
+    header += struct.pack('<I', 1 << dict_log)
+    header += struct.pack('<Q', len(data))
+    return bytes(header) + _LzmaEncoder(data, mode).encode()
+
+
+def lzma_decompress(data: bytes) -> bytes:
+    """解压.lzma（LZMA_Alone）格式数据"""
+    try:
+        return _lzma.LZMADecompressor(format=_lzma.FORMAT_ALONE).decompress(data)
+    except _lzma.LZMAError:
+        # 旧版liblzma不接受"已知长度+结束标记"，改写为未知长度后重试
+        patched = bytes(data[:5]) + b'\xff' * 8 + bytes(data[13:])
+        return _lzma.LZMADecompressor(format=_lzma.FORMAT_ALONE).decompress(patched)
+
+
+# ========== URL安全的base64 ==========
+
+def safe64_encode(data: bytes) -> str:
+    """与urlsafe-base64.encode一致：'+'→'-'，'/'→'_'，去掉末尾'='"""
+    return base64.urlsafe_b64encode(data).decode('ascii').rstrip('=')
+
+
+def safe64_decode(text: str) -> bytes:
+    """URL安全base64解码（自动补齐'='）"""
+    return base64.urlsafe_b64decode(text + '=' * (-len(text) % 4))
+
+
+# ========== json-url('lzma') ==========
+
+def compress(obj: Any) -> str:
+    """将JSON对象压缩为json-url('lzma')格式的hash字符串"""
+    return safe64_encode(lzma_compress(pack(obj), 9))
+
+
+def compress_json(json_str: str) -> str:
+    """将JSON字符串压缩为json-url('lzma')格式（等价于 compress_json.js）"""
+    return compress(json.loads(json_str))
+
+
+def decompress(text: str) -> Any:
+    """将json-url('lzma')格式的hash字符串还原为JSON对象"""
+    return unpack(lzma_decompress(safe64_decode(text)))
+
+
+if __name__ == "__main__":
+    import sys
+
+    # 与 compress_json.js 相同的用法: python json_url_codec.py < scene.json
+    sys.stdout.write(compress_json(sys.stdin.read()))
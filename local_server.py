@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+"""
+本地仿真器静态服务器 - 离线托管ray-optics仿真器
+
+默认生成的HTML都指向 https://phydemo.app/ray-optics/simulator/，
+渲染依赖外网且受远端延迟影响。本模块在后台线程中启动一个静态文件服务器，
+托管本地的ray-optics构建产物，使截图可以完全离线、结果可复现。
+
+查找顺序（找到第一个包含 simulator/index.html 的目录）:
+  1. 环境变量 RAY_OPTICS_ROOT
+  2. ray-optics/dist/    （ray-optics仓库执行 npm run build 后的输出）
+  3. ray-optics/
+  4. sample_files/
+
+用法:
+    from local_server import get_local_simulator_url
+
+    url = get_local_simulator_url()  # 例如 http://127.0.0.1:8765/simulator/
+
+    # 或命令行单独启动
+    python local_server.py --root ray-optics/dist --port 8765
+"""
+
+import argparse
+import atexit
+import functools
+import hashlib
+import os
+import threading
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# 默认配置
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8765  # 固定端口，生成的HTML在服务器重启后仍然有效（0表示随机端口）
+SIMULATOR_PATH = 'simulator'
+CANDIDATE_ROOTS = ['ray-optics/dist', 'ray-optics', 'sample_files']
+
+
+def find_simulator_root(root: Optional[str] = None) -> str:
+    """
+    查找本地ray-optics构建目录（其中应包含 simulator/index.html）
+
+    未找到时抛出 FileNotFoundError
+    """
+    if root is not None:
+        candidates = [root]
+    else:
+        candidates = [os.environ.get('RAY_OPTICS_ROOT')] + CANDIDATE_ROOTS
+    for candidate in candidates:
+        if not candidate:
+            continue
+        path = candidate if os.path.isabs(candidate) else os.path.join(BASE_DIR, candidate)
+        if os.path.isfile(os.path.join(path, SIMULATOR_PATH, 'index.html')):
+            return os.path.abspath(path)
+
+    searched = ', '.join(c for c in candidates if c)
+    raise FileNotFoundError(
+        f"未找到本地仿真器（需要 {SIMULATOR_PATH}/index.html），已查找: {searched}"
+    )
+
+
+def simulator_fingerprint(root: Optional[str] = None) -> str:
+    """
+    本地仿真器构建的指纹（simulator/ 下所有文件的相对路径、大小和修改时间的哈希）
+
+    更新构建产物后指纹改变，构建清单据此让旧截图失效（见 build_manifest.render_settings）
+    """
+    base = os.path.join(find_simulator_root(root), SIMULATOR_PATH)
+    digest = hashlib.sha256()
+    for directory, dirs, files in os.walk(base):
+        dirs.sort()
+        for name in sorted(files):
+            path = os.path.join(directory, name)
+            stat = os.stat(path)
+            relative = os.path.relpath(path, base).replace(os.sep, '/')
+            digest.update(f"{relative}\0{stat.st_size}\0{stat.st_mtime_ns}\n".encode('utf-8'))
+    return digest.hexdigest()[:16]
+
+
+class _QuietHandler(SimpleHTTPRequestHandler):
+    """不在终端打印每个请求的静态文件处理器"""
+
+    def log_message(self, format, *args):
+        pass
+
+
+class LocalSimulatorServer:
+    """
+    在后台线程中运行的静态文件服务器
+
+    参数:
+        root: 托管目录（默认自动查找，见 find_simulator_root）
+        host: 监听地址
+        port: 监听端口（0表示随机空闲端口）
+
+    用法:
+        with LocalSimulatorServer() as server:
+            print(server.simulator_url)
+    """
+
+    def __init__(self, root: Optional[str] = None, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT):
+        self.root = find_simulator_root(root)
+        self.host = host
+        self.port = port
+        self._httpd = None
+        self._thread = None
+
+    def start(self):
+        """启动服务器（已启动时直接返回）"""
+        if self._httpd is not None:
+            return self
+        handler = functools.partial(_QuietHandler, directory=self.root)
+        self._httpd = ThreadingHTTPServer((self.host, self.port), handler)
+        self._httpd.daemon_threads = True
+        self.port = self._httpd.server_address[1]
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """停止服务器"""
+        if self._httpd is None:
+            return
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        self._thread.join()
+        self._httpd = None
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        return f'http://{self.host}:{self.port}/'
+
+    @property
+    def simulator_url(self) -> str:
+        return f'{self.url}{SIMULATOR_PATH}/'
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+
+
+# ========== 共享服务器 ==========
+_shared_server = None
+_shared_lock = threading.Lock()
+
+
+def get_local_simulator_url(root: Optional[str] = None, port: int = DEFAULT_PORT) -> str:
+    """获取进程内共享的本地仿真器地址（首次调用时启动服务器，退出时自动关闭）"""
+    global _shared_server
+    with _shared_lock:
+        if _shared_server is None:
+            _shared_server = LocalSimulatorServer(root=root, port=port).start()
+        return _shared_server.simulator_url
+
+
+def get_local_simulator_fingerprint(root: Optional[str] = None) -> str:
+    """共享服务器（未启动时为自动查找到的目录）所托管构建的指纹"""
+    with _shared_lock:
+        if _shared_server is not None and root is None:
+            root = _shared_server.root
+    return simulator_fingerprint(root)
+
+
+def stop_shared_server():
+    """关闭共享的本地仿真器服务器"""
+    global _shared_server
+    with _shared_lock:
+        if _shared_server is not None:
+            _shared_server.stop()
+            _shared_server = None
+
+
+atexit.register(stop_shared_server)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='本地托管ray-optics仿真器（离线渲染）')
+    parser.add_argument('--root', help='ray-optics构建目录（默认自动查找）')
+    parser.add_argument('--host', default=DEFAULT_HOST, help=f'监听地址（默认: {DEFAULT_HOST}）')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT, help=f'监听端口（默认: {DEFAULT_PORT}）')
+    args = parser.parse_args()
+
+    try:
+        server = LocalSimulatorServer(root=args.root, host=args.host, port=args.port)
+    except FileNotFoundError as e:
+        print(f"❌ {e}")
+        print("   请先构建ray-optics: git clone https://github.com/ricktu288/ray-optics && npm run build")
+        return
+
+    server.start()
+    print("=" * 60)
+    print(f"✓ 本地仿真器已启动: {server.simulator_url}")
+    print(f"  托管目录: {server.root}")
+    print("  按 Ctrl+C 停止")
+    print("=" * 60)
+    try:
+        server._thread.join()
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,357 @@
+#!/usr/bin/env python3
+"""
+列式对象存储 - 用NumPy数组按类型保存大场景中的光学对象
+
+10万~100万个平面镜、遮挡物或玻璃顶点时，每个对象（及其Point）都是独立的Python对象，
+内存开销远大于坐标本身。ObjectStore 把同类型对象的数值放在同一个 float64 数组中
+（玻璃多边形的顶点放在一个 (N, 2) 数组里，另记每个多边形的起止位置），
+只有在生成JSON时才逐个构造 to_dict() 的输出。每行另记一个字节的位掩码，标记哪些值传入时是整数，
+输出时还原为原来的 int/float（1 与 1.0 的JSON不同），结果与普通对象列表逐字节一致。
+
+ObjectStore 的用法与列表相同，可以直接作为 RayOpticsScene.objects:
+
+    from object_store import ObjectStore
+
+    scene = RayOpticsScene("大量平面镜", store=ObjectStore())
+    scene.add_object(PointSource(Point(100, 300)))
+    scene.objects.add_array("Mirror", x1=xs, y1=ys1, x2=xs, y2=ys2)   # 批量添加
+    scene.save("output/json/mirrors.json")
+
+需要numpy（仅在使用 ObjectStore 时导入）。
+"""
+
+from numbers import Integral
+from typing import Any, Dict, Iterator, List
+
+from ray_optics_controller import (OpticalObject, Point, PointSource, ParallelLight, FlatMirror,
+                                   CurvedMirror, IdealLens, GlassRefractor, Blocker)
+
+
+def _int_flags(values) -> int:
+    """各值是否为整数的位掩码（第i位对应第i个值）"""
+    flags = 0
+    for i, value in enumerate(values):
+        if isinstance(value, Integral):
+            flags |= 1 << i
+    return flags
+
+
+def _typed(row: List[float], flags: int) -> list:
+    """float64 行转回传入时的Python类型（整数输出为int、浮点数保持float，与普通对象列表的JSON一致）"""
+    return [int(value) if flags >> i & 1 else value for i, value in enumerate(row)]
+
+
+def _array_flags(values) -> int:
+    """数组或标量按dtype是否为整数得到的标志（1为整数）"""
+    import numpy as np
+    return 1 if np.issubdtype(np.asarray(values).dtype, np.integer) else 0
+
+
+# 每种类型的列（顺序即数组中的列顺序）、从对象取值、从一行（已转回原类型）构造 to_dict 输出、还原对象
+_SCHEMAS = {
+    'PointSource': (
+        PointSource, ('x', 'y', 'wavelength', 'brightness'),
+        lambda o: (o.position.x, o.position.y, o.wavelength, o.brightness),
+        lambda r: {"type": "PointSource", "x": r[0], "y": r[1],
+                   "wavelength": str(r[2]), "brightness": str(r[3])},
+        lambda r: PointSource(Point(r[0], r[1]), r[2], r[3]),
+    ),
+    'Beam': (
+        ParallelLight, ('x', 'y', 'dx', 'dy', 'wavelength', 'brightness', 'width'),
+        lambda o: (o.position.x, o.position.y, o.direction.x, o.direction.y,
+                   o.wavelength, o.brightness, o.width),
+        lambda r: {"type": "Beam", "p1": {"x": r[0], "y": r[1]},
+                   "p2": {"x": r[0], "y": r[1] + r[6]},
+                   "wavelength": str(r[4]), "brightness": str(r[5])},
+        lambda r: ParallelLight(Point(r[0], r[1]), Point(r[2], r[3]),
+                                r[4], r[5], r[6]),
+    ),
+    'Mirror': (
+        FlatMirror, ('x1', 'y1', 'x2', 'y2'),
+        lambda o: (o.position.x, o.position.y, o.p2.x, o.p2.y),
+        lambda r: {"type": "Mirror", "p1": {"x": r[0], "y": r[1]},
+                   "p2": {"x": r[2], "y": r[3]}},
+        lambda r: FlatMirror(Point(r[0], r[1]), Point(r[2], r[3])),
+    ),
+    'ParabolicMirror': (
+        CurvedMirror, ('x1', 'y1', 'x2', 'y2', 'x3', 'y3'),
+        lambda o: (o.position.x, o.position.y, o.p2.x, o.p2.y, o.p3.x, o.p3.y),
+        lambda r: {"type": "ParabolicMirror", "p1": {"x": r[0], "y": r[1]},
+                   "p2": {"x": r[2], "y": r[3]}, "p3": {"x": r[4], "y": r[5]}},
+        lambda r: CurvedMirror(Point(r[0], r[1]), Point(r[2], r[3]),
+                               Point(r[4], r[5])),
+    ),
+    'IdealLens': (
+        IdealLens, ('x1', 'y1', 'x2', 'y2', 'focal_length'),
+        lambda o: (o.position.x, o.position.y, o.p2.x, o.p2.y, o.focal_length),
+        lambda r: {"type": "IdealLens", "p1": {"x": r[0], "y": r[1]},
+                   "p2": {"x": r[2], "y": r[3]}, "focalLength": str(r[4])},
+        lambda r: IdealLens(Point(r[0], r[1]), Point(r[2], r[3]), r[4]),
+    ),
+    'Blocker': (
+        Blocker, ('x1', 'y1', 'x2', 'y2'),
+        lambda o: (o.position.x, o.position.y, o.p2.x, o.p2.y),
+        lambda r: {"type": "Blocker", "p1": {"x": r[0], "y": r[1]},
+                   "p2": {"x": r[2], "y": r[3]}},
+        lambda r: Blocker(Point(r[0], r[1]), Point(r[2], r[3])),
+    ),
+}
+
+_GLASS = 'Glass'
+_OTHER = 'other'  # 未知的OpticalObject子类，原样保存
+
+# 类型编号（记录插入顺序用）
+_KINDS = list(_SCHEMAS) + [_GLASS, _OTHER]
+_KIND_CODES = {kind: code for code, kind in enumerate(_KINDS)}
+_CLASS_KINDS = {schema[0]: kind for kind, schema in _SCHEMAS.items()}
+_CLASS_KINDS[GlassRefractor] = _GLASS
+
+
+class _Growable:
+    """按需倍增容量的NumPy数组（追加为均摊O(1)）"""
+
+    __slots__ = ('data', 'size')
+
+    def __init__(self, columns: int, dtype='float64', capacity: int = 16):
+        import numpy as np
+        self.data = np.empty((capacity, columns) if columns else capacity, dtype=dtype)
+        self.size = 0
+
+    def _reserve(self, extra: int):
+        import numpy as np
+        needed = self.size + extra
+        if needed > len(self.data):
+            capacity = max(needed, len(self.data) * 2)
+            data = np.empty((capacity,) + self.data.shape[1:], dtype=self.data.dtype)
+            data[:self.size] = self.data[:self.size]
+            self.data = data
+
+    def append(self, row):
+        self._reserve(1)
+        self.data[self.size] = row
+        self.size += 1
+
+    def extend(self, rows):
+        self._reserve(len(rows))
+        self.data[self.size:self.size + len(rows)] = rows
+        self.size += len(rows)
+
+    def view(self):
+        return self.data[:self.size]
+
+
+class ObjectStore:
+    """
+    按类型分列存储光学对象（接口与list相同，可作为 RayOpticsScene.objects）
+
+    - append/extend/add_object: 逐个添加对象，数值拆入对应类型的数组
+    - add_array: 按列批量添加同类型对象（10万个对象只需一次数组拷贝）
+    - add_glass: 批量添加玻璃多边形（顶点数组 + 每个多边形的顶点数）
+    - iter_dicts/to_dicts: 按插入顺序生成 to_dict() 输出
+    - 迭代或下标访问时才构造对应的对象（修改构造出的对象不会写回存储）
+    """
+
+    def __init__(self, objects=None):
+        import numpy as np  # noqa: F401  缺少numpy时尽早报错
+
+        self._columns: Dict[str, _Growable] = {}
+        self._flags: Dict[str, _Growable] = {}  # 每行一个字节，第i位表示第i列传入时是整数
+        self._order_kind = _Growable(0, dtype='int8')
+        self._order_row = _Growable(0, dtype='int64')
+        # 玻璃: 顶点 (N, 2)、每个多边形的顶点起点、折射率
+        self._glass_points = _Growable(2)
+        self._glass_start = _Growable(0, dtype='int64')
+        self._glass_index = _Growable(0)
+        self._glass_point_flags = _Growable(0, dtype='uint8')  # 第0/1位: x/y 是整数
+        self._glass_index_flags = _Growable(0, dtype='uint8')
+        self._others: List[OpticalObject] = []
+        if objects is not None:
+            self.extend(objects)
+
+    # ---------- 添加 ----------
+
+    def _column(self, kind: str) -> _Growable:
+        if kind not in self._columns:
+            self._columns[kind] = _Growable(len(_SCHEMAS[kind][1]))
+            self._flags[kind] = _Growable(0, dtype='uint8')
+        return self._columns[kind]
+
+    def _record_order(self, kind: str, first_row: int, count: int):
+        import numpy as np
+        if count == 1:
+            self._order_kind.append(_KIND_CODES[kind])
+            self._order_row.append(first_row)
+            return
+        self._order_kind.extend(np.full(count, _KIND_CODES[kind], dtype='int8'))
+        self._order_row.extend(np.arange(first_row, first_row + count, dtype='int64'))
+
+    def append(self, obj: OpticalObject):
+        """添加一个对象"""
+        kind = _CLASS_KINDS.get(type(obj))
+        if kind == _GLASS:
+            self.add_glass([[(p.x, p.y) for p in obj.points]], [obj.refractive_index])
+            return
+        if kind is None:
+            self._record_order(_OTHER, len(self._others), 1)
+            self._others.append(obj)
+            return
+        column = self._column(kind)
+        self._record_order(kind, column.size, 1)
+        values = _SCHEMAS[kind][2](obj)
+        column.append(values)
+        self._flags[kind].append(_int_flags(values))
+
+    add_object = append
+
+    def extend(self, objects):
+        """逐个添加多个对象"""
+        for obj in objects:
+            self.append(obj)
+
+    def add_array(self, kind: str, **columns):
+        """
+        按列批量添加同类型对象
+
+        参数:
+            kind: 对象类型（'PointSource'、'Beam'、'Mirror'、'ParabolicMirror'、'IdealLens'、'Blocker'）
+            columns: 各列的数组或标量，例如 Mirror 需要 x1, y1, x2, y2
+                     （各类型的列名见 ObjectStore.columns(kind)）
+        """
+        import numpy as np
+
+        if kind not in _SCHEMAS:
+            raise ValueError(f"不支持批量添加的类型: {kind}（玻璃请使用 add_glass）")
+        names = _SCHEMAS[kind][1]
+        missing = [name for name in names if name not in columns]
+        unknown = [name for name in columns if name not in names]
+        if missing or unknown:
+            raise ValueError(f"{kind} 的列应为 {names}，缺少 {missing}，多余 {unknown}")
+
+        flags = sum(_array_flags(columns[name]) << i for i, name in enumerate(names))
+        arrays = [np.asarray(columns[name], dtype='float64') for name in names]
+        count = max((a.size for a in arrays if a.ndim), default=1)
+        rows = np.empty((count, len(names)), dtype='float64')
+        for i, array in enumerate(arrays):
+            rows[:, i] = array  # 标量广播到整列
+
+        column = self._column(kind)
+        self._record_order(kind, column.size, count)
+        column.extend(rows)
+        self._flags[kind].extend(np.full(count, flags, dtype='uint8'))
+
+    def add_glass(self, polygons, refractive_index=1.5):
+        """
+        批量添加玻璃多边形
+
+        参数:
+            polygons: 多边形列表，每个为 (顶点数, 2) 的数组或 [(x, y), ...]
+            refractive_index: 折射率（标量或与多边形数量相同的序列）
+        """
+        import numpy as np
+
+        point_flags = [np.full(len(polygon), 3 * _array_flags(polygon), dtype='uint8') if hasattr(polygon, 'dtype')
+                       else np.array([_int_flags(point) for point in polygon], dtype='uint8').reshape(-1)
+                       for polygon in polygons]
+        polygons = [np.asarray(polygon, dtype='float64').reshape(-1, 2) for polygon in polygons]
+        if not polygons:
+            return
+        if hasattr(refractive_index, 'dtype') or not hasattr(refractive_index, '__len__'):
+            index_flags = np.full(len(polygons), _array_flags(refractive_index), dtype='uint8')
+        else:
+            index_flags = np.array([_int_flags([value]) for value in refractive_index], dtype='uint8')
+        indices = np.broadcast_to(np.asarray(refractive_index, dtype='float64'), (len(polygons),))
+        sizes = np.array([len(polygon) for polygon in polygons], dtype='int64')
+        starts = self._glass_points.size + np.concatenate(([0], np.cumsum(sizes)[:-1]))
+
+        self._record_order(_GLASS, self._glass_start.size, len(polygons))
+        self._glass_points.extend(np.concatenate(polygons))
+        self._glass_start.extend(starts)
+        self._glass_index.extend(indices)
+        self._glass_point_flags.extend(np.concatenate(point_flags))
+        self._glass_index_flags.extend(np.broadcast_to(index_flags, (len(polygons),)))
+
+    @staticmethod
+    def columns(kind: str):
+        """某类型在 add_array 中使用的列名"""
+        return _SCHEMAS[kind][1]
+
+    # ---------- 读取 ----------
+
+    def __len__(self):
+        return self._order_kind.size
+
+    def _glass_range(self, row: int):
+        start = int(self._glass_start.data[row])
+        end = (int(self._glass_start.data[row + 1]) if row + 1 < self._glass_start.size
+               else self._glass_points.size)
+        return start, end
+
+    def _row(self, kind: str, row: int) -> list:
+        return _typed(self._columns[kind].data[row].tolist(), int(self._flags[kind].data[row]))
+
+    def _glass_vertices(self, start: int, end: int):
+        flags = self._glass_point_flags.data[start:end].tolist()
+        return [_typed(point, flag) for point, flag in zip(self._glass_points.data[start:end].tolist(), flags)]
+
+    def _glass_refractive_index(self, row: int):
+        return _typed([float(self._glass_index.data[row])], int(self._glass_index_flags.data[row]))[0]
+
+    def _dict_at(self, kind: str, row: int) -> Dict[str, Any]:
+        if kind == _OTHER:
+            return self._others[row].to_dict()
+        if kind == _GLASS:
+            start, end = self._glass_range(row)
+            path = [{"x": x, "y": y, "arc": False} for x, y in self._glass_vertices(start, end)]
+            return {"type": "Glass", "path": path, "refIndex": self._glass_refractive_index(row)}
+        return _SCHEMAS[kind][3](self._row(kind, row))
+
+    def _object_at(self, kind: str, row: int) -> OpticalObject:
+        if kind == _OTHER:
+            return self._others[row]
+        if kind == _GLASS:
+            start, end = self._glass_range(row)
+            points = [Point(x, y) for x, y in self._glass_vertices(start, end)]
+            return GlassRefractor(points, self._glass_refractive_index(row))
+        return _SCHEMAS[kind][4](self._row(kind, row))
+
+    def _entries(self):
+        kinds = self._order_kind.view().tolist()
+        rows = self._order_row.view().tolist()
+        for code, row in zip(kinds, rows):
+            yield _KINDS[code], row
+
+    def iter_dicts(self) -> Iterator[Dict[str, Any]]:
+        """按插入顺序逐个生成 to_dict() 的输出（不构造对象）"""
+        for kind, row in self._entries():
+            yield self._dict_at(kind, row)
+
+    def to_dicts(self) -> List[Dict[str, Any]]:
+        return list(self.iter_dicts())
+
+    def __iter__(self) -> Iterator[OpticalObject]:
+        for kind, row in self._entries():
+            yield self._object_at(kind, row)
+
+    def __getitem__(self, index: int) -> OpticalObject:
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("ObjectStore index out of range")
+        return self._object_at(_KINDS[int(self._order_kind.data[index])], int(self._order_row.data[index]))
+
+    def nbytes(self) -> int:
+        """数组占用的字节数（不含未知类型的Python对象）"""
+        arrays = [column.data for column in self._columns.values()]
+        arrays += [flags.data for flags in self._flags.values()]
+        arrays += [self._order_kind.data, self._order_row.data, self._glass_points.data,
+                   self._glass_start.data, self._glass_index.data,
+                   self._glass_point_flags.data, self._glass_index_flags.data]
+        return sum(array.nbytes for array in arrays)
+
+    def __repr__(self):
+        counts = {kind: column.size for kind, column in self._columns.items()}
+        if self._glass_start.size:
+            counts[_GLASS] = self._glass_start.size
+        if self._others:
+            counts[_OTHER] = len(self._others)
+        return f"ObjectStore({counts})"
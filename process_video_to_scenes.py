@@ -5,7 +5,7 @@
 主要功能：
 1. 捕获视频中的绿点坐标
 2. 根据坐标换算生成JSON场景文件
-3. 自动生成对应的HTML和图片
+3. 自动生成对应的查看页（共享 viewer.html，见 scene_viewer.py）和图片
 
 使用示例：
     from process_video_to_scenes import process_video_to_scenes
@@ -22,7 +22,12 @@ import cv2
 import numpy as np
 import json
 import os
-from screenshot_helper import screenshot_with_selenium, compress_scene_for_url
+from screenshot_helper import capture_html_png, capture_scene_png, compress_scenes_for_url
+from browser_pool import BrowserPool
+from frame_encoder import FrameEncoder, DEFAULT_FPS
+from build_manifest import BuildManifest, scene_hash, render_settings
+from scene_viewer import SceneManifest, create_html_from_json
+from scene_template import compile_light_template
 
 
 def detect_green_in_frame(frame):
@@ -133,109 +138,6 @@ def detect_green_dots_from_video(video_path, num_samples=20, verbose=True):
     return coordinates
 
 
-def create_html_from_json(json_data, output_html):
-    """从JSON数据创建本地HTML文件"""
-    json_str = json.dumps(json_data, ensure_ascii=False, separators=(",", ":"))
-    compressed_scene = compress_scene_for_url(json_str)
-
-    scene_name = json_data.get("name", "Ray Optics Scene")
-    width = json_data.get("width", 1200)
-    height = json_data.get("height", 600)
-    obj_count = len(json_data.get("objs", []))
-
-    html_content = f"""<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>Ray Optics - {scene_name}</title>
-    <style>
-        body {{
-            margin: 0;
-            padding: 0;
-            font-family: Arial, sans-serif;
-            background: #000;
-            color: white;
-            overflow: hidden;
-        }}
-        #info {{
-            position: fixed;
-            top: 10px;
-            left: 10px;
-            padding: 10px 15px;
-            background: rgba(0, 0, 0, 0.8);
-            border-radius: 5px;
-            z-index: 1000;
-            font-size: 12px;
-        }}
-        #loading {{
-            position: fixed;
-            top: 50%;
-            left: 50%;
-            transform: translate(-50%, -50%);
-            text-align: center;
-        }}
-        .spinner {{
-            border: 4px solid rgba(255, 255, 255, 0.1);
-            border-top: 4px solid white;
-            border-radius: 50%;
-            width: 40px;
-            height: 40px;
-            animation: spin 1s linear infinite;
-            margin: 0 auto 10px;
-        }}
-        @keyframes spin {{
-            0% {{ transform: rotate(0deg); }}
-            100% {{ transform: rotate(360deg); }}
-        }}
-        iframe {{
-            position: fixed;
-            top: 0;
-            left: 0;
-            width: 100%;
-            height: 100%;
-            border: none;
-        }}
-    </style>
-</head>
-<body>
-    <div id="info">
-        <strong>{scene_name}</strong><br>
-        {width}x{height} | {obj_count} objects
-    </div>
-
-    <div id="loading">
-        <div class="spinner"></div>
-        <div>Loading simulator...</div>
-    </div>
-
-    <iframe id="simulator"></iframe>
-
-    <script>
-        const compressedScene = '{compressed_scene}';
-        const simulatorURL = 'https://phydemo.app/ray-optics/simulator/#' + compressedScene;
-
-        const iframe = document.getElementById('simulator');
-        const loading = document.getElementById('loading');
-
-        iframe.src = simulatorURL;
-
-        iframe.onload = function() {{
-            setTimeout(function() {{
-                loading.style.display = 'none';
-            }}, 3000);
-        }};
-    </script>
-</body>
-</html>
-"""
-
-    with open(output_html, "w", encoding="utf-8") as f:
-        f.write(html_content)
-
-    return output_html
-
-
 def process_video_to_scenes(
     json_template,
     video_path,
@@ -243,7 +145,15 @@ def process_video_to_scenes(
     output_prefix="scene",
     generate_images=True,
     crop_top=75,
-    verbose=True
+    verbose=True,
+    compress_pool_size=None,
+    ready_timeout=30,
+    stepping=True,
+    animation_output=None,
+    fps=DEFAULT_FPS,
+    codec=None,
+    keep_png=True,
+    force=False
 ):
     """
     从视频中提取绿点坐标并生成光学场景
@@ -256,9 +166,18 @@ def process_video_to_scenes(
         generate_images: 是否生成图片（默认True）
         crop_top: 截图时裁剪顶部像素（默认75）
         verbose: 是否显示详细信息（默认True）
+        compress_pool_size: 并行压缩的Node进程数（node和auto压缩后端，默认按CPU核数，最多4个）
+        ready_timeout: 截图前等待场景渲染稳定的最长时间（秒，默认30）
+        stepping: 单页步进截图，仿真器只加载一次，之后逐帧切换场景（默认True）
+        animation_output: 动画输出路径（.mp4 / .webm / .gif），截图直接按顺序编码为一个文件
+        fps: 动画帧率（默认24）
+        codec: 动画编码器（默认按扩展名选择，见 frame_encoder.py）
+        keep_png: 输出动画时是否同时保存每帧PNG（默认True）
+        force: 忽略构建清单（output/.build_manifest.json），全部重建HTML和图片
 
     Returns:
-        dict: 处理结果，包含生成的文件列表
+        dict: 处理结果，包含生成的文件列表、每帧的渲染就绪用时（ready_times，秒）
+              和动画文件路径（animation，未输出动画时为None）
 
     Example:
         result = process_video_to_scenes(
@@ -291,20 +210,16 @@ def process_video_to_scenes(
     if verbose:
         print("读取模板JSON...")
     with open(json_template, 'r', encoding='utf-8') as f:
-        template = json.load(f)
-
-    # 提取光源坐标
-    light_source = None
-    for obj in template.get('objs', []):
-        if obj.get('type') == 'PointSource':
-            light_source = obj
-            break
+        template_data = json.load(f)
 
-    if light_source is None:
+    # 编译模板：以PointSource的坐标为参数，每帧只编码光源坐标
+    try:
+        template = compile_light_template(template_data, indent=4, types=('PointSource',))
+    except ValueError:
         raise ValueError("模板JSON中未找到PointSource对象")
 
-    template_x = light_source['x']
-    template_y = light_source['y']
+    template_x = template.defaults['x']
+    template_y = template.defaults['y']
 
     if verbose:
         print(f"模板光源坐标: ({template_x}, {template_y})\n")
@@ -336,69 +251,135 @@ def process_video_to_scenes(
     result = {
         "json_files": [],
         "html_files": [],
-        "image_files": []
+        "image_files": [],
+        "ready_times": [],
+        "animation": None
     }
 
     if verbose:
         print("开始生成场景文件...\n")
 
+    frames = []
     for i, coord in enumerate(coordinates, start=1):
-        # 创建新的JSON对象
-        new_json = json.loads(json.dumps(template))
-
         # 更新光源坐标
         new_x = coord['x']
         new_y = coord['y'] + y_offset
 
-        # 找到光源对象并更新
-        for obj in new_json.get('objs', []):
-            if obj.get('type') == 'PointSource':
-                obj['x'] = new_x
-                obj['y'] = new_y
-                break
-
         # 生成文件名
         filename = f"{output_prefix}_{i:02d}"
         json_path = os.path.join(json_dir, f"{filename}.json")
-        html_path = os.path.join(html_dir, f"{filename}.html")
-        image_path = os.path.join(image_dir, f"{filename}.png")
 
         # 保存JSON文件
-        with open(json_path, 'w', encoding='utf-8') as f:
-            json.dump(new_json, f, indent=4, ensure_ascii=False)
+        template.write(json_path, x=new_x, y=new_y)
         result["json_files"].append(json_path)
+        frames.append((filename, template.render_dict(x=new_x, y=new_y)))
 
         if verbose:
             print(f"[{i}/{len(coordinates)}] {filename}")
             print(f"  帧 {coord['frame']}: 坐标 ({new_x}, {new_y}), 原始 ({coord['x']}, {coord['y']})")
 
-        # 生成HTML文件
-        create_html_from_json(new_json, html_path)
-        result["html_files"].append(html_path)
-        if verbose:
-            print(f"  ✓ JSON & HTML 已生成")
-
-        # 生成图片
+    # 对比构建清单：只重建内容或渲染设置变化、或输出缺失的帧
+    settings = render_settings(crop_top)
+    viewer = SceneManifest(html_dir, simulator_url=settings['simulator'])
+    manifest = BuildManifest(force=force, before_save=viewer.flush)  # 保存前先写出查看器分片
+    keep_png = keep_png or not (generate_images and animation_output)
+    digests = [scene_hash(data) for _, data in frames]
+    stale = set()
+    for i, (filename, _) in enumerate(frames):
+        page_path = viewer.page_path(filename)
+        image_path = os.path.join(image_dir, f"{filename}.png")
         if generate_images:
-            if os.path.exists(image_path):
+            outputs = [viewer.shard_path(filename), image_path]
+            if not keep_png or manifest.needs_rebuild(image_path, digests[i], settings, outputs):
+                stale.add(i)
+        elif manifest.needs_rebuild(page_path, digests[i], settings, [viewer.shard_path(filename)]):
+            stale.add(i)
+
+    # 批量压缩需要重建的帧（默认按场景大小选择编码器，见 screenshot_helper.COMPRESS_BACKEND）
+    if verbose:
+        print(f"\n需要重建 {len(stale)} 帧，{len(frames) - len(stale)} 帧已是最新")
+        print(f"正在压缩 {len(stale)} 个场景...\n")
+    stale_indices = sorted(stale)
+    compressed = [None] * len(frames)
+    results = compress_scenes_for_url(
+        [json.dumps(frames[i][1], ensure_ascii=False, separators=(",", ":")) for i in stale_indices],
+        pool_size=compress_pool_size,
+    )
+    for i, compressed_scene in zip(stale_indices, results):
+        compressed[i] = compressed_scene
+
+    # 整批截图共用同一个浏览器（避免每帧冷启动Chrome）
+    encoder = None
+    if generate_images and animation_output:
+        encoder = FrameEncoder(animation_output, fps=fps, codec=codec)
+
+    viewer.write_viewer()
+    with BrowserPool(size=1) as browsers:
+        try:
+            for i, ((filename, new_json), compressed_scene) in enumerate(zip(frames, compressed), start=1):
+                html_path = viewer.page_path(filename)
+                image_path = os.path.join(image_dir, f"{filename}.png")
+
+                if i - 1 not in stale:
+                    # 已是最新，沿用已有的查看页和图片
+                    result["html_files"].append(html_path)
+                    if generate_images:
+                        result["image_files"].append(image_path)
+                        if encoder is not None:
+                            encoder.write_file(image_path)
+                    continue
+
                 if verbose:
-                    print(f"  ⚠ PNG已存在，跳过截图")
-            else:
+                    print(f"[{i}/{len(frames)}] {filename}")
+
+                # 写入共享查看器的场景清单
+                create_html_from_json(new_json, os.path.join(html_dir, f"{filename}.html"),
+                                      compressed_scene=compressed_scene, manifest=viewer)
+                result["html_files"].append(html_path)
                 if verbose:
-                    print(f"  正在截图...")
-                success = screenshot_with_selenium(
-                    html_path, image_path, wait_time=1, crop_top=crop_top
-                )
-                if success:
-                    result["image_files"].append(image_path)
+                    print(f"  ✓ 查看页已生成")
+
+                # 生成图片
+                if generate_images:
                     if verbose:
-                        print(f"  ✓ 截图已保存")
+                        print(f"  正在截图...")
+                    output_image = image_path if keep_png else None
+                    png = None
+                    if stepping:
+                        png = capture_scene_png(
+                            compressed_scene, output_image, crop_top=crop_top, pool=browsers,
+                            ready_timeout=ready_timeout, timings=result["ready_times"]
+                        )
+                    if png is None:
+                        # 步进截图失败时回退为加载查看页截图（场景hash直接带在地址中）
+                        png = capture_html_png(
+                            viewer.page_path(filename, compressed_scene), output_image, crop_top=crop_top, pool=browsers,
+                            ready_timeout=ready_timeout, timings=result["ready_times"]
+                        )
+                    if png is not None:
+                        if keep_png:
+                            result["image_files"].append(image_path)
+                            manifest.record(image_path, digests[i - 1], settings)
+                        if encoder is not None:
+                            encoder.write(png)
+                        if verbose:
+                            print(f"  ✓ 截图完成")
+                    else:
+                        if verbose:
+                            print(f"  ❌ 截图失败")
                 else:
-                    if verbose:
-                        print(f"  ❌ 截图失败")
+                    manifest.record(html_path, digests[i - 1], settings)
 
-        if verbose:
-            print()
+                if verbose:
+                    print()
+        finally:
+            if encoder is not None:
+                encoder.close()
+            viewer.flush()
+            manifest.save()
+
+    if encoder is not None:
+        result["animation"] = animation_output
 
     if verbose:
         print("=" * 70)
@@ -406,11 +387,16 @@ def process_video_to_scenes(
         print("=" * 70)
         print(f"生成文件统计:")
         print(f"  JSON文件: {len(result['json_files'])} 个")
-        print(f"  HTML文件: {len(result['html_files'])} 个")
+        print(f"  查看页: {len(result['html_files'])} 个（共用 {viewer.viewer_path}）")
         print(f"  PNG图片:  {len(result['image_files'])} 个")
+        if encoder is not None:
+            print(f"  动画: {animation_output}（{encoder.frames} 帧, {fps:g} fps）")
+        if result["ready_times"]:
+            ready_times = result["ready_times"]
+            print(f"  渲染就绪: 平均 {sum(ready_times) / len(ready_times):.2f} 秒, 最长 {max(ready_times):.2f} 秒")
         print(f"\n输出目录:")
         print(f"  - JSON: {json_dir}/")
-        print(f"  - HTML: {html_dir}/")
+        print(f"  - 查看页: {viewer.viewer_path}?scene=<场景名>")
         print(f"  - 图片: {image_dir}/")
         print("=" * 70)
 
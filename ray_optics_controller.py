@@ -4,15 +4,41 @@ Ray-Optics Simulator Controller
 用于生成ray-optics仿真器的JSON场景文件
 """
 
+import copy
 import json
 import os
-from typing import List, Dict, Any
+from collections.abc import MutableSequence
+from typing import List, Dict, Any, Optional, Callable, Iterable, Iterator, Tuple
 from dataclasses import dataclass
 
+from scene_culling import CullReport, cull_objects, viewport_rect
+from frame_writer import WRITE_WORKERS, write_frames
+from scene_writer import iter_scene_chunks, object_encoder, save_scene
+from spatial_index import SpatialIndex
+
+
+LARGE_SCENE_OBJECTS = 10000  # 对象数达到该值时 save() 默认写紧凑JSON
+LAZY_CONSTRUCT_BYTES = 4 * 1024 * 1024  # load() 读取超过该大小的文件时按需构造对象（JSON仍整个解析）
+
+# 新建场景的默认顶层设置（从文件加载的场景保留文件中的设置）
+DEFAULT_SCENE_SETTINGS = {
+    "rayModeDensity": 0.1,
+    "origin": {
+        "x": 0,
+        "y": 0
+    },
+    "scale": 1,
+    "simulateColors": True
+}
+
+
+_set = object.__setattr__  # 构造对象时直接赋值（见 OpticalObject）
+
 
 @dataclass
 class Point:
-    """点坐标"""
+    """点坐标（使用__slots__，大量顶点时不为每个点分配__dict__）"""
+    __slots__ = ('x', 'y')
     x: float
     y: float
 
@@ -21,10 +47,41 @@ class Point:
 
 
 class OpticalObject:
-    """光学对象基类"""
+    """
+    光学对象基类（子类都声明__slots__以减少大场景的内存占用）
+
+    对象缓存编码好的JSON片段（json_fragment），构造之后任何属性被赋值时缓存失效；
+    Point按值使用：移动对象时赋值新的Point，原地修改 position.x 后需调用 invalidate()
+
+    __init__ 中用 _set（object.__setattr__）赋值，绕过 __setattr__ 的失效处理（此时还没有缓存）
+    """
+    __slots__ = ('type', 'position', '_fragment')
+
     def __init__(self, obj_type: str, position: Point):
-        self.type = obj_type
-        self.position = position
+        _set(self, 'type', obj_type)
+        _set(self, 'position', position)
+        _set(self, '_fragment', None)
+
+    def __setattr__(self, name, value):
+        object.__setattr__(self, name, value)
+        object.__setattr__(self, '_fragment', None)
+
+    def invalidate(self):
+        """丢弃缓存的JSON片段"""
+        object.__setattr__(self, '_fragment', None)
+
+    def json_fragment(self, indent: Optional[int] = None, backend: str = 'json') -> bytes:
+        """
+        对象在场景objs数组中的JSON片段（见 scene_writer.object_encoder），编码一次后缓存
+
+        未修改的对象在多个场景、多次保存之间复用同一个片段
+        """
+        cached = self._fragment
+        if cached is not None and cached[0] == (indent, backend):
+            return cached[1]
+        fragment = object_encoder(backend, indent)(self.to_dict())
+        object.__setattr__(self, '_fragment', ((indent, backend), fragment))
+        return fragment
 
     def to_dict(self) -> Dict[str, Any]:
         """转换为ray-optics JSON格式"""
@@ -33,14 +90,22 @@ class OpticalObject:
             "p1": self.position.to_dict()
         }
 
+    def with_position(self, position: Point) -> 'OpticalObject':
+        """返回position替换后的浅拷贝（其他属性与原对象共享）"""
+        moved = copy.copy(self)
+        moved.position = position
+        return moved
+
 
 class PointSource(OpticalObject):
     """点光源"""
+    __slots__ = ('wavelength', 'brightness')
+
     def __init__(self, position: Point, wavelength: float = 550,
                  brightness: float = 0.5):
         super().__init__("PointSource", position)
-        self.wavelength = wavelength  # 波长 (nm)
-        self.brightness = brightness  # 亮度 0-1
+        _set(self, 'wavelength', wavelength)  # 波长 (nm)
+        _set(self, 'brightness', brightness)  # 亮度 0-1
 
     def to_dict(self) -> Dict[str, Any]:
         return {
@@ -54,14 +119,16 @@ class PointSource(OpticalObject):
 
 class ParallelLight(OpticalObject):
     """平行光束（Beam类型）"""
+    __slots__ = ('direction', 'wavelength', 'brightness', 'width')
+
     def __init__(self, position: Point, direction: Point,
                  wavelength: float = 550, brightness: float = 0.5,
                  width: float = 50):
         super().__init__("Beam", position)
-        self.direction = direction
-        self.wavelength = wavelength
-        self.brightness = brightness
-        self.width = width
+        _set(self, 'direction', direction)
+        _set(self, 'wavelength', wavelength)
+        _set(self, 'brightness', brightness)
+        _set(self, 'width', width)
 
     def to_dict(self) -> Dict[str, Any]:
         # p1和p2定义光束的宽度（垂直于传播方向）
@@ -76,9 +143,11 @@ class ParallelLight(OpticalObject):
 
 class FlatMirror(OpticalObject):
     """平面镜"""
+    __slots__ = ('p2',)
+
     def __init__(self, p1: Point, p2: Point):
         super().__init__("Mirror", p1)
-        self.p2 = p2
+        _set(self, 'p2', p2)
 
     def to_dict(self) -> Dict[str, Any]:
         return {
@@ -90,10 +159,12 @@ class FlatMirror(OpticalObject):
 
 class CurvedMirror(OpticalObject):
     """曲面镜（抛物面镜）"""
+    __slots__ = ('p2', 'p3')
+
     def __init__(self, p1: Point, p2: Point, p3: Point):
         super().__init__("ParabolicMirror", p1)
-        self.p2 = p2
-        self.p3 = p3  # 控制点
+        _set(self, 'p2', p2)
+        _set(self, 'p3', p3)  # 控制点
 
     def to_dict(self) -> Dict[str, Any]:
         return {
@@ -106,10 +177,12 @@ class CurvedMirror(OpticalObject):
 
 class IdealLens(OpticalObject):
     """理想透镜"""
+    __slots__ = ('p2', 'focal_length')
+
     def __init__(self, p1: Point, p2: Point, focal_length: float = 100):
         super().__init__("IdealLens", p1)
-        self.p2 = p2
-        self.focal_length = focal_length
+        _set(self, 'p2', p2)
+        _set(self, 'focal_length', focal_length)
 
     def to_dict(self) -> Dict[str, Any]:
         return {
@@ -122,10 +195,12 @@ class IdealLens(OpticalObject):
 
 class GlassRefractor(OpticalObject):
     """玻璃折射体（多边形）"""
+    __slots__ = ('points', 'refractive_index')
+
     def __init__(self, points: List[Point], refractive_index: float = 1.5):
         super().__init__("Glass", points[0])
-        self.points = points
-        self.refractive_index = refractive_index
+        _set(self, 'points', points)
+        _set(self, 'refractive_index', refractive_index)
 
     def to_dict(self) -> Dict[str, Any]:
         # 使用path数组表示多边形顶点
@@ -145,9 +220,11 @@ class GlassRefractor(OpticalObject):
 
 class Blocker(OpticalObject):
     """遮挡物"""
+    __slots__ = ('p2',)
+
     def __init__(self, p1: Point, p2: Point):
         super().__init__("Blocker", p1)
-        self.p2 = p2
+        _set(self, 'p2', p2)
 
     def to_dict(self) -> Dict[str, Any]:
         return {
@@ -157,46 +234,374 @@ class Blocker(OpticalObject):
         }
 
 
+# ========== 从JSON加载 ==========
+
+def _number(value):
+    """JSON中的数值可能写成字符串（如 "wavelength": "650"），统一转换为数字"""
+    if isinstance(value, str):
+        try:
+            return int(value)
+        except ValueError:
+            return float(value)
+    return value
+
+
+def _point(data: Dict[str, Any]) -> Point:
+    return Point(data["x"], data["y"])
+
+
+# 类型名 -> 由JSON字典构造对象的函数
+OBJECT_TYPES: Dict[str, Callable[[Dict[str, Any]], OpticalObject]] = {}
+
+
+def register_object_type(type_name: str):
+    """注册某个JSON类型的构造函数（装饰器）"""
+    def decorator(factory):
+        OBJECT_TYPES[type_name] = factory
+        return factory
+    return decorator
+
+
+@register_object_type("PointSource")
+def _point_source_from_dict(d):
+    return PointSource(Point(d["x"], d["y"]), wavelength=_number(d.get("wavelength", 550)),
+                       brightness=_number(d.get("brightness", 0.5)))
+
+
+@register_object_type("Beam")
+def _beam_from_dict(d):
+    return ParallelLight(_point(d["p1"]), direction=Point(100, 0),
+                         wavelength=_number(d.get("wavelength", 550)),
+                         brightness=_number(d.get("brightness", 0.5)),
+                         width=d["p2"]["y"] - d["p1"]["y"])
+
+
+@register_object_type("Mirror")
+def _mirror_from_dict(d):
+    return FlatMirror(_point(d["p1"]), _point(d["p2"]))
+
+
+@register_object_type("ParabolicMirror")
+def _parabolic_mirror_from_dict(d):
+    return CurvedMirror(_point(d["p1"]), _point(d["p2"]), _point(d["p3"]))
+
+
+@register_object_type("IdealLens")
+def _ideal_lens_from_dict(d):
+    return IdealLens(_point(d["p1"]), _point(d["p2"]), focal_length=_number(d.get("focalLength", 100)))
+
+
+@register_object_type("Glass")
+def _glass_from_dict(d):
+    return GlassRefractor([_point(p) for p in d["path"]], refractive_index=d.get("refIndex", 1.5))
+
+
+@register_object_type("Blocker")
+def _blocker_from_dict(d):
+    return Blocker(_point(d["p1"]), _point(d["p2"]))
+
+
+class RawObject(OpticalObject):
+    """
+    未注册类型、或带有模型不支持的字段的对象：原样保存JSON字典，输出时原样写回
+
+    to_dict() 返回保存的字典本身（不复制），不要修改它；需要移动时用 with_position()
+    """
+    __slots__ = ('data',)
+
+    def __init__(self, data: Dict[str, Any]):
+        if "x" in data and "y" in data:
+            position = Point(data["x"], data["y"])
+        elif "p1" in data:
+            position = _point(data["p1"])
+        else:
+            position = None
+        super().__init__(data.get("type"), position)
+        _set(self, 'data', data)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return self.data
+
+    def with_position(self, position: Point) -> 'RawObject':
+        data = dict(self.data)
+        if "x" in data and "y" in data:
+            data["x"], data["y"] = position.x, position.y
+        else:
+            data["p1"] = position.to_dict()
+        return RawObject(data)
+
+
+def object_from_dict(data: Dict[str, Any]) -> OpticalObject:
+    """
+    由JSON字典构造光学对象
+
+    只有 to_dict() 能完全还原原字典时才使用类型化对象，否则返回 RawObject，
+    保证加载后再保存的场景与原文件内容一致（不会补出文件中没有的字段）
+    """
+    factory = OBJECT_TYPES.get(data.get("type"))
+    if factory is not None:
+        try:
+            obj = factory(data)
+        except (KeyError, TypeError, ValueError, IndexError):
+            obj = None
+        if obj is not None and obj.to_dict() == data:
+            return obj
+    return RawObject(data)
+
+
+class LazyObjectList(MutableSequence):
+    """
+    按需构造对象的列表：保存原始JSON字典，第一次访问某个元素时才构造对象
+
+    只读取、修改少量对象再保存的大场景无需为每个对象构造Python对象，
+    未访问过的对象输出时直接使用原字典。
+    只推迟对象的构造：JSON已经整个解析，所有原始字典都在内存中（解析时间和字典内存不变）
+    """
+
+    def __init__(self, items=()):
+        self._items = list(items)
+
+    def _get(self, index: int) -> OpticalObject:
+        item = self._items[index]
+        if isinstance(item, dict):
+            item = self._items[index] = object_from_dict(item)
+        return item
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._get(i) for i in range(*index.indices(len(self._items)))]
+        return self._get(index)
+
+    def __setitem__(self, index, value):
+        self._items[index] = value
+
+    def __delitem__(self, index):
+        del self._items[index]
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def insert(self, index: int, value):
+        self._items.insert(index, value)
+
+    def iter_dicts(self):
+        for item in self._items:
+            yield item if isinstance(item, dict) else item.to_dict()
+
+    def to_dicts(self) -> List[Dict[str, Any]]:
+        return list(self.iter_dicts())
+
+    def copy(self) -> 'LazyObjectList':
+        return LazyObjectList(self._items)
+
+    def __repr__(self) -> str:
+        return f"LazyObjectList({len(self._items)} objects)"
+
+
 class RayOpticsScene:
-    """Ray-Optics场景"""
+    """
+    Ray-Optics场景
+
+    store: 可选的 object_store.ObjectStore，用NumPy数组按类型存储对象（10万以上对象时节省内存），
+           默认使用普通列表
+    settings: 其他顶层字段（rayModeDensity、origin等），默认 DEFAULT_SCENE_SETTINGS
+    """
     def __init__(self, name: str = "Optical Simulation",
-                 width: int = 1200, height: int = 600):
+                 width: int = 1200, height: int = 600, store=None,
+                 settings: Optional[Dict[str, Any]] = None):
         self.name = name
         self.width = width
         self.height = height
-        self.objects: List[OpticalObject] = []
+        self.version = 5
+        self.settings = copy.deepcopy(DEFAULT_SCENE_SETTINGS) if settings is None else settings
+        self.objects: List[OpticalObject] = store if store is not None else []
+        self._index: Optional[SpatialIndex] = None
+        self._index_size = 0  # 已登记到索引的对象数
+        self._index_built = 0  # 建立索引时的对象数
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any], name: str = "Optical Simulation",
+                  lazy: bool = False) -> 'RayOpticsScene':
+        """
+        由场景字典构造场景（未注册类型的对象原样保留）
+
+        lazy: 为True时对象在第一次访问时才构造（见 LazyObjectList；data 仍须是完整解析的字典）
+        """
+        objs = data.get("objs", [])
+        scene = cls(
+            name,
+            width=data.get("width", 1200),
+            height=data.get("height", 600),
+            store=LazyObjectList(objs) if lazy else [object_from_dict(obj) for obj in objs],
+            settings={k: v for k, v in data.items() if k not in ("version", "objs", "width", "height")},
+        )
+        scene.version = data.get("version", 5)
+        return scene
+
+    @classmethod
+    def from_json(cls, text: str, name: str = "Optical Simulation",
+                  lazy: bool = False) -> 'RayOpticsScene':
+        """由JSON字符串构造场景"""
+        return cls.from_dict(json.loads(text), name=name, lazy=lazy)
+
+    @classmethod
+    def load(cls, filename: str, lazy: Optional[bool] = None) -> 'RayOpticsScene':
+        """
+        读取场景JSON文件（场景名取文件名）
+
+        lazy: 默认文件达到 LAZY_CONSTRUCT_BYTES 时按需构造对象。
+              文件仍由 json.load 整个解析，只省去为每个对象构造 OpticalObject 的时间和内存
+        """
+        if lazy is None:
+            lazy = os.path.getsize(filename) >= LAZY_CONSTRUCT_BYTES
+        with open(filename, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        name = os.path.splitext(os.path.basename(filename))[0]
+        return cls.from_dict(data, name=name, lazy=lazy)
+
+    def copy(self, name: Optional[str] = None) -> 'RayOpticsScene':
+        """
+        复制场景（对象列表是新的，对象本身共享）
+
+        替换对象（如 objects[i] = obj.with_position(...)）不会影响原场景，
+        比 json.loads(json.dumps(...)) 深拷贝快得多
+        """
+        objects = self.objects.copy() if hasattr(self.objects, 'copy') else list(self.objects)
+        scene = RayOpticsScene(self.name if name is None else name, self.width, self.height,
+                               store=objects, settings=copy.deepcopy(self.settings))
+        scene.version = self.version
+        return scene
+
+    def find_object(self, obj_type: str) -> Optional[int]:
+        """返回第一个指定类型对象的下标，没有时返回None"""
+        for i, obj in enumerate(self.objects):
+            if obj.type == obj_type:
+                return i
+        return None
 
     def add_object(self, obj: OpticalObject):
         """添加光学对象"""
         self.objects.append(obj)
+        self._update_index()
         return self
 
     def add_objects(self, objects: List[OpticalObject]):
         """批量添加光学对象"""
         self.objects.extend(objects)
+        self._update_index()
         return self
 
-    def to_json(self, indent: int = 2) -> str:
-        """生成JSON字符串"""
-        scene_dict = {
-            "version": 5,
-            "objs": [obj.to_dict() for obj in self.objects],
+    # ---------- 空间查询（见 spatial_index.py） ----------
+
+    def _update_index(self):
+        """把新增的对象登记到已建立的索引中"""
+        if self._index is None or self._index_size > len(self.objects):
+            return
+        for i in range(self._index_size, len(self.objects)):
+            self._index.insert(i, self.objects[i].to_dict())
+        self._index_size = len(self.objects)
+
+    def invalidate_index(self):
+        """直接替换或删除 objects 中的对象后调用，下次查询时重建索引"""
+        self._index = None
+
+    def spatial_index(self) -> SpatialIndex:
+        """
+        场景的空间索引（第一次查询时建立，add_object/add_objects 自动更新）
+
+        对象数比建立时增长4倍以上、或 objects 被缩短时重建，以保持合适的网格单元大小
+        """
+        count = len(self.objects)
+        if (self._index is None or count < self._index_size
+                or count > 4 * self._index_built + 1024):
+            objects = self.objects
+            dicts = objects.iter_dicts() if hasattr(objects, 'iter_dicts') else (obj.to_dict() for obj in objects)
+            self._index = SpatialIndex.build(dicts, self.width, self.height, count=count)
+            self._index_size = self._index_built = count
+        else:
+            self._update_index()
+        return self._index
+
+    def query_rect(self, xmin: float, ymin: float, xmax: float, ymax: float) -> List[OpticalObject]:
+        """包围盒与矩形相交的对象"""
+        return [self.objects[i] for i in self.spatial_index().query_rect(xmin, ymin, xmax, ymax)]
+
+    def query_point(self, x: float, y: float, tolerance: float = 1e-9) -> List[OpticalObject]:
+        """包含该点的对象（点在玻璃内部、在镜面上、与光源重合等）"""
+        return [self.objects[i] for i in self.spatial_index().query_point(x, y, tolerance)]
+
+    def nearest(self, x: float, y: float, k: int = 1,
+                max_distance: Optional[float] = None) -> List[tuple]:
+        """距离最近的k个对象，返回 [(距离, 对象), ...]"""
+        return [(distance, self.objects[i])
+                for distance, i in self.spatial_index().nearest(x, y, k, max_distance)]
+
+    def query_segment(self, x1: float, y1: float, x2: float, y2: float) -> List[OpticalObject]:
+        """与线段相交的对象（如轨迹的一段经过的元件）"""
+        return [self.objects[i] for i in self.spatial_index().query_segment(x1, y1, x2, y2)]
+
+    # ---------- 序列化前精简（见 scene_culling.py） ----------
+
+    def viewport(self):
+        """可见区域 (xmin, ymin, xmax, ymax)（场景坐标，考虑 origin 和 scale）"""
+        return viewport_rect(self.scene_dict(objs=[]))
+
+    def cull(self, margin: float = 0.0, aggressive: bool = False, merge: bool = True,
+             precision: Optional[int] = None, viewport: bool = True) -> CullReport:
+        """
+        删除不影响画面的对象（画面外、退化、重复），合并共线重叠的遮挡物，返回 CullReport
+
+        未修改的对象保持原对象（缓存的JSON片段继续有效）；参数见 scene_culling.cull_objects
+        """
+        entries, report = cull_objects(self._object_dicts(), self.viewport() if viewport else None,
+                                       margin=margin, aggressive=aggressive, merge=merge,
+                                       precision=precision)
+        if report.removed == 0 and all(isinstance(entry, int) for entry in entries):
+            return report
+        store = self.objects
+        if isinstance(store, LazyObjectList):
+            # 未访问过的对象仍保存为原字典
+            self.objects = LazyObjectList(store._items[entry] if isinstance(entry, int) else entry
+                                          for entry in entries)
+        else:
+            objects = [store[entry] if isinstance(entry, int) else object_from_dict(entry)
+                       for entry in entries]
+            self.objects = objects if isinstance(store, list) else type(store)(objects)
+        self.invalidate_index()
+        return report
+
+    def _object_dicts(self) -> List[Dict[str, Any]]:
+        if hasattr(self.objects, 'to_dicts'):
+            return self.objects.to_dicts()  # ObjectStore直接由数组生成，不构造对象
+        return [obj.to_dict() for obj in self.objects]
+
+    def scene_dict(self, objs=None) -> Dict[str, Any]:
+        """场景字典（objs默认为所有对象的to_dict()列表）"""
+        data = {
+            "version": self.version,
+            "objs": self._object_dicts() if objs is None else objs,
             "width": self.width,
             "height": self.height,
-            "rayModeDensity": 0.1,
-            "origin": {
-                "x": 0,
-                "y": 0
-            },
-            "scale": 1,
-            "simulateColors": True
         }
-        return json.dumps(scene_dict, indent=indent, ensure_ascii=False)
+        data.update(self.settings)
+        return data
 
-    def save(self, filename: str):
-        """保存JSON文件"""
-        with open(filename, 'w', encoding='utf-8') as f:
-            f.write(self.to_json())
+    def to_json(self, indent: int = 2) -> str:
+        """生成JSON字符串"""
+        return json.dumps(self.scene_dict(), indent=indent, ensure_ascii=False)
+
+    def save(self, filename: str, compact: Optional[bool] = None, backend: str = 'auto'):
+        """
+        保存JSON文件（流式写入，见 scene_writer.py）
+
+        参数:
+            compact: 是否写紧凑JSON（无缩进，快数倍）；默认对象数达到
+                     LARGE_SCENE_OBJECTS 时使用紧凑模式，否则与 to_json() 一样缩进2格
+            backend: 'auto'（安装了orjson时使用orjson）、'json' 或 'orjson'
+        """
+        if compact is None:
+            compact = len(self.objects) >= LARGE_SCENE_OBJECTS
+        save_scene(self, filename, indent=None if compact else 2, backend=backend)
         print(f"✓ 场景已保存: {filename}")
         return self
 
@@ -276,65 +681,71 @@ def create_prism_dispersion() -> RayOpticsScene:
     return scene
 
 
+def iter_light_trajectory_frames(
+    base_scene: 'RayOpticsScene',
+    trajectory: Iterable[Point],
+    light_type: type = PointSource,
+    light_params: Dict[str, Any] = None,
+    output_prefix: str = "trajectory",
+    output_dir: str = "output/json"
+) -> Iterator[Tuple[str, bytes]]:
+    """
+    按需逐帧生成 (输出路径, 场景JSON字节)，参数同 generate_light_trajectory
+
+    trajectory 可以是生成器；已生成的帧不保留，内存占用与帧数无关。
+    输出与 scene.save() 相同（对象数达到 LARGE_SCENE_OBJECTS 时为紧凑JSON）
+    """
+    if light_params is None:
+        light_params = {"wavelength": 650, "brightness": 0.8}
+    if light_type not in (PointSource, ParallelLight):
+        raise ValueError(f"不支持的光源类型: {light_type}")
+    indent = None if len(base_scene.objects) + 1 >= LARGE_SCENE_OBJECTS else 2
+
+    for i, position in enumerate(trajectory, 1):
+        # 复制基础场景（光学元件共享，它们缓存的JSON片段在各帧之间复用）
+        scene = base_scene.copy(name=f"{base_scene.name} - Frame {i}")
+        scene.add_object(light_type(position=position, **light_params))
+        yield os.path.join(output_dir, f"{output_prefix}_{i:03d}.json"), b''.join(iter_scene_chunks(scene, indent=indent))
+
+
 def generate_light_trajectory(
     base_scene: 'RayOpticsScene',
     trajectory: List[Point],
     light_type: type = PointSource,
     light_params: Dict[str, Any] = None,
     output_prefix: str = "trajectory",
-    auto_convert: bool = False
+    auto_convert: bool = False,
+    workers: int = WRITE_WORKERS,
+    quiet: bool = False
 ) -> List[str]:
     """
     为光源轨迹生成一系列场景图片
 
+    帧由 iter_light_trajectory_frames 按需生成，交给有界线程池写盘（见 frame_writer.py）
+
     参数:
         base_scene: 基础场景（包含光学元件，但无光源）
-        trajectory: 光源位置数组
+        trajectory: 光源位置数组（或生成器）
         light_type: 光源类型（PointSource 或 ParallelLight）
         light_params: 光源参数字典（wavelength, brightness等，不包括position）
         output_prefix: 输出文件名前缀
         auto_convert: 是否自动转换为HTML和图片
+        workers: 写盘线程数
+        quiet: 不显示进度条
 
     返回:
         生成的JSON文件路径列表
     """
-    if light_params is None:
-        light_params = {"wavelength": 650, "brightness": 0.8}
-
-    json_files = []
-
     # 确保输出目录存在
     os.makedirs("output/json", exist_ok=True)
 
-    print(f"\n生成光源轨迹: {len(trajectory)} 个位置")
+    total = len(trajectory) if hasattr(trajectory, '__len__') else None
+    print(f"\n生成光源轨迹: {total if total is not None else '?'} 个位置")
     print("=" * 60)
 
-    for i, position in enumerate(trajectory, 1):
-        # 创建新场景（复制基础场景）
-        scene = RayOpticsScene(
-            name=f"{base_scene.name} - Frame {i}",
-            width=base_scene.width,
-            height=base_scene.height
-        )
-
-        # 复制基础场景中的所有光学元件
-        for obj in base_scene.objects:
-            scene.add_object(obj)
-
-        # 添加当前位置的光源
-        if light_type == PointSource:
-            light = PointSource(position=position, **light_params)
-        elif light_type == ParallelLight:
-            light = ParallelLight(position=position, **light_params)
-        else:
-            raise ValueError(f"不支持的光源类型: {light_type}")
-
-        scene.add_object(light)
-
-        # 保存JSON
-        filename = f"output/json/{output_prefix}_{i:03d}.json"
-        scene.save(filename)
-        json_files.append(filename)
+    json_files = write_frames(
+        iter_light_trajectory_frames(base_scene, trajectory, light_type, light_params, output_prefix),
+        workers=workers, total=total, quiet=quiet)
 
     print("=" * 60)
     print(f"✓ 已生成 {len(json_files)} 个场景文件\n")
@@ -0,0 +1,356 @@
+#!/usr/bin/env python3
+"""
+序列化前的场景精简 - 删除不影响画面的对象，缩短压缩后的URL hash
+
+场景中画面之外的遮挡物、长度为0的镜面等对象不会改变渲染结果，但仿真器仍要对它们求交，
+压缩后的hash也更长。cull_scene/RayOpticsScene.cull 在序列化前做一遍检查:
+
+  - 退化几何: 长度为0的 Mirror/Blocker/IdealLens/ParabolicMirror，
+    顶点少于3个或面积为0的 Glass
+  - 重复对象: 与前面某个对象完全相同的遮挡物、平面镜（光线在重合处只作用一次）；
+    光源重复会叠加亮度，玻璃、透镜重复会叠加折射，都不合并
+  - 共线重叠的 Blocker 合并为一条
+  - 画面外的对象: 包围盒与视口（由 width/height/origin/scale 得到）不相交的对象。
+    默认只在画面外没有镜面、透镜、玻璃等会改变光线方向的对象时删除画面外的遮挡物
+    （此时离开画面的光线沿直线传播，不会再回到画面内）；aggressive=True 时删除所有
+    画面外的非光源对象（画面外的镜面可能把光线反射回画面，结果可能改变）
+  - precision: 把坐标四舍五入到指定的小数位数（可选，会轻微移动对象）
+
+光源永远保留（画面外的光源仍可能照进画面）。
+
+用法:
+    from scene_culling import cull_scene
+
+    data, report = cull_scene(data)            # 返回新字典，不修改原字典
+    print(report)                              # 删除/合并了哪些对象
+
+    report = scene.cull(margin=20)             # RayOpticsScene 原地精简
+"""
+
+import json
+import math
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+
+from spatial_index import Segment, object_geometry, _bounds, _inside_polygon, _segments_intersect
+
+
+LIGHT_SOURCE_TYPES = {"PointSource", "Beam", "SingleRay", "AngleSource"}
+ABSORBER_TYPES = {"Blocker"}  # 只吸收光线、不改变光线方向的对象
+SEGMENT_TYPES = {"Mirror", "Blocker", "IdealLens", "ParabolicMirror"}  # 长度为0时没有作用
+DEDUPLICATE_TYPES = {"Blocker", "Mirror"}  # 完全重合时第二个没有作用（折射类对象重合会改变光路）
+DEGENERATE_EPSILON = 1e-9
+
+_COORDINATE_KEYS = ("x", "y")
+_POINT_KEYS = ("p1", "p2", "p3")
+
+Rect = Tuple[float, float, float, float]
+# 精简结果中的一项: 原对象下标（未修改）或新的对象字典（合并或坐标取整后的对象）
+Entry = Union[int, Dict[str, Any]]
+
+
+@dataclass
+class CullReport:
+    """精简结果统计（下标均为原对象列表中的位置）"""
+    total: int = 0
+    offscreen: List[int] = field(default_factory=list)
+    degenerate: List[int] = field(default_factory=list)
+    duplicates: List[int] = field(default_factory=list)
+    merged: List[int] = field(default_factory=list)  # 合并到前面的 Blocker 中的对象
+    rounded: int = 0  # 坐标被取整的对象数
+
+    @property
+    def removed(self) -> int:
+        return len(self.offscreen) + len(self.degenerate) + len(self.duplicates) + len(self.merged)
+
+    @property
+    def kept(self) -> int:
+        return self.total - self.removed
+
+    def __str__(self) -> str:
+        text = (f"精简场景: {self.total} -> {self.kept} 个对象（画面外 {len(self.offscreen)}, "
+                f"退化 {len(self.degenerate)}, 重复 {len(self.duplicates)}, 合并 {len(self.merged)}）")
+        if self.rounded:
+            text += f", 坐标取整 {self.rounded} 个"
+        return text
+
+
+def viewport_rect(data: Dict[str, Any]) -> Rect:
+    """场景字典的可见区域（场景坐标），屏幕坐标 = 场景坐标 * scale + origin"""
+    width = data.get("width", 1200)
+    height = data.get("height", 600)
+    origin = data.get("origin") or {"x": 0, "y": 0}
+    scale = data.get("scale", 1) or 1
+    x0, x1 = -origin["x"] / scale, (width - origin["x"]) / scale
+    y0, y1 = -origin["y"] / scale, (height - origin["y"]) / scale
+    return min(x0, x1), min(y0, y1), max(x0, x1), max(y0, y1)
+
+
+def _is_degenerate(data: Dict[str, Any], epsilon: float) -> bool:
+    kind = data.get("type")
+    if kind in SEGMENT_TYPES and "p1" in data and "p2" in data:
+        points = [data[key] for key in _POINT_KEYS if key in data]
+        return all(math.hypot(p["x"] - points[0]["x"], p["y"] - points[0]["y"]) <= epsilon
+                   for p in points[1:])
+    if kind == "Glass" and "path" in data:
+        path = data["path"]
+        if any(p.get("arc") for p in path):
+            return False  # 圆弧边的面积需要按弧计算，不判断
+        distinct = {(p["x"], p["y"]) for p in path}
+        area = sum(path[i - 1]["x"] * p["y"] - p["x"] * path[i - 1]["y"] for i, p in enumerate(path))
+        return len(distinct) < 3 or abs(area) / 2 <= epsilon
+    return False
+
+
+def _round_number(value, precision: int):
+    if type(value) is not float:
+        return value
+    value = round(value, precision)
+    return int(value) if value.is_integer() else value
+
+
+def _round_coordinates(data: Dict[str, Any], precision: int) -> Dict[str, Any]:
+    """坐标取整后的副本（没有变化时返回原字典）"""
+    def point(p):
+        rounded = {k: _round_number(v, precision) if k in _COORDINATE_KEYS else v for k, v in p.items()}
+        return p if rounded == p else rounded
+
+    result = dict(data)
+    for key in _COORDINATE_KEYS:
+        if key in result:
+            result[key] = _round_number(result[key], precision)
+    for key in _POINT_KEYS:
+        if isinstance(result.get(key), dict):
+            result[key] = point(result[key])
+    if isinstance(result.get("path"), list):
+        result["path"] = [point(p) for p in result["path"]]
+    return data if result == data else result
+
+
+def _merge_blockers(dicts: List[Dict[str, Any]], candidates: List[int],
+                    epsilon: float) -> Tuple[Dict[int, Dict[str, Any]], List[int]]:
+    """
+    合并共线且相互重叠（或首尾相接）的 Blocker
+
+    返回 ({保留的下标: 合并后的字典}, 被合并掉的下标)；合并结果放在该组第一个对象的位置
+    """
+    lines: Dict[Tuple, List[Tuple[float, float, int]]] = {}
+    for i in candidates:
+        data = dicts[i]
+        x1, y1, x2, y2 = data["p1"]["x"], data["p1"]["y"], data["p2"]["x"], data["p2"]["y"]
+        length = math.hypot(x2 - x1, y2 - y1)
+        ux, uy = (x2 - x1) / length, (y2 - y1) / length
+        if ux < -epsilon or (abs(ux) <= epsilon and uy < 0):
+            ux, uy = -ux, -uy  # 统一方向
+        offset = x1 * uy - y1 * ux  # 直线到原点的有向距离
+        key = (round(ux / epsilon), round(uy / epsilon), round(offset / epsilon))
+        t1, t2 = x1 * ux + y1 * uy, x2 * ux + y2 * uy
+        lines.setdefault(key, []).append((min(t1, t2), max(t1, t2), i))
+
+    replaced, merged = {}, []
+    for intervals in lines.values():
+        if len(intervals) < 2:
+            continue
+        intervals.sort()
+        groups = [[intervals[0]]]
+        end = intervals[0][1]
+        for interval in intervals[1:]:
+            if interval[0] <= end + epsilon:
+                groups[-1].append(interval)
+                end = max(end, interval[1])
+            else:
+                groups.append([interval])
+                end = interval[1]
+        for group in groups:
+            if len(group) < 2:
+                continue
+            members = sorted(i for _, _, i in group)
+            start = min(t for t, _, _ in group)
+            stop = max(t for _, t, _ in group)
+            # 端点取组内对象的原坐标，避免引入浮点误差
+            endpoints = [dicts[i][key] for i in members for key in ("p1", "p2")]
+            first = dicts[members[0]]
+            ux, uy = _direction(first)
+            p1 = min(endpoints, key=lambda p: abs(p["x"] * ux + p["y"] * uy - start))
+            p2 = min(endpoints, key=lambda p: abs(p["x"] * ux + p["y"] * uy - stop))
+            replaced[members[0]] = dict(first, p1=p1, p2=p2)
+            merged.extend(members[1:])
+    return replaced, merged
+
+
+def _direction(data: Dict[str, Any]) -> Tuple[float, float]:
+    dx = data["p2"]["x"] - data["p1"]["x"]
+    dy = data["p2"]["y"] - data["p1"]["y"]
+    length = math.hypot(dx, dy)
+    return dx / length, dy / length
+
+
+def _convex_hull(points: List[Tuple[float, float]]) -> List[Tuple[float, float]]:
+    """凸包顶点（逆时针，Andrew单调链）"""
+    points = sorted(set(points))
+    if len(points) <= 2:
+        return points
+
+    def half(sequence):
+        chain = []
+        for p in sequence:
+            while len(chain) >= 2 and ((chain[-1][0] - chain[-2][0]) * (p[1] - chain[-2][1])
+                                       - (chain[-1][1] - chain[-2][1]) * (p[0] - chain[-2][0])) <= 0:
+                chain.pop()
+            chain.append(p)
+        return chain[:-1]
+
+    return half(points) + half(reversed(points))
+
+
+def _rect_corners(rect: Rect) -> List[Tuple[float, float]]:
+    xmin, ymin, xmax, ymax = rect
+    return [(xmin, ymin), (xmax, ymin), (xmax, ymax), (xmin, ymax)]
+
+
+def _hull_edges(points: List[Tuple[float, float]]) -> List[Segment]:
+    hull = _convex_hull(points)
+    return [hull[j - 1] + hull[j] for j in range(len(hull))]
+
+
+def _light_regions(dicts: List[Dict[str, Any]], removed: set, rect: Rect,
+                   light_area: Optional[Rect] = None) -> Optional[List[List[Segment]]]:
+    """
+    不完全在可见区域内的光源（及 light_area）与可见区域的凸包（边的列表）
+
+    从光源照进画面的光线都在这个凸包内；有位置未知的光源时返回None
+    """
+    xmin, ymin, xmax, ymax = rect
+    corners = _rect_corners(rect)
+    regions = []
+    if light_area is not None:
+        ax0, ay0, ax1, ay1 = light_area
+        if not (xmin <= ax0 and ax1 <= xmax and ymin <= ay0 and ay1 <= ymax):
+            regions.append(_hull_edges(corners + _rect_corners(light_area)))
+    for i, data in enumerate(dicts):
+        if i in removed or data.get("type") not in LIGHT_SOURCE_TYPES:
+            continue
+        segments, _ = object_geometry(data)
+        if not segments:
+            return None
+        bx0, by0, bx1, by1 = _bounds(segments)
+        if xmin <= bx0 and bx1 <= xmax and ymin <= by0 and by1 <= ymax:
+            continue
+        regions.append(_hull_edges(corners + [p for s in segments for p in (s[:2], s[2:])]))
+    return regions
+
+
+def _in_regions(segments: List[Segment], regions: List[List[Segment]]) -> bool:
+    for region in regions:
+        for segment in segments:
+            if (_inside_polygon(segment[0], segment[1], region)
+                    or any(_segments_intersect(segment, edge) for edge in region)):
+                return True
+    return False
+
+
+def cull_objects(dicts: Iterable[Dict[str, Any]], rect: Optional[Rect] = None, margin: float = 0.0,
+                 aggressive: bool = False, merge: bool = True, precision: Optional[int] = None,
+                 epsilon: float = DEGENERATE_EPSILON,
+                 light_area: Optional[Rect] = None) -> Tuple[List[Entry], CullReport]:
+    """
+    精简对象字典序列
+
+    参数:
+        dicts: 对象字典（to_dict() 的输出）
+        rect: 可见区域 (xmin, ymin, xmax, ymax)，None时不删除画面外的对象
+        margin: 可见区域向外扩展的距离
+        aggressive: 删除所有画面外的非光源对象（见模块说明）
+        merge: 合并重复的遮挡物/平面镜（DEDUPLICATE_TYPES）和共线重叠的 Blocker
+        precision: 坐标保留的小数位数（None为不取整）
+        epsilon: 判断长度/面积为0的容差
+        light_area: 之后会放置光源的区域 (xmin, ymin, xmax, ymax)，如轨迹动画中光源经过的范围；
+                    基础场景中还没有这些光源，画面外挡住它们的遮挡物也会保留
+
+    返回:
+        (保留的对象, CullReport)；保留的对象按原顺序排列，每项为原下标（对象未修改）
+        或新的对象字典（合并或取整后的对象）
+    """
+    dicts = list(dicts)
+    report = CullReport(total=len(dicts))
+    removed = set()
+
+    for i, data in enumerate(dicts):
+        if _is_degenerate(data, epsilon):
+            report.degenerate.append(i)
+            removed.add(i)
+
+    if rect is not None:
+        xmin, ymin, xmax, ymax = rect[0] - margin, rect[1] - margin, rect[2] + margin, rect[3] + margin
+        outside = []
+        redirect_outside = False
+        regions = None if aggressive else _light_regions(dicts, removed, (xmin, ymin, xmax, ymax), light_area)
+        for i, data in enumerate(dicts):
+            if i in removed or data.get("type") in LIGHT_SOURCE_TYPES:
+                continue
+            segments, _ = object_geometry(data)
+            if segments:
+                bx0, by0, bx1, by1 = _bounds(segments)
+                if bx0 <= xmax and bx1 >= xmin and by0 <= ymax and by1 >= ymin:
+                    continue
+                if (not aggressive and data.get("type") in ABSORBER_TYPES
+                        and (regions is None or _in_regions(segments, regions))):
+                    continue  # 可能挡住画面外的光源照进画面的光线
+            outside.append(i)
+            # 画面外（或位置未知）的镜面、透镜等可能把光线送回画面
+            if data.get("type") not in ABSORBER_TYPES:
+                redirect_outside = True
+        if aggressive or not redirect_outside:
+            report.offscreen = outside
+            removed.update(outside)
+
+    replaced: Dict[int, Dict[str, Any]] = {}
+    if merge:
+        seen = set()
+        for i, data in enumerate(dicts):
+            if i in removed or data.get("type") not in DEDUPLICATE_TYPES:
+                continue
+            key = json.dumps(data, sort_keys=True)
+            if key in seen:
+                report.duplicates.append(i)
+                removed.add(i)
+            else:
+                seen.add(key)
+        blockers = [i for i, data in enumerate(dicts)
+                    if i not in removed and data.get("type") == "Blocker" and set(data) == {"type", "p1", "p2"}]
+        replaced, report.merged = _merge_blockers(dicts, blockers, epsilon)
+        removed.update(report.merged)
+
+    entries: List[Entry] = []
+    for i, data in enumerate(dicts):
+        if i in removed:
+            continue
+        entry = replaced.get(i, i)
+        if precision is not None:
+            rounded = _round_coordinates(dicts[i] if entry == i else entry, precision)
+            if rounded is not dicts[i] and rounded is not entry:
+                report.rounded += 1
+                entry = rounded
+        entries.append(entry)
+    return entries, report
+
+
+def cull_scene(data: Dict[str, Any], margin: float = 0.0, aggressive: bool = False,
+               merge: bool = True, precision: Optional[int] = None,
+               viewport: bool = True, light_area: Optional[Rect] = None) -> Tuple[Dict[str, Any], CullReport]:
+    """
+    精简场景字典，返回 (新的场景字典, CullReport)
+
+    新字典的 objs 是新列表，未修改的对象字典与原场景共享（不要原地修改）
+
+    参数:
+        viewport: 是否删除画面外的对象（False时只删除退化/重复对象）
+        其他参数见 cull_objects
+    """
+    objs = data.get("objs", [])
+    entries, report = cull_objects(objs, viewport_rect(data) if viewport else None, margin=margin,
+                                   aggressive=aggressive, merge=merge, precision=precision,
+                                   light_area=light_area)
+    result = dict(data)
+    result["objs"] = [objs[entry] if isinstance(entry, int) else entry for entry in entries]
+    return result, report
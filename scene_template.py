@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+"""
+编译场景模板 - 只替换光源坐标等少数字段，快速输出大量帧的JSON
+
+轨迹帧之间通常只有光源的几个数值不同。逐帧复制模板字典再 json.dump 的开销与场景大小成正比；
+CompiledTemplate 只解析、编码模板一次，在参数位置把JSON切分为预编码的字节片段，
+每帧只需编码几个数值并拼接片段。输出与 json.dump(同样的字典, indent=...) 逐字节一致。
+
+用法:
+    from scene_template import CompiledTemplate, compile_light_template
+
+    template = compile_light_template(scene_data, indent=4)   # 第一个PointSource/Beam的参数
+    template.write("output/json/test_01.json", x=400, y=625)
+
+    # 批量：NumPy坐标数组，一次写出所有帧
+    template.write_frames(paths, x=xs, y=ys)
+
+    # 按需逐帧生成，交给 frame_writer 并行写盘
+    write_frames(template.iter_frames(paths, x=xs, y=ys))
+"""
+
+import json
+import math
+import os
+import re
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+
+# 各光源类型的参数位置（相对于对象字典；只使用对象中已有的字段）
+LIGHT_SLOTS = {
+    "PointSource": {
+        "x": ("x",),
+        "y": ("y",),
+        "wavelength": ("wavelength",),
+        "brightness": ("brightness",),
+    },
+    "Beam": {
+        "p1_x": ("p1", "x"),
+        "p1_y": ("p1", "y"),
+        "p2_x": ("p2", "x"),
+        "p2_y": ("p2", "y"),
+        "wavelength": ("wavelength",),
+        "brightness": ("brightness",),
+    },
+}
+
+_MARKER = "\u0000slot{}\u0000"  # 占位字符串（编码后为 "\u0000slotN\u0000"，不会与正常内容冲突）
+_MARKER_PATTERN = re.compile(r'"\\u0000slot(\d+)\\u0000"')
+
+
+def encode_value(value) -> bytes:
+    """编码单个参数值（与json.dumps一致，整数和有限浮点数走快速路径）"""
+    kind = type(value)
+    if kind is int or (kind is float and math.isfinite(value)):
+        return repr(value).encode('ascii')
+    return json.dumps(value, ensure_ascii=False).encode('utf-8')
+
+
+def _get(data, path: Sequence):
+    for key in path:
+        data = data[key]
+    return data
+
+
+def _with_values(data, values: Dict[Tuple, Any]):
+    """
+    返回把各路径替换为新值后的副本
+
+    只复制路径经过的字典/列表，其余部分与原数据共享
+    """
+    children = {}
+    for path, value in values.items():
+        if not path:
+            return value
+        children.setdefault(path[0], {})[path[1:]] = value
+    copied = list(data) if isinstance(data, list) else dict(data)
+    for key, sub_values in children.items():
+        copied[key] = _with_values(data[key], sub_values)
+    return copied
+
+
+def light_slots(data: Dict[str, Any], index: Optional[int] = None,
+                types: Iterable[str] = ("PointSource", "Beam")) -> Dict[str, Tuple]:
+    """
+    找到光源对象，返回它的参数位置 {参数名: 路径}
+
+    参数:
+        data: 场景字典
+        index: 光源在objs中的下标（默认第一个指定类型的对象）
+        types: 可接受的光源类型
+    """
+    objs = data.get("objs", [])
+    types = tuple(types)
+    if index is None:
+        index = next((i for i, obj in enumerate(objs) if obj.get("type") in types), None)
+        if index is None:
+            raise ValueError(f"场景中未找到光源对象: {', '.join(types)}")
+    obj = objs[index]
+    if obj.get("type") not in LIGHT_SLOTS:
+        raise ValueError(f"不支持的光源类型: {obj.get('type')}")
+
+    slots = {}
+    for name, path in LIGHT_SLOTS[obj["type"]].items():
+        try:
+            _get(obj, path)
+        except (KeyError, IndexError, TypeError):
+            continue
+        slots[name] = ("objs", index) + path
+    return slots
+
+
+class CompiledTemplate:
+    """
+    预编码的场景模板
+
+    参数:
+        data: 场景字典（或带 scene_dict() 的 RayOpticsScene）
+        slots: {参数名: 路径}，路径是从场景字典根部开始的键/下标序列，如 ("objs", 0, "x")
+        indent: 输出缩进（None为紧凑JSON，与 json.dumps 的参数含义相同）
+
+    未传入的参数使用模板中的原值（见 defaults）
+    """
+
+    def __init__(self, data, slots: Dict[str, Sequence], indent: Optional[int] = 2):
+        if hasattr(data, 'scene_dict'):
+            data = data.scene_dict()
+        self.data = data
+        self.indent = indent
+        self.slots = {name: tuple(path) for name, path in slots.items()}
+        self.defaults = {name: _get(data, path) for name, path in self.slots.items()}
+
+        names = list(self.slots)
+        marked = _with_values(data, {path: _MARKER.format(i) for i, path in enumerate(self.slots.values())})
+        text = json.dumps(marked, ensure_ascii=False, indent=indent,
+                          separators=(',', ':') if indent is None else None)
+        pieces = _MARKER_PATTERN.split(text)
+        # pieces: [片段0, 参数序号, 片段1, 参数序号, 片段2, ...]
+        self._segments = [piece.encode('utf-8') for piece in pieces[0::2]]
+        self._order = [names[int(i)] for i in pieces[1::2]]
+        self._default_bytes = {name: encode_value(value) for name, value in self.defaults.items()}
+
+    def render(self, **values) -> bytes:
+        """生成一帧的JSON字节（只编码传入的参数）"""
+        unknown = set(values) - set(self.slots)
+        if unknown:
+            raise KeyError(f"模板中没有这些参数: {', '.join(sorted(unknown))}")
+        segments = self._segments
+        parts = [segments[0]]
+        for name, segment in zip(self._order, segments[1:]):
+            parts.append(encode_value(values[name]) if name in values else self._default_bytes[name])
+            parts.append(segment)
+        return b''.join(parts)
+
+    def render_dict(self, **values) -> Dict[str, Any]:
+        """生成一帧的场景字典（只复制参数路径上的字典，其余部分与模板共享，不要原地修改）"""
+        return _with_values(self.data, {self.slots[name]: value for name, value in values.items()})
+
+    def write(self, path: str, **values) -> int:
+        """写出一帧，返回写入的字节数"""
+        encoded = self.render(**values)
+        with open(path, 'wb') as f:
+            f.write(encoded)
+        return len(encoded)
+
+    def iter_frames(self, paths: Iterable[str], **arrays) -> Iterator[Tuple[str, bytes]]:
+        """
+        按需逐帧生成 (路径, JSON字节)，不保留已生成的帧
+
+        参数:
+            paths: 每帧的输出路径（可以是生成器）
+            arrays: {参数名: 数组}，NumPy数组、列表或任意可迭代对象，长度与paths相同
+        """
+        names = list(arrays)
+        columns = [iter(values.tolist() if hasattr(values, 'tolist') else values) for values in arrays.values()]
+        missing = object()
+        for i, path in enumerate(paths):
+            row = [next(column, missing) for column in columns]
+            if any(value is missing for value in row):
+                raise ValueError(f"参数数组比帧数短（第 {i + 1} 帧没有参数值）")
+            yield path, self.render(**dict(zip(names, row)))
+        if any(next(column, missing) is not missing for column in columns):
+            raise ValueError("参数数组比帧数长")
+
+    def write_frames(self, paths: Sequence[str], **arrays) -> List[str]:
+        """
+        批量写出所有帧
+
+        参数:
+            paths: 每帧的输出路径
+            arrays: {参数名: 数组}，NumPy数组或列表，长度与paths相同
+        """
+        columns = {}
+        for name, values in arrays.items():
+            values = values.tolist() if hasattr(values, 'tolist') else list(values)  # NumPy标量转为Python数值
+            if len(values) != len(paths):
+                raise ValueError(f"参数 {name} 的长度 {len(values)} 与帧数 {len(paths)} 不一致")
+            columns[name] = values
+        for path in {os.path.dirname(p) for p in paths}:
+            if path:
+                os.makedirs(path, exist_ok=True)
+        for i, path in enumerate(paths):
+            self.write(path, **{name: values[i] for name, values in columns.items()})
+        return list(paths)
+
+    def __repr__(self) -> str:
+        return f"CompiledTemplate(slots={list(self.slots)}, indent={self.indent})"
+
+
+def compile_light_template(data, index: Optional[int] = None, indent: Optional[int] = 2,
+                           types: Iterable[str] = ("PointSource", "Beam")) -> CompiledTemplate:
+    """编译以光源参数为参数位置的模板（见 light_slots）"""
+    if hasattr(data, 'scene_dict'):
+        data = data.scene_dict()
+    return CompiledTemplate(data, light_slots(data, index=index, types=types), indent=indent)
@@ -0,0 +1,349 @@
+#!/usr/bin/env python3
+"""
+共享场景查看器 - 一个 viewer.html + 分片场景清单，代替每个场景一个HTML文件
+
+以前每个场景都会生成一个约3KB的HTML，内容只有压缩后的场景hash不同，
+5万帧的轨迹就会留下5万个几乎相同的文件。现在:
+
+  output/html/viewer.html          唯一的查看器页面
+  output/html/scenes/00.js ~ ff.js 分片清单（按场景名哈希分到256个分片）
+
+查看器通过查询参数选择场景: viewer.html?scene=test_01
+分片使用JSONP格式（rayOpticsScenes({...});），通过 <script> 加载，
+因此直接双击用 file:// 打开也能工作（file:// 下 fetch JSON 会被浏览器拦截）。
+查看器也接受直接带hash的地址 viewer.html#XQAAAA...，截图回退时使用，无需先写清单。
+
+用法:
+    from scene_viewer import SceneManifest
+
+    with SceneManifest("output/html") as viewer:
+        viewer.add("test_01", compressed_scene, json_data)
+        print(viewer.page_path("test_01"))  # output/html/viewer.html?scene=test_01
+"""
+
+import json
+import os
+import threading
+from typing import Optional
+from urllib.parse import quote
+
+
+# 默认配置
+DEFAULT_HTML_DIR = os.path.join('output', 'html')
+VIEWER_FILENAME = 'viewer.html'
+SHARD_DIR = 'scenes'
+DEFAULT_SHARDS = 256  # 分片数量（每个分片约为 场景数/256 条记录，查看时只加载一个分片）
+
+_SHARD_PREFIX = 'rayOpticsScenes('
+_SHARD_SUFFIX = ');\n'
+
+
+def _fnv1a(text: str) -> int:
+    """32位FNV-1a哈希（与查看器中的JS实现一致）"""
+    h = 0x811c9dc5
+    for byte in text.encode('utf-8'):
+        h ^= byte
+        h = (h * 0x01000193) & 0xffffffff
+    return h
+
+
+def shard_of(name: str, shards: int = DEFAULT_SHARDS) -> int:
+    """场景名所在的分片编号"""
+    return _fnv1a(name) % shards
+
+
+def _shard_filename(index: int, shards: int) -> str:
+    width = max(2, len(f'{shards - 1:x}'))
+    return f'{index:0{width}x}.js'
+
+
+def scene_href(name: str) -> str:
+    """场景查看页相对于 html 目录的链接（用于索引页等）"""
+    return f'{VIEWER_FILENAME}?scene={quote(name, safe="")}'
+
+
+def scene_entry(json_data: dict, compressed_scene: str) -> dict:
+    """清单中的一条记录"""
+    return {
+        'hash': compressed_scene,
+        'name': json_data.get('name', 'Ray Optics Scene'),
+        'size': [json_data.get('width', 1200), json_data.get('height', 600)],
+        'objs': len(json_data.get('objs', [])),
+    }
+
+
+def render_viewer_html(simulator_url: str, shards: int = DEFAULT_SHARDS) -> str:
+    """生成查看器页面内容"""
+    width = max(2, len(f'{shards - 1:x}'))
+    return f"""<!DOCTYPE html>
+<html lang="en">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>Ray Optics</title>
+    <style>
+        body {{
+            margin: 0;
+            padding: 0;
+            font-family: Arial, sans-serif;
+            background: #000;
+            color: white;
+            overflow: hidden;
+        }}
+        #info {{
+            position: fixed;
+            top: 10px;
+            left: 10px;
+            padding: 10px 15px;
+            background: rgba(0, 0, 0, 0.8);
+            border-radius: 5px;
+            z-index: 1000;
+            font-size: 12px;
+        }}
+        #loading {{
+            position: fixed;
+            top: 50%;
+            left: 50%;
+            transform: translate(-50%, -50%);
+            text-align: center;
+        }}
+        .spinner {{
+            border: 4px solid rgba(255, 255, 255, 0.1);
+            border-top: 4px solid white;
+            border-radius: 50%;
+            width: 40px;
+            height: 40px;
+            animation: spin 1s linear infinite;
+            margin: 0 auto 10px;
+        }}
+        @keyframes spin {{
+            0% {{ transform: rotate(0deg); }}
+            100% {{ transform: rotate(360deg); }}
+        }}
+        iframe {{
+            position: fixed;
+            top: 0;
+            left: 0;
+            width: 100%;
+            height: 100%;
+            border: none;
+        }}
+    </style>
+</head>
+<body>
+    <div id="info"><strong id="scene-name"></strong><br><span id="scene-meta"></span></div>
+
+    <div id="loading">
+        <div class="spinner"></div>
+        <div id="loading-text">Loading simulator...</div>
+    </div>
+
+    <iframe id="simulator"></iframe>
+
+    <script>
+        const SIMULATOR_URL = {json.dumps(simulator_url)};
+        const SHARDS = {shards};
+        const SHARD_DIR = {json.dumps(SHARD_DIR)};
+
+        const iframe = document.getElementById('simulator');
+        const loading = document.getElementById('loading');
+
+        function fnv1a(text) {{
+            let h = 0x811c9dc5;
+            for (const byte of new TextEncoder().encode(text)) {{
+                h ^= byte;
+                h = Math.imul(h, 0x01000193) >>> 0;
+            }}
+            return h >>> 0;
+        }}
+
+        function show(entry) {{
+            document.title = 'Ray Optics - ' + entry.name;
+            document.getElementById('scene-name').textContent = entry.name;
+            if (entry.size) {{
+                document.getElementById('scene-meta').textContent =
+                    entry.size[0] + 'x' + entry.size[1] + ' | ' + entry.objs + ' objects';
+            }}
+            iframe.src = SIMULATOR_URL + '#' + entry.hash;
+            iframe.onload = function() {{
+                setTimeout(function() {{ loading.style.display = 'none'; }}, 3000);
+            }};
+        }}
+
+        function fail(message) {{
+            document.getElementById('loading-text').textContent = message;
+        }}
+
+        const sceneKey = new URLSearchParams(location.search).get('scene');
+        if (location.hash.length > 1) {{
+            // viewer.html#<压缩场景>：直接显示
+            show({{hash: location.hash.slice(1), name: sceneKey || 'Ray Optics Scene'}});
+        }} else if (sceneKey) {{
+            const shard = (fnv1a(sceneKey) % SHARDS).toString(16).padStart({width}, '0');
+            window.rayOpticsScenes = function(entries) {{
+                const entry = entries[sceneKey];
+                if (entry) {{
+                    show(entry);
+                }} else {{
+                    fail('Scene not found: ' + sceneKey);
+                }}
+            }};
+            const script = document.createElement('script');
+            script.src = SHARD_DIR + '/' + shard + '.js';
+            script.onerror = function() {{ fail('Scene manifest not found: ' + script.src); }};
+            document.head.appendChild(script);
+        }} else {{
+            fail('Usage: viewer.html?scene=<name>');
+        }}
+    </script>
+</body>
+</html>
+"""
+
+
+def _read_shard(path: str) -> dict:
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            text = f.read()
+    except OSError:
+        return {}
+    text = text.strip()
+    if not (text.startswith(_SHARD_PREFIX) and text.endswith(');')):
+        return {}
+    try:
+        return json.loads(text[len(_SHARD_PREFIX):-2])
+    except ValueError:
+        return {}
+
+
+def _write_atomic(path: str, content: str):
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(content)
+    os.replace(tmp_path, path)
+
+
+class SceneManifest:
+    """
+    共享查看器的分片场景清单
+
+    add() 只在内存中记录，flush() 时才重写发生变化的分片（与已有分片内容合并），
+    所以整批生成的磁盘写入量与分片数有关，而不是与场景数有关。
+
+    参数:
+        html_dir: 查看器所在目录
+        simulator_url: 仿真器地址（默认由 screenshot_helper.get_simulator_url() 决定）
+        shards: 分片数量
+    """
+
+    def __init__(self, html_dir: str = DEFAULT_HTML_DIR, simulator_url: Optional[str] = None,
+                 shards: int = DEFAULT_SHARDS):
+        if simulator_url is None:
+            from screenshot_helper import get_simulator_url
+            simulator_url = get_simulator_url()
+
+        self.html_dir = html_dir
+        self.simulator_url = simulator_url
+        self.shards = shards
+        self._pending = {}  # 分片编号 -> {场景名: 记录}
+        self._lock = threading.Lock()
+
+    @property
+    def viewer_path(self) -> str:
+        return os.path.join(self.html_dir, VIEWER_FILENAME)
+
+    def shard_path(self, name: str) -> str:
+        """场景所在分片文件的路径"""
+        filename = _shard_filename(shard_of(name, self.shards), self.shards)
+        return os.path.join(self.html_dir, SHARD_DIR, filename)
+
+    def page_path(self, name: str, compressed_scene: Optional[str] = None) -> str:
+        """
+        场景查看页地址（可直接传给 screenshot_helper.capture_html_png）
+
+        传入compressed_scene时返回 viewer.html#<hash>，不依赖清单是否已写入
+        （但查看器页面本身需已写入，见 write_viewer）
+        """
+        if compressed_scene is not None:
+            return f'{self.viewer_path}?scene={quote(name, safe="")}#{compressed_scene}'
+        return os.path.join(self.html_dir, scene_href(name))
+
+    def write_viewer(self):
+        """写入查看器页面（内容未变化时不重写）"""
+        os.makedirs(os.path.join(self.html_dir, SHARD_DIR), exist_ok=True)
+        content = render_viewer_html(self.simulator_url, self.shards)
+        try:
+            with open(self.viewer_path, 'r', encoding='utf-8') as f:
+                if f.read() == content:
+                    return
+        except OSError:
+            pass
+        _write_atomic(self.viewer_path, content)
+
+    def add(self, name: str, compressed_scene: str, json_data: dict):
+        """记录一个场景（线程安全，flush() 时写入）"""
+        entry = scene_entry(json_data, compressed_scene)
+        with self._lock:
+            self._pending.setdefault(shard_of(name, self.shards), {})[name] = entry
+
+    def flush(self):
+        """写入查看器页面，并把新记录合并写入对应分片"""
+        self.write_viewer()
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        for index, entries in pending.items():
+            path = os.path.join(self.html_dir, SHARD_DIR, _shard_filename(index, self.shards))
+            merged = _read_shard(path)
+            merged.update(entries)
+            body = json.dumps(merged, ensure_ascii=False, sort_keys=True, separators=(',', ':'))
+            _write_atomic(path, _SHARD_PREFIX + body + _SHARD_SUFFIX)
+
+    def get(self, name: str) -> Optional[dict]:
+        """读取一个场景的记录（包括尚未flush的）"""
+        index = shard_of(name, self.shards)
+        with self._lock:
+            entry = self._pending.get(index, {}).get(name)
+        if entry is not None:
+            return entry
+        return _read_shard(self.shard_path(name)).get(name)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.flush()
+
+
+def create_html_from_json(json_data: dict, output_html: str, compressed_scene: Optional[str] = None,
+                          simulator_url: Optional[str] = None,
+                          manifest: Optional[SceneManifest] = None) -> str:
+    """
+    为场景生成查看页 - 写入共享查看器的清单，而不是单独的HTML文件
+
+    参数:
+        json_data: 场景字典
+        output_html: 以前的单页路径（如 output/html/test_01.html），
+                     其目录作为查看器目录，文件名作为场景名
+        compressed_scene: 已压缩的场景hash（省略则现场压缩）
+        simulator_url: 仿真器地址（默认由 screenshot_helper.get_simulator_url() 决定）
+        manifest: 共享的 SceneManifest（批量生成时传入，由调用方统一flush；
+                  省略则立即写入）
+
+    返回:
+        场景查看页地址（output/html/viewer.html?scene=<场景名>）
+    """
+    html_dir = os.path.dirname(output_html) or '.'
+    name = os.path.splitext(os.path.basename(output_html))[0]
+
+    if compressed_scene is None:
+        from screenshot_helper import compress_scene_for_url
+        json_str = json.dumps(json_data, ensure_ascii=False, separators=(',', ':'))
+        compressed_scene = compress_scene_for_url(json_str)
+
+    if manifest is None:
+        with SceneManifest(html_dir, simulator_url=simulator_url) as single:
+            single.add(name, compressed_scene, json_data)
+        return single.page_path(name)
+
+    manifest.add(name, compressed_scene, json_data)
+    return manifest.page_path(name)
@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""
+流式场景写入 - 按批编码对象并写入文件，内存占用与场景大小无关
+
+RayOpticsScene.to_json 会先为所有对象生成字典列表，再拼出整个JSON字符串，
+峰值内存是场景大小的数倍；且 indent=2 时json模块只能使用纯Python编码器，很慢。
+本模块按小批对象编码、按块写入二进制文件句柄:
+
+  - indent=2 等缩进模式: 输出与 to_json(indent) 逐字节一致
+  - 紧凑模式 (indent=None): 无空白的JSON，可使用C编码器或orjson，速度快数倍
+  - backend='orjson': 安装了orjson时使用（'auto' 自动选择），否则使用标准库json
+
+普通对象列表按对象写入: 每个 OpticalObject 缓存自己编码好的JSON片段，属性变化时才重新编码，
+连续写入只有光源在变的轨迹帧时，只有变化的对象需要重新编码，其余对象直接拼接缓存的字节。
+ObjectStore 等提供 iter_dicts() 的容器按批编码。
+
+用法:
+    from scene_writer import write_scene, save_scene
+
+    save_scene(scene, "output/json/big.json")              # 紧凑模式
+    with open("scene.json", "wb") as f:
+        write_scene(scene, f, indent=2)
+"""
+
+import functools
+import itertools
+import json
+import os
+from json.encoder import c_make_encoder, encode_basestring
+from typing import Callable, Iterator, Optional
+
+
+CHUNK_SIZE = 1 << 16  # 累积多少字节写一次文件
+BATCH_OBJECTS = 1024  # 每次编码的对象数（减少编码器调用开销，内存仍与场景大小无关）
+
+_OBJS_PLACEHOLDER = '__objs__'
+
+
+def available_backend() -> str:
+    """当前环境可用的最快编码后端"""
+    try:
+        import orjson  # noqa: F401
+        return 'orjson'
+    except ImportError:
+        return 'json'
+
+
+def resolve_backend(backend: str) -> str:
+    return available_backend() if backend == 'auto' else backend
+
+
+def _batch_encoder(backend: str, indent: Optional[int]) -> Callable[[list], bytes]:
+    """返回把一批对象字典编码为JSON数组的函数"""
+    if backend == 'orjson':
+        import orjson
+        if indent is None:
+            return orjson.dumps
+        if indent == 2:
+            return lambda values: orjson.dumps(values, option=orjson.OPT_INDENT_2)
+        backend = 'json'  # orjson只支持2空格缩进
+
+    if backend != 'json':
+        raise ValueError(f"未知的编码后端: {backend}")
+    if indent is None:
+        encode = json.JSONEncoder(ensure_ascii=False, separators=(',', ':')).encode
+    else:
+        encode = json.JSONEncoder(ensure_ascii=False, indent=indent).encode
+    return lambda values: encode(values).encode('utf-8')
+
+
+_encoder = functools.lru_cache(maxsize=None)(_batch_encoder)
+
+
+@functools.lru_cache(maxsize=None)
+def object_encoder(backend: str = 'json', indent: Optional[int] = None) -> Callable[[dict], bytes]:
+    """
+    返回把单个对象字典编码为场景objs数组元素片段的函数
+
+    缩进模式下对象位于第二层，片段的每一行已多缩进两级，可以直接拼接
+    """
+    backend = resolve_backend(backend)
+    if backend == 'json' and indent is None and c_make_encoder is not None:
+        # JSONEncoder.encode 每次调用都重新创建C编码器，逐个对象编码时这部分开销占一半以上
+        encoder = json.JSONEncoder(ensure_ascii=False, separators=(',', ':'))
+        iterencode = c_make_encoder(None, encoder.default, encode_basestring, None, ':', ',',
+                                    False, False, True)
+        return lambda value: ''.join(iterencode(value, 0)).encode('utf-8')
+
+    encode = _encoder(backend, indent)
+    if indent is None:
+        return encode
+    line = b'\n' + b' ' * (2 * indent)
+    return lambda value: encode(value).replace(b'\n', line)
+
+
+def _object_fragments(objects, indent: Optional[int], backend: str, separator: bytes) -> Iterator[bytes]:
+    """每批对象的缓存片段拼接为一段（未修改的对象不再编码）"""
+    objects = iter(objects)
+    while True:
+        batch = [obj.json_fragment(indent, backend) for obj in itertools.islice(objects, BATCH_OBJECTS)]
+        if not batch:
+            break
+        yield separator.join(batch)
+
+
+def _iter_batched(objects, encode, indent: Optional[int]) -> Iterator[bytes]:
+    """
+    每批对象编码为一个数组后去掉外层括号（ObjectStore等没有片段缓存的容器）
+
+    缩进模式下objs位于第二层，每行再多缩进一级
+    """
+    extra_indent = b'' if indent is None else b'\n' + b' ' * indent
+    batch = []
+    while True:
+        batch.extend(itertools.islice(objects, BATCH_OBJECTS))
+        if not batch:
+            break
+        encoded = encode(batch)
+        batch.clear()
+        if indent is None:
+            yield encoded[1:-1]
+        else:
+            yield encoded[1:encoded.rindex(b'\n')].replace(b'\n', extra_indent)
+
+
+def iter_scene_chunks(scene, indent: Optional[int] = None, backend: str = 'auto') -> Iterator[bytes]:
+    """
+    逐块生成场景JSON（UTF-8字节）
+
+    参数:
+        scene: RayOpticsScene
+        indent: 缩进空格数；None为紧凑模式
+        backend: 'auto'、'json' 或 'orjson'
+    """
+    backend = resolve_backend(backend)
+
+    # 场景其他字段用标准库编码（与 to_json 格式一致），再在objs处插入对象
+    header = json.dumps(scene.scene_dict(objs=_OBJS_PLACEHOLDER), ensure_ascii=False, indent=indent,
+                        separators=(',', ':') if indent is None else None)
+    before, after = header.split(json.dumps(_OBJS_PLACEHOLDER), 1)
+
+    objects = scene.objects
+    if hasattr(objects, 'iter_dicts'):
+        # 每批编码结果自带开头的换行和缩进
+        parts = _iter_batched(objects.iter_dicts(), _encoder(backend, indent), indent)
+        opening, separator = b'[', b','
+    else:
+        line = b'' if indent is None else b'\n' + b' ' * (2 * indent)
+        opening, separator = b'[' + line, b',' + line
+        parts = _object_fragments(objects, indent, backend, separator)
+    closing = b']' if indent is None else b'\n' + b' ' * indent + b']'
+
+    buffer = bytearray(before.encode('utf-8'))
+    empty = True
+    for part in parts:
+        buffer += opening if empty else separator
+        buffer += part
+        empty = False
+        if len(buffer) >= CHUNK_SIZE:
+            yield bytes(buffer)
+            buffer.clear()
+    buffer += b'[]' if empty else closing
+    buffer += after.encode('utf-8')
+    yield bytes(buffer)
+
+
+def write_scene(scene, fp, indent: Optional[int] = None, backend: str = 'auto') -> int:
+    """
+    把场景流式写入二进制文件句柄
+
+    返回写入的字节数
+    """
+    written = 0
+    for chunk in iter_scene_chunks(scene, indent=indent, backend=backend):
+        fp.write(chunk)
+        written += len(chunk)
+    return written
+
+
+def save_scene(scene, filename: str, indent: Optional[int] = None, backend: str = 'auto') -> int:
+    """把场景流式写入文件（先写临时文件再替换，中途失败不会留下半个JSON）"""
+    tmp_path = filename + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        written = write_scene(scene, f, indent=indent, backend=backend)
+    os.replace(tmp_path, filename)
+    return written
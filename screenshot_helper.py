@@ -4,236 +4,481 @@
 """
 
 from ray_optics_controller import RayOpticsScene, Point, PointSource, FlatMirror
+from compression_pool import get_shared_pool, node_available, CompressionError
+from json_url_codec import compress_json
+from typing import List, Optional
 import os
 import json
-import subprocess
 
 
-def compress_scene_for_url(scene_json: str) -> str:
+# 场景压缩后端: 'python' 使用纯Python实现的json_url_codec（无需Node.js），
+# 'node' 使用常驻的Node.js压缩进程池（compress_worker.js），两者输出逐字节一致；
+# 'auto' 把不小于 NODE_COMPRESS_MIN_CHARS 的场景交给Node进程池（安装了Node.js和json-url时），
+# 其余用纯Python编码器。纯Python编码器在小场景上与Node相当、没有启动开销，
+# 但大场景慢一倍以上（约160KB的场景 3.4秒 vs 1.6秒），且受GIL限制不能并行
+COMPRESS_BACKEND = 'auto'
+NODE_COMPRESS_MIN_CHARS = 32 * 1024
+
+# ray-optics仿真器地址
+SIMULATOR_URL = 'https://phydemo.app/ray-optics/simulator/'
+
+# 使用本地托管的仿真器（离线渲染，见local_server.py）代替 SIMULATOR_URL
+USE_LOCAL_SIMULATOR = False
+
+
+def get_simulator_url(local: Optional[bool] = None) -> str:
+    """
+    获取生成HTML和截图使用的仿真器地址
+
+    参数:
+        local: 是否使用本地仿真器（默认使用 USE_LOCAL_SIMULATOR）；
+               为True时自动启动本地静态服务器
+    """
+    if local is None:
+        local = USE_LOCAL_SIMULATOR
+    if not local:
+        return SIMULATOR_URL
+
+    from local_server import get_local_simulator_url
+    return get_local_simulator_url()
+
+
+def get_simulator_version(local: Optional[bool] = None) -> Optional[str]:
+    """
+    仿真器构建的版本标识
+
+    本地仿真器返回构建文件的指纹（见 local_server.simulator_fingerprint）；
+    远程仿真器返回None（以地址代表版本）
+    """
+    if local is None:
+        local = USE_LOCAL_SIMULATOR
+    if not local:
+        return None
+
+    from local_server import get_local_simulator_fingerprint
+    return get_local_simulator_fingerprint()
+
+
+def compress_scene_for_url(scene_json: str, backend: Optional[str] = None) -> str:
     """
     使用json-url('lzma')压缩场景JSON
     这与ray-optics仿真器使用的格式完全一致
-    通过Node.js调用json-url库实现
+    默认按场景大小选择纯Python编码器（json_url_codec.py）或Node.js进程池（见 COMPRESS_BACKEND）
+    """
+    return compress_scenes_for_url([scene_json], backend=backend)[0]
+
+
+def _compress_with_python(scene_jsons: List[str], return_exceptions: bool) -> list:
+    results = []
+    for scene_json in scene_jsons:
+        try:
+            results.append(compress_json(scene_json))
+        except Exception as e:
+            if not return_exceptions:
+                raise CompressionError(str(e)) from e
+            results.append(e)
+    return results
+
+
+def compress_scenes_for_url(scene_jsons: List[str], pool_size: Optional[int] = None,
+                            return_exceptions: bool = False,
+                            backend: Optional[str] = None) -> list:
     """
+    批量压缩多个场景JSON，结果顺序与输入一致
+
+    参数:
+        scene_jsons: 场景JSON字符串列表
+        pool_size: 并行的Node压缩进程数量（'node' 和 'auto' 后端，默认按CPU核数，最多4个）
+        return_exceptions: 为True时单个场景失败不中断整批，对应位置返回异常对象
+        backend: 'python'、'node' 或 'auto'（默认使用 COMPRESS_BACKEND）
+    """
+    backend = backend or COMPRESS_BACKEND
+    if backend not in ('python', 'node', 'auto'):
+        raise ValueError(f"未知的压缩后端: {backend}")
+
+    if backend == 'auto':
+        large = [i for i, scene_json in enumerate(scene_jsons) if len(scene_json) >= NODE_COMPRESS_MIN_CHARS]
+        if not large or not node_available():
+            backend = 'python'
+        elif len(large) == len(scene_jsons):
+            backend = 'node'
+        else:
+            # 大场景交给Node进程池，小场景在本进程内压缩
+            large_set = set(large)
+            small = [i for i in range(len(scene_jsons)) if i not in large_set]
+            results = [None] * len(scene_jsons)
+            for indices, part_backend in ((large, 'node'), (small, 'python')):
+                part = compress_scenes_for_url([scene_jsons[i] for i in indices], pool_size,
+                                               return_exceptions, backend=part_backend)
+                for i, result in zip(indices, part):
+                    results[i] = result
+            return results
+
     try:
-        # 调用Node.js脚本进行压缩
-        script_path = os.path.join(os.path.dirname(__file__), 'compress_json.js')
-        result = subprocess.run(
-            ['node', script_path],
-            input=scene_json.encode('utf-8'),
-            capture_output=True,
-            check=True
-        )
-        compressed = result.stdout.decode('utf-8')
-        return compressed
-    except subprocess.CalledProcessError as e:
-        print(f"❌ JSON压缩失败: {e.stderr.decode('utf-8')}")
+        if backend == 'python':
+            return _compress_with_python(scene_jsons, return_exceptions)
+        pool = get_shared_pool(pool_size)
+        return pool.compress_many(scene_jsons, return_exceptions=return_exceptions)
+    except CompressionError as e:
+        print(f"❌ JSON压缩失败: {e}")
         raise
     except FileNotFoundError:
-        print("❌ 未找到Node.js或compress_json.js脚本")
-        print("   请确保已安装Node.js并运行 'npm install json-url'")
+        print("❌ 未找到Node.js或compress_worker.js脚本")
+        print("   请确保已安装Node.js并运行 'npm install json-url'，或改用 backend='python'")
         raise
 
 
-def create_local_html(scene: RayOpticsScene, output_html: str):
-    """创建本地HTML文件来显示场景 - 使用LZMA压缩的URL hash方式"""
+def create_local_html(scene: RayOpticsScene, output_html: str, simulator_url: Optional[str] = None) -> str:
+    """
+    为场景生成查看页 - 写入共享查看器 viewer.html 的场景清单（见 scene_viewer.py）
 
-    json_data = scene.to_json(indent=None)  # 不需要缩进，减少大小
+    output_html: 以前的单页路径（如 output/html/test.html），其目录作为查看器目录，文件名作为场景名
+    simulator_url: 仿真器地址（默认由 get_simulator_url() 决定）
 
-    # 使用LZMA压缩场景数据
+    返回场景查看页地址（viewer.html?scene=<场景名>），可直接传给 screenshot_with_selenium
+    """
+    from scene_viewer import create_html_from_json
+
+    json_data = scene.to_json(indent=None)  # 不需要缩进，减少大小
     compressed_scene = compress_scene_for_url(json_data)
+    json_dict = dict(json.loads(json_data), name=scene.name)  # name只用于查看页显示
+    return create_html_from_json(json_dict, output_html,
+                                 compressed_scene=compressed_scene, simulator_url=simulator_url)
 
-    html_content = f"""<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>Ray Optics - {scene.name}</title>
-    <style>
-        body {{
-            margin: 0;
-            padding: 0;
-            font-family: Arial, sans-serif;
-            background: #000;
-            color: white;
-            overflow: hidden;
-        }}
-        #info {{
-            position: fixed;
-            top: 10px;
-            left: 10px;
-            padding: 10px 15px;
-            background: rgba(0, 0, 0, 0.8);
-            border-radius: 5px;
-            z-index: 1000;
-            font-size: 12px;
-        }}
-        #loading {{
-            position: fixed;
-            top: 50%;
-            left: 50%;
-            transform: translate(-50%, -50%);
-            text-align: center;
-        }}
-        .spinner {{
-            border: 4px solid rgba(255, 255, 255, 0.1);
-            border-top: 4px solid white;
-            border-radius: 50%;
-            width: 40px;
-            height: 40px;
-            animation: spin 1s linear infinite;
-            margin: 0 auto 10px;
-        }}
-        @keyframes spin {{
-            0% {{ transform: rotate(0deg); }}
-            100% {{ transform: rotate(360deg); }}
-        }}
-        iframe {{
-            position: fixed;
-            top: 0;
-            left: 0;
-            width: 100%;
-            height: 100%;
-            border: none;
-        }}
-    </style>
-</head>
-<body>
-    <div id="info">
-        <strong>{scene.name}</strong><br>
-        {scene.width}x{scene.height} | {len(scene.objects)} objects
-    </div>
-
-    <div id="loading">
-        <div class="spinner"></div>
-        <div>Loading simulator...</div>
-    </div>
-
-    <iframe id="simulator"></iframe>
-
-    <script>
-        // 使用LZMA压缩的场景数据（已在Python中压缩）
-        const compressedScene = '{compressed_scene}';
-
-        // 直接使用压缩后的hash加载场景（ray-optics官方格式）
-        const simulatorURL = 'https://phydemo.app/ray-optics/simulator/#' + compressedScene;
-
-        const iframe = document.getElementById('simulator');
-        const loading = document.getElementById('loading');
-
-        console.log('Compressed scene length:', compressedScene.length);
-        console.log('Loading URL:', simulatorURL);
-
-        // 加载仿真器
-        iframe.src = simulatorURL;
-
-        // 监听iframe加载
-        iframe.onload = function() {{
-            // 给ray-optics足够时间来解压和加载场景
-            setTimeout(function() {{
-                loading.style.display = 'none';
-                console.log('✓ Scene loaded via LZMA compressed hash');
-            }}, 3000);
-        }};
-    </script>
-</body>
-</html>
-"""
 
-    with open(output_html, 'w', encoding='utf-8') as f:
-        f.write(html_content)
+# 渲染就绪检测配置
+READY_TIMEOUT = 30  # 等待场景渲染完成的最长时间（秒）
+READY_POLL_INTERVAL = 0.2  # 轮询间隔（秒）
+READY_STABLE_CHECKS = 2  # 连续多少次截图内容不变视为渲染完成
+STEP_CHANGE_TIMEOUT = 2  # 切换场景后等待画面开始变化的最长时间（秒）
+
+
+def _switch_to_simulator(driver) -> bool:
+    """切换到仿真器iframe，失败时停留在主页面"""
+    driver.switch_to.default_content()
+    try:
+        iframe = driver.find_element("id", "simulator")
+        driver.switch_to.frame(iframe)
+        return True
+    except Exception:
+        return False
+
+
+def _png_digest(png: bytes) -> bytes:
+    import hashlib
+    return hashlib.md5(png).digest()
+
 
-    print(f"✓ HTML文件已创建: {output_html}")
-    print(f"  场景数据已使用LZMA压缩（压缩后长度: {len(compressed_scene)} 字符）")
-    print(f"  在浏览器中打开此文件即可查看场景")
+def _screenshot_digest(driver) -> bytes:
+    return _png_digest(driver.get_screenshot_as_png())
 
-    return output_html
 
+def _wait_until_stable(driver, timeout: float, poll_interval: float, stable_checks: int):
+    """wait_for_render_ready的实现，额外返回最后一次截图（PNG字节），就绪时可直接作为结果"""
+    import time
 
-def screenshot_with_selenium(html_file: str, output_image: str, wait_time: int = 5, crop_top: int = 75):
+    start = time.time()
+    deadline = start + timeout
+    last_hash = None
+    last_png = None
+    stable = 0
+
+    while True:
+        _switch_to_simulator(driver)
+        try:
+            loaded = driver.execute_script(
+                "return document.readyState === 'complete' && "
+                "document.querySelector('canvas') !== null;"
+            )
+        except Exception:
+            loaded = False
+
+        if loaded:
+            last_png = driver.get_screenshot_as_png()
+            digest = _png_digest(last_png)
+            stable = stable + 1 if digest == last_hash else 1
+            last_hash = digest
+            if stable >= stable_checks:
+                return True, time.time() - start, last_png
+
+        if time.time() >= deadline:
+            return False, time.time() - start, None
+        time.sleep(poll_interval)
+
+
+def wait_for_render_ready(driver, timeout: float = READY_TIMEOUT,
+                          poll_interval: float = READY_POLL_INTERVAL,
+                          stable_checks: int = READY_STABLE_CHECKS):
     """
-    使用Selenium截图HTML文件
+    轮询等待仿真器中的场景加载并渲染完成
 
-    参数:
-        html_file: HTML文件路径
-        output_image: 输出图片路径
-        wait_time: 等待时间（秒）
-        crop_top: 裁剪顶部像素数（默认：75）
+    页面中有仿真器iframe时在iframe内检测，否则直接检测当前页面（直接打开仿真器时）
+
+    判定条件:
+      1. 文档已加载完成（document.readyState == 'complete'）
+      2. 页面中已出现canvas
+      3. 连续 stable_checks 次截图的哈希值相同（画面不再变化）
+
+    返回:
+        (是否就绪, 等待用时秒数)；超时返回 (False, timeout)
     """
-    try:
-        from selenium import webdriver
-        from selenium.webdriver.chrome.options import Options
-        import time
+    ready, elapsed, _ = _wait_until_stable(driver, timeout, poll_interval, stable_checks)
+    return ready, elapsed
+
 
-        options = Options()
-        options.add_argument('--headless=new')
-        options.add_argument('--no-sandbox')
-        options.add_argument('--disable-dev-shm-usage')
-        options.add_argument('--window-size=1920,1080')
+def _capture_page(driver, html_file: str, wait_time, ready_timeout: float):
+    """
+    用已启动的浏览器打开HTML文件并截图到内存
 
-        driver = webdriver.Chrome(options=options)
+    html_file可以带查询参数或hash（如共享查看器的 viewer.html?scene=test_01）
 
-        # 使用file:// URL打开本地文件
-        abs_path = os.path.abspath(html_file)
-        file_url = f'file://{abs_path}'
+    返回 (PNG字节, 场景就绪用时秒数)
+    """
+    import time
 
-        print(f"正在打开: {file_url}")
-        driver.get(file_url)
+    # 使用file:// URL打开本地文件
+    abs_path = os.path.abspath(html_file)
+    file_url = f'file://{abs_path}'
 
-        # 等待iframe加载
+    print(f"正在打开: {file_url}")
+    driver.get(file_url)
+
+    png = None
+    if wait_time is not None:
+        # 固定等待
         print(f"等待 {wait_time} 秒...")
         time.sleep(wait_time)
-
-        # 切换到iframe
-        try:
-            iframe = driver.find_element("id", "simulator")
-            driver.switch_to.frame(iframe)
+        ready_time = float(wait_time)
+        if _switch_to_simulator(driver):
             print("✓ 已切换到iframe")
-        except:
+        else:
             print("⚠ 无法切换到iframe，使用主页面截图")
+    else:
+        # 等待场景渲染稳定（稳定时的最后一次截图即为结果）
+        ready, ready_time, png = _wait_until_stable(
+            driver, ready_timeout, READY_POLL_INTERVAL, READY_STABLE_CHECKS
+        )
+        if ready:
+            print(f"✓ 场景已渲染完成（{ready_time:.2f} 秒）")
+        else:
+            print(f"⚠ 等待渲染超时（{ready_timeout} 秒），直接截图")
 
-        # 截图
-        driver.save_screenshot(output_image)
-        print(f"✓ 截图已保存: {output_image}")
+    if png is None:
+        png = driver.get_screenshot_as_png()
+    return png, ready_time
 
+
+def _step_to_scene(driver, compressed_scene: str, ready_timeout: float, simulator_url: str):
+    """
+    在已打开的仿真器页面中切换到新场景并截图到内存
+
+    首次使用时直接打开仿真器页面；之后只修改URL hash，
+    仿真器会在popstate事件中解压并加载新场景，无需重新加载页面和脚本。
+
+    返回 (PNG字节, 场景就绪用时秒数)
+    """
+    import time
+
+    start = time.time()
+    target_url = simulator_url + '#' + compressed_scene
+    driver.switch_to.default_content()
+    current_url = driver.current_url or ''
+
+    if not current_url.startswith(simulator_url):
+        # 首帧：加载仿真器
+        driver.get(target_url)
+    elif current_url != target_url:
+        # 后续帧：只切换hash，等待画面开始变化（sceneChanged事件或截图变化）
+        before = _screenshot_digest(driver)
+        driver.execute_script(
+            "window.__rayOpticsSceneChanged = false;"
+            "document.addEventListener('sceneChanged', function () {"
+            "  window.__rayOpticsSceneChanged = true;"
+            "}, {once: true});"
+            "window.location.hash = arguments[0];",
+            compressed_scene,
+        )
+        deadline = start + min(STEP_CHANGE_TIMEOUT, ready_timeout)
+        while time.time() < deadline:
+            if driver.execute_script("return window.__rayOpticsSceneChanged === true;"):
+                break
+            if _screenshot_digest(driver) != before:
+                break
+            time.sleep(READY_POLL_INTERVAL / 4)
+
+    remaining = max(0.0, ready_timeout - (time.time() - start))
+    ready, _, png = _wait_until_stable(driver, remaining, READY_POLL_INTERVAL, READY_STABLE_CHECKS)
+    ready_time = time.time() - start
+    if not ready:
+        print(f"⚠ 等待渲染超时（{ready_timeout} 秒），直接截图")
+        png = driver.get_screenshot_as_png()
+    return png, ready_time
+
+
+def crop_png(png: bytes, crop_top: int) -> bytes:
+    """
+    在内存中裁剪PNG顶部（去除仿真器工具栏），只重新编码一次
+
+    未安装Pillow或crop_top<=0时原样返回
+    """
+    if crop_top <= 0:
+        return png
+    try:
+        from PIL import Image
+    except ImportError:
+        print("⚠ 未安装PIL/Pillow，跳过裁剪")
+        print("  安装: pip install pillow")
+        return png
+
+    import io
+
+    img = Image.open(io.BytesIO(png))
+    width, height = img.size
+
+    # 裁剪：从crop_top像素开始到底部
+    cropped = img.crop((0, crop_top, width, height))
+    buffer = io.BytesIO()
+    cropped.save(buffer, format='PNG')
+    return buffer.getvalue()
+
+
+def _run_with_driver(capture, driver=None, pool=None):
+    """使用指定的浏览器、浏览器池中租借的浏览器或临时启动的浏览器执行截图"""
+    if driver is not None:
+        return capture(driver)
+    if pool is not None:
+        with pool.lease() as leased:
+            return capture(leased)
+
+    from browser_pool import create_chrome_driver
+
+    driver = create_chrome_driver()
+    try:
+        return capture(driver)
+    finally:
         driver.quit()
 
-        # 裁剪顶部（如果需要）
-        if crop_top > 0:
-            try:
-                from PIL import Image
-                img = Image.open(output_image)
-                width, height = img.size
-
-                # 裁剪：从crop_top像素开始到底部
-                cropped = img.crop((0, crop_top, width, height))
-                cropped.save(output_image)
-                print(f"✓ 已裁剪顶部 {crop_top}px")
-
-                # 更新文件大小
-                size = os.path.getsize(output_image)
-                print(f"  裁剪后大小: {size / 1024:.1f} KB")
-            except ImportError:
-                print("⚠ 未安装PIL/Pillow，跳过裁剪")
-                print("  安装: pip install pillow")
-            except Exception as e:
-                print(f"⚠ 裁剪失败: {e}")
+
+def _finish_capture(png: bytes, output_image: Optional[str], crop_top: int) -> bytes:
+    """裁剪截图，需要时写入文件（只写一次磁盘）"""
+    if crop_top > 0:
+        try:
+            cropped = crop_png(png, crop_top)
+        except Exception as e:
+            print(f"⚠ 裁剪失败: {e}")
+            cropped = png
+        # crop_png 未裁剪时（如未安装Pillow）原样返回输入
+        if cropped is png:
+            print(f"⚠ 截图未裁剪（仍包含顶部 {crop_top}px 的工具栏）")
         else:
-            # 检查文件大小
-            size = os.path.getsize(output_image)
-            print(f"  文件大小: {size / 1024:.1f} KB")
+            print(f"✓ 已裁剪顶部 {crop_top}px")
+        png = cropped
+
+    if output_image is not None:
+        with open(output_image, 'wb') as f:
+            f.write(png)
+        print(f"✓ 截图已保存: {output_image}")
+    print(f"  文件大小: {len(png) / 1024:.1f} KB")
+    return png
 
-        return True
+
+def capture_html_png(html_file: str, output_image: Optional[str] = None,
+                     wait_time: Optional[float] = None, crop_top: int = 75, driver=None, pool=None,
+                     ready_timeout: float = READY_TIMEOUT,
+                     timings: Optional[list] = None) -> Optional[bytes]:
+    """
+    使用Selenium截图HTML文件，返回裁剪后的PNG字节
+
+    截图、裁剪都在内存中完成；output_image为None时不写磁盘。
+    参数同 screenshot_with_selenium，失败时返回None。
+    """
+    try:
+        png, ready_time = _run_with_driver(
+            lambda d: _capture_page(d, html_file, wait_time, ready_timeout),
+            driver=driver, pool=pool,
+        )
+        if timings is not None:
+            timings.append(ready_time)
+        return _finish_capture(png, output_image, crop_top)
 
     except ImportError:
         print("❌ 未安装selenium")
         print("   运行: pip install selenium")
-        return False
+        return None
     except Exception as e:
         print(f"❌ 截图失败: {e}")
         import traceback
         traceback.print_exc()
-        return False
+        return None
+
+
+def capture_scene_png(compressed_scene: str, output_image: Optional[str] = None, crop_top: int = 75,
+                      driver=None, pool=None, ready_timeout: float = READY_TIMEOUT,
+                      timings: Optional[list] = None,
+                      simulator_url: Optional[str] = None) -> Optional[bytes]:
+    """
+    单页步进截图，返回裁剪后的PNG字节（output_image为None时不写磁盘）
+
+    参数同 screenshot_scene_stepping，失败时返回None。
+    """
+    if simulator_url is None:
+        simulator_url = get_simulator_url()
+
+    try:
+        png, ready_time = _run_with_driver(
+            lambda d: _step_to_scene(d, compressed_scene, ready_timeout, simulator_url),
+            driver=driver, pool=pool,
+        )
+        if timings is not None:
+            timings.append(ready_time)
+        print(f"✓ 场景已渲染完成（{ready_time:.2f} 秒）")
+        return _finish_capture(png, output_image, crop_top)
+
+    except ImportError:
+        print("❌ 未安装selenium")
+        print("   运行: pip install selenium")
+        return None
+    except Exception as e:
+        print(f"❌ 截图失败: {e}")
+        return None
+
+
+def screenshot_with_selenium(html_file: str, output_image: str, wait_time: Optional[float] = None,
+                             crop_top: int = 75, driver=None, pool=None,
+                             ready_timeout: float = READY_TIMEOUT, timings: Optional[list] = None):
+    """
+    使用Selenium截图HTML文件
+
+    参数:
+        html_file: HTML文件路径（或共享查看器地址，如 output/html/viewer.html?scene=test_01）
+        output_image: 输出图片路径
+        wait_time: 固定等待时间（秒）；默认None，表示轮询等待场景渲染稳定后再截图
+        crop_top: 裁剪顶部像素数（默认：75）
+        driver: 复用已启动的浏览器（不会被关闭）
+        pool: 从BrowserPool租借浏览器（见browser_pool.py）
+        ready_timeout: 等待渲染稳定的最长时间（秒）
+        timings: 传入列表时，追加本帧的就绪用时（秒）
+
+    未指定driver和pool时，为本次截图单独启动并关闭一个浏览器。
+    需要直接拿到图片数据（不经过磁盘）时使用 capture_html_png。
+    """
+    return capture_html_png(html_file, output_image, wait_time=wait_time, crop_top=crop_top,
+                            driver=driver, pool=pool, ready_timeout=ready_timeout,
+                            timings=timings) is not None
+
+
+def screenshot_scene_stepping(compressed_scene: str, output_image: str, crop_top: int = 75,
+                              driver=None, pool=None, ready_timeout: float = READY_TIMEOUT,
+                              timings: Optional[list] = None, simulator_url: Optional[str] = None):
+    """
+    单页步进截图：仿真器在每个浏览器中只加载一次，之后通过修改URL hash切换场景
+
+    适合轨迹等连续多帧场景，每帧省去加载HTML和仿真器脚本的时间。
+    参数与 screenshot_with_selenium 相同，但直接接收压缩后的场景hash而不是HTML文件。
+    """
+    return capture_scene_png(compressed_scene, output_image, crop_top=crop_top, driver=driver,
+                             pool=pool, ready_timeout=ready_timeout, timings=timings,
+                             simulator_url=simulator_url) is not None
 
 
 def main():
@@ -251,13 +496,12 @@ def main():
     scene.add_object(FlatMirror(Point(500, 250), Point(700, 450)))
 
     # 生成本地HTML
-    html_file = "output/viewer.html"
-    create_local_html(scene, html_file)
+    html_file = create_local_html(scene, "output/html/local_test.html")
 
     # 尝试自动截图
     print("\n尝试自动截图...")
     output_image = "output/viewer_screenshot.png"
-    success = screenshot_with_selenium(html_file, output_image, wait_time=10)
+    success = screenshot_with_selenium(html_file, output_image)
 
     if not success:
         print("\n" + "=" * 60)
@@ -0,0 +1,293 @@
+#!/usr/bin/env python3
+"""
+场景空间索引 - 均匀网格，按区域/点/线段/最近邻查询对象
+
+RayOpticsScene.objects 是普通列表，"视口内有哪些元件"、"轨迹经过哪些对象附近"、
+"光源是否在玻璃内"这类问题都要扫描全部对象。SpatialIndex 把每个对象的包围盒登记到
+覆盖的网格单元中，查询只检查相关单元里的对象，10万个对象的场景也能快速回答。
+
+对象的几何形状由 to_dict() 的输出得到，所有类型（包括 RawObject、ObjectStore）都适用:
+  - x/y（PointSource）: 点
+  - p1/p2（Mirror、Blocker、IdealLens、Beam）: 线段；有p3时（ParabolicMirror）: p1-p3-p2 折线
+  - path（Glass）: 闭合多边形
+
+用法（通常通过 RayOpticsScene 的同名方法使用）:
+    scene.query_rect(0, 0, 1200, 600)          # 包围盒与矩形相交的对象
+    scene.query_point(400, 300)                # 包含该点的对象（玻璃内部、线段上）
+    scene.nearest(400, 300, k=3)               # 最近的3个对象
+    scene.query_segment(0, 0, 1000, 600)       # 与线段相交的对象
+"""
+
+import heapq
+import math
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+
+MAX_CELLS_PER_OBJECT = 256  # 包围盒覆盖更多单元的对象（如贯穿场景的长镜面）单独存放，每次查询都检查
+TARGET_OBJECTS_PER_CELL = 4  # 自动选择单元大小时每个单元的平均对象数
+
+Segment = Tuple[float, float, float, float]
+
+
+def object_geometry(data: Dict[str, Any]) -> Tuple[List[Segment], bool]:
+    """
+    由对象字典得到几何形状
+
+    返回 (线段列表, 是否闭合多边形)；点表示为两端相同的线段，没有坐标的对象返回空列表
+    """
+    if "path" in data:
+        points = [(p["x"], p["y"]) for p in data["path"]]
+        segments = [points[i - 1] + points[i] for i in range(len(points))]
+        return segments, len(points) >= 3
+    if "p1" in data and "p2" in data:
+        points = [data["p1"], data["p3"], data["p2"]] if "p3" in data else [data["p1"], data["p2"]]
+        points = [(p["x"], p["y"]) for p in points]
+        return [points[i] + points[i + 1] for i in range(len(points) - 1)], False
+    if "x" in data and "y" in data:
+        return [(data["x"], data["y"], data["x"], data["y"])], False
+    return [], False
+
+
+def _bounds(segments: List[Segment]) -> Tuple[float, float, float, float]:
+    xs = [s[0] for s in segments] + [s[2] for s in segments]
+    ys = [s[1] for s in segments] + [s[3] for s in segments]
+    return min(xs), min(ys), max(xs), max(ys)
+
+
+def _point_segment_distance(x: float, y: float, segment: Segment) -> float:
+    x1, y1, x2, y2 = segment
+    dx, dy = x2 - x1, y2 - y1
+    length2 = dx * dx + dy * dy
+    t = 0.0 if length2 == 0 else max(0.0, min(1.0, ((x - x1) * dx + (y - y1) * dy) / length2))
+    return math.hypot(x - (x1 + t * dx), y - (y1 + t * dy))
+
+
+def _inside_polygon(x: float, y: float, segments: List[Segment]) -> bool:
+    inside = False
+    for x1, y1, x2, y2 in segments:
+        if (y1 > y) != (y2 > y) and x < x1 + (y - y1) * (x2 - x1) / (y2 - y1):
+            inside = not inside
+    return inside
+
+
+def _cross(ax, ay, bx, by, cx, cy) -> float:
+    return (bx - ax) * (cy - ay) - (by - ay) * (cx - ax)
+
+
+def _segments_intersect(a: Segment, b: Segment) -> bool:
+    """两条线段是否相交（包括端点接触）"""
+    ax1, ay1, ax2, ay2 = a
+    bx1, by1, bx2, by2 = b
+    if (max(ax1, ax2) < min(bx1, bx2) or max(bx1, bx2) < min(ax1, ax2)
+            or max(ay1, ay2) < min(by1, by2) or max(by1, by2) < min(ay1, ay2)):
+        return False
+    d1 = _cross(bx1, by1, bx2, by2, ax1, ay1)
+    d2 = _cross(bx1, by1, bx2, by2, ax2, ay2)
+    d3 = _cross(ax1, ay1, ax2, ay2, bx1, by1)
+    d4 = _cross(ax1, ay1, ax2, ay2, bx2, by2)
+    if ((d1 > 0) != (d2 > 0) or d1 == 0 or d2 == 0) and ((d3 > 0) != (d4 > 0) or d3 == 0 or d4 == 0):
+        # 共线时包围盒已重叠即相交；否则两组端点分居两侧
+        return True
+    return False
+
+
+class SpatialIndex:
+    """
+    均匀网格空间索引（保存对象下标，不保存对象本身）
+
+    参数:
+        cell_size: 网格单元边长（场景坐标）
+    """
+
+    def __init__(self, cell_size: float):
+        if cell_size <= 0:
+            raise ValueError(f"网格单元大小必须为正数: {cell_size}")
+        self.cell_size = float(cell_size)
+        self._cells: Dict[Tuple[int, int], List[int]] = {}
+        self._large: List[int] = []  # 覆盖单元过多的对象
+        self._geometry: Dict[int, Tuple[List[Segment], bool, Tuple[float, float, float, float]]] = {}
+        self._cell_bounds = None  # 已占用单元的范围 (cx0, cy0, cx1, cy1)，用于终止最近邻搜索
+
+    @classmethod
+    def build(cls, dicts: Iterable[Dict[str, Any]], width: float = 1200, height: float = 600,
+              count: Optional[int] = None) -> 'SpatialIndex':
+        """
+        为对象字典序列建立索引（下标为序列中的位置）
+
+        单元大小按场景面积和对象数自动选择，平均每个单元约 TARGET_OBJECTS_PER_CELL 个对象
+        """
+        count = count or 1
+        cell_size = math.sqrt(max(width, 1) * max(height, 1) * TARGET_OBJECTS_PER_CELL / count)
+        index = cls(cell_size)
+        for i, data in enumerate(dicts):
+            index.insert(i, data)
+        return index
+
+    def __len__(self) -> int:
+        return len(self._geometry)
+
+    def _cell(self, x: float, y: float) -> Tuple[int, int]:
+        return math.floor(x / self.cell_size), math.floor(y / self.cell_size)
+
+    def insert(self, item: int, data: Dict[str, Any]):
+        """登记一个对象（item 通常是对象在场景中的下标）"""
+        segments, closed = object_geometry(data)
+        if not segments:
+            return
+        bounds = _bounds(segments)
+        self._geometry[item] = (segments, closed, bounds)
+        cx0, cy0 = self._cell(bounds[0], bounds[1])
+        cx1, cy1 = self._cell(bounds[2], bounds[3])
+        if (cx1 - cx0 + 1) * (cy1 - cy0 + 1) > MAX_CELLS_PER_OBJECT:
+            self._large.append(item)
+            return
+        cells = self._cells
+        for cx in range(cx0, cx1 + 1):
+            for cy in range(cy0, cy1 + 1):
+                cells.setdefault((cx, cy), []).append(item)
+        if self._cell_bounds is None:
+            self._cell_bounds = (cx0, cy0, cx1, cy1)
+        else:
+            bx0, by0, bx1, by1 = self._cell_bounds
+            self._cell_bounds = (min(bx0, cx0), min(by0, cy0), max(bx1, cx1), max(by1, cy1))
+
+    def _candidates_in_cells(self, cx0: int, cy0: int, cx1: int, cy1: int) -> set:
+        found = set(self._large)
+        cells = self._cells
+        if (cx1 - cx0 + 1) * (cy1 - cy0 + 1) > len(cells):
+            # 查询范围比已占用的单元还多时直接遍历已占用单元
+            for (cx, cy), items in cells.items():
+                if cx0 <= cx <= cx1 and cy0 <= cy <= cy1:
+                    found.update(items)
+            return found
+        for cx in range(cx0, cx1 + 1):
+            for cy in range(cy0, cy1 + 1):
+                items = cells.get((cx, cy))
+                if items:
+                    found.update(items)
+        return found
+
+    # ---------- 查询 ----------
+
+    def query_rect(self, xmin: float, ymin: float, xmax: float, ymax: float) -> List[int]:
+        """包围盒与矩形相交的对象（按下标排序）"""
+        cx0, cy0 = self._cell(xmin, ymin)
+        cx1, cy1 = self._cell(xmax, ymax)
+        result = []
+        for item in self._candidates_in_cells(cx0, cy0, cx1, cy1):
+            bx0, by0, bx1, by1 = self._geometry[item][2]
+            if bx0 <= xmax and bx1 >= xmin and by0 <= ymax and by1 >= ymin:
+                result.append(item)
+        result.sort()
+        return result
+
+    def distance(self, item: int, x: float, y: float) -> float:
+        """点到对象的距离（闭合多边形内部为0）"""
+        segments, closed, _ = self._geometry[item]
+        if closed and _inside_polygon(x, y, segments):
+            return 0.0
+        return min(_point_segment_distance(x, y, segment) for segment in segments)
+
+    def query_point(self, x: float, y: float, tolerance: float = 1e-9) -> List[int]:
+        """包含该点（距离不超过tolerance）的对象，例如光源所在的玻璃"""
+        return [item for item in self.query_rect(x - tolerance, y - tolerance, x + tolerance, y + tolerance)
+                if self.distance(item, x, y) <= tolerance]
+
+    def nearest(self, x: float, y: float, k: int = 1,
+                max_distance: Optional[float] = None) -> List[Tuple[float, int]]:
+        """
+        距离最近的k个对象，返回 [(距离, 下标), ...]（由近到远）
+
+        从点所在单元向外逐圈搜索，第r圈之外的对象距离至少为 r * cell_size
+        """
+        if not self._geometry:
+            return []
+        limit = math.inf if max_distance is None else max_distance
+        best = []  # 最大堆: (-距离, -下标)
+        seen = set()
+
+        def consider(items):
+            for item in items:
+                if item in seen:
+                    continue
+                seen.add(item)
+                distance = self.distance(item, x, y)
+                if distance > limit:
+                    continue
+                entry = (-distance, -item)
+                if len(best) < k:
+                    heapq.heappush(best, entry)
+                elif entry > best[0]:
+                    heapq.heapreplace(best, entry)
+
+        consider(self._large)
+        cx, cy = self._cell(x, y)
+        if self._cell_bounds is not None:
+            bx0, by0, bx1, by1 = self._cell_bounds
+            max_ring = max(abs(cx - bx0), abs(cx - bx1), abs(cy - by0), abs(cy - by1))
+            # 从第一个碰到已占用范围的圈开始（点在范围外很远时跳过中间的空圈）
+            ring = max(bx0 - cx, cx - bx1, by0 - cy, cy - by1, 0)
+            while ring <= max_ring:
+                reach = max(ring - 1, 0) * self.cell_size  # 第ring圈中的点到(x, y)的最小可能距离
+                if reach > limit or (len(best) == k and reach > -best[0][0]):
+                    break
+                if 8 * ring > len(self._cells):
+                    # 圈上的单元比已占用的单元还多时，剩余的已占用单元一次检查完
+                    for (gx, gy), items in self._cells.items():
+                        if max(abs(gx - cx), abs(gy - cy)) >= ring:
+                            consider(items)
+                    break
+                # 只遍历圈与已占用范围相交的部分
+                for gy in (cy - ring, cy + ring) if ring else (cy,):
+                    if by0 <= gy <= by1:
+                        for gx in range(max(cx - ring, bx0), min(cx + ring, bx1) + 1):
+                            consider(self._cells.get((gx, gy), ()))
+                for gx in (cx - ring, cx + ring) if ring else ():
+                    if bx0 <= gx <= bx1:
+                        for gy in range(max(cy - ring + 1, by0), min(cy + ring - 1, by1) + 1):
+                            consider(self._cells.get((gx, gy), ()))
+                ring += 1
+        return sorted((-distance, -item) for distance, item in best)
+
+    def _cells_on_segment(self, x1: float, y1: float, x2: float, y2: float):
+        """线段经过的网格单元（网格遍历算法）"""
+        size = self.cell_size
+        cx, cy = self._cell(x1, y1)
+        ex, ey = self._cell(x2, y2)
+        dx, dy = x2 - x1, y2 - y1
+        step_x = 1 if dx > 0 else -1
+        step_y = 1 if dy > 0 else -1
+        t_max_x = ((cx + (step_x > 0)) * size - x1) / dx if dx else math.inf
+        t_max_y = ((cy + (step_y > 0)) * size - y1) / dy if dy else math.inf
+        t_delta_x = size / abs(dx) if dx else math.inf
+        t_delta_y = size / abs(dy) if dy else math.inf
+        yield cx, cy
+        for _ in range(abs(ex - cx) + abs(ey - cy)):
+            if t_max_x < t_max_y:
+                cx += step_x
+                t_max_x += t_delta_x
+            else:
+                cy += step_y
+                t_max_y += t_delta_y
+            yield cx, cy
+
+    def query_segment(self, x1: float, y1: float, x2: float, y2: float) -> List[int]:
+        """与线段相交的对象（包括端点落在闭合多边形内部的情况），按下标排序"""
+        found = set(self._large)
+        for cell in self._cells_on_segment(x1, y1, x2, y2):
+            items = self._cells.get(cell)
+            if items:
+                found.update(items)
+        query = (x1, y1, x2, y2)
+        result = []
+        for item in found:
+            segments, closed, _ = self._geometry[item]
+            if any(_segments_intersect(query, segment) for segment in segments) or (
+                    closed and _inside_polygon(x1, y1, segments)):
+                result.append(item)
+        result.sort()
+        return result
+
+    def __repr__(self) -> str:
+        return (f"SpatialIndex({len(self._geometry)} objects, cell_size={self.cell_size:g}, "
+                f"{len(self._cells)} cells, {len(self._large)} large)")
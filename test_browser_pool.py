@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+测试浏览器池：按需启动、按帧数/内存回收、出错时丢弃，以及关闭后不再租借（用假浏览器，不需要Chrome）
+"""
+
+import pytest
+
+import browser_pool
+from browser_pool import BrowserPool
+
+
+class FakeDriver:
+    def __init__(self, number):
+        self.number = number
+        self.quit_called = False
+
+    def quit(self):
+        self.quit_called = True
+
+
+class FakeFactory:
+    def __init__(self):
+        self.drivers = []
+
+    def __call__(self):
+        driver = FakeDriver(len(self.drivers))
+        self.drivers.append(driver)
+        return driver
+
+
+def test_lazy_launch_and_frame_recycling():
+    factory = FakeFactory()
+    pool = BrowserPool(size=2, max_frames=2, max_memory_mb=0, driver_factory=factory)
+    assert factory.drivers == [] and pool.launched == 0  # 首次使用时才启动
+
+    with pool.lease() as driver:
+        assert driver is factory.drivers[0]
+    assert (pool.launched, pool.recycled) == (1, 0)
+
+    # size=1 时同一个槽位反复租借：2帧后回收，下次租借时重建
+    pool = BrowserPool(size=1, max_frames=2, max_memory_mb=0, driver_factory=factory)
+    used = []
+    for _ in range(5):
+        with pool.lease() as driver:
+            used.append(driver.number)
+    assert used == [1, 1, 2, 2, 3]
+    assert (pool.launched, pool.recycled, pool.crashed) == (3, 2, 0)
+    assert factory.drivers[1].quit_called and factory.drivers[2].quit_called
+    assert not factory.drivers[3].quit_called
+
+    pool.close()
+    assert factory.drivers[3].quit_called
+
+
+def test_warm_pool():
+    factory = FakeFactory()
+    with BrowserPool(size=3, max_memory_mb=0, driver_factory=factory, warm=True) as pool:
+        assert pool.launched == 3 and len(factory.drivers) == 3
+    assert all(driver.quit_called for driver in factory.drivers)
+
+
+def test_memory_recycling(monkeypatch):
+    memory = {}
+    monkeypatch.setattr(browser_pool, "get_driver_memory_mb", lambda driver: memory.get(driver.number))
+    factory = FakeFactory()
+    pool = BrowserPool(size=1, max_frames=0, max_memory_mb=500, driver_factory=factory)
+
+    memory[0] = 100
+    with pool.lease():
+        pass
+    memory[0] = 800  # 超过上限后归还时回收
+    with pool.lease():
+        pass
+    with pool.lease() as driver:
+        assert driver.number == 1
+    assert (pool.launched, pool.recycled) == (2, 1)
+    assert factory.drivers[0].quit_called
+
+    # 读取不到内存时不回收
+    with pool.lease() as driver:
+        assert driver.number == 1
+    assert pool.recycled == 1
+
+
+def test_crash_discards_slot():
+    factory = FakeFactory()
+    pool = BrowserPool(size=1, max_frames=0, max_memory_mb=0, driver_factory=factory)
+    with pytest.raises(RuntimeError, match="崩溃"):
+        with pool.lease():
+            raise RuntimeError("浏览器崩溃")
+    assert pool.crashed == 1 and factory.drivers[0].quit_called
+
+    with pool.lease() as driver:  # 槽位已归还，重建新的浏览器
+        assert driver.number == 1
+    assert (pool.launched, pool.recycled, pool.crashed) == (2, 0, 1)
+
+
+def test_lease_after_close():
+    pool = BrowserPool(size=1, driver_factory=FakeFactory())
+    pool.close()
+    pool.close()  # 重复关闭没有副作用
+    with pytest.raises(RuntimeError):
+        with pool.lease():
+            pass
+    with pytest.raises(ValueError):
+        BrowserPool(size=0)
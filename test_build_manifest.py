@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+测试构建清单：重建判断（场景哈希、渲染设置、输出缺失）、自动保存，以及本地仿真器构建指纹
+"""
+
+import json
+import os
+
+import build_manifest
+from build_manifest import BuildManifest, render_settings, scene_hash
+from local_server import simulator_fingerprint
+
+
+SIMULATOR = "https://example.invalid/simulator/"
+SCENE = {"version": 5, "objs": [{"type": "Blocker", "p1": {"x": 0, "y": 0}, "p2": {"x": 1, "y": 1}}]}
+
+
+def _settings(**extra):
+    return render_settings(75, viewport=(800, 600), simulator_url=SIMULATOR, **extra)
+
+
+def test_needs_rebuild(tmp_path):
+    png = tmp_path / "a.png"
+    png.write_bytes(b"png")
+    outputs = [str(png)]
+    digest = scene_hash(SCENE)
+    manifest = BuildManifest(str(tmp_path / "manifest.json"))
+
+    assert manifest.needs_rebuild(str(png), digest, _settings(), outputs)  # 没有记录
+    manifest.record(str(png), digest, _settings())
+    assert not manifest.needs_rebuild(str(png), digest, _settings(), outputs)
+    # 键顺序不影响场景哈希
+    assert not manifest.needs_rebuild(str(png), scene_hash(dict(reversed(list(SCENE.items())))),
+                                      _settings(), outputs)
+
+    changed = {**SCENE, "objs": [{**SCENE["objs"][0], "p2": {"x": 2, "y": 1}}]}
+    assert manifest.needs_rebuild(str(png), scene_hash(changed), _settings(), outputs)
+    assert manifest.needs_rebuild(str(png), digest, render_settings(80, (800, 600), SIMULATOR), outputs)
+    assert manifest.needs_rebuild(str(png), digest, _settings(simulator_build="other"), outputs)
+    assert manifest.needs_rebuild(str(png), digest, _settings(), outputs + [str(tmp_path / "a.html")])
+
+    png.unlink()
+    assert manifest.needs_rebuild(str(png), digest, _settings(), outputs)
+
+    png.write_bytes(b"png")
+    assert BuildManifest(str(tmp_path / "manifest.json"), force=True).needs_rebuild(
+        str(png), digest, _settings(), outputs)
+    manifest.forget(str(png))
+    assert manifest.needs_rebuild(str(png), digest, _settings(), outputs)
+
+
+def test_save_and_autosave(tmp_path, monkeypatch):
+    monkeypatch.setattr(build_manifest, "AUTOSAVE_EVERY", 3)
+    path = tmp_path / "out" / "manifest.json"
+    calls = []
+    manifest = BuildManifest(str(path), before_save=lambda: calls.append(len(manifest.entries)))
+    for i in range(2):
+        manifest.record(f"frame_{i}.png", "digest", _settings())
+    assert not path.exists() and calls == []
+
+    manifest.record("frame_2.png", "digest", _settings())
+    saved = json.load(open(path))
+    assert saved["version"] == build_manifest.MANIFEST_VERSION and len(saved["entries"]) == 3
+    assert calls == [3]
+
+    manifest.record("frame_3.png", "digest", _settings())
+    assert len(json.load(open(path))["entries"]) == 3  # 未到自动保存间隔
+    with manifest:
+        pass
+    reloaded = BuildManifest(str(path))
+    assert not reloaded.needs_rebuild("frame_3.png", "digest", _settings())
+    assert not [f for f in os.listdir(path.parent) if f.endswith(".tmp")]
+
+    path.write_text("{broken")
+    assert BuildManifest(str(path)).entries == {}
+
+
+def test_simulator_fingerprint(tmp_path):
+    simulator = tmp_path / "simulator"
+    (simulator / "assets").mkdir(parents=True)
+    (simulator / "index.html").write_text("<html></html>")
+    bundle = simulator / "assets" / "main.js"
+    bundle.write_text("console.log(1);")
+    first = simulator_fingerprint(str(tmp_path))
+    assert simulator_fingerprint(str(tmp_path)) == first
+
+    # 构建产物变化（内容大小或修改时间）时指纹改变
+    bundle.write_text("console.log(12);")
+    second = simulator_fingerprint(str(tmp_path))
+    assert second != first
+    stat = os.stat(bundle)
+    os.utime(bundle, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    assert simulator_fingerprint(str(tmp_path)) != second
+
+    # 指纹参与设置哈希：本地仿真器更新后旧截图需要重建
+    manifest = BuildManifest(str(tmp_path / "manifest.json"))
+    manifest.record("a.png", "digest", _settings(simulator_build=first))
+    assert manifest.needs_rebuild("a.png", "digest", _settings(simulator_build=second))
+    assert not manifest.needs_rebuild("a.png", "digest", _settings(simulator_build=first))
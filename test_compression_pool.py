@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+测试常驻Node压缩进程池：与纯Python编码器往返一致、卡死进程超时重启，以及共享池扩容
+"""
+
+import json
+import os
+import shutil
+import threading
+
+import pytest
+
+import compression_pool
+from compression_pool import CompressionPool, close_shared_pool, get_shared_pool
+from json_url_codec import compress_json, decompress
+
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+pytestmark = pytest.mark.skipif(
+    shutil.which('node') is None or not os.path.isdir(os.path.join(ROOT, 'node_modules', 'json-url')),
+    reason="需要Node.js和json-url",
+)
+
+SCENES = [
+    json.dumps({"version": 5, "objs": [{"type": "PointSource", "x": i, "y": 2.5 * i, "brightness": 0.5}],
+                "name": f"场景{i}"}, ensure_ascii=False)
+    for i in range(8)
+]
+
+
+def test_round_trip():
+    with CompressionPool(size=2) as pool:
+        hashes = pool.compress_many(SCENES)
+        assert pool.compress(SCENES[0]) == hashes[0]
+    for scene_json, result in zip(SCENES, hashes):
+        assert decompress(result) == json.loads(scene_json)
+        assert result == compress_json(scene_json)
+
+
+def test_timeout_restarts_worker(tmp_path):
+    # 读取请求但从不响应的工作进程
+    script = tmp_path / "hang.js"
+    script.write_text("process.stdin.on('data', () => {});\n")
+    with CompressionPool(size=1, script=str(script), timeout=0.5) as pool:
+        with pytest.raises(TimeoutError):
+            pool.compress(SCENES[0])
+        assert pool.restarts == 1  # 超时后重启并重试一次
+        assert not pool._workers[0].alive()  # 仍然超时的进程已结束，不会留在池中卡住
+
+
+def test_shared_pool_grows_in_place():
+    close_shared_pool()
+    try:
+        pool = get_shared_pool(1)
+        results = []
+        worker = threading.Thread(target=lambda: results.append(pool.compress_many(SCENES)))
+        worker.start()
+        # 其他线程正在使用时请求更大的池：原有的池扩容而不是被关闭
+        assert get_shared_pool(2) is pool and pool.size == 2
+        assert get_shared_pool(1) is pool and pool.size == 2
+        worker.join()
+        assert results == [[compress_json(s) for s in SCENES]]
+        assert pool.compress_many(SCENES) == results[0]
+    finally:
+        close_shared_pool()
+    assert compression_pool._shared_pool is None
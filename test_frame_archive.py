@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+测试帧归档：差异还原、随机读取，以及轨迹生成写归档与逐帧JSON一致
+"""
+
+import copy
+import json
+import os
+
+import pytest
+
+from frame_archive import FrameArchive, FrameArchiveWriter, apply_delta, is_archive, scene_delta, write_archive
+from generate_trajectory import generate_trajectory_scenes
+
+
+BASE = {"version": 5, "objs": [{"type": "Blocker", "p1": {"x": 0, "y": 0}, "p2": {"x": 1, "y": 1}},
+                               {"type": "PointSource", "x": 1, "y": 2}], "width": 800, "simulateColors": True}
+
+
+def test_delta_round_trip():
+    frames = [
+        {**BASE, "objs": BASE["objs"][:1] + [{"type": "PointSource", "x": 1.0, "y": 5}]},  # 1 -> 1.0 需要写出
+        {**BASE, "objs": [], "scale": 2},
+        {"version": 5, "simulateColors": 1},
+        {**BASE, "objs": BASE["objs"] + [{"type": "Beam"}, {"type": "Blocker"}]},
+        [1, 2],
+    ]
+    snapshot = copy.deepcopy(BASE)
+    for frame in frames:
+        ops = scene_delta(BASE, frame)
+        restored = apply_delta(BASE, json.loads(json.dumps(ops)))
+        assert json.dumps(restored) == json.dumps(frame)
+    assert BASE == snapshot  # 还原不修改基础场景
+    assert scene_delta(BASE, BASE) == []
+    assert scene_delta(BASE, {**BASE}) == []
+
+
+def test_archive_random_access(tmp_path):
+    path = str(tmp_path / "frames.rayframes")
+    frames = [(f"f_{i:03d}", {**BASE, "objs": [BASE["objs"][0], {"type": "PointSource", "x": i, "y": -i}]})
+              for i in range(50)]
+    assert write_archive(path, frames) == 50
+    assert is_archive(path) and not is_archive(__file__)
+
+    with FrameArchive(path) as archive:
+        assert len(archive) == 50
+        assert archive.names == [name for name, _ in frames]
+        assert archive.base == frames[0][1]
+        assert archive.frame(37) == frames[37][1]
+        assert archive.frame(-1) == frames[-1][1]
+        assert archive["f_012"] == frames[12][1]
+        assert list(archive) == frames
+        with pytest.raises(IndexError):
+            archive.frame(50)
+
+    # 基础场景只存一次：50帧的归档远小于50个完整场景
+    assert os.path.getsize(path) < sum(len(json.dumps(scene)) for _, scene in frames) / 2
+
+
+def test_writer_errors(tmp_path):
+    with FrameArchiveWriter(str(tmp_path / "a.rayframes")) as writer:
+        with pytest.raises(ValueError):
+            writer.add_delta("a", [])  # 没有基础场景
+        writer.add("a", BASE)
+        with pytest.raises(ValueError):
+            writer.add("a", BASE)
+    # 写入中途出错时删除未完成的归档
+    def frames():
+        yield "a", BASE
+        raise RuntimeError("生成失败")
+    with pytest.raises(RuntimeError):
+        write_archive(str(tmp_path / "partial.rayframes"), frames())
+    assert not (tmp_path / "partial.rayframes").exists()
+
+    (tmp_path / "b.rayframes").write_bytes(b"not an archive at all, definitely not")
+    with pytest.raises(ValueError):
+        FrameArchive(str(tmp_path / "b.rayframes"))
+
+
+@pytest.mark.parametrize("light_type", ["PointSource", "Beam"])
+def test_trajectory_archive_matches_json(tmp_path, light_type):
+    base = {"objs": [BASE["objs"][0]], "width": 900}
+    trajectory = [{"x": 10.0 * i, "y": 300 - i} for i in range(25)]
+    light = {"type": light_type, "wavelength": 600, "brightness": 0.5, "width": 40}
+    json_dir = str(tmp_path / "json")
+    archive_path = str(tmp_path / "traj.rayframes")
+
+    files = generate_trajectory_scenes(base, trajectory, light, json_dir, "traj", quiet=True)
+    names = generate_trajectory_scenes(base, trajectory, light, json_dir, "traj", quiet=True,
+                                       archive=archive_path)
+    assert names == [os.path.splitext(os.path.basename(f))[0] for f in files]
+    with FrameArchive(archive_path) as archive:
+        for i, path in enumerate(files):
+            with open(path, 'r', encoding='utf-8') as f:
+                assert archive.frame(i) == json.load(f)
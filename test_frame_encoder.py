@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+测试动画编码：帧的顺序和数量（pillow后端写GIF；ffmpeg后端用假进程代替，不需要安装ffmpeg）
+"""
+
+import io
+
+import pytest
+
+import frame_encoder
+from frame_encoder import FrameEncoder
+
+Image = pytest.importorskip("PIL.Image")
+
+COLORS = [(255, 0, 0), (0, 255, 0), (0, 0, 255), (255, 255, 0)]
+
+
+def _png(color, size=(8, 6)):
+    buffer = io.BytesIO()
+    Image.new("RGB", size, color).save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+def test_pillow_gif_frame_order(tmp_path):
+    path = tmp_path / "anim" / "trajectory.gif"
+    with FrameEncoder(str(path), fps=10, backend="pillow") as encoder:
+        for color in COLORS[:-1]:
+            encoder.write(_png(color))
+        frame_file = tmp_path / "last.png"
+        frame_file.write_bytes(_png(COLORS[-1], size=(16, 12)))  # 尺寸不同的帧缩放到第一帧的大小
+        encoder.write_file(str(frame_file))
+    assert encoder.frames == len(COLORS) and encoder.size == (8, 6)
+
+    with Image.open(path) as gif:
+        assert gif.n_frames == len(COLORS)
+        for i, color in enumerate(COLORS):
+            gif.seek(i)
+            assert gif.size == (8, 6)
+            assert gif.convert("RGB").getpixel((3, 3)) == color
+            assert gif.info["duration"] == 100
+
+    with pytest.raises(RuntimeError):
+        encoder.write(_png(COLORS[0]))  # 已关闭
+    with pytest.raises(ValueError):
+        FrameEncoder(str(tmp_path / "a.mp4"), backend="pillow")
+
+
+class _FakeFfmpeg:
+    """代替ffmpeg进程：记录命令行和管道中收到的字节"""
+
+    instances = []
+
+    def __init__(self, command, stdin=None, stderr=None):
+        self.command = command
+        self.stdin = io.BytesIO()
+        self.stdin.close = lambda: None
+        self.stderr = io.BytesIO(b"")
+        _FakeFfmpeg.instances.append(self)
+
+    def wait(self):
+        return 0
+
+
+def test_ffmpeg_pipe_frame_order(tmp_path, monkeypatch):
+    monkeypatch.setattr(frame_encoder.subprocess, "Popen", _FakeFfmpeg)
+    _FakeFfmpeg.instances = []
+    frames = [_png(color) for color in COLORS]
+    path = str(tmp_path / "trajectory.mp4")
+    with FrameEncoder(path, fps=12, backend="ffmpeg") as encoder:
+        for png in frames:
+            encoder.write(png)
+
+    (process,) = _FakeFfmpeg.instances  # 只启动一个ffmpeg进程
+    assert process.command[0] == "ffmpeg" and process.command[-1] == path
+    assert process.command[process.command.index("-framerate") + 1] == "12"
+    assert process.stdin.getvalue() == b"".join(frames)  # 按写入顺序原样送入管道
+    assert encoder.frames == len(COLORS)
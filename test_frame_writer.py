@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+测试按需生成的帧经有界线程池写盘
+"""
+
+import json
+import threading
+
+import pytest
+
+import frame_writer
+from frame_writer import FrameWriter, write_frames
+from ray_optics_controller import *
+from scene_template import compile_light_template
+
+
+class _WatchedSlots:
+    """代替 FrameWriter 的排队信号量，记录 submit 何时因排队已满而阻塞"""
+
+    def __init__(self, size):
+        self._semaphore = threading.BoundedSemaphore(size)
+        self.blocked = threading.Event()
+
+    def acquire(self):
+        if not self._semaphore.acquire(blocking=False):
+            self.blocked.set()
+            self._semaphore.acquire()
+
+    def release(self):
+        self._semaphore.release()
+
+
+def test_backpressure(tmp_path, monkeypatch):
+    """生成器领先写盘的帧数不超过 max_pending"""
+    release = threading.Event()
+    started = []
+    original = FrameWriter._write
+
+    def blocked_write(self, path, data):
+        release.wait()
+        original(self, path, data)
+    monkeypatch.setattr(FrameWriter, '_write', blocked_write)
+
+    def frames():
+        for i in range(20):
+            started.append(i)
+            yield str(tmp_path / f"f_{i}.json"), b"{}"
+
+    writer = FrameWriter(workers=2, max_pending=3)
+    writer._slots = slots = _WatchedSlots(writer.max_pending)
+
+    def run():
+        with writer:
+            for path, data in frames():
+                writer.submit(path, data)
+    thread = threading.Thread(target=run)
+    thread.start()
+    assert slots.blocked.wait(5)
+    assert len(started) == 4  # 3 帧排队 + 1 帧阻塞在 submit，生成器没有继续
+    release.set()
+    thread.join()
+    assert len(list(tmp_path.iterdir())) == 20 and writer.written == 20
+
+
+def test_write_error_propagates(tmp_path, monkeypatch):
+    # 提交时创建目录失败
+    (tmp_path / "file").write_text("")
+    with pytest.raises(OSError):
+        write_frames([(str(tmp_path / "file" / "frame.json"), b"{}")], quiet=True)
+
+    # 写盘线程中的失败在 close / __exit__ 时抛出
+    failed_threads = []
+
+    def failing_open(path, mode='r', *args, **kwargs):
+        if path.endswith("bad.json"):
+            failed_threads.append(threading.current_thread().name)
+            raise OSError(28, "磁盘已满")
+        return open(path, mode, *args, **kwargs)
+    monkeypatch.setattr(frame_writer, 'open', failing_open, raising=False)
+
+    frames = [(str(tmp_path / name), b"{}") for name in ("a.json", "b.json", "bad.json")]  # 失败的帧最后提交
+    writer = FrameWriter(workers=2)
+    for path, data in frames:
+        writer.submit(path, data)
+    with pytest.raises(OSError, match="磁盘已满"):
+        writer.close()
+    assert failed_threads and failed_threads[0].startswith("frame-writer")
+    assert writer.written == 2
+    with pytest.raises(OSError, match="磁盘已满"):
+        writer.submit(str(tmp_path / "c.json"), b"{}")  # 出错后不再接受新帧
+
+    with pytest.raises(OSError, match="磁盘已满"):
+        write_frames(frames, quiet=True)
+
+    # 调用方已有异常时不被写盘错误覆盖
+    with pytest.raises(KeyError):
+        with FrameWriter(workers=1) as writer:
+            writer.submit(frames[-1][0], b"{}")
+            raise KeyError("调用方的异常")
+
+
+def test_iter_frames_matches_save(tmp_path):
+    scene = create_lens_system()
+    frames = list(iter_light_trajectory_frames(scene, (Point(100 + i, 300) for i in range(3)),
+                                               output_dir=str(tmp_path)))
+    for i, (path, data) in enumerate(frames):
+        expected = scene.copy().add_object(PointSource(Point(100 + i, 300), wavelength=650, brightness=0.8))
+        assert data.decode('utf-8') == expected.to_json()
+
+    template = compile_light_template(json.loads(frames[0][1]))
+    assert [data for _, data in template.iter_frames(["a", "b"], x=iter([1, 2]))] == \
+        [template.render(x=1), template.render(x=2)]
+    with pytest.raises(ValueError):
+        list(template.iter_frames(["a", "b"], x=[1]))
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+测试分页索引：按页拆分、页文件增量重写、页面中的链接路径和缩略图
+"""
+
+import json
+import os
+
+import pytest
+
+from index_builder import INDEX_DATA_DIR, build_index, list_scene_names, scene_title
+from scene_viewer import VIEWER_FILENAME
+
+
+def _jsonp(path, callback):
+    text = open(path, encoding="utf-8").read()
+    assert text.startswith(callback + "(") and text.endswith(");\n")
+    return json.loads("[" + text[len(callback) + 1:-3] + "]")
+
+
+def _make_output(tmp_path, names, images=()):
+    json_dir = tmp_path / "json"
+    image_dir = tmp_path / "images"
+    json_dir.mkdir()
+    image_dir.mkdir()
+    for name in names:
+        (json_dir / f"{name}.json").write_text("{}")
+    for name in images:
+        (image_dir / f"{name}.png").write_bytes(b"png")
+    (json_dir / "notes.txt").write_text("不是场景")
+    return str(tmp_path)
+
+
+def test_page_split(tmp_path):
+    names = [f"scene_{i:02d}" for i in range(7)]
+    output = _make_output(tmp_path, reversed(names), images=["scene_01"])
+    assert list_scene_names(os.path.join(output, "json")) == names
+
+    stats = build_index(output, page_size=3, thumbnails=False, trajectories=False, verbose=False)
+    assert stats == {"total": 7, "pages": 3, "pages_written": 3, "thumbs_written": 0, "players": 0}
+
+    data_dir = os.path.join(output, INDEX_DATA_DIR)
+    pages = [_jsonp(os.path.join(data_dir, f"page_{p:04d}.js"), "rayOpticsIndexPage") for p in (1, 2, 3)]
+    assert [number for number, _ in pages] == [1, 2, 3]
+    assert [[row[0] for row in rows] for _, rows in pages] == [names[0:3], names[3:6], names[6:]]
+    assert pages[0][1][1] == ["scene_01", scene_title("scene_01"), 1]  # 有截图
+    assert pages[0][1][0][2] == 0
+
+    (meta,) = _jsonp(os.path.join(data_dir, "meta.js"), "rayOpticsIndexMeta")
+    assert (meta["total"], meta["pages"], meta["page_size"], len(meta["versions"])) == (7, 3, 3, 3)
+
+    # 内容不变时不重写；场景变少时删除多余的旧页
+    assert build_index(output, page_size=3, thumbnails=False, trajectories=False,
+                       verbose=False)["pages_written"] == 0
+    os.remove(os.path.join(output, "json", "scene_06.json"))
+    stats = build_index(output, page_size=3, thumbnails=False, trajectories=False, verbose=False)
+    assert (stats["pages"], stats["pages_written"]) == (2, 0)
+    assert not os.path.exists(os.path.join(data_dir, "page_0003.js"))
+
+
+def test_links(tmp_path):
+    output = _make_output(tmp_path, ["a"])
+    build_index(output, html_dir=str(tmp_path / "viewer"), thumbnails=False, trajectories=False,
+                verbose=False)
+    page = open(os.path.join(output, "index.html"), encoding="utf-8").read()
+    paths = json.loads(page.split("const PATHS = ", 1)[1].split(";\n", 1)[0])
+    assert paths == {"data": INDEX_DATA_DIR, "thumbs": "images", "thumbExt": ".png", "json": "json",
+                     "images": "images", "viewer": f"viewer/{VIEWER_FILENAME}", "players": ""}
+    # 所有链接都是相对 index.html 的路径，meta.js 带版本号以便浏览器重新加载
+    assert "PATHS.viewer + '?scene=' + key" in page
+    assert "PATHS.json + '/' + key + '.json'" in page
+    assert f'src="{INDEX_DATA_DIR}/meta.js?v=' in page
+
+
+def test_thumbnails(tmp_path):
+    Image = pytest.importorskip("PIL.Image")
+    output = _make_output(tmp_path, ["a", "b"])
+    Image.new("RGB", (1280, 640), "white").save(tmp_path / "images" / "a.png")
+
+    stats = build_index(output, trajectories=False, verbose=False)
+    assert stats["thumbs_written"] == 1
+    with Image.open(tmp_path / "thumbs" / "a.jpg") as thumb:
+        assert thumb.size == (320, 160)
+    assert '"thumbExt": ".jpg"' in open(os.path.join(output, "index.html"), encoding="utf-8").read()
+    assert build_index(output, trajectories=False, verbose=False)["thumbs_written"] == 0
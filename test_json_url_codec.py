@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+测试纯Python的json-url('lzma')编码器与Node.js的json-url输出逐字节一致
+"""
+
+import glob
+import json
+import os
+import shutil
+import subprocess
+
+import pytest
+
+from json_url_codec import compress, compress_json, decompress, pack
+from ray_optics_controller import *
+
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+
+def _node_available():
+    return (shutil.which('node') is not None
+            and os.path.isdir(os.path.join(ROOT, 'node_modules', 'json-url')))
+
+
+def _node_compress(json_str):
+    result = subprocess.run(['node', 'compress_json.js'], input=json_str.encode('utf-8'),
+                            capture_output=True, cwd=ROOT, check=True)
+    return result.stdout.decode('utf-8').strip()
+
+
+def _scene_files():
+    files = glob.glob(os.path.join(ROOT, '*.json'))
+    files += glob.glob(os.path.join(ROOT, 'output', 'json', '*.json'))
+    files = [f for f in sorted(files) if os.path.basename(f) not in ('package.json', 'package-lock.json')]
+    return files
+
+
+def test_known_vectors():
+    """固定测试向量（由Node.js的json-url生成）"""
+    assert compress({"a": 1}) == "XQAAAAIEAAAAAAAAAABAqEggGH3____8IAAA"
+    assert pack({"a": 1.5, "b": "hi", "c": [1, 2, 3], "d": 0.1, "e": -5,
+                 "f": 300, "g": 1e10, "h": True, "i": None}).hex() == (
+        "89a161ca3fc00000a162a26869a16393010203a164cb3fb999999999999a"
+        "a165fba166cd012ca167cf00000002540be400a168c3a169c0")
+    # JS对象中整数形式的键排在前面
+    assert pack({"b": 1, "2": 2, "1": 3}) == pack({"1": 3, "2": 2, "b": 1})
+
+
+def test_round_trip():
+    """压缩后可以还原出相同的场景"""
+    scene = RayOpticsScene()
+    scene.add_object(PointSource(Point(100, 200), brightness=0.5))
+    scene.add_object(FlatMirror(Point(300, 100), Point(300, 400)))
+    data = json.loads(scene.to_json())
+    assert decompress(compress(data)) == data
+
+
+@pytest.mark.skipif(not _node_available(), reason="需要Node.js和json-url")
+def test_matches_node():
+    """仓库内所有场景JSON的压缩结果与 compress_json.js 完全一致"""
+    scene = RayOpticsScene()
+    scene.add_object(PointSource(Point(100, 200), brightness=0.5, wavelength=650))
+    scene.add_object(GlassRefractor([Point(400, 200), Point(500, 200), Point(450, 300)]))
+    samples = [scene.to_json()]
+    for path in _scene_files():
+        with open(path, 'r', encoding='utf-8') as f:
+            samples.append(f.read())
+
+    for json_str in samples:
+        assert compress_json(json_str) == _node_compress(json_str)
+
+
+def test_auto_backend_routes_large_scenes(monkeypatch):
+    """'auto' 后端把大场景交给Node进程池，小场景和没有Node时用纯Python编码器"""
+    import screenshot_helper
+
+    sent = []
+
+    class FakePool:
+        def compress_many(self, scene_jsons, return_exceptions=False):
+            sent.extend(scene_jsons)
+            return [compress_json(s) for s in scene_jsons]
+
+    monkeypatch.setattr(screenshot_helper, 'get_shared_pool', lambda size=None: FakePool())
+    monkeypatch.setattr(screenshot_helper, 'NODE_COMPRESS_MIN_CHARS', 100)
+    small = json.dumps({"version": 5, "objs": []})
+    large = json.dumps({"version": 5, "objs": [{"type": "PointSource", "x": i, "y": i} for i in range(10)]})
+    scenes = [small, large, small, large]
+
+    monkeypatch.setattr(screenshot_helper, 'node_available', lambda: True)
+    results = screenshot_helper.compress_scenes_for_url(scenes, backend='auto')
+    assert results == [compress_json(s) for s in scenes]  # 顺序与输入一致
+    assert sent == [large, large]
+    assert screenshot_helper.compress_scenes_for_url([small], backend='auto') == [compress_json(small)]
+    assert len(sent) == 2
+
+    monkeypatch.setattr(screenshot_helper, 'node_available', lambda: False)
+    assert screenshot_helper.compress_scenes_for_url(scenes, backend='auto') == results
+    assert len(sent) == 2
+    with pytest.raises(ValueError):
+        screenshot_helper.compress_scenes_for_url(scenes, backend='lzma')
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+测试列式 ObjectStore 生成的场景JSON与普通对象列表完全一致
+"""
+
+import json
+
+import pytest
+
+from ray_optics_controller import *
+
+np = pytest.importorskip("numpy")
+from object_store import ObjectStore  # noqa: E402
+
+
+def _all_objects():
+    return [
+        PointSource(Point(100, 200), wavelength=650, brightness=0.8),
+        ParallelLight(Point(100, 200), Point(1, 0), wavelength=450, width=100),
+        FlatMirror(Point(300.5, 100), Point(300, 400)),
+        CurvedMirror(Point(1, 2), Point(3, 4), Point(5, 6)),
+        IdealLens(Point(700, 250), Point(700, 450), focal_length=150),
+        GlassRefractor([Point(900, 500), Point(1100, 350), Point(900, 200)], 1.6),
+        Blocker(Point(800, 0), Point(800, 600)),
+    ]
+
+
+def test_same_json_as_list():
+    """逐个添加对象时，JSON与普通列表逐字节一致"""
+    plain = RayOpticsScene("对比").add_objects(_all_objects())
+    stored = RayOpticsScene("对比", store=ObjectStore()).add_objects(_all_objects())
+    assert stored.to_json() == plain.to_json()
+    assert [obj.to_dict() for obj in stored.objects] == json.loads(plain.to_json())["objs"]
+
+
+def test_bulk_add():
+    """按列批量添加与逐个添加结果一致，并保持插入顺序"""
+    xs = np.arange(5)
+    store = ObjectStore([PointSource(Point(0, 0))])
+    store.add_array("Mirror", x1=xs, y1=0, x2=xs, y2=10)
+    store.add_glass([[(0, 0), (1, 0), (0, 1)], np.zeros((4, 2))], refractive_index=[1.5, 1.7])
+
+    expected = [PointSource(Point(0, 0))]
+    expected += [FlatMirror(Point(x, 0), Point(x, 10)) for x in range(5)]
+    expected += [GlassRefractor([Point(0, 0), Point(1, 0), Point(0, 1)], 1.5),
+                 GlassRefractor([Point(0, 0)] * 4, 1.7)]
+    assert len(store) == len(expected)
+    assert store.to_dicts() == [obj.to_dict() for obj in expected]
+    assert store[-1].refractive_index == 1.7
+
+
+def test_float_input_keeps_type():
+    """整数值的浮点坐标仍输出为 1.0（与普通列表一致），整数仍输出为 1"""
+    objects = [
+        PointSource(Point(1.0, 2.0), wavelength=650.0, brightness=1.0),
+        ParallelLight(Point(100.0, 200), Point(1, 0.0), width=100.0),
+        FlatMirror(Point(1.0, 2), Point(3, 4.0)),
+        IdealLens(Point(700, 250.0), Point(700.0, 450), focal_length=150.0),
+        GlassRefractor([Point(900.0, 500), Point(1100, 350.0), Point(900, 200)], 2.0),
+        Blocker(Point(0.0, 0.0), Point(0, 600)),
+    ]
+    plain = RayOpticsScene("浮点").add_objects(objects)
+    stored = RayOpticsScene("浮点", store=ObjectStore()).add_objects(objects)
+    assert stored.to_json() == plain.to_json()
+    assert '"x": 1.0' in stored.to_json()
+
+    # 批量添加按数组的dtype决定
+    store = ObjectStore()
+    store.add_array("Mirror", x1=np.array([1.0, 2.0]), y1=0, x2=np.arange(2), y2=10.0)
+    store.add_glass([np.ones((3, 2)), np.ones((3, 2), dtype=int)], refractive_index=1.5)
+    dumped = json.dumps(store.to_dicts())
+    assert json.dumps(store.to_dicts()[0]) == json.dumps(
+        FlatMirror(Point(1.0, 0), Point(0, 10.0)).to_dict())
+    assert '"path": [{"x": 1.0, "y": 1.0' in dumped and '{"x": 1, "y": 1, "arc": false}' in dumped
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+测试序列化前的场景精简
+"""
+
+import json
+
+from generate_trajectory import generate_trajectory_scenes
+from object_store import ObjectStore
+from ray_optics_controller import *
+from scene_culling import cull_scene
+
+
+def _scene(objects, **settings):
+    scene = RayOpticsScene("精简", width=800, height=600)
+    scene.settings.update(settings)
+    return scene.add_objects(objects)
+
+
+def test_degenerate_duplicate_and_merge():
+    light = PointSource(Point(100, 300))
+    scene = _scene([
+        light, light,                                  # 光源重复不合并
+        FlatMirror(Point(200, 100), Point(200, 100)),  # 长度为0
+        GlassRefractor([Point(0, 0), Point(10, 10), Point(20, 20)]),  # 面积为0
+        FlatMirror(Point(300, 100), Point(300, 400)),
+        FlatMirror(Point(300, 100), Point(300, 400)),  # 重复
+        Blocker(Point(500, 0), Point(500, 200)),
+        Blocker(Point(500, 350), Point(500, 150)),      # 与上一条共线重叠
+        Blocker(Point(500, 500), Point(500, 600)),      # 共线但不相接
+    ])
+    mirror = scene.objects[4]
+    report = scene.cull()
+    assert (report.degenerate, report.duplicates, report.merged, report.offscreen) == ([2, 3], [5], [7], [])
+    assert scene.objects[2] is mirror  # 未修改的对象保持原对象
+    assert [obj.to_dict() for obj in scene.objects[3:]] == [
+        {"type": "Blocker", "p1": {"x": 500, "y": 0}, "p2": {"x": 500, "y": 350}},
+        {"type": "Blocker", "p1": {"x": 500, "y": 500}, "p2": {"x": 500, "y": 600}},
+    ]
+
+    # 重合的玻璃、透镜会叠加折射，不作为重复对象删除
+    glass = GlassRefractor([Point(100, 100), Point(200, 100), Point(150, 200)])
+    lens = IdealLens(Point(400, 100), Point(400, 300), 100)
+    scene = _scene([light, glass, glass, lens, lens])
+    report = scene.cull()
+    assert report.duplicates == [] and len(scene.objects) == 5
+
+
+def test_offscreen_with_origin_and_scale():
+    objects = [
+        PointSource(Point(-500, 300)),                  # 画面外的光源保留
+        Blocker(Point(2000, 0), Point(2000, 600)),
+        Blocker(Point(100, 100), Point(200, 100)),
+    ]
+    data = json.loads(_scene(objects).to_json())
+    culled, report = cull_scene(data)
+    assert report.offscreen == [1] and len(culled["objs"]) == 2
+    assert len(data["objs"]) == 3  # 不修改原字典
+
+    # 缩小到1/4后 x=2000 在画面内
+    culled, report = cull_scene(dict(data, scale=0.25))
+    assert report.offscreen == []
+
+    # 挡在画面外的光源与画面之间的遮挡物保留（删除后光线会照进画面），aggressive 时删除
+    shadow = _scene([PointSource(Point(-500, 300)), Blocker(Point(-400, 200), Point(-400, 400))])
+    data_shadow = json.loads(shadow.to_json())
+    assert cull_scene(data_shadow)[1].offscreen == []
+    assert len(cull_scene(data_shadow)[0]["objs"]) == 2
+    assert cull_scene(data_shadow, aggressive=True)[1].offscreen == [1]
+    # 光源背后的遮挡物不影响画面
+    data_shadow["objs"].append(Blocker(Point(-600, 200), Point(-600, 400)).to_dict())
+    assert cull_scene(data_shadow)[1].offscreen == [2]
+
+    # 画面外有镜面时默认不删除画面外的遮挡物，aggressive 时全部删除
+    data["objs"].append(FlatMirror(Point(-300, 0), Point(-300, 600)).to_dict())
+    assert cull_scene(data)[1].offscreen == []
+    assert cull_scene(data, aggressive=True)[1].offscreen == [1, 3]
+
+
+def test_trajectory_cull_keeps_offscreen_shadow(tmp_path):
+    """基础场景中还没有光源：轨迹经过画面外时，挡住它的遮挡物仍需保留"""
+    base = {"objs": [Blocker(Point(-100, 200), Point(-100, 400)).to_dict(),   # 光源与画面之间
+                     Blocker(Point(-300, 200), Point(-300, 400)).to_dict()],  # 光源背后
+            "width": 800, "height": 600}
+    trajectory = [{"x": -200, "y": 300}, {"x": -200, "y": 320}]
+    for light in ({"type": "PointSource"}, {"type": "Beam", "width": 40}):
+        files = generate_trajectory_scenes(base, trajectory, light, str(tmp_path), "shadow", cull=True, quiet=True)
+        for path in files:
+            objs = json.load(open(path, encoding="utf-8"))["objs"]
+            assert [obj["type"] for obj in objs] == ["Blocker", light["type"]]
+            assert objs[0]["p1"]["x"] == -100
+            # 与对完整帧精简的结果一致
+            assert cull_scene(json.load(open(path, encoding="utf-8")))[0]["objs"] == objs
+
+    # 轨迹在画面内时画面外的遮挡物照常删除
+    files = generate_trajectory_scenes(base, [{"x": 100, "y": 300}], {"type": "PointSource"}, str(tmp_path),
+                                       "inside", cull=True, quiet=True)
+    assert [obj["type"] for obj in json.load(open(files[0], encoding="utf-8"))["objs"]] == ["PointSource"]
+
+
+def test_precision_and_store():
+    store = ObjectStore([FlatMirror(Point(0.123456, 10), Point(100.5, 10)), Blocker(Point(5, 5), Point(5, 5))])
+    scene = RayOpticsScene("存储", store=store)
+    report = scene.cull(precision=2)
+    assert isinstance(scene.objects, ObjectStore)
+    assert (report.degenerate, report.rounded) == ([1], 1)
+    assert scene.objects.to_dicts() == [{"type": "Mirror", "p1": {"x": 0.12, "y": 10}, "p2": {"x": 100.5, "y": 10}}]
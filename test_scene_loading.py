@@ -0,0 +1,38 @@
+#!/usr/bin/env python3
+"""
+测试从JSON加载的场景再输出时与原内容一致
+"""
+
+import json
+
+from ray_optics_controller import *
+
+
+def test_round_trip():
+    """类型化对象、原样保留的对象和自定义顶层字段都不丢失，按需加载结果相同"""
+    scene = create_prism_dispersion().add_objects([
+        FlatMirror(Point(300.5, 100), Point(300, 400)),
+        CurvedMirror(Point(0, 0), Point(10, 0), Point(5, 5)),
+        IdealLens(Point(500, 200), Point(500, 400), focal_length=150),
+    ])
+    data = json.loads(scene.to_json())
+    data["objs"] += [
+        {"type": "PointSource", "x": 400, "y": 625},  # 缺少wavelength等字段
+        {"type": "TextLabel", "x": 1, "y": 2, "text": "标签"},
+    ]
+    data["observer"] = None
+
+    for lazy in (False, True):
+        loaded = RayOpticsScene.from_json(json.dumps(data), lazy=lazy)
+        assert loaded.scene_dict() == data
+        assert type(loaded.objects[0]) is ParallelLight
+        assert type(loaded.objects[-1]) is RawObject
+
+
+def test_copy_with_position():
+    """复制后移动对象不影响原场景"""
+    scene = RayOpticsScene.from_dict({"objs": [{"type": "PointSource", "x": 400, "y": 625}]})
+    frame = scene.copy()
+    frame.objects[0] = frame.objects[0].with_position(Point(1, 2))
+    assert frame.scene_dict()["objs"] == [{"type": "PointSource", "x": 1, "y": 2}]
+    assert scene.scene_dict()["objs"] == [{"type": "PointSource", "x": 400, "y": 625}]
@@ -0,0 +1,37 @@
+#!/usr/bin/env python3
+"""
+测试编译模板输出与逐帧 json.dumps 一致
+"""
+
+import json
+
+import numpy as np
+
+from ray_optics_controller import *
+from scene_template import CompiledTemplate, compile_light_template
+
+
+def test_render_matches_dumps():
+    """点光源、平行光、紧凑/缩进输出都与替换后字典的 json.dumps 逐字节一致"""
+    for light in (PointSource(Point(100, 200), wavelength=650), ParallelLight(Point(100, 200), Point(1, 0))):
+        data = json.loads(create_prism_dispersion().add_object(light).to_json())
+        index = len(data["objs"]) - 1
+        for indent in (None, 2, 4):
+            template = compile_light_template(data, index=index, indent=indent)
+            values = {name: 0.5 * i - 3 for i, name in enumerate(template.slots)}
+            expected = json.dumps(template.render_dict(**values), ensure_ascii=False, indent=indent,
+                                  separators=(',', ':') if indent is None else None)
+            assert template.render(**values).decode('utf-8') == expected
+            assert template.render() == template.render(**template.defaults)
+    assert data["objs"][-1]["p1"] == {"x": 100, "y": 200}  # 模板数据不被修改
+
+
+def test_write_frames(tmp_path):
+    """NumPy数组批量写出的帧可以被正常解析"""
+    data = {"objs": [{"type": "Mirror", "p1": {"x": 0, "y": 0}}, {"type": "PointSource", "x": 1, "y": 2}]}
+    template = CompiledTemplate(data, {"x": ("objs", 1, "x"), "y": ("objs", 1, "y")})
+    paths = [str(tmp_path / f"frame_{i}.json") for i in range(3)]
+    template.write_frames(paths, x=np.arange(3), y=np.linspace(0, 1, 3))
+    assert [json.load(open(path))["objs"][1] for path in paths] == [
+        {"type": "PointSource", "x": i, "y": i / 2} for i in range(3)
+    ]
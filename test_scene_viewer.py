@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+测试共享查看器的分片清单：分片规则、JSONP格式、flush合并，以及与构建清单的保存顺序
+"""
+
+import json
+import os
+
+import build_manifest
+from build_manifest import BuildManifest
+from scene_viewer import SHARD_DIR, VIEWER_FILENAME, SceneManifest, _fnv1a, shard_of
+
+
+SIMULATOR = "https://example.invalid/simulator/"
+SCENE = {"name": "测试", "width": 800, "height": 400, "objs": [{"type": "Blocker"}]}
+
+
+def _shard_data(path):
+    text = open(path, encoding="utf-8").read()
+    assert text.startswith("rayOpticsScenes(") and text.endswith(");\n")
+    return json.loads(text[len("rayOpticsScenes("):-3])
+
+
+def test_sharding():
+    assert _fnv1a("") == 0x811c9dc5
+    assert _fnv1a("a") == 0xe40c292c  # FNV-1a 32位的标准测试值
+    assert shard_of("test_01") == _fnv1a("test_01") % 256
+    assert shard_of("test_01", shards=16) == _fnv1a("test_01") % 16
+
+    viewer = SceneManifest("out", simulator_url=SIMULATOR)
+    assert viewer.shard_path("test_01") == os.path.join("out", SHARD_DIR, f"{shard_of('test_01'):02x}.js")
+    assert SceneManifest("out", simulator_url=SIMULATOR, shards=4096).shard_path("a").endswith(
+        f"{_fnv1a('a') % 4096:03x}.js")
+    assert viewer.page_path("a b") == os.path.join("out", f"{VIEWER_FILENAME}?scene=a%20b")
+    assert viewer.page_path("a", "XQAA") == os.path.join("out", VIEWER_FILENAME) + "?scene=a#XQAA"
+
+
+def test_flush_writes_jsonp_and_merges(tmp_path):
+    html_dir = str(tmp_path / "html")
+    viewer = SceneManifest(html_dir, simulator_url=SIMULATOR)
+    viewer.add("test_01", "HASH1", SCENE)
+    assert viewer.get("test_01")["hash"] == "HASH1"  # 未flush时从内存读取
+    assert not os.path.exists(viewer.shard_path("test_01"))
+
+    viewer.flush()
+    assert SIMULATOR in open(viewer.viewer_path, encoding="utf-8").read()
+    entries = _shard_data(viewer.shard_path("test_01"))
+    assert entries == {"test_01": {"hash": "HASH1", "name": "测试", "size": [800, 400], "objs": 1}}
+
+    # 另一次运行写入同一分片的其他场景时与已有记录合并
+    names = [f"s{i}" for i in range(2000)]
+    same_shard = next(n for n in names if shard_of(n) == shard_of("test_01"))
+    with SceneManifest(html_dir, simulator_url=SIMULATOR) as again:
+        again.add(same_shard, "HASH2", SCENE)
+        again.add("test_01", "HASH3", SCENE)
+    entries = _shard_data(viewer.shard_path("test_01"))
+    assert {name: entry["hash"] for name, entry in entries.items()} == {"test_01": "HASH3", same_shard: "HASH2"}
+    assert viewer.get(same_shard)["hash"] == "HASH2"
+    assert not [f for f in os.listdir(os.path.join(html_dir, SHARD_DIR)) if f.endswith(".tmp")]
+
+
+def test_autosave_flushes_viewer_first(tmp_path, monkeypatch):
+    monkeypatch.setattr(build_manifest, "AUTOSAVE_EVERY", 3)
+    viewer = SceneManifest(str(tmp_path / "html"), simulator_url=SIMULATOR)
+    manifest = BuildManifest(str(tmp_path / "manifest.json"), before_save=viewer.flush)
+    settings = {"crop_top": 75}
+    for i in range(3):
+        name = f"frame_{i}"
+        viewer.add(name, f"H{i}", SCENE)
+        manifest.record(name + ".png", "digest", settings)
+
+    # 自动保存后，清单中记为最新的场景在分片中都已存在（中断后不会被跳过）
+    saved = json.load(open(tmp_path / "manifest.json"))["entries"]
+    assert len(saved) == 3
+    for i in range(3):
+        assert _shard_data(viewer.shard_path(f"frame_{i}"))[f"frame_{i}"]["hash"] == f"H{i}"
@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""
+测试流式写入的场景JSON与 to_json() 一致
+"""
+
+import json
+
+import scene_writer
+from ray_optics_controller import *
+from scene_writer import iter_scene_chunks
+
+
+def _scene(objects):
+    return RayOpticsScene("流式写入", width=800, height=600).add_objects(objects)
+
+
+def test_matches_to_json(monkeypatch):
+    """缩进模式逐字节一致，紧凑模式内容一致（包括空场景和跨批次的对象）"""
+    monkeypatch.setattr(scene_writer, 'BATCH_OBJECTS', 2)
+    objects = [
+        PointSource(Point(100, 200), wavelength=650, brightness=0.8),
+        ParallelLight(Point(100, 200), Point(1, 0), wavelength=450, width=100),
+        FlatMirror(Point(300.5, 100), Point(300, 400)),
+        GlassRefractor([Point(900, 500), Point(1100, 350), Point(900, 200)], 1.6),
+        Blocker(Point(800, 0), Point(800, 600)),
+    ]
+    for scene in (_scene([]), _scene(objects[:1]), _scene(objects)):
+        for indent in (2, 4):
+            streamed = b''.join(iter_scene_chunks(scene, indent=indent, backend='json'))
+            assert streamed.decode('utf-8') == scene.to_json(indent=indent)
+        compact = b''.join(iter_scene_chunks(scene, indent=None))
+        assert b' ' not in compact
+        assert json.loads(compact) == json.loads(scene.to_json())
+
+
+def test_fragment_cache_invalidated():
+    """属性赋值后缓存的片段失效，共享对象的场景各自输出正确的内容"""
+    light = PointSource(Point(100, 200), wavelength=650)
+    mirror = FlatMirror(Point(300, 100), Point(300, 400))
+    base = _scene([mirror])
+    assert mirror.json_fragment() == json.dumps(mirror.to_dict(), separators=(',', ':')).encode()
+
+    for x in (100, 150):
+        frame = base.copy().add_object(light.with_position(Point(x, 200)))
+        streamed = b''.join(iter_scene_chunks(frame, indent=2, backend='json'))
+        assert streamed.decode('utf-8') == frame.to_json()
+
+    mirror.p2 = Point(500, 400)
+    light.wavelength = 450
+    scene = _scene([mirror, light])
+    assert json.loads(b''.join(iter_scene_chunks(scene))) == json.loads(scene.to_json())
@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+测试截图的内存裁剪：裁剪后的尺寸和像素、不裁剪时原样返回，以及只在实际裁剪后提示"已裁剪"
+"""
+
+import io
+import sys
+
+import pytest
+
+from screenshot_helper import _finish_capture, crop_png
+
+Image = pytest.importorskip("PIL.Image")
+
+
+def _png(width=4, height=6):
+    image = Image.new("RGB", (width, height))
+    for y in range(height):
+        for x in range(width):
+            image.putpixel((x, y), (x * 10, y * 20, 255))
+    buffer = io.BytesIO()
+    image.save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+def test_crop_png():
+    png = _png()
+    with Image.open(io.BytesIO(crop_png(png, 2))) as cropped:
+        assert cropped.size == (4, 4)
+        assert cropped.getpixel((0, 0)) == (0, 40, 255)  # 原图第2行
+        assert cropped.getpixel((3, 3)) == (30, 100, 255)
+    assert crop_png(png, 0) is png
+    assert crop_png(png, -5) is png
+
+
+def test_finish_capture_reports_crop(tmp_path, capsys, monkeypatch):
+    png = _png()
+    output = tmp_path / "shot.png"
+    result = _finish_capture(png, str(output), 2)
+    assert "已裁剪顶部 2px" in capsys.readouterr().out
+    assert output.read_bytes() == result
+    with Image.open(output) as image:
+        assert image.size == (4, 4)
+
+    assert _finish_capture(png, None, 0) is png
+    assert "裁剪" not in capsys.readouterr().out
+
+    # 裁剪出错时同样提示未裁剪
+    assert _finish_capture(b"not a png", None, 2) == b"not a png"
+    out = capsys.readouterr().out
+    assert "裁剪失败" in out and "未裁剪" in out
+
+    # 未安装Pillow时原样保存，提示未裁剪而不是"已裁剪"
+    monkeypatch.setitem(sys.modules, "PIL", None)
+    assert _finish_capture(png, str(output), 2) is png
+    out = capsys.readouterr().out
+    assert "未裁剪" in out and "已裁剪" not in out
+    assert output.read_bytes() == png
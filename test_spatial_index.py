@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+测试空间索引查询结果与逐个对象检查一致
+"""
+
+import random
+
+from ray_optics_controller import *
+from spatial_index import object_geometry, _inside_polygon, _segments_intersect
+
+
+def _random_scene(count=2000):
+    random.seed(7)
+    scene = RayOpticsScene("空间索引", width=2000, height=1000)
+    scene.spatial_index()  # 先建立索引，检查 add_objects 的增量更新
+    for _ in range(count):
+        x, y = random.uniform(0, 2000), random.uniform(0, 1000)
+        kind = random.randrange(4)
+        if kind == 0:
+            scene.add_object(FlatMirror(Point(x, y), Point(x + random.uniform(-40, 40), y + random.uniform(-40, 40))))
+        elif kind == 1:
+            scene.add_object(PointSource(Point(x, y)))
+        elif kind == 2:
+            scene.add_object(GlassRefractor([Point(x, y), Point(x + 30, y), Point(x + 15, y + 30)]))
+        else:
+            scene.add_object(CurvedMirror(Point(x, y), Point(x + 30, y), Point(x + 15, y + 15)))
+    scene.add_object(Blocker(Point(-5000, 500), Point(5000, 500)))  # 覆盖大量单元的长对象
+    return scene
+
+
+def test_queries_match_brute_force():
+    scene = _random_scene()
+    index = scene.spatial_index()
+    geometry = [object_geometry(obj.to_dict()) for obj in scene.objects]
+    everything = range(len(scene.objects))
+
+    for _ in range(20):
+        x, y = random.uniform(-100, 2100), random.uniform(-100, 1100)
+        brute = sorted((index.distance(i, x, y), i) for i in everything)[:4]
+        assert index.nearest(x, y, k=4) == brute
+        assert index.query_point(x, y, tolerance=5) == [i for i in everything if index.distance(i, x, y) <= 5]
+
+        x2, y2 = x + random.uniform(-600, 600), y + random.uniform(-600, 600)
+        brute = [i for i, (segments, closed) in enumerate(geometry)
+                 if any(_segments_intersect((x, y, x2, y2), s) for s in segments)
+                 or (closed and _inside_polygon(x, y, segments))]
+        assert index.query_segment(x, y, x2, y2) == brute
+
+        xmin, ymin, xmax, ymax = min(x, x2), min(y, y2), max(x, x2), max(y, y2)
+        brute = [i for i, (segments, _) in enumerate(geometry)
+                 if min(min(s[0], s[2]) for s in segments) <= xmax and max(max(s[0], s[2]) for s in segments) >= xmin
+                 and min(min(s[1], s[3]) for s in segments) <= ymax and max(max(s[1], s[3]) for s in segments) >= ymin]
+        assert index.query_rect(xmin, ymin, xmax, ymax) == brute
+
+
+def test_nearest_far_outside_bounds():
+    # 查询点远在已占用范围之外：按圈搜索不能与距离的平方成正比（以前 x=1e6 要遍历上亿个空单元）
+    scene = _random_scene(500)
+    index = scene.spatial_index()
+    everything = range(len(scene.objects))
+    for x, y in [(1e6, 300), (-1e6, -1e6), (1000, 5e5), (2500, 500), (50000, 300)]:
+        brute = sorted((index.distance(i, x, y), i) for i in everything)[:3]
+        assert index.nearest(x, y, k=3) == brute
+    assert index.nearest(1e6, 300, max_distance=10) == []
+
+
+def test_point_inside_glass():
+    scene = RayOpticsScene("玻璃").add_objects([
+        GlassRefractor([Point(400, 400), Point(600, 300), Point(400, 200)]),
+        PointSource(Point(450, 300)),
+    ])
+    assert [obj.type for obj in scene.query_point(450, 300)] == ["Glass", "PointSource"]
+    assert scene.query_point(300, 300) == []
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+测试向量化轨迹与原有逐点生成函数一致，以及新增路径的几何性质
+"""
+
+import math
+
+import numpy as np
+
+import trajectories as tj
+from create_trajectory import generate_linear_trajectory, generate_circular_trajectory, generate_grid_trajectory
+
+
+def test_matches_legacy_generators():
+    assert tj.to_point_list(tj.line((100, 300), (600, 450), 7)) == generate_linear_trajectory(100, 300, 600, 450, 7)
+    assert tj.to_point_list(tj.grid(100, 500, 4, 100, 300, 3, zigzag=True)) == \
+        generate_grid_trajectory(100, 500, 4, 100, 300, 3, zigzag=True)
+    legacy = generate_circular_trajectory(500, 400, 150, 36, -1, 2)
+    assert np.allclose(tj.circle((500, 400), 150, 36, -1, 2), tj.from_json_data(legacy))
+
+
+def test_curves_pass_through_control_points():
+    control = [(100, 300), (250, 100), (400, 350), (600, 200)]
+    curve = tj.bezier(control, 101)
+    assert np.allclose(curve[[0, -1]], [control[0], control[-1]])
+
+    for alpha in (0, 0.5, 1):
+        spline = tj.catmull_rom(control, 10001, alpha=alpha)
+        # 每个控制点都在曲线上（采样足够密时最近距离趋于0）
+        assert all(np.hypot(*(spline - p).T).min() < 0.5 for p in control)
+    closed = tj.catmull_rom(control, 50, closed=True)
+    assert np.allclose(closed[0], closed[-1])
+
+
+def test_polyline_arc_length_and_shapes():
+    path = tj.polyline([(0, 0), (100, 0), (100, 50)], spacing=10)
+    assert len(path) == 16
+    assert np.allclose(np.diff(tj.arc_length(path)), 10)
+
+    spiral = tj.spiral((0, 0), 10, 100, 2, 201)
+    assert np.allclose(np.hypot(*spiral[[0, -1]].T), [10, 100])
+
+    figure = tj.lissajous((0, 0), (300, 200), (3, 2), 1000)
+    assert figure.shape == (1000, 2) and np.abs(figure).max(axis=0).tolist() <= [300, 200]
+    assert tj.to_separated(tj.line((0, 0), (1, 2), 2)) == {"x": [0.0, 1.0], "y": [0.0, 2.0]}
+
+
+def test_resampling():
+    # 直线 + 半径20的半圆：转弯处的帧间距小于直线段
+    path = np.concatenate([tj.line((0, 0), (200, 0), 2001)[:-1],
+                           tj.circle((200, 20), 20, 2000, -math.pi / 2, math.pi / 2)])
+    adaptive = tj.resample_curvature(path, spacing=10, max_angle=math.radians(10))
+    steps = np.diff(tj.arc_length(adaptive))
+    assert steps.max() <= 10 and steps[-10:].max() < 4
+    assert np.allclose(adaptive[[0, -1]], path[[0, -1]])
+
+    uniform = tj.resample(path, 'arc', n_points=50)
+    assert len(uniform) == 50 and np.ptp(np.diff(tj.arc_length(tj.resample(path, 'arc', spacing=1)))) < 0.05
+
+    # 折线的尖角不会堆积重合的帧
+    corner = tj.resample_curvature(tj.polyline([(0, 0), (100, 0), (100, 100)], 1001), spacing=10)
+    assert np.diff(tj.arc_length(corner)).min() > 1
+
+    simplified = tj.simplify_rdp(tj.polyline([(0, 0), (100, 0), (100, 100), (0, 100)], 3001), tolerance=0.5)
+    assert simplified.tolist() == [[0, 0], [100, 0], [100, 100], [0, 100]]
+    noisy = path + np.random.default_rng(1).normal(0, 0.05, path.shape)
+    assert len(tj.simplify_rdp(noisy, 0.5)) < 100
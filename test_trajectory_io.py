@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+测试轨迹文件各格式读写一致，以及按块生成场景
+"""
+
+import json
+import zipfile
+
+import numpy as np
+
+import trajectories as tj
+from generate_trajectory import generate_trajectory_scenes
+from trajectory_io import TrajectoryFile, load_trajectory_array, write_trajectory
+
+
+def test_formats_round_trip(tmp_path):
+    points = tj.spiral((500, 300), 10, 200, 3, 1001)
+    for name in ("traj.json", "traj.ndjson", "traj.npy", "traj.npz"):
+        path = str(tmp_path / name)
+        write_trajectory(path, points)
+        trajectory = TrajectoryFile(path)
+        assert len(trajectory) == 1001
+        assert trajectory.last() == {"x": points[-1, 0], "y": points[-1, 1]}
+        chunks = list(trajectory.chunks(300))
+        assert [len(xs) for xs, _ in chunks] == [300, 300, 300, 101]
+        assert np.array_equal(np.column_stack([sum((xs for xs, _ in chunks), []),
+                                               sum((ys for _, ys in chunks), [])]), points)
+
+    # npy 与未压缩的 npz 以内存映射读取
+    assert isinstance(load_trajectory_array(str(tmp_path / "traj.npy")), np.memmap)
+    assert isinstance(load_trajectory_array(str(tmp_path / "traj.npz")), np.memmap)
+
+
+def _zip_members(path):
+    with zipfile.ZipFile(path) as archive:
+        return sorted(archive.namelist())
+
+
+def test_npz_xy_and_ndjson_pairs(tmp_path):
+    np.savez_compressed(tmp_path / "xy.npz", x=np.arange(3.0), y=np.arange(3.0) * 2)
+    assert _zip_members(tmp_path / "xy.npz") == ["x.npy", "y.npy"]
+    assert list(TrajectoryFile(str(tmp_path / "xy.npz"))) == [{"x": i, "y": 2 * i} for i in (0.0, 1.0, 2.0)]
+
+    (tmp_path / "pairs.ndjson").write_text('[1, 2]\n\n{"x": 3, "y": 4}\n')
+    assert list(TrajectoryFile(str(tmp_path / "pairs.ndjson"))) == [{"x": 1, "y": 2}, {"x": 3, "y": 4}]
+
+
+def test_scenes_from_streamed_trajectory(tmp_path):
+    base = {"objs": [{"type": "Mirror", "p1": {"x": 0, "y": 0}, "p2": {"x": 0, "y": 100}}]}
+    points = [{"x": 100 + i, "y": 300} for i in range(5)]
+    write_trajectory(str(tmp_path / "traj.ndjson"), points)
+    light = {"type": "PointSource", "wavelength": 650}
+    from_list = generate_trajectory_scenes(base, points, light, str(tmp_path / "a"), "t")
+    from_file = generate_trajectory_scenes(base, TrajectoryFile(str(tmp_path / "traj.ndjson")), light,
+                                           str(tmp_path / "b"), "t")
+    assert len(from_list) == len(from_file) == 5
+    for a, b in zip(from_list, from_file):
+        assert open(a).read() == open(b).read()
+    assert json.load(open(from_file[-1]))["objs"][-1]["x"] == 104
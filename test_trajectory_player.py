@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+测试轨迹播放页：帧名分组、嵌入页面的帧列表和路径，以及由索引页列出的播放页
+"""
+
+import json
+import os
+
+import pytest
+
+from index_builder import INDEX_DATA_DIR, build_index
+from trajectory_player import PLAYER_DIR, PLAYER_FRAME_DIR, build_players, group_trajectories, split_frame_name
+
+
+def _embedded(page, const):
+    return json.loads(page.split(f"const {const} = ", 1)[1].split(";\n", 1)[0])
+
+
+def _images(tmp_path, names):
+    image_dir = tmp_path / "images"
+    image_dir.mkdir(exist_ok=True)
+    for name in names:
+        (image_dir / f"{name}.png").write_bytes(b"png")
+
+
+def test_grouping():
+    assert split_frame_name("demo_h_010") == ("demo_h", 10)
+    assert split_frame_name("test-7") == ("test", 7)
+    assert split_frame_name("scene") == ("scene", None)
+    assert split_frame_name("42") == ("42", None)
+
+    names = ["demo_h_010", "demo_h_002", "demo_h_001", "single_1", "lens", "test_01", "test_02"]
+    assert group_trajectories(names) == {
+        "demo_h": ["demo_h_001", "demo_h_002", "demo_h_010"],  # 按帧号而不是字符串排序
+        "test": ["test_01", "test_02"],
+    }
+
+
+def test_player_frame_list(tmp_path):
+    names = [f"demo_h_{i:03d}" for i in range(1, 6)] + ["lens", "single_1"]
+    _images(tmp_path, [n for n in names if n != "demo_h_003"])  # 缺少截图的帧不加入播放页
+
+    players = build_players(str(tmp_path), names, frame_width=0, fps=12, verbose=False)
+    assert players == [["demo_h", 4]]
+    page = open(tmp_path / PLAYER_DIR / "demo_h.html", encoding="utf-8").read()
+    assert _embedded(page, "FRAMES") == ["demo_h_001", "demo_h_002", "demo_h_004", "demo_h_005"]
+    assert _embedded(page, "FRAME_DIR") == "../images"
+    assert _embedded(page, "FRAME_EXT") == ".png"
+    assert 'href="../index.html"' in page and "let fps = 12;" in page
+
+
+def test_scaled_frames(tmp_path):
+    Image = pytest.importorskip("PIL.Image")
+    (tmp_path / "images").mkdir()
+    for i in range(2):
+        Image.new("RGB", (1920, 960), "black").save(tmp_path / "images" / f"run_{i}.png")
+
+    assert build_players(str(tmp_path), ["run_0", "run_1"], verbose=False) == [["run", 2]]
+    page = open(tmp_path / PLAYER_DIR / "run.html", encoding="utf-8").read()
+    assert _embedded(page, "FRAME_DIR") == f"../{PLAYER_FRAME_DIR}"
+    assert _embedded(page, "FRAME_EXT") == ".jpg"
+    with Image.open(tmp_path / PLAYER_FRAME_DIR / "run_0.jpg") as frame:
+        assert frame.size == (960, 480)
+
+
+def test_index_lists_players(tmp_path):
+    names = ["orbit_1", "orbit_2", "orbit_3"]
+    (tmp_path / "json").mkdir()
+    for name in names:
+        (tmp_path / "json" / f"{name}.json").write_text("{}")
+    _images(tmp_path, names)
+
+    stats = build_index(str(tmp_path), thumbnails=False, verbose=False)
+    assert stats["players"] == 1
+    text = open(tmp_path / INDEX_DATA_DIR / "meta.js", encoding="utf-8").read()
+    meta = json.loads(text[len("rayOpticsIndexMeta("):-3])
+    assert meta["players"] == [["orbit", 3]]
+    assert _embedded(open(tmp_path / "index.html", encoding="utf-8").read(), "PATHS")["players"] == PLAYER_DIR
+    assert os.path.exists(tmp_path / PLAYER_DIR / "orbit.html")
@@ -0,0 +1,357 @@
+#!/usr/bin/env python3
+"""
+向量化轨迹生成 - 用NumPy一次生成 (N, 2) 坐标数组
+
+create_trajectory.py 中的 generate_*_trajectory 逐点构造 {"x", "y"} 字典，
+百万点的参数扫描既慢又占内存。本模块的函数都返回 float64 的 (N, 2) 数组（第0列x，第1列y），
+只在写文件时才转换为现有的JSON格式（to_point_list / to_separated / save_trajectory）。
+10^6 个点的直线、圆周、网格只需几十毫秒，贝塞尔曲线和样条约0.2秒。
+
+路径类型:
+  - line / circle / grid: 与 create_trajectory.py 中的同名轨迹结果相同
+  - bezier: 任意阶贝塞尔曲线（控制点）
+  - catmull_rom: 经过所有控制点的 Catmull-Rom 样条（默认向心参数化，不会打结）
+  - lissajous: 李萨如曲线
+  - spiral: 阿基米德螺线
+  - polyline: 沿折线按弧长等距取点
+
+重采样（输入为任意来源的轨迹数组，例如视频检测结果）:
+  - resample_arc_length: 按弧长等距重新取点
+  - resample_curvature: 直线段稀疏、急转弯处密集（相邻两点的弧长和转角都不超过限制）
+  - simplify_rdp: Ramer-Douglas-Peucker 简化，删除偏离不超过容差的点
+  - resample: 按方法名调用以上函数（generate_trajectory.py --resample）
+
+用法:
+    import trajectories as tj
+
+    points = tj.catmull_rom([(100, 300), (300, 100), (500, 300)], 1000)
+    tj.save_trajectory("traj.json", points, fmt="separated")
+
+需要numpy。
+"""
+
+import json
+import math
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+
+def _as_points(points) -> np.ndarray:
+    """控制点转为 (M, 2) 的float64数组"""
+    array = np.asarray(points, dtype='float64').reshape(-1, 2)
+    if len(array) == 0:
+        raise ValueError("至少需要一个控制点")
+    return array
+
+
+def _stack(x: np.ndarray, y: np.ndarray) -> np.ndarray:
+    result = np.empty((len(x), 2), dtype='float64')
+    result[:, 0] = x
+    result[:, 1] = y
+    return result
+
+
+def _unit_steps(n_points: int) -> np.ndarray:
+    """[0, 1] 上的 n_points 个等分参数（只有1个点时为0）"""
+    return np.arange(n_points, dtype='float64') / (n_points - 1) if n_points > 1 else np.zeros(n_points)
+
+
+# ---------- 基本路径（与 create_trajectory.py 一致） ----------
+
+def line(start: Sequence[float], end: Sequence[float], n_points: int) -> np.ndarray:
+    """从start到end（包含两端）的 n_points 个等距点"""
+    t = _unit_steps(n_points)
+    return _stack(start[0] + (end[0] - start[0]) * t, start[1] + (end[1] - start[1]) * t)
+
+
+def circle(center: Sequence[float], radius: float, n_points: int,
+           start_angle: float = 0, end_angle: Optional[float] = None) -> np.ndarray:
+    """
+    圆周或圆弧（角度为弧度）
+
+    与 generate_circular_trajectory 相同，第i个点的角度为 start + (end - start) * i / n_points（不含终点）
+    """
+    if end_angle is None:
+        end_angle = start_angle + 2 * math.pi
+    angle = start_angle + (end_angle - start_angle) * (np.arange(n_points, dtype='float64') / n_points)
+    return _stack(center[0] + radius * np.cos(angle), center[1] + radius * np.sin(angle))
+
+
+def grid(x_start: float, x_end: float, x_steps: int, y_start: float, y_end: float, y_steps: int,
+         zigzag: bool = False) -> np.ndarray:
+    """逐行扫描的网格（zigzag时奇数行反向）"""
+    # 与 generate_grid_trajectory 的运算顺序相同（先乘后除），结果逐位一致
+    xs = x_start + (x_end - x_start) * np.arange(x_steps, dtype='float64') / (x_steps - 1)
+    ys = y_start + (y_end - y_start) * np.arange(y_steps, dtype='float64') / (y_steps - 1)
+    x = np.tile(xs, (y_steps, 1))
+    if zigzag:
+        x[1::2] = x[1::2, ::-1]
+    return _stack(x.ravel(), np.repeat(ys, x_steps))
+
+
+# ---------- 曲线 ----------
+
+def bezier(control_points, n_points: int) -> np.ndarray:
+    """
+    贝塞尔曲线（阶数 = 控制点数 - 1），参数t在[0, 1]上等分
+
+    用Bernstein基函数矩阵一次计算: (N, 阶数+1) @ (阶数+1, 2)
+    """
+    control = _as_points(control_points)
+    degree = len(control) - 1
+    t = _unit_steps(n_points)[:, None]
+    k = np.arange(degree + 1)
+    coefficients = np.array([math.comb(degree, i) for i in range(degree + 1)], dtype='float64')
+    basis = coefficients * t ** k * (1 - t) ** (degree - k)
+    return basis @ control
+
+
+def catmull_rom(control_points, n_points: int, alpha: float = 0.5, closed: bool = False) -> np.ndarray:
+    """
+    经过所有控制点的 Catmull-Rom 样条
+
+    参数:
+        alpha: 参数化方式，0为均匀、0.5为向心（默认，不会出现尖点和自交）、1为弦长
+        closed: 是否闭合（终点回到起点）
+
+    每段按节点间距分配采样，样本在整条曲线的节点参数上等分
+    """
+    control = _as_points(control_points)
+    if closed:
+        control = np.concatenate([control[-1:], control, control[:2]])
+    elif len(control) >= 2:
+        # 两端各补一个镜像点，使曲线经过首尾控制点
+        control = np.concatenate([2 * control[:1] - control[1:2], control, 2 * control[-1:] - control[-2:-1]])
+    else:
+        return np.repeat(control, n_points, axis=0)
+
+    distances = np.hypot(*np.diff(control, axis=0).T)
+    knots = np.concatenate([[0.0], np.cumsum(np.maximum(distances, 1e-12) ** alpha)])
+    segments = len(control) - 3
+
+    # 每段转为三次Hermite多项式（切线由非均匀节点的差商得到），再按局部参数用Horner求值
+    p0, p1, p2, p3 = (control[i:i + segments] for i in range(4))
+    t0, t1, t2, t3 = (knots[i:i + segments, None] for i in range(4))
+    span = t2 - t1
+    m1 = ((p1 - p0) / (t1 - t0) - (p2 - p0) / (t2 - t0) + (p2 - p1) / span) * span
+    m2 = ((p2 - p1) / span - (p3 - p1) / (t3 - t1) + (p3 - p2) / (t3 - t2)) * span
+    c2 = 3 * (p2 - p1) - 2 * m1 - m2
+    c3 = 2 * (p1 - p2) + m1 + m2
+
+    u = knots[1] + (knots[-2] - knots[1]) * _unit_steps(n_points)
+    segment = np.clip(np.searchsorted(knots, u, side='right') - 2, 0, segments - 1)
+    s = ((u - knots[segment + 1]) / span[segment, 0])[:, None]
+    return ((c3[segment] * s + c2[segment]) * s + m1[segment]) * s + p1[segment]
+
+
+def lissajous(center: Sequence[float], amplitude: Sequence[float], frequency: Sequence[float],
+              n_points: int, phase: float = math.pi / 2, cycles: float = 1.0) -> np.ndarray:
+    """
+    李萨如曲线 x = cx + ax·sin(fx·t + phase), y = cy + ay·sin(fy·t)
+
+    t 在 [0, 2π·cycles) 上等分（不含终点，整数频率时首尾相接）
+    """
+    t = 2 * math.pi * cycles * (np.arange(n_points, dtype='float64') / n_points)
+    return _stack(center[0] + amplitude[0] * np.sin(frequency[0] * t + phase),
+                  center[1] + amplitude[1] * np.sin(frequency[1] * t))
+
+
+def spiral(center: Sequence[float], start_radius: float, end_radius: float, turns: float,
+           n_points: int, start_angle: float = 0) -> np.ndarray:
+    """阿基米德螺线：半径随角度线性变化，从 start_radius 转 turns 圈到 end_radius（包含两端）"""
+    t = _unit_steps(n_points)
+    angle = start_angle + 2 * math.pi * turns * t
+    radius = start_radius + (end_radius - start_radius) * t
+    return _stack(center[0] + radius * np.cos(angle), center[1] + radius * np.sin(angle))
+
+
+# ---------- 弧长 ----------
+
+def arc_length(points) -> np.ndarray:
+    """累积弧长（第一个点为0，长度与点数相同）"""
+    points = _as_points(points)
+    return np.concatenate([[0.0], np.cumsum(np.hypot(*np.diff(points, axis=0).T))])
+
+
+def polyline(vertices, n_points: Optional[int] = None, spacing: Optional[float] = None,
+             closed: bool = False) -> np.ndarray:
+    """
+    沿折线按弧长等距取点（包含两端）
+
+    参数:
+        vertices: 折线顶点
+        n_points: 点数（与spacing二选一）
+        spacing: 相邻点的弧长间距，点数取 floor(总长 / spacing) + 1
+        closed: 是否把终点连回起点
+    """
+    vertices = _as_points(vertices)
+    if closed:
+        vertices = np.concatenate([vertices, vertices[:1]])
+    vertices = _drop_repeats(vertices)
+    lengths = arc_length(vertices)
+    total = lengths[-1]
+    if n_points is None:
+        if spacing is None or spacing <= 0:
+            raise ValueError("polyline 需要 n_points 或正数 spacing")
+        n_points = int(total // spacing) + 1
+    if total == 0:
+        return np.repeat(vertices[:1], n_points, axis=0)
+    s = total * _unit_steps(n_points)
+    return _stack(np.interp(s, lengths, vertices[:, 0]), np.interp(s, lengths, vertices[:, 1]))
+
+
+def _drop_repeats(points: np.ndarray) -> np.ndarray:
+    """删除与前一个点重合的点（弧长严格递增，np.interp 才有确定的结果）"""
+    keep = np.ones(len(points), dtype=bool)
+    keep[1:] = np.any(points[1:] != points[:-1], axis=1)
+    return points if keep.all() else points[keep]
+
+
+# ---------- 重采样 ----------
+
+def resample_arc_length(points, n_points: Optional[int] = None, spacing: Optional[float] = None) -> np.ndarray:
+    """按弧长等距重新取点（包含首尾，点落在原折线上），n_points 与 spacing 二选一"""
+    return polyline(points, n_points, spacing=spacing)
+
+
+def turning_angles(points) -> np.ndarray:
+    """每个内部顶点处的转角（弧度，0~π），长度为 点数 - 2"""
+    points = _drop_repeats(_as_points(points))
+    if len(points) < 3:
+        return np.zeros(0)
+    d = np.diff(points, axis=0)
+    cross = d[:-1, 0] * d[1:, 1] - d[:-1, 1] * d[1:, 0]
+    dot = np.einsum('ij,ij->i', d[:-1], d[1:])
+    return np.abs(np.arctan2(cross, dot))
+
+
+def resample_curvature(points, spacing: float, max_angle: float = math.radians(10),
+                       n_points: Optional[int] = None, min_spacing: Optional[float] = None) -> np.ndarray:
+    """
+    曲率自适应重采样：相邻两点之间的弧长不超过 spacing、转角不超过 max_angle（弧度）
+
+    每段的"代价" = 段长 / spacing + 转角 / max_angle（顶点的转角平均分给相邻两段），
+    按累积代价等分取点：直线段按 spacing 取点，转弯处按转角加密。
+    折线的尖角无法靠加密满足转角限制，转角代价以 段长 / min_spacing 为上限
+    （默认 spacing / 10），避免在同一位置堆积几乎重合的帧。
+    指定 n_points 时保持两种代价的比例，只把总点数缩放到 n_points。
+    """
+    points = _drop_repeats(_as_points(points))
+    if len(points) < 2:
+        return points.copy()
+    if spacing <= 0 or max_angle <= 0:
+        raise ValueError("spacing 和 max_angle 必须为正数")
+    if min_spacing is None:
+        min_spacing = spacing / 10
+    lengths = np.hypot(*np.diff(points, axis=0).T)
+    angles = turning_angles(points) / max_angle
+    turning = np.zeros(len(lengths))
+    turning[:-1] += angles / 2
+    turning[1:] += angles / 2
+    cost = lengths / spacing + np.minimum(turning, lengths / min_spacing)
+    cumulative = np.concatenate([[0.0], np.cumsum(cost)])
+    if n_points is None:
+        n_points = int(math.ceil(cumulative[-1] - 1e-9)) + 1
+    c = cumulative[-1] * _unit_steps(n_points)
+    return _stack(np.interp(c, cumulative, points[:, 0]), np.interp(c, cumulative, points[:, 1]))
+
+
+def simplify_rdp(points, tolerance: float) -> np.ndarray:
+    """
+    Ramer-Douglas-Peucker 简化：保留首尾，删除到简化后折线的距离不超过 tolerance 的点
+
+    用栈代替递归，每次用NumPy计算一整段内所有点到弦的距离
+    """
+    points = _as_points(points)
+    count = len(points)
+    if count < 3:
+        return points.copy()
+    keep = np.zeros(count, dtype=bool)
+    keep[0] = keep[-1] = True
+    stack = [(0, count - 1)]
+    while stack:
+        start, end = stack.pop()
+        if end - start < 2:
+            continue
+        inner = points[start + 1:end]
+        a, b = points[start], points[end]
+        chord = b - a
+        length = math.hypot(chord[0], chord[1])
+        if length == 0:
+            distances = np.hypot(*(inner - a).T)  # 闭合轨迹：弦退化为点
+        else:
+            distances = np.abs(chord[0] * (inner[:, 1] - a[1]) - chord[1] * (inner[:, 0] - a[0])) / length
+        i = int(np.argmax(distances))
+        if distances[i] > tolerance:
+            split = start + 1 + i
+            keep[split] = True
+            stack.append((start, split))
+            stack.append((split, end))
+    return points[keep]
+
+
+RESAMPLE_METHODS = ('arc', 'curvature', 'rdp')
+
+
+def resample(points, method: str, n_points: Optional[int] = None, spacing: Optional[float] = None,
+             max_angle: float = math.radians(10), tolerance: float = 1.0) -> np.ndarray:
+    """
+    按方法名重采样
+
+    参数:
+        method: 'arc'（弧长等距，n_points 或 spacing）、'curvature'（spacing + max_angle，可选 n_points）、
+                'rdp'（tolerance）
+    """
+    if method == 'arc':
+        return resample_arc_length(points, n_points, spacing)
+    if method == 'curvature':
+        if spacing is None:
+            raise ValueError("curvature 重采样需要 spacing")
+        return resample_curvature(points, spacing, max_angle, n_points)
+    if method == 'rdp':
+        return simplify_rdp(points, tolerance)
+    raise ValueError(f"不支持的重采样方法: {method}（可选: {', '.join(RESAMPLE_METHODS)}）")
+
+
+# ---------- 转换为JSON格式 ----------
+
+def to_point_list(points) -> List[Dict[str, float]]:
+    """转为点数组格式 [{"x": ..., "y": ...}, ...]"""
+    return [{"x": x, "y": y} for x, y in np.asarray(points, dtype='float64').tolist()]
+
+
+def to_separated(points) -> Dict[str, List[float]]:
+    """转为分离格式 {"x": [...], "y": [...]}"""
+    points = np.asarray(points, dtype='float64')
+    return {"x": points[:, 0].tolist(), "y": points[:, 1].tolist()}
+
+
+def from_json_data(data: Any) -> np.ndarray:
+    """由轨迹JSON数据（点数组或分离格式）得到 (N, 2) 数组"""
+    if isinstance(data, list):
+        return _stack(np.array([p["x"] for p in data], dtype='float64'),
+                      np.array([p["y"] for p in data], dtype='float64'))
+    if isinstance(data, dict) and 'x' in data and 'y' in data:
+        if len(data['x']) != len(data['y']):
+            raise ValueError(f"x和y坐标数量不匹配: {len(data['x'])} vs {len(data['y'])}")
+        return _stack(np.asarray(data['x'], dtype='float64'), np.asarray(data['y'], dtype='float64'))
+    raise ValueError(f"不支持的轨迹格式: {type(data)}")
+
+
+def save_trajectory(path: str, points, fmt: str = 'array', indent: Optional[int] = 2):
+    """
+    写出轨迹JSON文件
+
+    参数:
+        fmt: 'array'（点数组）或 'separated'（分离格式）
+        indent: JSON缩进（None为紧凑格式，百万点时快得多）
+    """
+    if fmt == 'separated':
+        output = to_separated(points)
+    elif fmt == 'array':
+        output = to_point_list(points)
+    else:
+        raise ValueError(f"不支持的轨迹格式: {fmt}")
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(output, f, indent=indent, ensure_ascii=False)
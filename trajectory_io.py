@@ -0,0 +1,257 @@
+#!/usr/bin/env python3
+"""
+轨迹文件读写 - 流式NDJSON和内存映射的 .npy/.npz，百万点的轨迹无需全部读入内存
+
+支持的格式（按扩展名识别）:
+  - .json: 点数组 [{"x": .., "y": ..}, ...] 或分离格式 {"x": [...], "y": [...]}（整个文件读入，适合小文件）
+  - .ndjson / .jsonl: 每行一个点，{"x": 100, "y": 300} 或 [100, 300]，逐行流式读取
+  - .npy: (N, 2) float64 数组，内存映射读取
+  - .npz: 成员 points（(N, 2)）或 x、y（各 (N,)）；未压缩时内存映射读取（np.savez 的默认方式）
+
+用法:
+    from trajectory_io import TrajectoryFile, write_trajectory
+
+    trajectory = TrajectoryFile("scan.npy")
+    print(len(trajectory), trajectory.first(), trajectory.last())
+    for xs, ys in trajectory.chunks(65536):   # 按块读取坐标列表
+        ...
+
+    write_trajectory("scan.ndjson", points)    # points 为 (N, 2) 数组或 [{"x", "y"}] 列表
+
+.npy/.npz 需要numpy（仅在读写这两种格式时导入）。
+"""
+
+import json
+import math
+import os
+import struct
+import zipfile
+from typing import Dict, Iterator, List, Optional, Tuple
+
+
+CHUNK_POINTS = 65536  # 按块读取/写入的点数
+
+FORMATS = ('json', 'ndjson', 'npy', 'npz')
+_EXTENSIONS = {'.json': 'json', '.ndjson': 'ndjson', '.jsonl': 'ndjson', '.npy': 'npy', '.npz': 'npz'}
+
+
+def trajectory_format(path: str) -> str:
+    """由扩展名判断轨迹格式（未知扩展名按JSON处理）"""
+    return _EXTENSIONS.get(os.path.splitext(path)[1].lower(), 'json')
+
+
+# ---------- 读取 ----------
+
+def _parse_ndjson_line(line: str, number: int) -> Tuple[float, float]:
+    value = json.loads(line)
+    if isinstance(value, dict):
+        return value["x"], value["y"]
+    if isinstance(value, list) and len(value) == 2:
+        return value[0], value[1]
+    raise ValueError(f"第{number}行不是轨迹点: {line.strip()[:80]}")
+
+
+def _iter_ndjson(path: str) -> Iterator[Tuple[float, float]]:
+    with open(path, 'r', encoding='utf-8') as f:
+        for number, line in enumerate(f, 1):
+            if line.strip():
+                yield _parse_ndjson_line(line, number)
+
+
+def _npz_member(path: str, name: str):
+    """
+    以内存映射方式打开 .npz 中未压缩的成员，压缩成员只能读入内存
+
+    zip中未压缩成员的数据就是完整的 .npy 文件，定位到它在zip中的偏移后直接映射
+    """
+    import numpy as np
+
+    with zipfile.ZipFile(path) as archive:
+        info = archive.getinfo(name + '.npy')
+        if info.compress_type != zipfile.ZIP_STORED:
+            with archive.open(info) as f:
+                return np.lib.format.read_array(f)
+    with open(path, 'rb') as f:
+        f.seek(info.header_offset)
+        local_header = f.read(30)
+        name_length, extra_length = struct.unpack('<HH', local_header[26:30])
+        f.seek(info.header_offset + 30 + name_length + extra_length)
+        version = np.lib.format.read_magic(f)
+        if version == (1, 0):
+            shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(f)
+        else:
+            shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(f)
+        offset = f.tell()
+    return np.memmap(path, dtype=dtype, mode='r', offset=offset, shape=shape,
+                     order='F' if fortran_order else 'C')
+
+
+def load_trajectory_array(path: str, fmt: Optional[str] = None):
+    """
+    读取为 (N, 2) 的NumPy数组
+
+    .npy 和未压缩的 .npz 返回只读的内存映射数组（访问到的部分才从磁盘读入）
+    """
+    import numpy as np
+
+    fmt = fmt or trajectory_format(path)
+    if fmt == 'npy':
+        points = np.load(path, mmap_mode='r')
+    elif fmt == 'npz':
+        with zipfile.ZipFile(path) as archive:
+            names = {os.path.splitext(n)[0] for n in archive.namelist()}
+        if 'points' in names:
+            points = _npz_member(path, 'points')
+        elif 'x' in names and 'y' in names:
+            x, y = _npz_member(path, 'x'), _npz_member(path, 'y')
+            if len(x) != len(y):
+                raise ValueError(f"x和y坐标数量不匹配: {len(x)} vs {len(y)}")
+            points = np.column_stack([x, y])
+        else:
+            raise ValueError(f"{path} 中没有 points 或 x/y 数组: {sorted(names)}")
+    elif fmt == 'ndjson':
+        points = np.array(list(_iter_ndjson(path)), dtype='float64').reshape(-1, 2)
+    else:
+        with open(path, 'r', encoding='utf-8') as f:
+            from trajectories import from_json_data
+            points = from_json_data(json.load(f))
+    if points.ndim != 2 or points.shape[1] != 2:
+        raise ValueError(f"轨迹数组应为 (N, 2)，实际为 {points.shape}")
+    return points
+
+
+def point_chunks(points, size: int = CHUNK_POINTS) -> Iterator[Tuple[List[float], List[float]]]:
+    """(N, 2) 数组或 [{"x", "y"}] 列表按块转为 (xs, ys)"""
+    if hasattr(points, 'shape'):
+        for start in range(0, len(points), size):
+            block = points[start:start + size]
+            yield block[:, 0].tolist(), block[:, 1].tolist()
+    else:
+        for start in range(0, len(points), size):
+            block = points[start:start + size]
+            yield [p["x"] for p in block], [p["y"] for p in block]
+
+
+class TrajectoryFile:
+    """
+    轨迹文件的只读视图（按块迭代，不一次读入全部点）
+
+    - JSON: 读入整个文件（小文件）
+    - NDJSON: 每次迭代重新逐行读取文件；len()/last() 第一次调用时扫描一遍文件
+    - npy/npz: 内存映射数组
+    """
+
+    def __init__(self, path: str, fmt: Optional[str] = None):
+        self.path = path
+        self.format = fmt or trajectory_format(path)
+        if self.format not in FORMATS:
+            raise ValueError(f"不支持的轨迹格式: {self.format}")
+        self._points = None  # JSON: [{"x", "y"}]；npy/npz: (N, 2) 数组
+        self._count = None
+        self._last = None
+        if self.format == 'json':
+            from generate_trajectory import load_trajectory_json
+            self._points = load_trajectory_json(path)
+        elif self.format in ('npy', 'npz'):
+            self._points = load_trajectory_array(path, self.format)
+
+    def _scan(self):
+        count, last = 0, None
+        for last in _iter_ndjson(self.path):
+            count += 1
+        self._count, self._last = count, last
+
+    def __len__(self) -> int:
+        if self.format == 'ndjson':
+            if self._count is None:
+                self._scan()
+            return self._count
+        return len(self._points)
+
+    def chunks(self, size: int = CHUNK_POINTS) -> Iterator[Tuple[List[float], List[float]]]:
+        """按块生成 (xs, ys) 坐标列表"""
+        if self.format == 'ndjson':
+            xs, ys = [], []
+            for x, y in _iter_ndjson(self.path):
+                xs.append(x)
+                ys.append(y)
+                if len(xs) >= size:
+                    yield xs, ys
+                    xs, ys = [], []
+            if xs:
+                yield xs, ys
+        else:
+            yield from point_chunks(self._points, size)
+
+    def __iter__(self) -> Iterator[Dict[str, float]]:
+        for xs, ys in self.chunks():
+            for x, y in zip(xs, ys):
+                yield {"x": x, "y": y}
+
+    def first(self) -> Optional[Dict[str, float]]:
+        if self.format == 'ndjson':
+            points = _iter_ndjson(self.path)
+            point = next(points, None)
+            points.close()
+            return None if point is None else {"x": point[0], "y": point[1]}
+        return self._point_at(0) if len(self._points) else None
+
+    def _point_at(self, index: int) -> Dict[str, float]:
+        point = self._points[index]
+        if self.format == 'json':
+            return point
+        return {"x": float(point[0]), "y": float(point[1])}
+
+    def last(self) -> Optional[Dict[str, float]]:
+        if self.format == 'ndjson':
+            if self._count is None:
+                self._scan()
+            return None if self._last is None else {"x": self._last[0], "y": self._last[1]}
+        return self._point_at(-1) if len(self._points) else None
+
+    def __repr__(self) -> str:
+        return f"TrajectoryFile({self.path!r}, format={self.format!r})"
+
+
+# ---------- 写入 ----------
+
+def _as_array(points):
+    import numpy as np
+    if hasattr(points, 'shape'):
+        return np.asarray(points, dtype='float64')
+    return np.array([(p["x"], p["y"]) for p in points], dtype='float64').reshape(-1, 2)
+
+
+def write_ndjson(path: str, points):
+    """每行一个 {"x": .., "y": ..}，按块编码写入"""
+    with open(path, 'w', encoding='utf-8') as f:
+        for xs, ys in point_chunks(points):
+            if not all(map(math.isfinite, xs)) or not all(map(math.isfinite, ys)):
+                raise ValueError("轨迹坐标包含 NaN 或无穷大，无法写为NDJSON")
+            f.write(''.join(f'{{"x": {x!r}, "y": {y!r}}}\n' for x, y in zip(xs, ys)))
+
+
+def write_trajectory(path: str, points, fmt: Optional[str] = None, **json_options):
+    """
+    写出轨迹文件
+
+    参数:
+        points: (N, 2) 数组或 [{"x", "y"}] 列表
+        fmt: 'json'、'ndjson'、'npy'、'npz'（默认按扩展名）
+        json_options: JSON格式的参数（fmt='array'/'separated'、indent，见 trajectories.save_trajectory）
+    """
+    fmt = fmt or trajectory_format(path)
+    if fmt == 'ndjson':
+        write_ndjson(path, points)
+    elif fmt in ('npy', 'npz'):
+        import numpy as np
+        with open(path, 'wb') as f:  # 传入文件对象，numpy不会给路径追加扩展名
+            if fmt == 'npy':
+                np.save(f, _as_array(points))
+            else:
+                np.savez(f, points=_as_array(points))  # 不压缩，读取时可内存映射
+    elif fmt == 'json':
+        from trajectories import save_trajectory
+        save_trajectory(path, _as_array(points), **json_options)
+    else:
+        raise ValueError(f"不支持的轨迹格式: {fmt}")
@@ -0,0 +1,334 @@
+#!/usr/bin/env python3
+"""
+轨迹动画播放页 - 按文件名前缀把连续帧组合成可播放的动画
+
+demo_h_001..N、test_01..20 这类轨迹输出在索引页中是一张张互不相关的卡片。
+本模块为每个轨迹前缀生成一个播放页:
+
+  output/players/<前缀>.html        播放页（播放/暂停、拖动进度条、调整帧率）
+  output/player_frames/<场景名>.jpg  缩小后的播放帧（默认960px宽，只在截图更新后重新生成）
+
+播放页在播放位置之前维护一个预加载环形缓冲区（默认48帧，图片提前解码），
+下一帧尚未就绪时暂停等待而不是跳帧，1000帧的扫描也能实时流畅播放。
+
+用法:
+    from trajectory_player import build_players
+
+    build_players("output", scene_names)   # 通常由 index_builder.build_index 自动调用
+"""
+
+import html
+import json
+import os
+import re
+from typing import Dict, List, Optional
+
+
+# 默认配置
+PLAYER_DIR = 'players'
+PLAYER_FRAME_DIR = 'player_frames'
+PLAYER_FRAME_WIDTH = 960  # 播放帧宽度（像素）
+PRELOAD_FRAMES = 48  # 预加载环形缓冲区大小（帧）
+MIN_TRAJECTORY_FRAMES = 2  # 至少多少帧才生成播放页
+
+_FRAME_PATTERN = re.compile(r'^(.*?)[_-]?(\d+)$')
+
+
+def split_frame_name(name: str):
+    """把场景名拆分为 (前缀, 帧号)；不以数字结尾时返回 (name, None)"""
+    match = _FRAME_PATTERN.match(name)
+    if not match or not match.group(1):
+        return name, None
+    return match.group(1), int(match.group(2))
+
+
+def group_trajectories(names, min_frames: int = MIN_TRAJECTORY_FRAMES) -> Dict[str, List[str]]:
+    """
+    按前缀分组场景名，每组按帧号排序
+
+    例如 demo_h_001、demo_h_002 → {'demo_h': ['demo_h_001', 'demo_h_002']}
+    """
+    groups = {}
+    for name in names:
+        prefix, number = split_frame_name(name)
+        if number is not None:
+            groups.setdefault(prefix, []).append((number, name))
+    return {
+        prefix: [name for _, name in sorted(frames)]
+        for prefix, frames in sorted(groups.items())
+        if len(frames) >= min_frames
+    }
+
+
+def render_player_html(prefix: str, frames: List[str], frame_dir: str, ext: str,
+                       index_href: str, fps: float, preload: int = PRELOAD_FRAMES) -> str:
+    """生成单个轨迹的播放页"""
+    title = html.escape(prefix)
+    return """<!DOCTYPE html>
+<html lang="zh-CN">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>Ray-Optics 轨迹 - """ + title + """</title>
+    <style>
+        body {
+            margin: 0;
+            font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Arial, sans-serif;
+            background: #111;
+            color: white;
+            display: flex;
+            flex-direction: column;
+            height: 100vh;
+        }
+        #stage {
+            flex: 1;
+            display: flex;
+            align-items: center;
+            justify-content: center;
+            min-height: 0;
+        }
+        canvas {
+            max-width: 100%;
+            max-height: 100%;
+        }
+        #controls {
+            display: flex;
+            gap: 12px;
+            align-items: center;
+            padding: 12px 20px;
+            background: rgba(255, 255, 255, 0.08);
+            font-size: 14px;
+        }
+        #controls input[type=range] {
+            flex: 1;
+        }
+        #controls input[type=number] {
+            width: 60px;
+        }
+        button {
+            padding: 6px 14px;
+            border-radius: 6px;
+            border: 1px solid rgba(255, 255, 255, 0.3);
+            background: rgba(255, 255, 255, 0.15);
+            color: white;
+            cursor: pointer;
+        }
+        a {
+            color: #4CAF50;
+        }
+        #status {
+            min-width: 150px;
+            text-align: right;
+            opacity: 0.8;
+        }
+    </style>
+</head>
+<body>
+    <div id="stage"><canvas id="frame"></canvas></div>
+    <div id="controls">
+        <a href=""" + json.dumps(index_href) + """>← 索引</a>
+        <strong>""" + title + """</strong>
+        <button id="play">▶ 播放</button>
+        <input type="range" id="scrub" min="0" value="0">
+        <label>帧率 <input type="number" id="fps" min="1" max="120" step="1"></label>
+        <span id="status"></span>
+    </div>
+
+    <script>
+        const FRAMES = """ + json.dumps(frames, ensure_ascii=False, separators=(',', ':')) + """;
+        const FRAME_DIR = """ + json.dumps(frame_dir) + """;
+        const FRAME_EXT = """ + json.dumps(ext) + """;
+        const PRELOAD = """ + str(preload) + """;
+
+        const canvas = document.getElementById('frame');
+        const context = canvas.getContext('2d');
+        const scrub = document.getElementById('scrub');
+        const fpsInput = document.getElementById('fps');
+        const playButton = document.getElementById('play');
+        const status = document.getElementById('status');
+
+        const cache = new Map();  // 帧号 -> {image, ready}
+        let current = 0;
+        let playing = false;
+        let fps = """ + f'{fps:g}' + """;
+        let lastTick = 0;
+
+        scrub.max = FRAMES.length - 1;
+        fpsInput.value = fps;
+
+        function load(index) {
+            if (cache.has(index)) {
+                return cache.get(index);
+            }
+            const image = new Image();
+            const entry = {image: image, ready: false};
+            image.src = FRAME_DIR + '/' + encodeURIComponent(FRAMES[index]) + FRAME_EXT;
+            image.decode().catch(function() {}).then(function() {
+                entry.ready = true;
+                if (index === current) {
+                    draw(index);
+                }
+            });
+            cache.set(index, entry);
+            return entry;
+        }
+
+        // 环形缓冲区：保留当前帧之前的少量帧和之后的 PRELOAD 帧，其余释放
+        function preload(from) {
+            const keep = new Set();
+            for (let k = -2; k < PRELOAD; k++) {
+                keep.add((from + k + FRAMES.length) % FRAMES.length);
+            }
+            for (const index of cache.keys()) {
+                if (!keep.has(index)) {
+                    cache.delete(index);
+                }
+            }
+            for (let k = 0; k < PRELOAD; k++) {
+                load((from + k) % FRAMES.length);
+            }
+        }
+
+        function draw(index) {
+            const entry = cache.get(index);
+            if (!entry || !entry.ready || !entry.image.naturalWidth) {
+                return false;
+            }
+            if (canvas.width !== entry.image.naturalWidth || canvas.height !== entry.image.naturalHeight) {
+                canvas.width = entry.image.naturalWidth;
+                canvas.height = entry.image.naturalHeight;
+            }
+            context.drawImage(entry.image, 0, 0);
+            return true;
+        }
+
+        function buffered() {
+            let count = 0;
+            while (count < PRELOAD && count < FRAMES.length) {
+                const entry = cache.get((current + count) % FRAMES.length);
+                if (!entry || !entry.ready) {
+                    break;
+                }
+                count++;
+            }
+            return count;
+        }
+
+        function seek(index) {
+            current = (index + FRAMES.length) % FRAMES.length;
+            scrub.value = current;
+            preload(current);
+            draw(current);
+            updateStatus();
+        }
+
+        function updateStatus() {
+            status.textContent = (current + 1) + ' / ' + FRAMES.length + '  缓冲 ' + buffered();
+        }
+
+        function tick(now) {
+            if (playing && now - lastTick >= 1000 / fps) {
+                const next = (current + 1) % FRAMES.length;
+                const entry = cache.get(next);
+                if (entry && entry.ready) {
+                    // 下一帧已解码才前进，缓冲不足时等待而不是跳帧
+                    lastTick = now;
+                    seek(next);
+                } else {
+                    load(next);
+                    updateStatus();
+                }
+            }
+            requestAnimationFrame(tick);
+        }
+
+        function setPlaying(value) {
+            playing = value;
+            playButton.textContent = playing ? '⏸ 暂停' : '▶ 播放';
+        }
+
+        playButton.onclick = function() { setPlaying(!playing); };
+        scrub.oninput = function() { seek(parseInt(scrub.value, 10)); };
+        fpsInput.onchange = function() {
+            fps = Math.min(120, Math.max(1, parseFloat(fpsInput.value) || fps));
+            fpsInput.value = fps;
+        };
+        document.addEventListener('keydown', function(event) {
+            if (event.target === fpsInput) {
+                return;
+            }
+            if (event.key === ' ') {
+                event.preventDefault();
+                setPlaying(!playing);
+            } else if (event.key === 'ArrowRight') {
+                seek(current + 1);
+            } else if (event.key === 'ArrowLeft') {
+                seek(current - 1);
+            }
+        });
+
+        seek(0);
+        requestAnimationFrame(tick);
+    </script>
+</body>
+</html>
+"""
+
+
+def build_players(output_dir: str, names, image_dir: Optional[str] = None,
+                  frame_width: int = PLAYER_FRAME_WIDTH, fps: Optional[float] = None,
+                  verbose: bool = True) -> List[list]:
+    """
+    为每个轨迹前缀生成播放页和缩小的播放帧（只重写变化的内容）
+
+    参数:
+        output_dir: 输出目录（播放页写在 output_dir/players/ 下）
+        names: 场景名列表
+        image_dir: 截图目录（默认 output_dir/images）
+        frame_width: 播放帧宽度（0表示直接使用原图）
+        fps: 默认播放帧率（默认 frame_encoder.DEFAULT_FPS）
+        verbose: 是否打印进度
+
+    返回 [[前缀, 帧数], ...]，供索引页列出所有播放页
+    """
+    from frame_encoder import DEFAULT_FPS
+    from index_builder import _relative, _write_if_changed, make_thumbnail
+
+    if fps is None:
+        fps = DEFAULT_FPS
+    image_dir = image_dir or os.path.join(output_dir, 'images')
+    player_dir = os.path.join(output_dir, PLAYER_DIR)
+    frame_dir = os.path.join(output_dir, PLAYER_FRAME_DIR) if frame_width else image_dir
+    ext = '.jpg' if frame_width else '.png'
+
+    players = []
+    frames_written = 0
+    for prefix, frames in group_trajectories(names).items():
+        frames = [name for name in frames if os.path.exists(os.path.join(image_dir, f"{name}.png"))]
+        if len(frames) < MIN_TRAJECTORY_FRAMES:
+            continue
+
+        os.makedirs(player_dir, exist_ok=True)
+        if frame_width:
+            os.makedirs(frame_dir, exist_ok=True)
+            for name in frames:
+                try:
+                    if make_thumbnail(os.path.join(image_dir, f"{name}.png"),
+                                      os.path.join(frame_dir, f"{name}.jpg"), width=frame_width):
+                        frames_written += 1
+                except Exception as e:
+                    print(f"  ⚠ 播放帧生成失败: {name}.png: {e}")
+
+        page = render_player_html(
+            prefix, frames,
+            frame_dir=_relative(frame_dir, player_dir),
+            ext=ext,
+            index_href=_relative(os.path.join(output_dir, 'index.html'), player_dir),
+            fps=fps,
+        )
+        _write_if_changed(os.path.join(player_dir, f"{prefix}.html"), page)
+        players.append([prefix, len(frames)])
+
+    if verbose and players:
+        print(f"✓ 轨迹播放页: {len(players)} 个（新播放帧 {frames_written} 张）")
+    return players